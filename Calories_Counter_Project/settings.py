@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 from decouple import config
+from corsheaders.defaults import default_headers as default_cors_headers
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -25,6 +26,10 @@ SECRET_KEY = config('DJANGO_SECRET_KEY')
 # Gemini API configuration
 GEMINI_API_KEY = config('GEMINI_API_KEY')
 
+# Gemini nutrition lookups are cached per normalised description
+GEMINI_CACHE_TTL_DAYS = config('GEMINI_CACHE_TTL_DAYS', default=30, cast=int)
+GEMINI_CACHE_MAX_ENTRIES = config('GEMINI_CACHE_MAX_ENTRIES', default=2000, cast=int)
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = config('DEBUG', default=True, cast=bool)
 
@@ -64,6 +69,9 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:5173",
 ]
 CORS_ALLOW_CREDENTIALS = True
+# Conditional GETs: let the dev server send If-None-Match and read ETag
+CORS_ALLOW_HEADERS = (*default_cors_headers, 'if-none-match', 'if-modified-since')
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified']
 
 # CSRF settings for React frontend
 CSRF_TRUSTED_ORIGINS = [
@@ -123,6 +131,26 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local-memory cache with LRU eviction once MAX_ENTRIES is reached.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'count-calories',
+        'OPTIONS': {
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=500, cast=int),
+            'CULL_FREQUENCY': 4,
+        },
+    }
+}
+
+# Seconds an analytics/trends response stays cached (0 disables the response cache).
+# Entries are also invalidated whenever the data they were built from changes.
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=3600, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -0,0 +1,130 @@
+"""
+Date-aligned joins between two time series.
+
+Body measurements show the weight logged around the same date. Rather than
+looking a weigh-in up per measurement, both series are read sorted once and
+merged in a single linear pass, so attaching weights costs one query for any
+number of measurements.
+
+Three ways to match a target date to a sample:
+
+- SAME_DAY: the latest sample on that local date.
+- NEAREST: the sample on the closest local date within ``within_days``
+  (the earlier date wins a tie; the latest sample of that date is used).
+- LATEST_BEFORE: the latest sample on or before that local date, optionally
+  no more than ``within_days`` old.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from .models import Weight
+
+SAME_DAY = 'same_day'
+NEAREST = 'nearest'
+LATEST_BEFORE = 'latest_before'
+MATCH_MODES = (SAME_DAY, NEAREST, LATEST_BEFORE)
+
+# Default window for NEAREST when none is given
+DEFAULT_WITHIN_DAYS = 3
+
+
+def local_day(value):
+    """Local calendar date of an aware datetime (dates pass through)."""
+    return timezone.localdate(value) if isinstance(value, datetime) else value
+
+
+def _latest_per_day(samples):
+    """Collapse ascending (date, value) pairs to the last value of each date."""
+    days, values = [], []
+    for day, value in samples:
+        if days and days[-1] == day:
+            values[-1] = value
+        else:
+            days.append(day)
+            values.append(value)
+    return days, values
+
+
+def align_by_date(targets, samples, match=SAME_DAY, within_days=None):
+    """
+    The sample value matched to each target date, or None, in target order.
+
+    ``samples`` must be (date, value) pairs in ascending time order. Targets
+    may come in any order; they are visited in date order while one cursor
+    walks the samples, so the merge is linear in both lengths.
+    """
+    if match not in MATCH_MODES:
+        raise ValueError(f"Unknown match mode: {match!r}")
+    if match == NEAREST and within_days is None:
+        within_days = DEFAULT_WITHIN_DAYS
+    days, values = _latest_per_day(samples)
+
+    matched = [None] * len(targets)
+    after = 0  # index of the first sample day later than the current target
+    for index in sorted(range(len(targets)), key=targets.__getitem__):
+        target = targets[index]
+        while after < len(days) and days[after] <= target:
+            after += 1
+        before = after - 1
+
+        candidates = []
+        if before >= 0:
+            candidates.append(before)
+        if match == NEAREST and after < len(days):
+            candidates.append(after)
+        if match == SAME_DAY:
+            candidates = [i for i in candidates if days[i] == target]
+        elif within_days is not None:
+            candidates = [i for i in candidates if abs((days[i] - target).days) <= within_days]
+
+        if candidates:
+            # min() keeps the first of equally distant candidates: the earlier day
+            best = min(candidates, key=lambda i: abs((days[i] - target).days))
+            matched[index] = values[best]
+    return matched
+
+
+def matching_from_query(params):
+    """
+    (match, within_days) from ``?weight_match=...&weight_within=N``.
+
+    Unknown modes fall back to SAME_DAY and a missing or invalid window to the
+    mode's default.
+    """
+    match = params.get('weight_match', SAME_DAY)
+    if match not in MATCH_MODES:
+        match = SAME_DAY
+    try:
+        within_days = max(int(params.get('weight_within', '')), 0)
+    except ValueError:
+        within_days = None
+    return match, within_days
+
+
+def weights_for_dates(days, match=SAME_DAY, within_days=None):
+    """
+    The logged weight (Decimal) matched to each local date in ``days``, or None.
+
+    Reads only the weigh-ins that can match, in one query.
+    """
+    if not days:
+        return []
+    first, last = min(days), max(days)
+    if match == NEAREST:
+        reach = within_days if within_days is not None else DEFAULT_WITHIN_DAYS
+        first, last = first - timedelta(days=reach), last + timedelta(days=reach)
+    weights = Weight.objects.filter(
+        recorded_at__lt=timezone.make_aware(datetime.combine(last + timedelta(days=1), time.min)),
+    )
+    if match != LATEST_BEFORE or within_days is not None:
+        if match == LATEST_BEFORE:
+            first -= timedelta(days=within_days)
+        weights = weights.filter(recorded_at__gte=timezone.make_aware(datetime.combine(first, time.min)))
+
+    samples = (
+        (local_day(recorded_at), weight)
+        for recorded_at, weight in weights.order_by('recorded_at', 'id').values_list('recorded_at', 'weight')
+    )
+    return align_by_date(days, samples, match, within_days)
@@ -0,0 +1,958 @@
+"""
+Analytics engine shared by the analytics page and api_analytics.
+
+The period's daily totals are read once from the DailyNutrition rollup into
+NumPy arrays, and weigh-ins once from Weight. Every section is computed from
+those arrays with vectorised operations: bincount for weekday and hour
+buckets, histogram for calorie bands, unique/bincount for weekly and monthly
+reports. Sections are cached properties, so each is computed at most once per
+engine and only when a view asks for it.
+
+Hour-of-day figures come from HourlyHistogram: one query grouped by local
+weekday and hour, so meal timing never loads individual food entries.
+
+Sections return plain Python numbers so they can go straight into a template
+context or a JSON response.
+"""
+
+import json
+from datetime import timedelta
+from functools import cached_property
+
+import numpy as np
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay
+from django.utils import timezone
+
+from .correlation import ROLLUP_FIELDS, weight_intervals
+from .models import DailyNutrition, FoodItem, RunningSession, Weight, WorkoutSession
+from .streaks import logging_streaks
+
+DEFAULT_PERIOD_DAYS = 90
+
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# (key, label) per band; a day falls in the band whose lower edge it reaches
+CALORIE_BANDS = (
+    ('very_low', '<1500'),
+    ('low', '1500-2000'),
+    ('moderate', '2000-2500'),
+    ('high', '2500-3000'),
+    ('very_high', '3000+'),
+)
+CALORIE_BAND_EDGES = (-np.inf, 1500, 2000, 2500, 3000, np.inf)
+
+# (key, label, hours) per meal period
+MEAL_PERIODS = (
+    ('morning', 'Morning (5-10)', range(5, 11)),
+    ('midday', 'Midday (11-14)', range(11, 15)),
+    ('afternoon', 'Afternoon (15-17)', range(15, 18)),
+    ('evening', 'Evening (18-21)', range(18, 22)),
+    ('night', 'Night (22-4)', (22, 23, 0, 1, 2, 3, 4)),
+)
+
+DEFAULT_GOALS = {
+    'daily_calories': 2500,
+    'daily_protein': 150,
+    'weekly_workouts': 4,
+    'weekly_runs': 2,
+    'target_weight': 80,  # kg
+}
+
+CALORIE_TARGET = 2500
+PROJECTION_GOAL_WEIGHTS = (70, 75, 80, 85, 90, 95)
+
+
+def _round(value, digits=0):
+    return round(float(value), digits)
+
+
+def _weekday(days):
+    """Monday=0 weekday numbers for a datetime64[D] array (1970-01-01 was a Thursday)."""
+    return (days.astype(np.int64) + 3) % 7
+
+
+def _to_date(value):
+    return value.astype('datetime64[D]').astype(object)
+
+
+class HourlyHistogram:
+    """
+    Calories and entry counts of a FoodItem queryset by local weekday and hour.
+
+    ``calories`` and ``entries`` are 7 x 24 arrays, Monday first. They are
+    filled from a single query grouped on (weekday, hour), so the cost does
+    not depend on how many entries the queryset covers.
+    """
+
+    def __init__(self, food_items):
+        rows = list(
+            food_items.annotate(weekday=ExtractIsoWeekDay('consumed_at'), hour=ExtractHour('consumed_at'))
+            .values('weekday', 'hour')
+            .annotate(total=Sum('calories'), count=Count('id'))
+            .order_by()
+        )
+        rows = [row for row in rows if row['hour'] is not None]
+        cells = np.array([(row['weekday'] - 1) * 24 + row['hour'] for row in rows], dtype=np.int64)
+        totals = np.array([float(row['total'] or 0) for row in rows])
+        counts = np.array([row['count'] for row in rows], dtype=float)
+        self.calories = np.bincount(cells, weights=totals, minlength=7 * 24).reshape(7, 24)
+        self.entries = np.bincount(cells, weights=counts, minlength=7 * 24).reshape(7, 24).astype(np.int64)
+
+    def __bool__(self):
+        return bool(self.entries.any())
+
+    @property
+    def by_hour(self):
+        """Calories per hour of the day, summed over weekdays."""
+        return self.calories.sum(axis=0)
+
+    def meal_periods(self):
+        """Calories per meal period, keyed like MEAL_PERIODS."""
+        by_hour = self.by_hour
+        return {key: float(by_hour[list(hours)].sum()) for key, _, hours in MEAL_PERIODS}
+
+    def heatmap(self):
+        """Weekday x hour grid for charts."""
+        return {
+            'days': list(DAY_NAMES),
+            'hours': list(range(24)),
+            'calories': [[_round(value, 1) for value in day] for day in self.calories],
+            'entries': self.entries.tolist(),
+        }
+
+
+class DailySeries:
+    """Daily totals between two local dates as parallel NumPy arrays, oldest first."""
+
+    def __init__(self, start=None, end=None):
+        rows = list(
+            DailyNutrition.objects.between(start, end).order_by('date')
+            .values_list('date', 'entry_count', *ROLLUP_FIELDS)
+        )
+        self.days = np.array([row[0] for row in rows], dtype='datetime64[D]')
+        self.entries = np.array([row[1] for row in rows], dtype=np.int64)
+        columns = np.array([row[2:] for row in rows], dtype=float).reshape(len(rows), len(ROLLUP_FIELDS))
+        self.calories, self.protein, self.carbs, self.fat = columns.T
+
+    def __len__(self):
+        return len(self.days)
+
+    def logged(self, values):
+        """The non-zero entries of ``values``, i.e. days where that total was logged."""
+        return values[values != 0]
+
+
+class AnalyticsEngine:
+    """
+    Every analytics section for the period from ``start_date`` (None for all
+    time) to ``now``.
+    """
+
+    def __init__(self, start_date=None, now=None, period_days=DEFAULT_PERIOD_DAYS):
+        self.now = now or timezone.now()
+        self.start_date = start_date
+        self.period_days = period_days
+        self.series = DailySeries(start_date, self.now)
+
+        weights = Weight.objects.filter(recorded_at__lte=self.now)
+        if start_date:
+            weights = weights.filter(recorded_at__gte=start_date)
+        self.weigh_ins = list(weights.order_by('recorded_at').values_list('recorded_at', 'weight'))
+        self.weights = np.array([float(weight) for _, weight in self.weigh_ins])
+
+    @classmethod
+    def for_period(cls, period, now=None):
+        """
+        Engine for a ``period`` query parameter: a number of days or 'all'.
+
+        Anything else falls back to the default 90 days.
+        """
+        now = now or timezone.now()
+        if period == 'all':
+            return cls(None, now)
+        try:
+            days = int(period)
+        except (TypeError, ValueError):
+            days = DEFAULT_PERIOD_DAYS
+        return cls(now - timedelta(days=days), now, period_days=days)
+
+    # === DAILY SERIES ===
+
+    @cached_property
+    def calories(self):
+        """Calories of each day with calories logged."""
+        return self.series.logged(self.series.calories)
+
+    @cached_property
+    def daily_data(self):
+        s = self.series
+        return [
+            {
+                'date': _to_date(s.days[i]).isoformat(),
+                'calories': float(s.calories[i]),
+                'protein': _round(s.protein[i], 1),
+                'carbs': _round(s.carbs[i], 1),
+                'fat': _round(s.fat[i], 1),
+            }
+            for i in range(len(s))
+        ]
+
+    @cached_property
+    def overall_stats(self):
+        s = self.series
+        calories = self.calories
+        if not len(calories):
+            return {}
+        stats = {
+            'avg_daily_calories': _round(calories.mean()),
+            'total_days_logged': len(s),
+            'total_calories': _round(calories.sum()),
+            'calorie_min': _round(calories.min()),
+            'calorie_max': _round(calories.max()),
+        }
+        for name, values in (('protein', s.protein), ('carbs', s.carbs), ('fat', s.fat)):
+            logged = s.logged(values)
+            if len(logged):
+                stats[f'avg_daily_{name}'] = _round(logged.mean(), 1)
+                stats[f'total_{name}'] = _round(logged.sum())
+        if len(calories) >= 3:
+            stats['calorie_std_dev'] = _round(calories.std(ddof=1))
+        return stats
+
+    # === THIS WEEK ===
+
+    @cached_property
+    def weekly_summary(self):
+        now = self.now
+        this_week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        last_week_start = this_week_start - timedelta(days=7)
+
+        two_weeks = DailySeries(last_week_start.date(), now)
+        this_week = two_weeks.days >= np.datetime64(this_week_start.date())
+
+        def week(mask):
+            days = int(mask.sum())
+            calories = float(two_weeks.calories[mask].sum())
+            protein = float(two_weeks.protein[mask].sum())
+            avg_calories = _round(calories / days) if days else 0
+            avg_protein = _round(protein / days, 1) if days else 0
+            return days, calories, protein, avg_calories, avg_protein
+
+        this_days, this_cal, this_prot, this_avg_cal, this_avg_prot = week(this_week)
+        last_days, _, _, last_avg_cal, last_avg_prot = week(~this_week)
+
+        workouts = WorkoutSession.objects.filter(date__gte=last_week_start, date__lte=now).aggregate(
+            this_week=Count('id', filter=Q(date__gte=this_week_start)),
+            last_week=Count('id', filter=Q(date__lt=this_week_start)),
+        )
+        runs = RunningSession.objects.filter(date__gte=this_week_start, date__lte=now).aggregate(
+            count=Count('id'), distance=Sum('distance')
+        )
+        weights = [
+            float(weight) for weight in
+            Weight.objects.filter(recorded_at__gte=this_week_start, recorded_at__lte=now)
+            .order_by('recorded_at').values_list('weight', flat=True)
+        ]
+
+        return {
+            'this_week': {
+                'days_logged': this_days,
+                'total_calories': this_cal,
+                'avg_calories': this_avg_cal,
+                'total_protein': _round(this_prot),
+                'avg_protein': this_avg_prot,
+                'workouts': workouts['this_week'],
+                'runs': runs['count'],
+                'run_distance': _round(runs['distance'] or 0, 1),
+                'weight_change': _round(weights[-1] - weights[0], 1) if len(weights) >= 2 else None,
+                'current_weight': weights[-1] if weights else None,
+            },
+            'last_week': {
+                'days_logged': last_days,
+                'avg_calories': last_avg_cal,
+                'avg_protein': last_avg_prot,
+                'workouts': workouts['last_week'],
+            },
+            'comparison': {
+                'calories_diff': _round(this_avg_cal - last_avg_cal) if last_avg_cal else None,
+                'protein_diff': _round(this_avg_prot - last_avg_prot, 1) if last_avg_prot else None,
+                'workouts_diff': workouts['this_week'] - workouts['last_week'],
+                'logging_diff': this_days - last_days,
+            },
+        }
+
+    def goal_progress(self, goals=DEFAULT_GOALS):
+        this_week = self.weekly_summary['this_week']
+        progress = {}
+
+        if this_week['avg_calories'] > 0:
+            cal_progress = min(100, _round(this_week['avg_calories'] / goals['daily_calories'] * 100))
+            progress['calories'] = {
+                'current': this_week['avg_calories'],
+                'target': goals['daily_calories'],
+                'progress': cal_progress,
+                'status': 'on_track' if 90 <= cal_progress <= 110 else 'under' if cal_progress < 90 else 'over',
+            }
+
+        if this_week['avg_protein'] > 0:
+            prot_progress = min(100, _round(this_week['avg_protein'] / goals['daily_protein'] * 100))
+            progress['protein'] = {
+                'current': this_week['avg_protein'],
+                'target': goals['daily_protein'],
+                'progress': prot_progress,
+                'status': 'achieved' if prot_progress >= 100 else 'in_progress',
+            }
+
+        for key, count, goal in (('workouts', this_week['workouts'], 'weekly_workouts'),
+                                 ('runs', this_week['runs'], 'weekly_runs')):
+            count_progress = min(100, _round(count / goals[goal] * 100))
+            progress[key] = {
+                'current': count,
+                'target': goals[goal],
+                'progress': count_progress,
+                'status': 'achieved' if count_progress >= 100 else 'in_progress',
+            }
+        return progress
+
+    # === WEEKLY / MONTHLY REPORTS ===
+
+    def _reports(self, buckets, key, limit):
+        """Per-bucket totals and averages, newest bucket first."""
+        s = self.series
+        if not len(s):
+            return []
+        starts, inverse = np.unique(buckets, return_inverse=True)
+        days = np.bincount(inverse)
+        totals = {
+            name: np.bincount(inverse, weights=values)
+            for name, values in (('calories', s.calories), ('protein', s.protein), ('carbs', s.carbs), ('fat', s.fat))
+        }
+        reports = []
+        for i in range(len(starts) - 1, max(len(starts) - limit, 0) - 1, -1):
+            report = {key: _to_date(starts[i]), 'days_logged': int(days[i])}
+            for name, total in totals.items():
+                report[f'total_{name}'] = float(total[i])
+                report[f'avg_{name}'] = _round(total[i] / days[i], 0 if name == 'calories' else 1)
+            reports.append(report)
+        return reports
+
+    def weekly_reports(self, limit=12):
+        days = self.series.days
+        return self._reports(days - _weekday(days).astype('timedelta64[D]'), 'week_start', limit)
+
+    def monthly_reports(self, limit=12):
+        return self._reports(self.series.days.astype('datetime64[M]'), 'month', limit)
+
+    # === BEST / WORST DAYS ===
+
+    @cached_property
+    def best_worst_days(self):
+        s = self.series
+        valid = np.flatnonzero(s.calories >= 500)
+        if not len(valid):
+            return {}
+
+        def day(i):
+            return {
+                'day': _to_date(s.days[i]),
+                'total_calories': float(s.calories[i]),
+                'total_protein': float(s.protein[i]),
+                'total_carbs': float(s.carbs[i]),
+                'total_fat': float(s.fat[i]),
+                'count': int(s.entries[i]),
+            }
+
+        return {
+            'lowest_calorie_day': day(valid[np.argmin(s.calories[valid])]),
+            'highest_calorie_day': day(valid[np.argmax(s.calories[valid])]),
+            'highest_protein_day': day(valid[np.argmax(s.protein[valid])]),
+            'lowest_protein_day': day(valid[np.argmin(s.protein[valid])]),
+        }
+
+    # === WEIGHT ===
+
+    @cached_property
+    def weight_analysis(self):
+        weights = self.weights
+        if len(weights) < 2:
+            return {}
+        analysis = {
+            'start_weight': float(weights[0]),
+            'end_weight': float(weights[-1]),
+            'current_weight': float(weights[-1]),
+            'total_change': _round(weights[-1] - weights[0], 1),
+            'min_weight': float(weights.min()),
+            'max_weight': float(weights.max()),
+            'avg_weight': _round(weights.mean(), 1),
+            'days_tracked': len(weights),
+        }
+        if len(weights) >= 3:
+            analysis['std_dev'] = _round(weights.std(ddof=1), 2)
+        return analysis
+
+    @cached_property
+    def weight_pace(self):
+        if len(self.weights) < 2:
+            return {}
+        days_diff = (self.weigh_ins[-1][0] - self.weigh_ins[0][0]).days
+        if days_diff <= 0:
+            return {}
+
+        total_change = float(self.weights[-1] - self.weights[0])
+        pace = {
+            'total_change': _round(total_change, 1),
+            'days': days_diff,
+            'weekly_rate': _round(total_change / days_diff * 7, 2),
+            'monthly_rate': _round(total_change / days_diff * 30, 1),
+        }
+
+        # Healthy weight loss/gain is typically 0.5-1 kg per week
+        if total_change < 0:
+            pace['status'] = 'losing'
+            if abs(pace['weekly_rate']) > 1:
+                pace['pace_assessment'] = 'Rapid weight loss (>1 kg/week) - may be too fast'
+            elif abs(pace['weekly_rate']) >= 0.5:
+                pace['pace_assessment'] = 'Healthy weight loss pace (0.5-1 kg/week)'
+            else:
+                pace['pace_assessment'] = 'Slow but steady weight loss (<0.5 kg/week)'
+        elif total_change > 0:
+            pace['status'] = 'gaining'
+            if pace['weekly_rate'] > 0.5:
+                pace['pace_assessment'] = 'Rapid weight gain (>0.5 kg/week)'
+            else:
+                pace['pace_assessment'] = 'Gradual weight gain (<0.5 kg/week)'
+        else:
+            pace['status'] = 'maintaining'
+            pace['pace_assessment'] = 'Weight is stable'
+
+        # 1 kg of body weight ≈ 7700 calories
+        if days_diff >= 7:
+            pace['estimated_daily_deficit'] = _round(total_change * 7700 / days_diff)
+        return pace
+
+    @cached_property
+    def projections(self):
+        weekly_rate = self.weight_pace.get('weekly_rate')
+        if not weekly_rate:
+            return {}
+        current_weight = float(self.weights[-1])
+        projections = {
+            f'{weeks}_weeks': _round(current_weight + weekly_rate * weeks, 1) for weeks in (4, 8, 12)
+        }
+
+        # Time to reach common goals when losing weight, if within a year
+        if weekly_rate < 0:
+            goals = np.array(PROJECTION_GOAL_WEIGHTS, dtype=float)
+            weeks_to_goal = (current_weight - goals) / abs(weekly_rate)
+            reachable = (goals < current_weight) & (weeks_to_goal <= 52)
+            projections['goals'] = [
+                {
+                    'weight': int(goal),
+                    'weeks': _round(weeks),
+                    'date': (self.now + timedelta(weeks=float(weeks))).strftime('%B %d, %Y'),
+                }
+                for goal, weeks in zip(goals[reachable], weeks_to_goal[reachable])
+            ]
+        return projections
+
+    @cached_property
+    def weight_volatility(self):
+        weights = self.weights
+        if len(weights) < 5:
+            return {}
+        fluctuations = np.abs(np.diff(weights))
+        significant = int((fluctuations > 0.5).sum())
+
+        # Trend: second half of the weigh-ins against the first half
+        mid = len(weights) // 2
+        first_half, second_half = weights[:mid].mean(), weights[mid:].mean()
+        return {
+            'avg_fluctuation': _round(fluctuations.mean(), 2),
+            'max_fluctuation': _round(fluctuations.max(), 2),
+            'significant_fluctuations': significant,
+            'stability_score': _round(100 - significant / len(fluctuations) * 100),
+            'trend_direction': (
+                'decreasing' if second_half < first_half else 'increasing' if second_half > first_half else 'stable'
+            ),
+            'trend_change': _round(second_half - first_half, 2),
+        }
+
+    # === CORRELATION ===
+
+    @cached_property
+    def correlation_insights(self):
+        """Insights from average nutrition between weigh-ins that lost versus gained weight."""
+        if len(self.weigh_ins) < 3 or len(self.series) < 7:
+            return []
+        intervals = weight_intervals(self.weigh_ins, fields=ROLLUP_FIELDS)
+        logged = intervals['logged_days']
+        has_days = logged > 0
+        if has_days.sum() < 3:
+            return []
+
+        change = intervals['weight_change'][has_days].astype(float)
+        averages = {
+            field: intervals[field][has_days] / logged[has_days] for field in ROLLUP_FIELDS
+        }
+        losing = change < -0.1
+        gaining = change > 0.1
+        insights = []
+
+        if losing.any() and gaining.any():
+            cal_loss = averages['calories'][losing].mean()
+            cal_gain = averages['calories'][gaining].mean()
+            if cal_loss < cal_gain:
+                insights.append({
+                    'type': 'calories',
+                    'icon': '🔥',
+                    'title': 'Calorie Impact',
+                    'description': f'You tend to lose weight when averaging {cal_loss:.0f} kcal/day and gain when averaging {cal_gain:.0f} kcal/day.',
+                    'recommendation': f'Try to stay around {cal_loss:.0f} kcal/day for weight loss.'
+                })
+
+        if losing.any():
+            protein_loss = averages['protein'][losing].mean()
+            protein_all = averages['protein'].mean()
+            if protein_loss > protein_all * 1.1:  # 10% higher
+                insights.append({
+                    'type': 'protein',
+                    'icon': '💪',
+                    'title': 'Protein Correlation',
+                    'description': f'Weight loss periods correlate with higher protein intake (~{protein_loss:.0f}g/day vs average {protein_all:.0f}g/day).',
+                    'recommendation': f'Aim for at least {protein_loss:.0f}g protein daily.'
+                })
+
+        if losing.any() and gaining.any():
+            carbs_loss = averages['carbohydrates'][losing].mean()
+            carbs_gain = averages['carbohydrates'][gaining].mean()
+            if carbs_loss < carbs_gain * 0.9:  # 10% lower
+                insights.append({
+                    'type': 'carbs',
+                    'icon': '🍞',
+                    'title': 'Carbohydrate Pattern',
+                    'description': f'Lower carb intake (~{carbs_loss:.0f}g/day) correlates with weight loss vs (~{carbs_gain:.0f}g/day) with weight gain.',
+                    'recommendation': f'Consider keeping carbs around {carbs_loss:.0f}g/day.'
+                })
+
+            fat_loss = averages['fat'][losing].mean()
+            fat_gain = averages['fat'][gaining].mean()
+            if abs(fat_loss - fat_gain) > 10:
+                insights.append({
+                    'type': 'fat',
+                    'icon': '🥑',
+                    'title': 'Fat Intake Pattern',
+                    'description': f'During weight loss: ~{fat_loss:.0f}g fat/day. During weight gain: ~{fat_gain:.0f}g fat/day.',
+                    'recommendation': f'Optimal fat intake appears to be around {fat_loss:.0f}g/day.'
+                })
+        return insights
+
+    # === DAY OF WEEK ===
+
+    @cached_property
+    def day_of_week_stats(self):
+        s = self.series
+        logged = s.calories != 0
+        weekdays = _weekday(s.days[logged])
+        counts = np.bincount(weekdays, minlength=7)
+        totals = np.bincount(weekdays, weights=s.calories[logged], minlength=7)
+        return {
+            DAY_NAMES[day]: {
+                'avg_calories': _round(totals[day] / counts[day]),
+                'count': int(counts[day]),
+                'total_calories': _round(totals[day]),
+            }
+            for day in np.flatnonzero(counts)
+        }
+
+    @cached_property
+    def weekday_insights(self):
+        stats = self.day_of_week_stats
+        if not stats:
+            return {}
+        ranked = sorted(stats.items(), key=lambda item: item[1]['avg_calories'])
+        insights = {
+            'lowest_day': {'name': ranked[0][0], 'calories': ranked[0][1]['avg_calories']},
+            'highest_day': {'name': ranked[-1][0], 'calories': ranked[-1][1]['avg_calories']},
+        }
+        weekday_cals = [v['avg_calories'] for k, v in stats.items() if k in DAY_NAMES[:5]]
+        weekend_cals = [v['avg_calories'] for k, v in stats.items() if k in DAY_NAMES[5:]]
+        if weekday_cals and weekend_cals:
+            insights['weekday_avg'] = _round(np.mean(weekday_cals))
+            insights['weekend_avg'] = _round(np.mean(weekend_cals))
+            insights['weekend_difference'] = _round(insights['weekend_avg'] - insights['weekday_avg'])
+        return insights
+
+    # === STREAKS ===
+
+    @cached_property
+    def streaks(self):
+        # Shared with the dashboard so current/longest streaks always match;
+        # total days and consistency are for the selected period.
+        return logging_streaks(since=self.start_date) if len(self.series) else {}
+
+    # === MACROS ===
+
+    @cached_property
+    def macro_analysis(self):
+        stats = self.overall_stats
+        if not (stats.get('avg_daily_protein') and stats.get('avg_daily_carbs') and stats.get('avg_daily_fat')):
+            return {}
+        protein_g = stats['avg_daily_protein']
+        energy = np.array([protein_g * 4, stats['avg_daily_carbs'] * 4, stats['avg_daily_fat'] * 9])
+        if energy.sum() <= 0:
+            return {}
+
+        protein_pct, carbs_pct, fat_pct = (_round(pct, 1) for pct in energy / energy.sum() * 100)
+        analysis = {'protein_percent': protein_pct, 'carbs_percent': carbs_pct, 'fat_percent': fat_pct}
+        if len(self.weights):
+            analysis['protein_per_kg'] = _round(protein_g / self.weights[-1], 2)
+
+        # Recommended ranges: Protein 10-35%, Carbs 45-65%, Fat 20-35%
+        notes = []
+        if protein_pct < 15:
+            notes.append('Protein intake is low (below 15%)')
+        elif protein_pct > 35:
+            notes.append('Protein intake is high (above 35%)')
+        if carbs_pct < 40:
+            notes.append('Carb intake is low (below 40%)')
+        elif carbs_pct > 65:
+            notes.append('Carb intake is high (above 65%)')
+        if fat_pct < 20:
+            notes.append('Fat intake is low (below 20%)')
+        elif fat_pct > 40:
+            notes.append('Fat intake is high (above 40%)')
+        analysis['balance_notes'] = notes
+        return analysis
+
+    # === CALORIE PATTERNS ===
+
+    @cached_property
+    def consistency_score(self):
+        calories = self.calories
+        if len(calories) < 7:
+            return {}
+        mean = calories.mean()
+        # Coefficient of variation (lower is more consistent)
+        cv = calories.std(ddof=1) / mean * 100 if mean > 0 else 0
+
+        if cv < 10:
+            rating, description, score = 'Excellent', 'Very consistent calorie intake', 95
+        elif cv < 15:
+            rating, description, score = 'Good', 'Fairly consistent calorie intake', 80
+        elif cv < 25:
+            rating, description, score = 'Moderate', 'Some variation in daily calories', 60
+        else:
+            rating, description, score = 'Variable', 'High variation in daily calories', 40
+        return {'rating': rating, 'description': description, 'score': score, 'cv': _round(cv, 1)}
+
+    def calorie_budget(self, target=CALORIE_TARGET):
+        calories = self.calories
+        if not len(calories):
+            return {}
+        under = calories <= target
+        days_under = int(under.sum())
+        days_over = len(calories) - days_under
+        return {
+            'target': target,
+            'days_under': days_under,
+            'days_over': days_over,
+            'under_percent': _round(days_under / len(calories) * 100, 1),
+            'avg_over_amount': _round((calories[~under] - target).mean()) if days_over else 0,
+            'avg_under_amount': _round((target - calories[under]).mean()) if days_under else 0,
+        }
+
+    @cached_property
+    def calorie_distribution(self):
+        calories = self.calories
+        if len(calories) < 10:
+            return {}
+        counts, _ = np.histogram(calories, bins=CALORIE_BAND_EDGES)
+        return {
+            key: {'count': int(count), 'percent': _round(count / len(calories) * 100, 1), 'label': label}
+            for (key, label), count in zip(CALORIE_BANDS, counts)
+        }
+
+    # === MEAL TIMING ===
+
+    @cached_property
+    def hourly(self):
+        return HourlyHistogram(self.food_items)
+
+    @cached_property
+    def meal_timing(self):
+        if not self.hourly:
+            return {}
+        totals = np.array(list(self.hourly.meal_periods().values()))
+        total = totals.sum()
+        if total <= 0:
+            return {}
+        timing = {
+            key: {'calories': _round(calories), 'percent': _round(calories / total * 100, 1)}
+            for (key, _, _), calories in zip(MEAL_PERIODS, totals)
+        }
+        timing['peak_period'] = MEAL_PERIODS[int(np.argmax(totals))][1]
+        # 24-hour breakdown for chart
+        timing['hourly_json'] = json.dumps([_round(calories, 1) for calories in self.hourly.by_hour])
+        return timing
+
+    @cached_property
+    def eating_heatmap(self):
+        return self.hourly.heatmap() if self.hourly else {}
+
+    # === FOODS ===
+
+    @cached_property
+    def food_items(self):
+        items = FoodItem.objects.filter(consumed_at__lte=self.now)
+        if self.start_date:
+            items = items.filter(consumed_at__gte=self.start_date)
+        return items
+
+    @cached_property
+    def frequent_foods(self):
+        return list(
+            self.food_items.food_totals().values(
+                'product_name', 'count', 'total_calories', 'total_protein',
+            ).order_by('-count')
+        )
+
+    @cached_property
+    def top_foods(self):
+        if not self.frequent_foods:
+            return {}
+        return {
+            'most_frequent': self.frequent_foods,
+            'highest_calorie': [
+                {'name': f.product_name, 'calories': float(f.calories), 'date': f.consumed_at}
+                for f in self.food_items.order_by('-calories')[:5]
+            ],
+            'highest_protein': [
+                {'name': f.product_name, 'protein': float(f.protein), 'date': f.consumed_at}
+                for f in self.food_items.filter(protein__isnull=False).order_by('-protein')[:5]
+            ],
+        }
+
+    # === SCORES ===
+
+    @cached_property
+    def nutrition_score(self):
+        macro = self.macro_analysis
+        if not (macro and self.overall_stats.get('avg_daily_calories')):
+            return {}
+        breakdown = []
+
+        # Protein (max 25 points)
+        protein_per_kg = macro.get('protein_per_kg', 0)
+        if protein_per_kg >= 1.6:
+            breakdown.append({'name': 'Protein', 'score': 25, 'status': 'Excellent'})
+        elif protein_per_kg >= 1.2:
+            breakdown.append({'name': 'Protein', 'score': 20, 'status': 'Good'})
+        elif protein_per_kg >= 0.8:
+            breakdown.append({'name': 'Protein', 'score': 15, 'status': 'Adequate'})
+        else:
+            breakdown.append({'name': 'Protein', 'score': 5, 'status': 'Low'})
+
+        # Macro balance (max 25 points)
+        balance = 25
+        if macro['protein_percent'] < 15 or macro['protein_percent'] > 35:
+            balance -= 8
+        if macro['carbs_percent'] < 40 or macro['carbs_percent'] > 65:
+            balance -= 8
+        if macro['fat_percent'] < 20 or macro['fat_percent'] > 40:
+            balance -= 8
+        breakdown.append({'name': 'Macro Balance', 'score': balance, 'status': 'Good' if balance >= 20 else 'Needs Work'})
+
+        # Consistency (max 25 points)
+        consistency = self.consistency_score
+        if consistency.get('score'):
+            breakdown.append({
+                'name': 'Consistency', 'score': round(consistency['score'] * 0.25), 'status': consistency['rating']
+            })
+
+        # Logging dedication (max 25 points)
+        if self.streaks.get('consistency_rate'):
+            log_score = min(25, round(self.streaks['consistency_rate'] * 0.25))
+            breakdown.append({
+                'name': 'Logging', 'score': log_score,
+                'status': 'Dedicated' if log_score >= 20 else 'Regular' if log_score >= 10 else 'Sporadic',
+            })
+
+        for part in breakdown:
+            part['max'] = 25
+        score = sum(part['score'] for part in breakdown)
+        return {
+            'total': min(100, score),
+            'breakdown': breakdown,
+            'grade': 'A' if score >= 85 else 'B' if score >= 70 else 'C' if score >= 55 else 'D' if score >= 40 else 'F',
+        }
+
+    # === PERIOD COMPARISON ===
+
+    @cached_property
+    def period_comparison(self):
+        if not self.start_date or not len(self.series):
+            return {}
+        prev_start = self.start_date - timedelta(days=self.period_days)
+        prev_end = self.start_date
+        previous = DailySeries(prev_start, DailyNutrition.day_for(prev_end) - timedelta(days=1))
+        comparison = {}
+
+        prev_calories = previous.logged(previous.calories)
+        if len(prev_calories) and len(self.calories):
+            prev_avg, curr_avg = prev_calories.mean(), self.calories.mean()
+            comparison.update({
+                'prev_avg_calories': _round(prev_avg),
+                'curr_avg_calories': _round(curr_avg),
+                'calorie_change': _round(curr_avg - prev_avg),
+                'calorie_change_percent': _round((curr_avg - prev_avg) / prev_avg * 100, 1) if prev_avg > 0 else 0,
+            })
+            prev_protein = previous.logged(previous.protein)
+            curr_protein = self.series.logged(self.series.protein)
+            if len(prev_protein) and len(curr_protein):
+                comparison.update({
+                    'prev_avg_protein': _round(prev_protein.mean(), 1),
+                    'curr_avg_protein': _round(curr_protein.mean(), 1),
+                    'protein_change': _round(curr_protein.mean() - prev_protein.mean(), 1),
+                })
+
+        if len(self.weights):
+            prev_weights = np.array([
+                float(weight) for weight in
+                Weight.objects.filter(recorded_at__gte=prev_start, recorded_at__lt=prev_end).values_list('weight', flat=True)
+            ])
+            if len(prev_weights):
+                comparison.update({
+                    'prev_avg_weight': _round(prev_weights.mean(), 1),
+                    'curr_avg_weight': _round(self.weights.mean(), 1),
+                    'weight_change': _round(self.weights.mean() - prev_weights.mean(), 1),
+                })
+        return comparison
+
+    # === INSIGHTS / ACHIEVEMENTS ===
+
+    @cached_property
+    def insights(self):
+        insights = list(self.correlation_insights)
+        weekday = self.weekday_insights
+        consistency = self.consistency_score
+        macro = self.macro_analysis
+        streaks = self.streaks
+        pace = self.weight_pace
+        timing = self.meal_timing
+        distribution = self.calorie_distribution
+
+        if weekday.get('weekend_difference') and weekday['weekend_difference'] > 200:
+            insights.append({
+                'type': 'weekend',
+                'icon': '📅',
+                'title': 'Weekend Pattern',
+                'description': f'You eat ~{weekday["weekend_difference"]:.0f} more calories on weekends ({weekday["weekend_avg"]:.0f}) vs weekdays ({weekday["weekday_avg"]:.0f}).',
+                'recommendation': 'Plan weekend meals in advance to stay on track.'
+            })
+
+        if consistency.get('rating') == 'Variable':
+            stats = self.overall_stats
+            insights.append({
+                'type': 'consistency',
+                'icon': '📊',
+                'title': 'Calorie Variability',
+                'description': f'Your daily calories vary significantly (CV: {consistency["cv"]:.1f}%). Range: {stats.get("calorie_min", 0):.0f} - {stats.get("calorie_max", 0):.0f} kcal.',
+                'recommendation': 'Try meal prepping to maintain more consistent intake.'
+            })
+
+        if macro.get('protein_per_kg'):
+            if macro['protein_per_kg'] < 1.2:
+                insights.append({
+                    'type': 'protein',
+                    'icon': '🥩',
+                    'title': 'Protein Intake',
+                    'description': f'You\'re getting {macro["protein_per_kg"]:.2f}g protein per kg body weight. For muscle maintenance, aim for 1.2-1.6g/kg.',
+                    'recommendation': f'Consider increasing protein to {round(float(self.weights[-1]) * 1.4, 0):.0f}g daily.'
+                })
+            elif macro['protein_per_kg'] >= 1.6:
+                insights.append({
+                    'type': 'protein',
+                    'icon': '💪',
+                    'title': 'Strong Protein Intake',
+                    'description': f'Excellent! You\'re getting {macro["protein_per_kg"]:.2f}g protein per kg body weight.',
+                    'recommendation': 'Keep up the good protein intake for muscle health.'
+                })
+
+        if streaks.get('current_streak', 0) >= 7:
+            insights.append({
+                'type': 'streak',
+                'icon': '🔥',
+                'title': 'Logging Streak',
+                'description': f'Great job! You\'ve logged {streaks["current_streak"]} days in a row. Your longest streak is {streaks["longest_streak"]} days.',
+                'recommendation': 'Keep the momentum going!'
+            })
+
+        if pace.get('total_change') and pace['total_change'] < -5:
+            insights.append({
+                'type': 'milestone',
+                'icon': '🏆',
+                'title': 'Weight Loss Milestone',
+                'description': f'Amazing! You\'ve lost {abs(pace["total_change"]):.1f} kg in {pace["days"]} days.',
+                'recommendation': 'Celebrate your progress and keep going!'
+            })
+
+        if timing.get('night', {}).get('percent', 0) > 15:
+            insights.append({
+                'type': 'timing',
+                'icon': '🌙',
+                'title': 'Late Night Eating',
+                'description': f'{timing["night"]["percent"]:.0f}% of your calories are consumed late at night (after 10 PM).',
+                'recommendation': 'Try to finish eating earlier for better digestion and sleep quality.'
+            })
+
+        if distribution.get('very_high', {}).get('percent', 0) > 20:
+            insights.append({
+                'type': 'distribution',
+                'icon': '📊',
+                'title': 'High Calorie Days',
+                'description': f'{distribution["very_high"]["percent"]:.0f}% of your days exceed 3000 calories.',
+                'recommendation': 'Identify triggers for high-calorie days and plan alternatives.'
+            })
+        return insights
+
+    @cached_property
+    def achievements(self):
+        achievements = []
+        streaks = self.streaks
+        weight_change = self.weight_pace.get('total_change', 0)
+        protein_per_kg = self.macro_analysis.get('protein_per_kg', 0)
+
+        if streaks.get('current_streak', 0) >= 30:
+            achievements.append({'icon': '🔥', 'title': 'Monthly Warrior', 'desc': '30+ day logging streak'})
+        elif streaks.get('current_streak', 0) >= 14:
+            achievements.append({'icon': '🔥', 'title': 'Two Week Champion', 'desc': '14+ day logging streak'})
+        elif streaks.get('current_streak', 0) >= 7:
+            achievements.append({'icon': '🔥', 'title': 'Week Warrior', 'desc': '7+ day logging streak'})
+
+        if weight_change <= -10:
+            achievements.append({'icon': '🏆', 'title': 'Major Milestone', 'desc': 'Lost 10+ kg'})
+        elif weight_change <= -5:
+            achievements.append({'icon': '🥇', 'title': 'Great Progress', 'desc': 'Lost 5+ kg'})
+        elif weight_change <= -2:
+            achievements.append({'icon': '🥈', 'title': 'Good Start', 'desc': 'Lost 2+ kg'})
+
+        if self.consistency_score.get('score', 0) >= 90:
+            achievements.append({'icon': '🎯', 'title': 'Precision Eater', 'desc': 'Excellent calorie consistency'})
+
+        if protein_per_kg >= 2.0:
+            achievements.append({'icon': '💪', 'title': 'Protein Champion', 'desc': '2+ g protein per kg body weight'})
+        elif protein_per_kg >= 1.6:
+            achievements.append({'icon': '🥩', 'title': 'Protein Pro', 'desc': '1.6+ g protein per kg body weight'})
+
+        if streaks.get('total_days', 0) >= 100:
+            achievements.append({'icon': '📊', 'title': 'Century Logger', 'desc': '100+ days logged'})
+        elif streaks.get('total_days', 0) >= 50:
+            achievements.append({'icon': '📈', 'title': 'Dedicated Tracker', 'desc': '50+ days logged'})
+
+        if streaks.get('consistency_rate', 0) >= 90:
+            achievements.append({'icon': '⭐', 'title': 'Super Consistent', 'desc': '90%+ logging consistency'})
+
+        if self.nutrition_score.get('total', 0) >= 80:
+            achievements.append({'icon': '🌟', 'title': 'Nutrition Master', 'desc': 'Excellent overall nutrition score'})
+        return achievements
@@ -4,3 +4,6 @@
 class CountCaloriesAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'count_calories_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
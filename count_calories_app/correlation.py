@@ -0,0 +1,93 @@
+"""
+Weight/calorie correlation engine.
+
+Daily totals are loaded once from the DailyNutrition rollup into NumPy arrays
+indexed by day offset. Prefix sums over those arrays give the calorie (and
+macro) total for any run of days in constant time, so correlating N weigh-in
+intervals costs one query instead of N.
+"""
+
+import numpy as np
+
+from .models import DailyNutrition
+
+ROLLUP_FIELDS = ('calories', 'protein', 'carbohydrates', 'fat')
+
+
+class DailyTotalsIndex:
+    """
+    Prefix sums of daily nutrition totals between two local dates (inclusive).
+
+    Days without a rollup row count as zero and are not counted as logged.
+    """
+
+    def __init__(self, first_day, last_day, fields=('calories',)):
+        self.first_day = first_day
+        self.fields = tuple(fields)
+        length = max((last_day - first_day).days + 1, 0)
+
+        rows = list(
+            DailyNutrition.objects
+            .filter(date__gte=first_day, date__lte=last_day)
+            .values_list('date', *self.fields)
+        )
+        values = {field: np.zeros(length) for field in self.fields}
+        logged = np.zeros(length)
+        if rows:
+            offsets = self.offsets([row[0] for row in rows])
+            logged[offsets] = 1
+            for column, field in enumerate(self.fields, start=1):
+                values[field][offsets] = np.array([float(row[column]) for row in rows])
+
+        self._prefix = {field: self._prefix_sum(values[field]) for field in self.fields}
+        self._logged_prefix = self._prefix_sum(logged)
+
+    @staticmethod
+    def _prefix_sum(values):
+        return np.concatenate(([0.0], np.cumsum(values)))
+
+    def offsets(self, days):
+        """Day offsets from first_day for a sequence of dates, as an int array."""
+        days = np.asarray(days, dtype='datetime64[D]')
+        return (days - np.datetime64(self.first_day, 'D')).astype(np.int64)
+
+    def _window(self, prefix, start_days, end_days):
+        size = len(prefix) - 1
+        starts = np.clip(self.offsets(start_days), 0, size)
+        ends = np.clip(self.offsets(end_days) + 1, 0, size)
+        return prefix[np.maximum(ends, starts)] - prefix[starts]
+
+    def interval_sums(self, field, start_days, end_days):
+        """Sum of ``field`` over each inclusive [start, end] day range."""
+        return self._window(self._prefix[field], start_days, end_days)
+
+    def logged_days(self, start_days, end_days):
+        """Number of days with at least one food entry in each inclusive day range."""
+        return self._window(self._logged_prefix, start_days, end_days).astype(np.int64)
+
+
+def weight_intervals(weights, fields=('calories',)):
+    """
+    Nutrition totals for each pair of consecutive weigh-ins.
+
+    ``weights`` is an ascending sequence of (recorded_at, weight) pairs. Each
+    interval covers the local days from the earlier weigh-in through the later
+    one, inclusive. Returns a dict of NumPy arrays, one entry per interval:
+    weight_change, logged_days and one array per requested field.
+    """
+    if len(weights) < 2:
+        empty = np.zeros(0)
+        return {'weight_change': empty, 'logged_days': empty.astype(np.int64), **{f: empty for f in fields}}
+
+    days = [DailyNutrition.day_for(recorded_at) for recorded_at, _ in weights]
+    values = np.array([float(weight) for _, weight in weights])
+    index = DailyTotalsIndex(min(days), max(days), fields=fields)
+    start_days, end_days = days[:-1], days[1:]
+
+    result = {
+        'weight_change': values[1:] - values[:-1],
+        'logged_days': index.logged_days(start_days, end_days),
+    }
+    for field in fields:
+        result[field] = index.interval_sums(field, start_days, end_days)
+    return result
@@ -0,0 +1,210 @@
+"""
+Streaming data exports.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` and written by
+generator-based CSV / NDJSON / JSON writers into a StreamingHttpResponse, so an
+export of any size starts sending immediately and uses constant memory.
+"""
+
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+from .models import BodyMeasurement, FoodItem, RunningSession, Weight, WorkoutExercise, WorkoutSession
+
+CHUNK_SIZE = 2000
+BUFFER_SIZE = 64 * 1024
+
+
+class _Echo:
+    """File-like object whose write() hands the formatted line back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _buffered(pieces, size=BUFFER_SIZE):
+    """Join small string pieces into chunks of roughly ``size`` characters."""
+    buffer = []
+    length = 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def csv_lines(header, rows):
+    """Yield CSV-formatted lines for a header and an iterable of rows."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(sections):
+    """Yield one JSON object per line; each record gets a "type" key naming its section."""
+    for name, records in sections:
+        for record in records:
+            yield json.dumps({'type': name, **record}) + '\n'
+
+
+def json_document(sections):
+    """Yield a JSON object of ``{section: [records...]}`` piece by piece."""
+    yield '{'
+    for position, (name, records) in enumerate(sections):
+        yield (',\n' if position else '\n') + f'  {json.dumps(name)}: ['
+        empty = True
+        for record in records:
+            yield ('\n' if empty else ',\n') + '    ' + json.dumps(record)
+            empty = False
+        yield ']' if empty else '\n  ]'
+    yield '\n}\n'
+
+
+def streaming_response(pieces, content_type, filename):
+    """Wrap generated text in a StreamingHttpResponse served as an attachment."""
+    response = StreamingHttpResponse(_buffered(pieces), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _decimal(value):
+    return float(value) if value is not None else None
+
+
+def _csv_decimal(value):
+    return float(value) if value else ''
+
+
+# ---------------------------------------------------------------------------
+# Records used by the JSON and NDJSON exports
+# ---------------------------------------------------------------------------
+
+def food_records():
+    rows = FoodItem.objects.order_by('-consumed_at').values_list(
+        'consumed_at', 'product_name', 'calories', 'protein', 'carbohydrates', 'fat'
+    )
+    for consumed_at, name, calories, protein, carbs, fat in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield {
+            'consumed_at': consumed_at.isoformat(), 'product_name': name,
+            'calories': float(calories), 'protein': float(protein),
+            'carbohydrates': float(carbs), 'fat': float(fat),
+        }
+
+
+def weight_records():
+    rows = Weight.objects.order_by('-recorded_at').values_list('recorded_at', 'weight', 'notes')
+    for recorded_at, weight, notes in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield {'recorded_at': recorded_at.isoformat(), 'weight': float(weight), 'notes': notes}
+
+
+def running_records():
+    rows = RunningSession.objects.order_by('-date').values_list('date', 'distance', 'duration', 'notes')
+    for date, distance, duration, notes in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield {'date': date.isoformat(), 'distance': float(distance), 'duration': str(duration), 'notes': notes}
+
+
+BODY_MEASUREMENT_FIELDS = (
+    'neck', 'chest', 'belly', 'left_biceps', 'right_biceps', 'left_triceps', 'right_triceps',
+    'left_forearm', 'right_forearm', 'left_thigh', 'right_thigh', 'left_lower_leg',
+    'right_lower_leg', 'butt',
+)
+
+
+def body_measurement_records():
+    rows = BodyMeasurement.objects.order_by('-date').values_list('date', *BODY_MEASUREMENT_FIELDS, 'notes')
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        record = {'date': row[0].isoformat()}
+        record.update((field, _decimal(value)) for field, value in zip(BODY_MEASUREMENT_FIELDS, row[1:-1]))
+        record['notes'] = row[-1]
+        yield record
+
+
+def workout_records():
+    sessions = WorkoutSession.objects.with_exercises().order_by('-date')
+    for workout in sessions.iterator(chunk_size=CHUNK_SIZE):
+        yield {
+            'date': workout.date.isoformat(), 'name': workout.name, 'notes': workout.notes,
+            'exercises': [
+                {
+                    'exercise_name': ex.exercise.name, 'sets': ex.sets, 'reps': ex.reps,
+                    'weight': _decimal(ex.weight), 'notes': ex.notes,
+                }
+                for ex in workout.exercises.all()
+            ],
+        }
+
+
+RECORD_SECTIONS = {
+    'food': ('food_items', food_records),
+    'weight': ('weight', weight_records),
+    'workout': ('workouts', workout_records),
+    'running': ('running', running_records),
+    'body': ('body_measurements', body_measurement_records),
+}
+
+
+def record_sections(export_type):
+    """(name, records) pairs for one export type, or for every type when export_type is 'all'."""
+    keys = list(RECORD_SECTIONS) if export_type == 'all' else [export_type]
+    return ((RECORD_SECTIONS[key][0], RECORD_SECTIONS[key][1]()) for key in keys)
+
+
+# ---------------------------------------------------------------------------
+# CSV exports
+# ---------------------------------------------------------------------------
+
+def food_csv_rows():
+    rows = FoodItem.objects.order_by('-consumed_at').values_list(
+        'consumed_at', 'product_name', 'calories', 'protein', 'carbohydrates', 'fat'
+    )
+    for consumed_at, name, calories, protein, carbs, fat in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield [consumed_at.strftime('%Y-%m-%d %H:%M'), name,
+               float(calories), float(protein), float(carbs), float(fat)]
+
+
+def weight_csv_rows():
+    rows = Weight.objects.order_by('-recorded_at').values_list('recorded_at', 'weight', 'notes')
+    for recorded_at, weight, notes in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield [recorded_at.strftime('%Y-%m-%d %H:%M'), float(weight), notes or '']
+
+
+def workout_csv_rows():
+    rows = WorkoutExercise.objects.order_by('-workout__date', 'workout_id', 'id').values_list(
+        'workout__date', 'workout__name', 'exercise__name', 'sets', 'reps', 'weight', 'notes'
+    )
+    for date, workout_name, exercise_name, sets, reps, weight, notes in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield [date.strftime('%Y-%m-%d'), workout_name or 'Unnamed', exercise_name,
+               sets, reps, _csv_decimal(weight), notes or '']
+
+
+def running_csv_rows():
+    rows = RunningSession.objects.order_by('-date').values_list('date', 'distance', 'duration', 'notes')
+    for date, distance, duration, notes in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield [date.strftime('%Y-%m-%d'), float(distance), str(duration), notes or '']
+
+
+def body_measurement_csv_rows():
+    rows = BodyMeasurement.objects.order_by('-date').values_list('date', *BODY_MEASUREMENT_FIELDS, 'notes')
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield [row[0].strftime('%Y-%m-%d'), *(_csv_decimal(value) for value in row[1:-1]), row[-1] or '']
+
+
+CSV_EXPORTS = {
+    'food': ('food_data.csv', food_csv_rows,
+             ['Date', 'Product Name', 'Calories', 'Protein (g)', 'Carbs (g)', 'Fat (g)']),
+    'weight': ('weight_data.csv', weight_csv_rows, ['Date', 'Weight (kg)', 'Notes']),
+    'workout': ('workout_data.csv', workout_csv_rows,
+                ['Date', 'Workout Name', 'Exercise', 'Sets', 'Reps', 'Weight (kg)', 'Notes']),
+    'running': ('running_data.csv', running_csv_rows, ['Date', 'Distance (km)', 'Duration', 'Notes']),
+    'body': ('body_measurements.csv', body_measurement_csv_rows,
+             ['Date', 'Neck', 'Chest', 'Belly', 'Left Biceps', 'Right Biceps',
+              'Left Triceps', 'Right Triceps', 'Left Forearm', 'Right Forearm',
+              'Left Thigh', 'Right Thigh', 'Left Lower Leg', 'Right Lower Leg', 'Butt', 'Notes']),
+}
@@ -0,0 +1,78 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from count_calories_app.analytics_engine import AnalyticsEngine
+from count_calories_app.models import FoodItem, Weight
+
+SECTIONS = (
+    'overall_stats', 'weekly_summary', 'best_worst_days', 'weight_analysis', 'weight_pace', 'projections',
+    'weight_volatility', 'correlation_insights', 'day_of_week_stats', 'weekday_insights', 'streaks',
+    'macro_analysis', 'consistency_score', 'calorie_distribution', 'meal_timing', 'top_foods',
+    'nutrition_score', 'period_comparison', 'insights', 'achievements',
+)
+
+
+class Command(BaseCommand):
+    help = "Time the analytics engine against a synthetic food and weight history (rolled back afterwards)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--years', type=int, default=5, help="Years of synthetic history (default 5).")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per period (default 5).")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            items, weights = self.populate(options['years'])
+            self.stdout.write(f"Synthetic history: {items} food entries and {weights} weigh-ins.")
+            for period in ('30', '90', '365', 'all'):
+                self.measure(period, options['repeat'])
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS("Benchmark finished; synthetic data rolled back."))
+
+    def populate(self, years):
+        rng = random.Random(0)
+        now = timezone.now()
+        items = [
+            FoodItem(
+                product_name=f'Food {rng.randrange(60)}',
+                calories=Decimal(rng.randint(80, 1200)),
+                protein=Decimal(rng.randint(0, 60)),
+                carbohydrates=Decimal(rng.randint(0, 120)),
+                fat=Decimal(rng.randint(0, 50)),
+                consumed_at=now - timedelta(days=day, hours=rng.randint(0, 23)),
+            )
+            for day in range(years * 365) if rng.random() > 0.1
+            for _ in range(rng.randint(2, 5))
+        ]
+        FoodItem.objects.bulk_create(items, batch_size=1000)
+        weights = [
+            Weight(weight=Decimal('90') - Decimal(day) / 200 + Decimal(rng.randint(-10, 10)) / 10,
+                   recorded_at=now - timedelta(days=day, hours=1))
+            for day in range(0, years * 365, 2)
+        ]
+        Weight.objects.bulk_create(weights)
+        return len(items), len(weights)
+
+    def measure(self, period, repeat):
+        timings = []
+        for _ in range(repeat):
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                engine = AnalyticsEngine.for_period(period)
+                for section in SECTIONS:
+                    getattr(engine, section)
+                engine.weekly_reports()
+                engine.monthly_reports()
+                engine.calorie_budget()
+                timings.append(time.perf_counter() - started)
+        self.stdout.write(
+            f"period={period:>4}: {len(engine.series)} days, {len(ctx.captured_queries)} queries, "
+            f"best {min(timings) * 1000:.1f} ms, mean {sum(timings) / len(timings) * 1000:.1f} ms"
+        )
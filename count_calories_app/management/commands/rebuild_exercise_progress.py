@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from count_calories_app.models import ExerciseProgress
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ExerciseProgress table and personal records from all logged workout exercises."
+
+    def handle(self, *args, **options):
+        rows = ExerciseProgress.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt exercise progress for {rows} exercise session(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from count_calories_app.models import FoodProduct
+
+
+class Command(BaseCommand):
+    help = "Link every food item to its FoodProduct and recompute the per-product totals."
+
+    def handle(self, *args, **options):
+        products = FoodProduct.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt totals for {products} food product(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from count_calories_app import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the food name full-text search index from all logged food items."
+
+    def handle(self, *args, **options):
+        names = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {names} distinct food name(s)."))
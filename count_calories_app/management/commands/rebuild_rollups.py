@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from count_calories_app.models import DailyNutrition
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailyNutrition rollup table from all logged food items."
+
+    def handle(self, *args, **options):
+        days = DailyNutrition.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt daily nutrition rollups for {days} day(s)."))
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:20
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def populate_daily_nutrition(apps, schema_editor):
+    FoodItem = apps.get_model('count_calories_app', 'FoodItem')
+    DailyNutrition = apps.get_model('count_calories_app', 'DailyNutrition')
+    rows = FoodItem.objects.annotate(day=TruncDate('consumed_at')).values('day').annotate(
+        calories=Sum('calories'),
+        protein=Sum('protein'),
+        carbohydrates=Sum('carbohydrates'),
+        fat=Sum('fat'),
+        entry_count=Count('id'),
+    ).order_by('day')
+    DailyNutrition.objects.bulk_create(
+        [
+            DailyNutrition(
+                date=row['day'],
+                calories=row['calories'] or 0,
+                protein=row['protein'] or 0,
+                carbohydrates=row['carbohydrates'] or 0,
+                fat=row['fat'] or 0,
+                entry_count=row['entry_count'],
+            )
+            for row in rows
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('count_calories_app', '0017_mealtemplate_mealtemplateitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyNutrition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Local calendar date', unique=True)),
+                ('calories', models.DecimalField(decimal_places=2, default=0, help_text='Total calories for the day', max_digits=9)),
+                ('protein', models.DecimalField(decimal_places=2, default=0, help_text='Total protein in grams', max_digits=9)),
+                ('carbohydrates', models.DecimalField(decimal_places=2, default=0, help_text='Total carbohydrates in grams', max_digits=9)),
+                ('fat', models.DecimalField(decimal_places=2, default=0, help_text='Total fat in grams', max_digits=9)),
+                ('entry_count', models.PositiveIntegerField(default=0, help_text='Number of food entries logged that day')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily nutrition',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.RunPython(populate_daily_nutrition, migrations.RunPython.noop),
+    ]
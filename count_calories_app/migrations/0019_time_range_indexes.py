@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:39
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('count_calories_app', '0018_dailynutrition'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bodymeasurement',
+            index=models.Index(fields=['date'], name='bodymeasurement_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['consumed_at'], name='fooditem_consumed_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['product_name', 'consumed_at'], name='fooditem_name_consumed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(condition=models.Q(('hide_from_quick_list', False)), fields=['product_name', 'consumed_at'], name='fooditem_quick_list_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(django.db.models.functions.text.Lower('product_name'), name='fooditem_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='runningsession',
+            index=models.Index(fields=['date'], name='runningsession_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weight',
+            index=models.Index(fields=['recorded_at'], name='weight_recorded_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workoutsession',
+            index=models.Index(fields=['date'], name='workoutsession_date_idx'),
+        ),
+    ]
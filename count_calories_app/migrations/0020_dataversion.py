@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('count_calories_app', '0019_time_range_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Model label, e.g. count_calories_app.fooditem', max_length=100, unique=True)),
+                ('token', models.CharField(max_length=32)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('count_calories_app', '0020_dataversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataversion',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('count_calories_app', '0021_dataversion_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NutritionLookup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='SHA-256 of the normalised description', max_length=64, unique=True)),
+                ('description', models.TextField(help_text='Normalised food description')),
+                ('data', models.JSONField(help_text='Nutrition values returned by Gemini')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('hits', models.PositiveIntegerField(default=0, help_text='Number of lookups answered from this entry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='nutritionlookup_used_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,85 @@
+from django.db import migrations
+
+# Distinct product names with how often each was logged, an external-content
+# FTS5 index over them, and triggers that keep both in step with FoodItem.
+CREATE_SQL = [
+    """
+    CREATE TABLE count_calories_app_foodname (
+        id INTEGER PRIMARY KEY,
+        product_name TEXT NOT NULL UNIQUE,
+        times_logged INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE count_calories_app_foodname_fts USING fts5(
+        product_name,
+        content='count_calories_app_foodname',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER count_calories_app_foodname_ai AFTER INSERT ON count_calories_app_foodname BEGIN
+        INSERT INTO count_calories_app_foodname_fts (rowid, product_name) VALUES (new.id, new.product_name);
+    END
+    """,
+    """
+    CREATE TRIGGER count_calories_app_foodname_ad AFTER DELETE ON count_calories_app_foodname BEGIN
+        INSERT INTO count_calories_app_foodname_fts (count_calories_app_foodname_fts, rowid, product_name)
+        VALUES ('delete', old.id, old.product_name);
+    END
+    """,
+    """
+    CREATE TRIGGER count_calories_app_fooditem_search_ai AFTER INSERT ON count_calories_app_fooditem BEGIN
+        INSERT INTO count_calories_app_foodname (product_name, times_logged) VALUES (new.product_name, 1)
+        ON CONFLICT (product_name) DO UPDATE SET times_logged = times_logged + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER count_calories_app_fooditem_search_ad AFTER DELETE ON count_calories_app_fooditem BEGIN
+        UPDATE count_calories_app_foodname SET times_logged = times_logged - 1 WHERE product_name = old.product_name;
+        DELETE FROM count_calories_app_foodname WHERE product_name = old.product_name AND times_logged <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER count_calories_app_fooditem_search_au AFTER UPDATE OF product_name ON count_calories_app_fooditem
+    WHEN old.product_name IS NOT new.product_name BEGIN
+        UPDATE count_calories_app_foodname SET times_logged = times_logged - 1 WHERE product_name = old.product_name;
+        DELETE FROM count_calories_app_foodname WHERE product_name = old.product_name AND times_logged <= 0;
+        INSERT INTO count_calories_app_foodname (product_name, times_logged) VALUES (new.product_name, 1)
+        ON CONFLICT (product_name) DO UPDATE SET times_logged = times_logged + 1;
+    END
+    """,
+    """
+    INSERT INTO count_calories_app_foodname (product_name, times_logged)
+    SELECT product_name, COUNT(*) FROM count_calories_app_fooditem GROUP BY product_name
+    """,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS count_calories_app_fooditem_search_au',
+    'DROP TRIGGER IF EXISTS count_calories_app_fooditem_search_ad',
+    'DROP TRIGGER IF EXISTS count_calories_app_fooditem_search_ai',
+    'DROP TABLE IF EXISTS count_calories_app_foodname_fts',
+    'DROP TABLE IF EXISTS count_calories_app_foodname',
+]
+
+
+def run_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('count_calories_app', '0022_nutritionlookup'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sqlite(CREATE_SQL), run_sqlite(DROP_SQL)),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:57
+
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Q, Subquery, Sum
+
+
+def product_key(name):
+    return ' '.join(unicodedata.normalize('NFC', name or '').casefold().split())[:255]
+
+
+def populate_food_products(apps, schema_editor):
+    FoodItem = apps.get_model('count_calories_app', 'FoodItem')
+    FoodProduct = apps.get_model('count_calories_app', 'FoodProduct')
+    products = {}
+    for name in FoodItem.objects.values_list('product_name', flat=True).distinct().order_by():
+        key = product_key(name)
+        if key not in products:
+            products[key] = FoodProduct.objects.create(key=key, name=name)
+        FoodItem.objects.filter(product_name=name).update(product=products[key])
+
+    entries = FoodItem.objects.filter(product=OuterRef('pk')).order_by('-consumed_at', '-id')
+    rows = FoodItem.objects.values('product_id').annotate(
+        entries=Count('id'),
+        visible=Count('id', filter=Q(hide_from_quick_list=False)),
+        calories=Sum('calories'),
+        protein=Sum('protein'),
+        carbohydrates=Sum('carbohydrates'),
+        fat=Sum('fat'),
+        last_consumed=Max('consumed_at'),
+    ).order_by()
+    for row in rows:
+        FoodProduct.objects.filter(pk=row['product_id']).update(
+            entry_count=row['entries'],
+            quick_add_count=row['visible'],
+            calories_total=row['calories'] or 0,
+            protein_total=row['protein'] or 0,
+            carbohydrates_total=row['carbohydrates'] or 0,
+            fat_total=row['fat'] or 0,
+            last_consumed_at=row['last_consumed'],
+        )
+    FoodProduct.objects.update(
+        name=Subquery(entries.values('product_name')[:1]),
+        latest_item=Subquery(entries.filter(hide_from_quick_list=False).values('pk')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('count_calories_app', '0023_food_name_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FoodProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='Case-folded, whitespace-collapsed product name', max_length=255, unique=True)),
+                ('name', models.CharField(help_text='Product name as written on the latest entry', max_length=200)),
+                ('entry_count', models.PositiveIntegerField(default=0, help_text='Number of entries logged')),
+                ('quick_add_count', models.PositiveIntegerField(default=0, help_text='Number of entries not hidden from quick add')),
+                ('calories_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('protein_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('carbohydrates_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('fat_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('last_consumed_at', models.DateTimeField(blank=True, help_text='When the latest entry was consumed', null=True)),
+                ('latest_item', models.ForeignKey(blank=True, help_text='Latest entry not hidden from quick add', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='count_calories_app.fooditem')),
+            ],
+            options={
+                'ordering': ['-entry_count'],
+            },
+        ),
+        migrations.AddField(
+            model_name='fooditem',
+            name='product',
+            field=models.ForeignKey(blank=True, help_text='Catalogue entry for this product name', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='entries', to='count_calories_app.foodproduct'),
+        ),
+        migrations.RunPython(populate_food_products, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:39
+
+from django.db import migrations, models
+
+# Copy of RunningSession.DISTANCE_BUCKETS at the time of this migration
+DISTANCE_BUCKETS = (('marathon', 42.195), ('half', 21.0975), ('10k', 10), ('5k', 5))
+
+
+def populate_running_metrics(apps, schema_editor):
+    RunningSession = apps.get_model('count_calories_app', 'RunningSession')
+    sessions = list(RunningSession.objects.all())
+    for session in sessions:
+        distance = float(session.distance or 0)
+        seconds = session.duration.total_seconds() if session.duration else 0
+        session.pace_seconds = seconds / distance if distance > 0 else None
+        session.speed_kmh = distance / (seconds / 3600) if seconds > 0 else 0
+        session.calories_estimate = distance * 60
+        session.distance_bucket = next((bucket for bucket, minimum in DISTANCE_BUCKETS if distance >= minimum), '')
+    RunningSession.objects.bulk_update(
+        sessions, ['pace_seconds', 'speed_kmh', 'calories_estimate', 'distance_bucket'], batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('count_calories_app', '0024_foodproduct'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='runningsession',
+            name='calories_estimate',
+            field=models.FloatField(default=0, editable=False, help_text='Estimated kcal burned'),
+        ),
+        migrations.AddField(
+            model_name='runningsession',
+            name='distance_bucket',
+            field=models.CharField(blank=True, choices=[('marathon', 'Marathon'), ('half', 'Half marathon'), ('10k', '10K'), ('5k', '5K')], default='', editable=False, help_text='Longest race distance covered, empty under 5 km', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='runningsession',
+            name='pace_seconds',
+            field=models.FloatField(blank=True, editable=False, help_text='Seconds per km, empty without distance', null=True),
+        ),
+        migrations.AddField(
+            model_name='runningsession',
+            name='speed_kmh',
+            field=models.FloatField(default=0, editable=False, help_text='Average speed in km/h, 0 without duration'),
+        ),
+        migrations.AddIndex(
+            model_name='runningsession',
+            index=models.Index(fields=['distance_bucket', 'pace_seconds'], name='runningsession_bucket_pace_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='runningsession',
+            index=models.Index(fields=['-distance'], name='runningsession_distance_idx'),
+        ),
+        migrations.RunPython(populate_running_metrics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('count_calories_app', '0025_running_derived_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='runningsession',
+            name='elevation_gain',
+            field=models.FloatField(blank=True, editable=False, help_text='Metres climbed', null=True),
+        ),
+        migrations.AddField(
+            model_name='runningsession',
+            name='moving_duration',
+            field=models.DurationField(blank=True, editable=False, help_text='Time spent moving', null=True),
+        ),
+        migrations.AddField(
+            model_name='runningsession',
+            name='splits',
+            field=models.JSONField(blank=True, editable=False, help_text='Per-km splits: km, distance, seconds and pace_seconds', null=True),
+        ),
+        migrations.CreateModel(
+            name='RunningTrack',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_format', models.CharField(choices=[('gpx', 'GPX'), ('tcx', 'TCX')], max_length=3)),
+                ('point_count', models.PositiveIntegerField(help_text='Number of track points stored')),
+                ('points', models.BinaryField(help_text='Packed float32 (lat, lon, elevation, time delta) rows')),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='track', to='count_calories_app.runningsession')),
+            ],
+        ),
+    ]
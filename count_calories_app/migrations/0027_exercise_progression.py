@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copy of ExerciseRecord.KINDS at the time of this migration
+RECORD_KINDS = (('weight', 'best_weight'), ('e1rm', 'estimated_1rm'), ('volume', 'volume'))
+
+
+def session_fields(rows):
+    """ExerciseProgress fields from the (sets, reps, weight) rows of one exercise in one workout."""
+    fields = {'sets': 0, 'reps': 0, 'volume': 0.0, 'best_weight': None, 'best_reps': 0, 'estimated_1rm': None}
+    for sets, reps, weight in rows:
+        fields['sets'] += sets
+        fields['reps'] += sets * reps
+        if weight is None:
+            continue
+        fields['volume'] += sets * reps * float(weight)
+        if fields['best_weight'] is None or (weight, reps) > (fields['best_weight'], fields['best_reps']):
+            fields['best_weight'], fields['best_reps'] = weight, reps
+        if reps:
+            one_rep_max = float(weight) if reps == 1 else float(weight) * (1 + reps / 30)
+            fields['estimated_1rm'] = max(fields['estimated_1rm'] or 0, one_rep_max)
+    return fields
+
+
+def populate_exercise_progress(apps, schema_editor):
+    WorkoutExercise = apps.get_model('count_calories_app', 'WorkoutExercise')
+    ExerciseProgress = apps.get_model('count_calories_app', 'ExerciseProgress')
+    ExerciseRecord = apps.get_model('count_calories_app', 'ExerciseRecord')
+
+    grouped = {}
+    rows = WorkoutExercise.objects.order_by('id').values_list(
+        'exercise_id', 'workout_id', 'workout__date', 'sets', 'reps', 'weight',
+    )
+    for exercise_id, workout_id, date, sets, reps, weight in rows.iterator():
+        grouped.setdefault((exercise_id, workout_id), (date, []))[1].append((sets, reps, weight))
+    progress = ExerciseProgress.objects.bulk_create(
+        [
+            ExerciseProgress(exercise_id=exercise_id, workout_id=workout_id, date=date, **session_fields(session_rows))
+            for (exercise_id, workout_id), (date, session_rows) in grouped.items()
+        ],
+        batch_size=500,
+    )
+
+    records = []
+    best = {}
+    for row in sorted(progress, key=lambda row: (row.date, row.exercise_id, row.workout_id)):
+        for kind, field in RECORD_KINDS:
+            value = getattr(row, field)
+            previous = best.get((row.exercise_id, kind))
+            if value and (previous is None or float(value) > previous):
+                best[(row.exercise_id, kind)] = float(value)
+                records.append(ExerciseRecord(
+                    exercise_id=row.exercise_id, workout_id=row.workout_id, date=row.date, kind=kind,
+                    value=float(value), previous=previous,
+                ))
+    ExerciseRecord.objects.bulk_create(records, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('count_calories_app', '0026_running_tracks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExerciseProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateTimeField(help_text='Date and time of the workout')),
+                ('sets', models.PositiveIntegerField(default=0, help_text='Sets performed in the session')),
+                ('reps', models.PositiveIntegerField(default=0, help_text='Repetitions performed in the session')),
+                ('best_weight', models.DecimalField(blank=True, decimal_places=2, help_text='Heaviest weight used', max_digits=6, null=True)),
+                ('best_reps', models.PositiveIntegerField(default=0, help_text='Repetitions of the heaviest set')),
+                ('estimated_1rm', models.FloatField(blank=True, help_text='Best Epley one-rep max estimate', null=True)),
+                ('volume', models.FloatField(default=0, help_text='Sum of sets * reps * weight')),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='count_calories_app.exercise')),
+                ('workout', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='count_calories_app.workoutsession')),
+            ],
+            options={
+                'ordering': ['date', 'id'],
+                'indexes': [models.Index(fields=['exercise', 'date'], name='exerciseprogress_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('exercise', 'workout'), name='exerciseprogress_unique_session')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExerciseRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateTimeField(help_text='Date and time of the workout that set the record')),
+                ('kind', models.CharField(choices=[('weight', 'Heaviest weight'), ('e1rm', 'Estimated 1RM'), ('volume', 'Session volume')], max_length=10)),
+                ('value', models.FloatField(help_text='Record value (kg)')),
+                ('previous', models.FloatField(blank=True, help_text='Record this one beat, empty for the first', null=True)),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='records', to='count_calories_app.exercise')),
+                ('workout', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='count_calories_app.workoutsession')),
+            ],
+            options={
+                'ordering': ['-date', '-id'],
+                'indexes': [models.Index(fields=['exercise', 'kind', 'date'], name='exerciserecord_exercise_idx'), models.Index(fields=['date'], name='exerciserecord_date_idx')],
+            },
+        ),
+        migrations.RunPython(populate_exercise_progress, migrations.RunPython.noop),
+    ]
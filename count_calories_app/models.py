@@ -1,7 +1,98 @@
-﻿from django.db import models
+﻿from datetime import datetime, time, timedelta
+
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.utils import timezone
 import json
 
+class FoodItemQuerySet(models.QuerySet):
+    """
+    QuerySet for FoodItem that keeps the DailyNutrition rollup and FoodProduct
+    totals in step with bulk writes.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Create the items in bulk, then refresh the rollup rows for the days and products they touch."""
+        objs = list(objs)
+        FoodProduct.assign([item for item in objs if item.product_id is None])
+        created = super().bulk_create(objs, *args, **kwargs)
+        DailyNutrition.refresh_days(DailyNutrition.day_for(item.consumed_at) for item in created)
+        FoodProduct.refresh(item.product_id for item in created)
+        DataVersion.bump(self.model)
+        return created
+
+    def latest_per_product(self):
+        """
+        The most recent entry for each FoodProduct, newest first, in one query.
+
+        Names differing only in case or spacing share a product, as in
+        FoodProduct.objects.for_quick_add(). Each item is annotated with
+        times_logged, the number of entries for that product in this queryset.
+        Filters applied before this call (for example hide_from_quick_list=False)
+        restrict which entries are considered.
+        """
+        from django.db.models.functions import RowNumber
+        by_product = [models.F('product_id')]
+        return self.annotate(
+            product_rank=models.Window(
+                RowNumber(),
+                partition_by=by_product,
+                order_by=[models.F('consumed_at').desc(), models.F('id').desc()],
+            ),
+            times_logged=models.Window(models.Count('id'), partition_by=by_product),
+        ).filter(product_rank=1).order_by('-consumed_at')
+
+    def food_totals(self):
+        """
+        Per-product totals over the entries in this queryset, one dict per
+        FoodProduct with the keys of FoodProduct.objects.food_totals().
+
+        Entries are grouped by product, not by the exact product_name, so a
+        date-windowed list merges "Apple" and "apple" like the all-time one.
+        """
+        return self.values('product_id').annotate(
+            key=models.F('product__key'),
+            product_name=models.F('product__name'),
+            count=models.Count('id'),
+            total_calories=models.Sum('calories'),
+            total_protein=models.Sum('protein'),
+            total_carbs=models.Sum('carbohydrates'),
+            total_fat=models.Sum('fat'),
+            avg_calories=models.Avg('calories'),
+            avg_protein=models.Avg('protein'),
+            avg_carbs=models.Avg('carbohydrates'),
+            avg_fat=models.Avg('fat'),
+            latest_consumed=models.Max('consumed_at'),
+        )
+
+    def search(self, text):
+        """
+        Entries whose product name matches ``text`` through the full-text index.
+
+        Every word of ``text`` must prefix-match a word of the name, ignoring
+        case and diacritics (see search.py). Databases without the index fall
+        back to ``icontains``.
+        """
+        from . import search
+        if not search.is_available():
+            return self.filter(product_name__icontains=text.strip())
+        names = search.matching_names_subquery(text)
+        if names is None:
+            return self.none()
+        return self.filter(product_name__in=names)
+
+    def named(self, *names):
+        """
+        Entries whose product_name matches any of ``names``, ignoring case.
+
+        Both sides are lower-cased in SQL so the lookup can use the
+        fooditem_name_lower_idx expression index, unlike ``__iexact``.
+        """
+        match = models.Q()
+        for name in names:
+            match |= models.Q(name_lower=Lower(models.Value(name)))
+        return self.alias(name_lower=Lower('product_name')).filter(match)
+
 class FoodItem(models.Model):
     """
     Represents a single food item consumed by the user.
@@ -13,6 +104,12 @@ class FoodItem(models.Model):
     protein = models.DecimalField(max_digits=5, decimal_places=2, default=0.0, help_text="Protein content in grams")
     consumed_at = models.DateTimeField(default=timezone.now, help_text="Date and time the item was consumed")
     hide_from_quick_list = models.BooleanField(default=False, help_text="Hide this item from the quick add list")
+    product = models.ForeignKey(
+        'FoodProduct', null=True, blank=True, on_delete=models.SET_NULL, related_name='entries',
+        help_text="Catalogue entry for this product name",
+    )
+
+    objects = FoodItemQuerySet.as_manager()
 
     def __str__(self):
         """String representation of the food item."""
@@ -20,15 +117,242 @@ class FoodItem(models.Model):
 
     class Meta:
         ordering = ['-consumed_at'] # Show newest items first
+        indexes = [
+            models.Index(fields=['consumed_at'], name='fooditem_consumed_at_idx'),
+            models.Index(fields=['product_name', 'consumed_at'], name='fooditem_name_consumed_idx'),
+            models.Index(
+                fields=['product_name', 'consumed_at'], name='fooditem_quick_list_idx',
+                condition=models.Q(hide_from_quick_list=False),
+            ),
+            models.Index(Lower('product_name'), name='fooditem_name_lower_idx'),
+        ]
+
+class FoodProductQuerySet(models.QuerySet):
+    """
+    QuerySet helpers for reading the per-product aggregates.
+    """
+
+    def food_totals(self):
+        """
+        One dict per product using the same keys as the per-product_name
+        Count/Sum/Avg/Max queries over FoodItem that this table replaces.
+        """
+        from django.db.models.functions import Cast
+
+        def average(field):
+            return Cast(field, models.FloatField()) / models.F('entry_count')
+
+        return self.values(
+            'key',
+            product_name=models.F('name'),
+            count=models.F('entry_count'),
+            total_calories=models.F('calories_total'),
+            total_protein=models.F('protein_total'),
+            total_carbs=models.F('carbohydrates_total'),
+            total_fat=models.F('fat_total'),
+            avg_calories=average('calories_total'),
+            avg_protein=average('protein_total'),
+            avg_carbs=average('carbohydrates_total'),
+            avg_fat=average('fat_total'),
+            latest_consumed=models.F('last_consumed_at'),
+        )
+
+    def totals(self):
+        """Aggregate entries, calories and macros over the selected products."""
+        return self.aggregate(
+            total_count=models.Sum('entry_count'),
+            total_calories=models.Sum('calories_total'),
+            total_fat=models.Sum('fat_total'),
+            total_carbs=models.Sum('carbohydrates_total'),
+            total_protein=models.Sum('protein_total'),
+            unique_foods=models.Count('id'),
+        )
+
+    def for_quick_add(self):
+        """Products with a visible entry, most often logged first, with that latest entry loaded."""
+        return self.filter(quick_add_count__gt=0, latest_item__isnull=False).select_related(
+            'latest_item'
+        ).order_by('-quick_add_count', '-latest_item__consumed_at')
+
+
+class FoodProduct(models.Model):
+    """
+    One row per distinct food, keyed by its normalised product name.
+
+    FoodItem.product points here and the running totals are maintained on
+    every FoodItem write (see signals.py and FoodItemQuerySet.bulk_create), so
+    all-time per-product lists read one row per product instead of grouping
+    every entry by name.
+    """
+    key = models.CharField(max_length=255, unique=True, help_text="Case-folded, whitespace-collapsed product name")
+    name = models.CharField(max_length=200, help_text="Product name as written on the latest entry")
+    entry_count = models.PositiveIntegerField(default=0, help_text="Number of entries logged")
+    quick_add_count = models.PositiveIntegerField(default=0, help_text="Number of entries not hidden from quick add")
+    calories_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    protein_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    carbohydrates_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    fat_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    last_consumed_at = models.DateTimeField(null=True, blank=True, help_text="When the latest entry was consumed")
+    latest_item = models.ForeignKey(
+        'FoodItem', null=True, blank=True, on_delete=models.SET_NULL, related_name='+',
+        help_text="Latest entry not hidden from quick add",
+    )
+
+    objects = FoodProductQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.name} ({self.entry_count} entries)"
+
+    class Meta:
+        ordering = ['-entry_count']
+
+    @staticmethod
+    def key_for(product_name):
+        """Case-fold and collapse whitespace so "Greek  yogurt" and "greek yogurt" share a product."""
+        import unicodedata
+        return ' '.join(unicodedata.normalize('NFC', product_name or '').casefold().split())[:255]
+
+    @classmethod
+    def for_name(cls, product_name):
+        """The product for ``product_name``, created if this is its first entry."""
+        product, _ = cls.objects.get_or_create(key=cls.key_for(product_name), defaults={'name': product_name})
+        return product
+
+    @classmethod
+    def assign(cls, items):
+        """Set ``product`` on unsaved FoodItems, creating missing products in one batch."""
+        names = {cls.key_for(item.product_name): item.product_name for item in items}
+        if not names:
+            return
+        products = dict(cls.objects.filter(key__in=names).values_list('key', 'pk'))
+        missing = [cls(key=key, name=name) for key, name in names.items() if key not in products]
+        if missing:
+            cls.objects.bulk_create(missing, ignore_conflicts=True)
+            products = dict(cls.objects.filter(key__in=names).values_list('key', 'pk'))
+        for item in items:
+            item.product_id = products[cls.key_for(item.product_name)]
+
+    @classmethod
+    def refresh(cls, product_ids):
+        """
+        Recompute the totals of the given products from their entries.
+
+        Only those products' entries are read, through the FoodItem.product
+        index, so a write costs time proportional to one product's history.
+        Products left without entries are deleted.
+        """
+        product_ids = {pk for pk in product_ids if pk is not None}
+        if not product_ids:
+            return
+
+        entries = FoodItem.objects.filter(product=models.OuterRef('pk')).order_by('-consumed_at', '-id')
+        visible = entries.filter(hide_from_quick_list=False)
+        rows = FoodItem.objects.filter(product_id__in=product_ids).values('product_id').annotate(
+            entries=models.Count('id'),
+            visible=models.Count('id', filter=models.Q(hide_from_quick_list=False)),
+            calories=models.Sum('calories'),
+            protein=models.Sum('protein'),
+            carbohydrates=models.Sum('carbohydrates'),
+            fat=models.Sum('fat'),
+            last_consumed=models.Max('consumed_at'),
+        ).order_by()
+
+        with transaction.atomic():
+            seen = set()
+            for row in rows:
+                seen.add(row['product_id'])
+                cls.objects.filter(pk=row['product_id']).update(
+                    entry_count=row['entries'],
+                    quick_add_count=row['visible'],
+                    calories_total=row['calories'] or 0,
+                    protein_total=row['protein'] or 0,
+                    carbohydrates_total=row['carbohydrates'] or 0,
+                    fat_total=row['fat'] or 0,
+                    last_consumed_at=row['last_consumed'],
+                    name=models.Subquery(entries.values('product_name')[:1]),
+                    latest_item=models.Subquery(visible.values('pk')[:1]),
+                )
+            cls.objects.filter(pk__in=product_ids - seen).delete()
+
+    @classmethod
+    def rebuild(cls, batch_size=500):
+        """Re-link every FoodItem to its product and recompute all totals. Returns the number of products."""
+        with transaction.atomic():
+            names = FoodItem.objects.values_list('product_name', flat=True).distinct().order_by()
+            for name in names.iterator():
+                product = cls.for_name(name)
+                FoodItem.objects.filter(product_name=name).exclude(product=product).update(product=product)
+            product_ids = list(cls.objects.values_list('pk', flat=True))
+            for start in range(0, len(product_ids), batch_size):
+                cls.refresh(product_ids[start:start + batch_size])
+        return cls.objects.count()
+
+
+class RunningSessionQuerySet(models.QuerySet):
+    """
+    QuerySet for RunningSession that fills in the derived columns on bulk
+    writes and reads personal-best leaderboards.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Create the sessions in bulk with pace, speed, calories and bucket set."""
+        objs = list(objs)
+        for session in objs:
+            session.update_derived()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def fastest(self, bucket, limit):
+        """
+        The ``limit`` runs of a distance bucket with the lowest pace, fastest
+        first (ties to the earlier run), read through the bucket/pace index.
+        """
+        return self.filter(distance_bucket=bucket, pace_seconds__isnull=False).order_by('pace_seconds', 'date', 'id')[:limit]
+
+    def longest(self, limit):
+        """The ``limit`` longest runs, read through the distance index."""
+        return self.order_by('-distance', 'date', 'id')[:limit]
+
 
 class RunningSession(models.Model):
     """
     Represents a running session recorded by the user.
+
+    Pace, speed, the calorie estimate and the distance bucket are derived
+    from distance and duration whenever the session is saved (see
+    update_derived), so lists and leaderboards read them instead of
+    recomputing them per request.
     """
+    # (bucket, label, minimum km): a run belongs to the longest race distance it covers
+    DISTANCE_BUCKETS = (
+        ('marathon', 'Marathon', 42.195),
+        ('half', 'Half marathon', 21.0975),
+        ('10k', '10K', 10),
+        ('5k', '5K', 5),
+    )
+    # Rough energy cost of running, kcal per km
+    CALORIES_PER_KM = 60
+
     date = models.DateTimeField(default=timezone.now, help_text="Date and time of the run")
     distance = models.DecimalField(max_digits=5, decimal_places=2, help_text="Distance in kilometers")
     duration = models.DurationField(help_text="Duration of the run (HH:MM:SS)")
     notes = models.TextField(blank=True, null=True, help_text="Optional notes about this run")
+    pace_seconds = models.FloatField(null=True, blank=True, editable=False, help_text="Seconds per km, empty without distance")
+    speed_kmh = models.FloatField(default=0, editable=False, help_text="Average speed in km/h, 0 without duration")
+    calories_estimate = models.FloatField(default=0, editable=False, help_text="Estimated kcal burned")
+    distance_bucket = models.CharField(
+        max_length=10, blank=True, default='', editable=False,
+        choices=[(bucket, label) for bucket, label, _ in DISTANCE_BUCKETS],
+        help_text="Longest race distance covered, empty under 5 km",
+    )
+    # Cached from an imported GPX/TCX track (see tracks.py), empty otherwise
+    moving_duration = models.DurationField(null=True, blank=True, editable=False, help_text="Time spent moving")
+    elevation_gain = models.FloatField(null=True, blank=True, editable=False, help_text="Metres climbed")
+    splits = models.JSONField(
+        null=True, blank=True, editable=False,
+        help_text="Per-km splits: km, distance, seconds and pace_seconds",
+    )
+
+    objects = RunningSessionQuerySet.as_manager()
 
     def __str__(self):
         """String representation of the running session."""
@@ -36,6 +360,54 @@ class RunningSession(models.Model):
 
     class Meta:
         ordering = ['-date'] # Show newest runs first
+        indexes = [
+            models.Index(fields=['date'], name='runningsession_date_idx'),
+            models.Index(fields=['distance_bucket', 'pace_seconds'], name='runningsession_bucket_pace_idx'),
+            models.Index(fields=['-distance'], name='runningsession_distance_idx'),
+        ]
+
+    @classmethod
+    def bucket_for(cls, distance):
+        """The distance bucket of a run of ``distance`` km, '' under 5 km."""
+        for bucket, _, minimum in cls.DISTANCE_BUCKETS:
+            if distance >= minimum:
+                return bucket
+        return ''
+
+    def update_derived(self):
+        """Recompute pace, speed, calories and bucket from distance and duration."""
+        distance = float(self.distance or 0)
+        seconds = self.duration.total_seconds() if self.duration else 0
+        self.pace_seconds = seconds / distance if distance > 0 else None
+        self.speed_kmh = distance / (seconds / 3600) if seconds > 0 else 0
+        self.calories_estimate = distance * self.CALORIES_PER_KM
+        self.distance_bucket = self.bucket_for(distance)
+
+
+class RunningTrack(models.Model):
+    """
+    The GPS points of an imported running session, packed into one blob.
+
+    ``points`` holds little-endian float32 rows of (latitude, longitude,
+    elevation in metres or NaN, seconds since the previous point); see
+    tracks.pack_points. Kept apart from RunningSession so that listing
+    sessions never reads the points.
+    """
+    GPX = 'gpx'
+    TCX = 'tcx'
+
+    session = models.OneToOneField(RunningSession, on_delete=models.CASCADE, related_name='track')
+    source_format = models.CharField(max_length=3, choices=[(GPX, 'GPX'), (TCX, 'TCX')])
+    point_count = models.PositiveIntegerField(help_text="Number of track points stored")
+    points = models.BinaryField(help_text="Packed float32 (lat, lon, elevation, time delta) rows")
+
+    def __str__(self):
+        return f"{self.get_source_format_display()} track of {self.session} ({self.point_count} points)"
+
+    def point_arrays(self):
+        """(lat, lon, elevation, seconds since start) as NumPy arrays."""
+        from .tracks import unpack_points
+        return unpack_points(self.points)
 
 class Weight(models.Model):
     """
@@ -51,6 +423,7 @@ class Weight(models.Model):
 
     class Meta:
         ordering = ['-recorded_at'] # Show newest measurements first
+        indexes = [models.Index(fields=['recorded_at'], name='weight_recorded_at_idx')]
 
 class Exercise(models.Model):
     """
@@ -67,6 +440,40 @@ class Exercise(models.Model):
     class Meta:
         ordering = ['name'] # Order alphabetically by name
 
+class WorkoutSessionQuerySet(models.QuerySet):
+    """
+    QuerySet for WorkoutSession with batch loading helpers for list and export views.
+    """
+
+    def with_exercises(self):
+        """
+        Prefetch each session's exercises together with their Exercise rows.
+
+        Every prefetched WorkoutExercise is annotated with volume
+        (sets * reps * weight, None when no weight was recorded).
+        """
+        exercises = WorkoutExercise.objects.select_related('exercise').annotate(
+            volume=models.ExpressionWrapper(
+                models.F('sets') * models.F('reps') * models.F('weight'),
+                output_field=models.FloatField(),
+            )
+        )
+        return self.prefetch_related(models.Prefetch('exercises', queryset=exercises))
+
+    def with_total_volume(self):
+        """Annotate total_volume, the sum of sets * reps * weight over the session's exercises."""
+        from django.db.models.functions import Coalesce
+        return self.annotate(
+            total_volume=Coalesce(
+                models.Sum(
+                    models.F('exercises__sets') * models.F('exercises__reps') * models.F('exercises__weight'),
+                    output_field=models.FloatField(),
+                ),
+                models.Value(0.0),
+                output_field=models.FloatField(),
+            )
+        )
+
 class WorkoutSession(models.Model):
     """
     Represents a workout session performed by the user.
@@ -75,6 +482,8 @@ class WorkoutSession(models.Model):
     name = models.CharField(max_length=200, blank=True, null=True, help_text="Optional name for this workout session")
     notes = models.TextField(blank=True, null=True, help_text="Optional notes about this workout session")
 
+    objects = WorkoutSessionQuerySet.as_manager()
+
     def __str__(self):
         """String representation of the workout session."""
         if self.name:
@@ -83,6 +492,7 @@ class WorkoutSession(models.Model):
 
     class Meta:
         ordering = ['-date'] # Show newest workouts first
+        indexes = [models.Index(fields=['date'], name='workoutsession_date_idx')]
 
 class WorkoutExercise(models.Model):
     """
@@ -103,6 +513,227 @@ class WorkoutExercise(models.Model):
     class Meta:
         ordering = ['id'] # Preserve the order exercises were added
 
+
+def estimated_one_rep_max(weight, reps):
+    """Epley estimate of the one-rep max for ``reps`` repetitions at ``weight``; None without weight."""
+    if weight is None or not reps:
+        return None
+    weight = float(weight)
+    return weight if reps == 1 else weight * (1 + reps / 30)
+
+
+class ExerciseProgress(models.Model):
+    """
+    One row per exercise per workout: the best set, estimated one-rep max and
+    volume of that exercise in that session.
+
+    Rows are maintained on every WorkoutExercise and WorkoutSession write
+    (see signals.py), so progress charts and PR detection read one row per
+    session instead of every logged set and its workout.
+    """
+    exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE, related_name='progress')
+    workout = models.ForeignKey(WorkoutSession, on_delete=models.CASCADE, related_name='+')
+    date = models.DateTimeField(help_text="Date and time of the workout")
+    sets = models.PositiveIntegerField(default=0, help_text="Sets performed in the session")
+    reps = models.PositiveIntegerField(default=0, help_text="Repetitions performed in the session")
+    best_weight = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, help_text="Heaviest weight used")
+    best_reps = models.PositiveIntegerField(default=0, help_text="Repetitions of the heaviest set")
+    estimated_1rm = models.FloatField(null=True, blank=True, help_text="Best Epley one-rep max estimate")
+    volume = models.FloatField(default=0, help_text="Sum of sets * reps * weight")
+
+    def __str__(self):
+        return f"{self.exercise_id} on {self.date:%Y-%m-%d}: {self.volume} kg volume"
+
+    class Meta:
+        ordering = ['date', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['exercise', 'workout'], name='exerciseprogress_unique_session'),
+        ]
+        indexes = [models.Index(fields=['exercise', 'date'], name='exerciseprogress_date_idx')]
+
+    @staticmethod
+    def _session_rows(rows):
+        """Fold (sets, reps, weight) rows of one exercise in one workout into the stored fields."""
+        sets = reps = 0
+        volume = 0.0
+        best_weight, best_reps, best_1rm = None, 0, None
+        for row_sets, row_reps, weight in rows:
+            sets += row_sets
+            reps += row_sets * row_reps
+            if weight is None:
+                continue
+            volume += row_sets * row_reps * float(weight)
+            if best_weight is None or (weight, row_reps) > (best_weight, best_reps):
+                best_weight, best_reps = weight, row_reps
+            one_rep_max = estimated_one_rep_max(weight, row_reps)
+            if one_rep_max is not None and (best_1rm is None or one_rep_max > best_1rm):
+                best_1rm = one_rep_max
+        return {
+            'sets': sets, 'reps': reps, 'volume': volume,
+            'best_weight': best_weight, 'best_reps': best_reps, 'estimated_1rm': best_1rm,
+        }
+
+    @classmethod
+    def refresh(cls, pairs):
+        """
+        Recompute the rows for the given (exercise_id, workout_id) pairs, then
+        the personal records of their exercises.
+
+        Only those workouts' exercises are read. Pairs with nothing logged
+        any more lose their row.
+        """
+        pairs = {pair for pair in pairs if None not in pair}
+        if not pairs:
+            return
+        grouped = {}
+        rows = WorkoutExercise.objects.filter(
+            exercise_id__in={exercise for exercise, _ in pairs},
+            workout_id__in={workout for _, workout in pairs},
+        ).order_by('id').values_list('exercise_id', 'workout_id', 'workout__date', 'sets', 'reps', 'weight')
+        for exercise_id, workout_id, date, sets, reps, weight in rows:
+            if (exercise_id, workout_id) in pairs:
+                grouped.setdefault((exercise_id, workout_id), (date, []))[1].append((sets, reps, weight))
+
+        with transaction.atomic():
+            for (exercise_id, workout_id), (date, session_rows) in grouped.items():
+                cls.objects.update_or_create(
+                    exercise_id=exercise_id, workout_id=workout_id,
+                    defaults={'date': date, **cls._session_rows(session_rows)},
+                )
+            stale = models.Q()
+            for exercise_id, workout_id in pairs - grouped.keys():
+                stale |= models.Q(exercise_id=exercise_id, workout_id=workout_id)
+            if stale:
+                cls.objects.filter(stale).delete()
+            ExerciseRecord.refresh({exercise for exercise, _ in pairs})
+
+    @classmethod
+    def move_workout(cls, workout):
+        """Give a workout's rows its current date and re-detect the records it may affect."""
+        moved = cls.objects.filter(workout=workout).exclude(date=workout.date)
+        exercise_ids = set(moved.values_list('exercise_id', flat=True))
+        if exercise_ids:
+            with transaction.atomic():
+                moved.update(date=workout.date)
+                ExerciseRecord.refresh(exercise_ids)
+
+    @classmethod
+    def rebuild(cls):
+        """Drop and recreate every row and record from WorkoutExercise. Returns the number of rows written."""
+        grouped = {}
+        rows = WorkoutExercise.objects.order_by('id').values_list(
+            'exercise_id', 'workout_id', 'workout__date', 'sets', 'reps', 'weight',
+        )
+        for exercise_id, workout_id, date, sets, reps, weight in rows.iterator():
+            grouped.setdefault((exercise_id, workout_id), (date, []))[1].append((sets, reps, weight))
+        with transaction.atomic():
+            cls.objects.all().delete()
+            created = cls.objects.bulk_create(
+                (cls(exercise_id=exercise_id, workout_id=workout_id, date=date, **cls._session_rows(session_rows))
+                 for (exercise_id, workout_id), (date, session_rows) in grouped.items()),
+                batch_size=500,
+            )
+            ExerciseRecord.objects.all().delete()
+            ExerciseRecord.refresh(Exercise.objects.values_list('id', flat=True))
+        return len(created)
+
+
+class ExerciseRecordQuerySet(models.QuerySet):
+    """
+    QuerySet helpers for reading personal records.
+    """
+
+    def current(self):
+        """The latest record of each exercise and kind, i.e. the standing personal bests."""
+        from django.db.models.functions import RowNumber
+        return self.annotate(
+            record_rank=models.Window(
+                RowNumber(),
+                partition_by=[models.F('exercise_id'), models.F('kind')],
+                order_by=[models.F('date').desc(), models.F('id').desc()],
+            ),
+        ).filter(record_rank=1)
+
+
+class ExerciseRecord(models.Model):
+    """
+    A personal record: a session whose best weight, estimated one-rep max or
+    volume beat every earlier session of the same exercise.
+
+    The first session of an exercise sets its first record of each kind
+    (with no ``previous`` value). Records are re-detected from ExerciseProgress
+    whenever an exercise's sessions change.
+    """
+    WEIGHT = 'weight'
+    ONE_REP_MAX = 'e1rm'
+    VOLUME = 'volume'
+    # (kind, label, ExerciseProgress field)
+    KINDS = (
+        (WEIGHT, 'Heaviest weight', 'best_weight'),
+        (ONE_REP_MAX, 'Estimated 1RM', 'estimated_1rm'),
+        (VOLUME, 'Session volume', 'volume'),
+    )
+
+    exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE, related_name='records')
+    workout = models.ForeignKey(WorkoutSession, on_delete=models.CASCADE, related_name='+')
+    date = models.DateTimeField(help_text="Date and time of the workout that set the record")
+    kind = models.CharField(max_length=10, choices=[(kind, label) for kind, label, _ in KINDS])
+    value = models.FloatField(help_text="Record value (kg)")
+    previous = models.FloatField(null=True, blank=True, help_text="Record this one beat, empty for the first")
+
+    objects = ExerciseRecordQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.get_kind_display()} record of {self.value} on {self.date:%Y-%m-%d}"
+
+    class Meta:
+        ordering = ['-date', '-id']
+        indexes = [
+            models.Index(fields=['exercise', 'kind', 'date'], name='exerciserecord_exercise_idx'),
+            models.Index(fields=['date'], name='exerciserecord_date_idx'),
+        ]
+
+    @classmethod
+    def detect(cls, values):
+        """
+        Indexes of the values (in date order, None for missing) that beat
+        every earlier value, with the value each one beat (None for the first).
+        """
+        import numpy as np
+        values = np.array([np.nan if value is None else float(value) for value in values], dtype=float)
+        # Best value strictly before each position; -inf before the first
+        best_before = np.concatenate(([-np.inf], np.fmax.accumulate(values)[:-1])) if len(values) else values
+        best_before = np.where(np.isnan(best_before), -np.inf, best_before)
+        records = np.flatnonzero(values > best_before)
+        return [(int(i), None if np.isinf(best_before[i]) else float(best_before[i])) for i in records]
+
+    @classmethod
+    def refresh(cls, exercise_ids):
+        """Re-detect every record of the given exercises from their ExerciseProgress rows."""
+        exercise_ids = set(exercise_ids)
+        if not exercise_ids:
+            return
+        sessions = {}
+        rows = ExerciseProgress.objects.filter(exercise_id__in=exercise_ids).order_by('date', 'id').values_list(
+            'exercise_id', 'workout_id', 'date', *(field for _, _, field in cls.KINDS),
+        )
+        for exercise_id, *row in rows:
+            sessions.setdefault(exercise_id, []).append(row)
+
+        records = []
+        for exercise_id, rows in sessions.items():
+            for column, (kind, _, _) in enumerate(cls.KINDS, start=2):
+                values = [row[column] or None for row in rows]
+                for index, previous in cls.detect(values):
+                    workout_id, date = rows[index][0], rows[index][1]
+                    records.append(cls(
+                        exercise_id=exercise_id, workout_id=workout_id, date=date, kind=kind,
+                        value=float(values[index]), previous=previous,
+                    ))
+        with transaction.atomic():
+            cls.objects.filter(exercise_id__in=exercise_ids).delete()
+            cls.objects.bulk_create(records, batch_size=500)
+
 class WorkoutTable(models.Model):
     """
     Represents a workout table with exercises and workout data.
@@ -145,6 +776,7 @@ class BodyMeasurement(models.Model):
 
     class Meta:
         ordering = ['-date'] # Show newest measurements first
+        indexes = [models.Index(fields=['date'], name='bodymeasurement_date_idx')]
 
 
 class UserSettings(models.Model):
@@ -407,3 +1039,263 @@ class MealTemplateItem(models.Model):
 
     def __str__(self):
         return f"{self.product_name} ({self.template.name})"
+
+
+class DailyNutritionQuerySet(models.QuerySet):
+    """
+    QuerySet helpers for reading the daily nutrition rollup.
+    """
+
+    def between(self, start=None, end=None):
+        """
+        Restrict to local dates from start to end, both inclusive.
+
+        Either bound may be a date, a datetime or None. A datetime bound
+        selects the whole local day it falls on, so a "now minus N days"
+        window keeps the day it starts in, as a consumed_at >= start filter would.
+        """
+        qs = self
+        if start is not None:
+            qs = qs.filter(date__gte=DailyNutrition.day_for(start))
+        if end is not None:
+            qs = qs.filter(date__lte=DailyNutrition.day_for(end))
+        return qs
+
+    def daily_totals(self):
+        """
+        One dict per logged day, oldest first, using the same keys as the
+        TruncDate/Sum queries over FoodItem that this table replaces.
+        """
+        return self.order_by('date').values(
+            day=models.F('date'),
+            total_calories=models.F('calories'),
+            total_protein=models.F('protein'),
+            total_carbs=models.F('carbohydrates'),
+            total_fat=models.F('fat'),
+            count=models.F('entry_count'),
+        )
+
+    def totals(self):
+        """Aggregate calories, macros, entry count and logged-day count over the selected days."""
+        return self.aggregate(
+            calories=models.Sum('calories'),
+            protein=models.Sum('protein'),
+            carbs=models.Sum('carbohydrates'),
+            fat=models.Sum('fat'),
+            count=models.Sum('entry_count'),
+            days=models.Count('id'),
+        )
+
+
+class DailyNutrition(models.Model):
+    """
+    Per-day totals of FoodItem entries, keyed by local calendar date.
+
+    Rows are maintained on every FoodItem write (see signals.py and
+    FoodItemQuerySet.bulk_create) so that trend and analytics views read one
+    row per day instead of scanning every entry. Days without entries have no row.
+    """
+    date = models.DateField(unique=True, help_text="Local calendar date")
+    calories = models.DecimalField(max_digits=9, decimal_places=2, default=0, help_text="Total calories for the day")
+    protein = models.DecimalField(max_digits=9, decimal_places=2, default=0, help_text="Total protein in grams")
+    carbohydrates = models.DecimalField(max_digits=9, decimal_places=2, default=0, help_text="Total carbohydrates in grams")
+    fat = models.DecimalField(max_digits=9, decimal_places=2, default=0, help_text="Total fat in grams")
+    entry_count = models.PositiveIntegerField(default=0, help_text="Number of food entries logged that day")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = DailyNutritionQuerySet.as_manager()
+
+    # Day ranges OR-ed into one refresh_days() query
+    REFRESH_RANGES_PER_QUERY = 200
+
+    def __str__(self):
+        return f"{self.date}: {self.calories} kcal ({self.entry_count} entries)"
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name_plural = "Daily nutrition"
+
+    @staticmethod
+    def day_for(value):
+        """Return the local calendar date for a date or (aware or naive) datetime."""
+        if isinstance(value, datetime):
+            if timezone.is_aware(value):
+                return timezone.localtime(value).date()
+            return value.date()
+        return value
+
+    @staticmethod
+    def _totals_by_day(food_items):
+        """Group a FoodItem queryset by local date with summed calories and macros."""
+        from django.db.models.functions import TruncDate
+        return food_items.annotate(
+            day=TruncDate('consumed_at')
+        ).values('day').annotate(
+            total_calories=models.Sum('calories'),
+            total_protein=models.Sum('protein'),
+            total_carbs=models.Sum('carbohydrates'),
+            total_fat=models.Sum('fat'),
+            entries=models.Count('id'),
+        ).order_by('day')
+
+    @classmethod
+    def _from_totals(cls, row):
+        return {
+            'calories': row['total_calories'] or 0,
+            'protein': row['total_protein'] or 0,
+            'carbohydrates': row['total_carbs'] or 0,
+            'fat': row['total_fat'] or 0,
+            'entry_count': row['entries'],
+        }
+
+    @classmethod
+    def refresh_days(cls, days):
+        """
+        Recompute the rollup rows for the given local dates from FoodItem.
+
+        Only the entries of those days are read, so the cost of a write is
+        proportional to the entries logged on the affected days. Consecutive
+        days are read as one range, and ranges are queried in batches so a
+        bulk import spanning years stays within SQLite's expression limits.
+        """
+        days = {day for day in days if day is not None}
+        if not days:
+            return
+
+        ranges = []
+        for day in sorted(days):
+            if ranges and ranges[-1][1] == day:
+                ranges[-1][1] = day + timedelta(days=1)
+            else:
+                ranges.append([day, day + timedelta(days=1)])
+
+        tz = timezone.get_current_timezone()
+        with transaction.atomic():
+            seen = set()
+            for batch_start in range(0, len(ranges), cls.REFRESH_RANGES_PER_QUERY):
+                day_filter = models.Q()
+                for first, end in ranges[batch_start:batch_start + cls.REFRESH_RANGES_PER_QUERY]:
+                    day_filter |= models.Q(
+                        consumed_at__gte=timezone.make_aware(datetime.combine(first, time.min), tz),
+                        consumed_at__lt=timezone.make_aware(datetime.combine(end, time.min), tz),
+                    )
+                for row in cls._totals_by_day(FoodItem.objects.filter(day_filter)):
+                    if row['day'] not in days:
+                        continue
+                    seen.add(row['day'])
+                    cls.objects.update_or_create(date=row['day'], defaults=cls._from_totals(row))
+            cls.objects.filter(date__in=days - seen).delete()
+
+    @classmethod
+    def rebuild(cls):
+        """Drop and recreate every rollup row from FoodItem. Returns the number of days written."""
+        with transaction.atomic():
+            cls.objects.all().delete()
+            rows = cls._totals_by_day(FoodItem.objects.all())
+            created = cls.objects.bulk_create(
+                (cls(date=row['day'], **cls._from_totals(row)) for row in rows.iterator()),
+                batch_size=500,
+            )
+        return len(created)
+
+
+class DataVersion(models.Model):
+    """
+    A token that changes every time rows of one model are written.
+
+    The response cache puts these tokens in its keys, so a cached response
+    goes stale exactly when the data it was built from changes. Tokens live in
+    the database rather than the cache so that a rolled-back write also rolls
+    back its token.
+    """
+    model = models.CharField(max_length=100, unique=True, help_text="Model label, e.g. count_calories_app.fooditem")
+    token = models.CharField(max_length=32)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.model}: {self.token}"
+
+    @classmethod
+    def bump(cls, model):
+        """Give ``model`` a fresh token."""
+        import uuid
+        label = model._meta.label_lower
+        token = uuid.uuid4().hex
+        if not cls.objects.filter(model=label).update(token=token):
+            cls.objects.create(model=label, token=token)
+
+    @classmethod
+    def state(cls, model_classes):
+        """
+        Current tokens and last write time for the given models, in one query.
+
+        Returns ({label: token}, last_modified). Never-written models get the
+        token '' and last_modified is None if none of them were written.
+        """
+        labels = [model._meta.label_lower for model in model_classes]
+        rows = cls.objects.filter(model__in=labels).values_list('model', 'token', 'updated_at')
+        current = {label: (token, updated_at) for label, token, updated_at in rows}
+        tokens = {label: current[label][0] if label in current else '' for label in labels}
+        last_modified = max((updated_at for _, updated_at in current.values()), default=None)
+        return tokens, last_modified
+
+    @classmethod
+    def tokens(cls, model_classes):
+        """Current token for each model label; never-written models get ''."""
+        return cls.state(model_classes)[0]
+
+
+class NutritionLookup(models.Model):
+    """
+    A cached Gemini nutrition answer for one normalised food description.
+
+    Entries expire after settings.GEMINI_CACHE_TTL_DAYS days and the least
+    recently used ones are evicted once there are more than
+    settings.GEMINI_CACHE_MAX_ENTRIES.
+    """
+    key = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the normalised description")
+    description = models.TextField(help_text="Normalised food description")
+    data = models.JSONField(help_text="Nutrition values returned by Gemini")
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+    hits = models.PositiveIntegerField(default=0, help_text="Number of lookups answered from this entry")
+
+    def __str__(self):
+        return f"{self.description} ({self.hits} hits)"
+
+    class Meta:
+        indexes = [models.Index(fields=['last_used_at'], name='nutritionlookup_used_idx')]
+
+    @staticmethod
+    def normalize(description):
+        """Case-fold and collapse whitespace so trivially different descriptions share an entry."""
+        import unicodedata
+        return ' '.join(unicodedata.normalize('NFC', description).casefold().split())
+
+    @staticmethod
+    def key_for(normalized):
+        import hashlib
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def fetch(cls, normalized, ttl):
+        """Return the cached data for a normalised description, or None if missing or expired."""
+        key = cls.key_for(normalized)
+        data = cls.objects.filter(key=key, created_at__gte=timezone.now() - ttl).values_list('data', flat=True).first()
+        if data is not None:
+            cls.objects.filter(key=key).update(last_used_at=timezone.now(), hits=models.F('hits') + 1)
+        return data
+
+    @classmethod
+    def store(cls, normalized, data, ttl, max_entries):
+        """Save an answer, then drop expired entries and evict the least recently used overflow."""
+        now = timezone.now()
+        cls.objects.update_or_create(
+            key=cls.key_for(normalized),
+            defaults={'description': normalized, 'data': data, 'created_at': now, 'last_used_at': now},
+        )
+        cls.objects.filter(created_at__lt=now - ttl).delete()
+        overflow = cls.objects.order_by('-last_used_at', '-id').values_list('id', flat=True)[max_entries:]
+        stale_ids = list(overflow)
+        if stale_ids:
+            cls.objects.filter(id__in=stale_ids).delete()
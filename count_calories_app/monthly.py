@@ -0,0 +1,231 @@
+"""
+Monthly nutrition and weight series.
+
+month_trends, api_yearly_trends and the month comparison views show one row
+per calendar month. The rows are built from a fixed number of grouped queries
+(daily rollup totals, weigh-ins and the most logged foods per month) and months
+without data are filled in here, so the cost does not grow with the number of
+months shown or compared.
+"""
+
+import calendar
+from datetime import date, datetime, time
+
+from django.db.models import Avg, Count, F, Max, Min, Q, Sum, Window
+from django.db.models.functions import FirstValue, RowNumber, TruncMonth
+from django.utils import timezone
+
+from .models import DailyNutrition, FoodItem, Weight
+
+# Most months one comparison request may ask for
+MAX_COMPARE_MONTHS = 24
+
+
+def month_sequence(first, last):
+    """Every (year, month) pair from ``first`` through ``last``, both inclusive."""
+    year, month = first
+    months = []
+    while (year, month) <= tuple(last):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def last_months(today, count=12):
+    """The ``count`` calendar months ending with the month of ``today``."""
+    index = today.year * 12 + today.month - 1 - (count - 1)
+    return month_sequence((index // 12, index % 12 + 1), (today.year, today.month))
+
+
+def parse_month(value):
+    """(year, month) for a 'YYYY-MM' string; raises ValueError otherwise."""
+    parsed = datetime.strptime(value.strip(), '%Y-%m')
+    return parsed.year, parsed.month
+
+
+def first_logged_day():
+    """Local date of the first food entry, or None when nothing is logged."""
+    return DailyNutrition.objects.order_by('date').values_list('date', flat=True).first()
+
+
+def _next_month(year, month):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _month_ranges(months):
+    """Half-open [start, end) date ranges covering ``months``, consecutive months merged."""
+    ranges = []
+    for year, month in sorted(set(months)):
+        start = date(year, month, 1)
+        end = date(*_next_month(year, month), 1)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    return ranges
+
+
+def _in_months(field, ranges, aware=False):
+    """Q matching ``field`` inside any of the local date ranges."""
+    condition = Q()
+    for start, end in ranges:
+        if aware:
+            start = timezone.make_aware(datetime.combine(start, time.min))
+            end = timezone.make_aware(datetime.combine(end, time.min))
+        condition |= Q(**{f'{field}__gte': start, f'{field}__lt': end})
+    return condition
+
+
+def _month_key(value):
+    """(year, month) of a TruncMonth value, which is a date or a local datetime."""
+    return value.year, value.month
+
+
+def _nutrition_by_month(ranges):
+    rows = (
+        DailyNutrition.objects
+        .filter(_in_months('date', ranges))
+        .annotate(month=TruncMonth('date'))
+        .order_by()
+        .values('month')
+        .annotate(
+            calories=Sum('calories'),
+            protein=Sum('protein'),
+            carbs=Sum('carbohydrates'),
+            fat=Sum('fat'),
+            entries=Sum('entry_count'),
+            days=Count('id'),
+        )
+    )
+    return {_month_key(row['month']): row for row in rows}
+
+
+def _weight_by_month(ranges):
+    """First, last, average, lowest and highest weigh-in of every month, one row per month."""
+    month = F('month')
+    rows = (
+        Weight.objects
+        .filter(_in_months('recorded_at', ranges, aware=True))
+        .annotate(month=TruncMonth('recorded_at'))
+        .annotate(
+            first=Window(FirstValue('weight'), partition_by=[month], order_by=[F('recorded_at').asc(), F('id').asc()]),
+            last=Window(FirstValue('weight'), partition_by=[month], order_by=[F('recorded_at').desc(), F('id').desc()]),
+            avg=Window(Avg('weight'), partition_by=[month]),
+            low=Window(Min('weight'), partition_by=[month]),
+            high=Window(Max('weight'), partition_by=[month]),
+            count=Window(Count('id'), partition_by=[month]),
+        )
+        .order_by()
+        .values('month', 'first', 'last', 'avg', 'low', 'high', 'count')
+        .distinct()
+    )
+    return {_month_key(row['month']): row for row in rows}
+
+
+def _top_foods_by_month(ranges, limit=None):
+    """
+    Product totals of every month, most logged first (ties alphabetical).
+
+    With ``limit`` only that many products per month are returned, ranked in
+    the database; otherwise every product logged that month is.
+    """
+    rows = (
+        FoodItem.objects
+        .filter(_in_months('consumed_at', ranges, aware=True))
+        .annotate(month=TruncMonth('consumed_at'))
+        .order_by()
+        .values('month', 'product_name')
+        .annotate(
+            count=Count('id'),
+            calories=Sum('calories'),
+            protein=Sum('protein'),
+            carbs=Sum('carbohydrates'),
+            fat=Sum('fat'),
+        )
+    )
+    if limit is not None:
+        rows = rows.annotate(rank=Window(
+            RowNumber(), partition_by=[F('month')], order_by=[F('count').desc(), F('product_name').asc()],
+        )).filter(rank__lte=limit)
+
+    foods = {}
+    for row in rows:
+        month = _month_key(row.pop('month'))
+        row.pop('rank', None)
+        foods.setdefault(month, []).append({
+            'product_name': row['product_name'],
+            'count': row['count'],
+            **{field: float(row[field] or 0) for field in ('calories', 'protein', 'carbs', 'fat')},
+        })
+    for month_foods in foods.values():
+        month_foods.sort(key=lambda food: (-food['count'], food['product_name']))
+    return foods
+
+
+def _month_row(key, totals, weight):
+    return {
+        'year': key[0],
+        'month': key[1],
+        'days_in_month': calendar.monthrange(*key)[1],
+        'days_logged': totals.get('days', 0),
+        'entries': totals.get('entries') or 0,
+        'calories': float(totals.get('calories') or 0),
+        'protein': float(totals.get('protein') or 0),
+        'carbs': float(totals.get('carbs') or 0),
+        'fat': float(totals.get('fat') or 0),
+        'weight_first': float(weight['first']) if weight else None,
+        'weight_last': float(weight['last']) if weight else None,
+        'weight_avg': float(weight['avg']) if weight else None,
+        'weight_min': float(weight['low']) if weight else None,
+        'weight_max': float(weight['high']) if weight else None,
+        'weigh_ins': weight['count'] if weight else 0,
+    }
+
+
+def monthly_series(months):
+    """
+    Totals for each (year, month) pair in ``months``.
+
+    Returns one dict per month, in the given order: year, month,
+    days_in_month, days_logged, entries, calories, protein, carbs and fat
+    (floats, 0 for months without entries), weight_first, weight_last,
+    weight_avg, weight_min and weight_max (floats, None without weigh-ins),
+    weigh_ins and top_food (None without entries).
+    """
+    if not months:
+        return []
+    ranges = _month_ranges(months)
+    nutrition = _nutrition_by_month(ranges)
+    weights = _weight_by_month(ranges)
+    top_foods = _top_foods_by_month(ranges, limit=1)
+
+    series = []
+    for key in months:
+        row = _month_row(key, nutrition.get(key, {}), weights.get(key))
+        row['top_food'] = top_foods[key][0]['product_name'] if key in top_foods else None
+        series.append(row)
+    return series
+
+
+def month_comparison(months, top_foods=None):
+    """
+    monthly_series() for months that need not be consecutive, with food lists.
+
+    Each row carries ``top_foods``: dicts of product_name, count, calories,
+    protein, carbs and fat, most logged first, at most ``top_foods`` of them
+    (all products when None). Months may repeat; the query count is the same
+    for two months as for twelve.
+    """
+    if not months:
+        return []
+    ranges = _month_ranges(months)
+    nutrition = _nutrition_by_month(ranges)
+    weights = _weight_by_month(ranges)
+    foods = _top_foods_by_month(ranges, limit=top_foods)
+
+    comparison = []
+    for key in months:
+        row = _month_row(key, nutrition.get(key, {}), weights.get(key))
+        row['top_foods'] = [dict(food) for food in foods.get(key, [])]
+        comparison.append(row)
+    return comparison
@@ -0,0 +1,103 @@
+"""
+Keyset (cursor) pagination for the React list endpoints.
+
+Pages are read newest first on ``(field, id)`` and each page ends with an
+opaque cursor naming its last row. The next page filters on
+``(field, id) < cursor`` instead of using OFFSET, so fetching page 100 costs
+the same as fetching page 1 and rows added while a client scrolls do not
+shift later pages.
+
+Cursors are signed with the project's SECRET_KEY and salted with the model
+and field they page over, so they cannot be forged or replayed against a
+different endpoint.
+"""
+
+from dataclasses import dataclass
+
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that was tampered with or issued for another list."""
+
+
+@dataclass
+class CursorPage:
+    items: list
+    next_cursor: str | None
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+    def as_dict(self, per_page):
+        return {'per_page': per_page, 'next_cursor': self.next_cursor, 'has_more': self.has_more}
+
+
+def per_page_param(request, default=DEFAULT_PER_PAGE):
+    """The per_page query parameter, clamped to 1..MAX_PER_PAGE."""
+    try:
+        return min(max(int(request.GET.get('per_page', default)), 1), MAX_PER_PAGE)
+    except (TypeError, ValueError):
+        return default
+
+
+def include_totals_param(request, default=True):
+    """Whether the client asked for totals/stats alongside the page (include_totals=0 turns them off)."""
+    value = request.GET.get('include_totals')
+    if value is None:
+        return default
+    return value.lower() not in ('0', 'false', 'no', 'off', '')
+
+
+def _salt(queryset, field):
+    return f'count_calories_app.pagination:{queryset.model._meta.label}.{field}'
+
+
+def encode_cursor(queryset, field, obj):
+    """Opaque cursor pointing just after ``obj`` in a ``(-field, -id)`` ordering."""
+    value = queryset.model._meta.get_field(field).value_to_string(obj)
+    return signing.dumps([value, obj.pk], salt=_salt(queryset, field), compress=False)
+
+
+def decode_cursor(queryset, field, cursor):
+    """The ``(value, id)`` pair encoded in ``cursor``."""
+    try:
+        value, pk = signing.loads(cursor, salt=_salt(queryset, field))
+        return queryset.model._meta.get_field(field).to_python(value), int(pk)
+    except (signing.BadSignature, ValidationError, TypeError, ValueError) as exc:
+        raise InvalidCursor('Invalid cursor') from exc
+
+
+def paginate(queryset, field, cursor=None, per_page=DEFAULT_PER_PAGE):
+    """
+    One page of ``queryset`` ordered by ``field`` then id, newest first.
+
+    ``cursor`` is the next_cursor of the previous page, or None/'' for the
+    first page. Fetches a single extra row to tell whether more pages follow.
+    """
+    queryset = queryset.order_by(f'-{field}', '-pk')
+    if cursor:
+        value, pk = decode_cursor(queryset, field, cursor)
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+    rows = list(queryset[:per_page + 1])
+    items = rows[:per_page]
+    next_cursor = encode_cursor(queryset, field, items[-1]) if len(rows) > per_page else None
+    return CursorPage(items, next_cursor)
+
+
+def paginate_request(request, queryset, field, default_per_page=DEFAULT_PER_PAGE):
+    """
+    Cursor page for a request that asked for one, else None.
+
+    A request opts in with a ``cursor`` parameter, empty for the first page.
+    Raises InvalidCursor for a bad cursor.
+    """
+    if 'cursor' not in request.GET:
+        return None
+    return paginate(queryset, field, request.GET.get('cursor'), per_page_param(request, default_per_page))
@@ -0,0 +1,136 @@
+"""
+Side-by-side food product comparison.
+
+Averages, entry counts and the last-logged time come from the FoodProduct
+running totals. The weekly-frequency sparkline is counted in the same grouped
+query with one conditional Count per week. Comparing any number of products
+therefore costs one query, plus a full-text lookup and one more query for
+names that have no exact product.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import FoodProduct
+from .search import search_product_names
+
+# Weeks shown in the frequency sparkline
+FREQUENCY_WEEKS = 8
+
+# Most products one request may compare
+MAX_COMPARE_PRODUCTS = 10
+
+
+def _week_buckets(today):
+    """
+    Conditional counts of entries per week, oldest week first.
+
+    The last week ends at the end of ``today`` so the counts only change
+    from one day to the next, like the cached responses built from them.
+    """
+    end = timezone.make_aware(datetime.combine(today + timedelta(days=1), time.min))
+    return {
+        f'week_{week}': Count('entries', filter=Q(
+            entries__consumed_at__gte=end - timedelta(weeks=FREQUENCY_WEEKS - week),
+            entries__consumed_at__lt=end - timedelta(weeks=FREQUENCY_WEEKS - week - 1),
+        ))
+        for week in range(FREQUENCY_WEEKS)
+    }
+
+
+def _product_rows(keys, today):
+    """Running totals and weekly counts of the products with these keys, by key."""
+    rows = (
+        FoodProduct.objects
+        .filter(key__in=keys, entry_count__gt=0)
+        .order_by()
+        .values(
+            'key', 'entry_count', 'calories_total', 'protein_total', 'carbohydrates_total', 'fat_total',
+            'last_consumed_at',
+        )
+        .annotate(**_week_buckets(today))
+    )
+    return {row['key']: row for row in rows}
+
+
+def _ratio(part, whole, factor=1):
+    return round(part * factor / whole * 100, 1) if whole else 0
+
+
+def _product_stats(name, row, settings):
+    entries = row['entry_count']
+    calories = round(float(row['calories_total']) / entries, 1)
+    protein = round(float(row['protein_total']) / entries, 1)
+    fat = round(float(row['fat_total']) / entries, 1)
+    carbs = round(float(row['carbohydrates_total']) / entries, 1)
+    weekly_counts = [row[f'week_{week}'] for week in range(FREQUENCY_WEEKS)]
+
+    return {
+        'name': name,
+        'calories': calories,
+        'protein': protein,
+        'fat': fat,
+        'carbs': carbs,
+        'entries': entries,
+        'last_logged': row['last_consumed_at'],
+        'weekly_counts': weekly_counts,
+        'weekly_max': max(weekly_counts) or 1,
+        'protein_pct': _ratio(protein, calories, 4),
+        'fat_pct': _ratio(fat, calories, 9),
+        'carbs_pct': _ratio(carbs, calories, 4),
+        'protein_per_100kcal': _ratio(protein, calories),
+        # Goal alignment (% of daily targets)
+        'cal_goal_pct': _ratio(calories, settings.daily_calorie_target or 1),
+        'protein_goal_pct': _ratio(protein, settings.protein_target or 1),
+        'fat_goal_pct': _ratio(fat, settings.fat_target or 1),
+        'carbs_goal_pct': _ratio(carbs, settings.carbs_target or 1),
+    }
+
+
+def compare_products(names, settings, today=None):
+    """
+    Averaged nutrition per entry, frequency and goal alignment for each name.
+
+    Returns one dict (or None when nothing matches) per name, in order. A name
+    without an exact product falls back to its best full-text match, whose name
+    is then reported. ``settings`` supplies the daily targets; ``today``
+    (default: the local date) ends the last week of ``weekly_counts``.
+    """
+    today = today or timezone.localdate()
+    keys = [FoodProduct.key_for(name) for name in names]
+    rows = _product_rows(set(keys), today)
+
+    # Names without a product of their own: best full-text match instead
+    fallbacks = {}
+    for name, key in zip(names, keys):
+        if key not in rows and key not in fallbacks:
+            best = search_product_names(name, limit=1)
+            if best:
+                fallbacks[key] = best[0]
+    if fallbacks:
+        rows.update(_product_rows({FoodProduct.key_for(match) for match in fallbacks.values()}, today))
+
+    stats = []
+    for name, key in zip(names, keys):
+        if key in rows:
+            stats.append(_product_stats(name, rows[key], settings))
+        elif key in fallbacks and FoodProduct.key_for(fallbacks[key]) in rows:
+            stats.append(_product_stats(fallbacks[key], rows[FoodProduct.key_for(fallbacks[key])], settings))
+        else:
+            stats.append(None)
+    return stats
+
+
+def radar_chart(products):
+    """Each product's axes as a percentage of the largest value among ``products``."""
+    axes = (
+        ('cal_pct', 'calories'), ('pro_pct', 'protein'), ('fat_pct', 'fat'),
+        ('car_pct', 'carbs'), ('eff_pct', 'protein_per_100kcal'),
+    )
+    largest = {field: max(p[field] for p in products) or 1 for _, field in axes}
+    return [
+        {'name': p['name'], **{axis: round(p[field] / largest[field] * 100) for axis, field in axes}}
+        for p in products
+    ]
@@ -0,0 +1,109 @@
+"""
+Response caching and conditional GETs for the read-heavy views.
+
+Both are driven by DataVersion tokens: writes to a model replace its token
+(see signals.py), so anything derived from the tokens changes exactly when the
+underlying data does.
+
+- cached_response / cached_context keep built responses in the size-bounded
+  LRU cache configured in settings.CACHES, keyed by view name, the normalised
+  query string, the local date and the tokens of every model the view reads.
+- conditional_response turns the same inputs into an ETag and Last-Modified
+  pair and answers 304 Not Modified without running the view.
+"""
+
+import hashlib
+from datetime import datetime, time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .models import (
+    BodyMeasurement, DataVersion, Exercise, FoodItem, MealTemplate, MealTemplateItem, RunningSession,
+    UserSettings, Weight, WorkoutExercise, WorkoutSession, WorkoutTable,
+)
+
+# Models whose writes invalidate cached responses and ETags
+CACHED_MODELS = (
+    FoodItem, Weight, WorkoutSession, WorkoutExercise, Exercise, RunningSession, BodyMeasurement,
+    UserSettings, MealTemplate, MealTemplateItem, WorkoutTable,
+)
+
+
+def _fingerprint(request, model_classes):
+    """Hash of the query string, local date and model tokens, plus the models' last write time."""
+    tokens, last_modified = DataVersion.state(model_classes)
+    params = sorted((key, [value.strip() for value in request.GET.getlist(key)]) for key in request.GET)
+    raw = repr((params, timezone.localdate().isoformat(), sorted(tokens.items())))
+    return hashlib.sha1(raw.encode()).hexdigest(), last_modified
+
+
+def cache_key(name, request, model_classes):
+    """Cache key for ``name`` given the request's query string and the models' current tokens."""
+    return f"response:{name}:{_fingerprint(request, model_classes)[0]}"
+
+
+def _timeout():
+    return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 0)
+
+
+def cached_response(*model_classes):
+    """
+    Cache successful GET responses of a view until one of ``model_classes`` is written.
+
+    Use for JSON views. Template views should use cached_context() so the
+    template is still rendered on every request.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or not _timeout():
+                return view(request, *args, **kwargs)
+            key = cache_key(view.__name__, request, model_classes)
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.streaming:
+                    cache.set(key, response, _timeout())
+            return response
+        return wrapper
+    return decorator
+
+
+def cached_context(name, request, model_classes, build):
+    """Return ``build(request)``, cached under the same rules as cached_response()."""
+    if not _timeout():
+        return build(request)
+    key = cache_key(name, request, model_classes)
+    context = cache.get(key)
+    if context is None:
+        context = build(request)
+        cache.set(key, context, _timeout())
+    return context
+
+
+def conditional_response(*model_classes):
+    """
+    Support If-None-Match / If-Modified-Since on a GET view reading ``model_classes``.
+
+    The validators cost one DataVersion query; on a match the view body is
+    skipped and 304 Not Modified is returned. Last-Modified is never earlier
+    than local midnight because these views also depend on today's date.
+    """
+    def fingerprint(request):
+        if not hasattr(request, '_data_fingerprint'):
+            request._data_fingerprint = _fingerprint(request, model_classes)
+        return request._data_fingerprint
+
+    def etag(request, *args, **kwargs):
+        return fingerprint(request)[0]
+
+    def last_modified(request, *args, **kwargs):
+        midnight = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+        written = fingerprint(request)[1]
+        return max(written, midnight) if written else midnight
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
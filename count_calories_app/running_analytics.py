@@ -0,0 +1,189 @@
+"""
+Running analytics shared by the running tracker page and get_running_data.
+
+The sessions' date, distance and duration columns, together with the pace,
+speed and calorie estimate stored on each session, are read once into NumPy
+arrays; the stats and the fastest and slowest runs are computed from those
+arrays with vectorised operations. Weekly and monthly distance totals are
+grouped in the database with TruncWeek and TruncMonth, so neither view loops
+over sessions in Python to build them.
+
+personal_bests() answers the leaderboard with one indexed ORDER BY ... LIMIT
+query per distance bucket.
+
+Series and sections return plain Python numbers so they can go straight into
+a template context or a JSON response.
+"""
+
+from functools import cached_property
+
+import numpy as np
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import RunningSession
+
+# Sessions shorter than this (km) are left out unless the request says otherwise
+DEFAULT_MIN_DISTANCE = 3
+
+# Runs listed per leaderboard by default, and at most
+DEFAULT_LEADERBOARD_SIZE = 5
+MAX_LEADERBOARD_SIZE = 50
+
+
+def min_distance_param(params):
+    """``?min_distance=`` as a float, DEFAULT_MIN_DISTANCE when missing or invalid."""
+    try:
+        return float(params.get('min_distance', DEFAULT_MIN_DISTANCE))
+    except ValueError:
+        return DEFAULT_MIN_DISTANCE
+
+
+def running_sessions(min_distance=DEFAULT_MIN_DISTANCE, start=None, end=None):
+    """Running sessions of at least ``min_distance`` km between two datetimes (None: open)."""
+    sessions = RunningSession.objects.filter(distance__gte=min_distance)
+    if start is not None:
+        sessions = sessions.filter(date__gte=start)
+    if end is not None:
+        sessions = sessions.filter(date__lte=end)
+    return sessions
+
+
+class RunningSeries:
+    """The sessions of a queryset as parallel NumPy arrays, oldest first."""
+
+    def __init__(self, sessions):
+        self.sessions = sessions.order_by()
+        rows = list(sessions.order_by('date', 'id').values_list(
+            'id', 'date', 'distance', 'duration', 'pace_seconds', 'speed_kmh', 'calories_estimate',
+        ))
+        self.ids = [row[0] for row in rows]
+        self.dates = [row[1] for row in rows]
+        self.distance = np.array([float(row[2]) for row in rows], dtype=float)
+        self.minutes = np.array([row[3].total_seconds() / 60 if row[3] else 0 for row in rows], dtype=float)
+        # Minutes per km, 0 for runs without distance
+        self.pace = np.array([(row[4] or 0) / 60 for row in rows], dtype=float)
+        # Km per hour, 0 for runs without duration
+        self.speed = np.array([row[5] for row in rows], dtype=float)
+        self.calories = np.array([row[6] for row in rows], dtype=float)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _paced(self):
+        """Paces of the runs with a distance, in date order."""
+        return self.pace[self.distance > 0]
+
+    def speed_extremes(self):
+        """
+        (fastest, slowest) run indexes by average speed, or (None, None).
+
+        Runs without duration have no speed and are never picked; ties go to
+        the most recent run.
+        """
+        timed = np.flatnonzero(self.minutes > 0)
+        if not len(timed):
+            return None, None
+        speeds = self.speed[timed][::-1]
+        newest_first = timed[::-1]
+        return int(newest_first[np.argmax(speeds)]), int(newest_first[np.argmin(speeds)])
+
+    def _distance_by(self, trunc):
+        """Total distance per period, oldest first, one value per period with runs."""
+        totals = (
+            self.sessions
+            .annotate(period=trunc('date'))
+            .values('period')
+            .annotate(total=Sum('distance'))
+            .order_by('period')
+            .values_list('total', flat=True)
+        )
+        return np.array([float(total) for total in totals], dtype=float)
+
+    @cached_property
+    def weekly_distance(self):
+        """Distance of each ISO week (Monday start, local time) with a run."""
+        return self._distance_by(TruncWeek)
+
+    @cached_property
+    def monthly_distance(self):
+        """Distance of each local calendar month with a run."""
+        return self._distance_by(TruncMonth)
+
+    def stats(self):
+        """Totals, averages, personal bests and pace improvement over the series."""
+        stats = {
+            'total_distance': 0,
+            'total_sessions': 0,
+            'avg_distance': 0,
+            'avg_duration': 0,
+            'avg_speed': 0,  # Average speed in km/h
+            'avg_pace': 0,   # Average pace in min/km
+            'total_calories': 0,  # Estimated total calories burned
+            'weekly_distance': 0,  # Average weekly distance
+            'monthly_distance': 0,  # Average monthly distance
+            'pace_improvement': 0,  # Pace improvement over time (%)
+            'longest_run': 0,  # Longest run distance
+            'fastest_pace': 0,  # Fastest pace (min/km)
+        }
+        if not len(self):
+            return stats
+
+        total_distance = float(self.distance.sum())
+        total_minutes = float(self.minutes.sum())
+        stats.update({
+            'total_distance': total_distance,
+            'total_sessions': len(self),
+            'avg_distance': total_distance / len(self),
+            'avg_duration': total_minutes / len(self),
+            'total_calories': float(self.calories.sum()),
+            'longest_run': float(self.distance.max()),
+        })
+        if total_minutes > 0:
+            stats['avg_speed'] = total_distance / (total_minutes / 60)
+        if total_distance > 0:
+            stats['avg_pace'] = total_minutes / total_distance
+        if len(self.weekly_distance):
+            stats['weekly_distance'] = float(self.weekly_distance.mean())
+        if len(self.monthly_distance):
+            stats['monthly_distance'] = float(self.monthly_distance.mean())
+
+        paces = self._paced()
+        if len(paces):
+            stats['fastest_pace'] = float(paces.min())
+            if paces[0] > 0:
+                # Negative change in pace is an improvement
+                stats['pace_improvement'] = float(-(paces[-1] - paces[0]) / paces[0] * 100)
+        return stats
+
+    def chart_data(self):
+        """Per-run series for the running charts, plus stats()."""
+        return {
+            'labels': [day.strftime('%Y-%m-%d') for day in self.dates],
+            'distances': self.distance.tolist(),
+            'durations': self.minutes.tolist(),
+            'paces': self.pace.tolist(),
+            'speeds': self.speed.tolist(),
+            'calories': self.calories.tolist(),
+            'stats': self.stats(),
+        }
+
+
+def personal_bests(limit=DEFAULT_LEADERBOARD_SIZE, buckets=None):
+    """
+    Leaderboards of the fastest runs per distance bucket and the longest runs.
+
+    Returns one dict per bucket (all of RunningSession.DISTANCE_BUCKETS,
+    longest distance first, unless ``buckets`` names some): bucket, label and
+    runs, the ``limit`` lowest-pace RunningSession instances. ``longest`` holds
+    the ``limit`` longest runs of any distance.
+    """
+    labels = {bucket: label for bucket, label, _ in RunningSession.DISTANCE_BUCKETS}
+    wanted = [bucket for bucket in labels if buckets is None or bucket in buckets]
+    return {
+        'buckets': [
+            {'bucket': bucket, 'label': labels[bucket], 'runs': list(RunningSession.objects.fastest(bucket, limit))}
+            for bucket in wanted
+        ],
+        'longest': list(RunningSession.objects.longest(limit)),
+    }
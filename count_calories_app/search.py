@@ -0,0 +1,89 @@
+"""
+Full-text search over distinct food product names.
+
+Migration 0023 creates a table with one row per distinct FoodItem.product_name
+and how often it was logged, plus an FTS5 index over those names. SQL triggers
+on the FoodItem table keep both in step with every insert, update and delete,
+including bulk and raw SQL writes, so searching never touches FoodItem itself.
+
+The unicode61 tokenizer folds case and strips diacritics, so "italiskas" finds
+"itališkas" and the other way round. Every word of the query must prefix-match
+a word of the name. Results rank by bm25 relevance boosted by the log of how
+often the product was logged.
+"""
+
+import re
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.expressions import RawSQL
+
+from .models import FoodItem
+
+NAMES_TABLE = 'count_calories_app_foodname'
+FTS_TABLE = 'count_calories_app_foodname_fts'
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def is_available():
+    """The FTS index only exists on SQLite."""
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(text):
+    """FTS5 MATCH expression requiring a prefix match for every word in ``text``, or None if it has none."""
+    words = _WORD_RE.findall(text or '')
+    if not words:
+        return None
+    return ' AND '.join(f'"{word}"*' for word in words)
+
+
+def search_product_names(text, limit=20):
+    """Distinct product names matching ``text``, best match first."""
+    match = match_expression(text)
+    if match is None:
+        return []
+    if not is_available():
+        rows = (FoodItem.objects.filter(product_name__icontains=text.strip())
+                .values('product_name').annotate(count=Count('id')).order_by('-count')[:limit])
+        return [row['product_name'] for row in rows]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT n.product_name FROM {FTS_TABLE} JOIN {NAMES_TABLE} n ON n.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s ORDER BY bm25({FTS_TABLE}) - LN(1 + n.times_logged), n.product_name '
+            f'LIMIT %s',
+            [match, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def matching_names_subquery(text):
+    """
+    RawSQL selecting every product name matching ``text``, for ``product_name__in``.
+
+    Returns None when ``text`` has no words to match.
+    """
+    match = match_expression(text)
+    if match is None:
+        return None
+    return RawSQL(
+        f'SELECT n.product_name FROM {FTS_TABLE} JOIN {NAMES_TABLE} n ON n.id = {FTS_TABLE}.rowid '
+        f'WHERE {FTS_TABLE} MATCH %s',
+        [match],
+    )
+
+
+def rebuild():
+    """Recreate the name table and FTS index from FoodItem. Returns the number of distinct names."""
+    if not is_available():
+        return 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {NAMES_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {NAMES_TABLE} (product_name, times_logged) '
+            f'SELECT product_name, COUNT(*) FROM count_calories_app_fooditem GROUP BY product_name'
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f'SELECT COUNT(*) FROM {NAMES_TABLE}')
+        return cursor.fetchone()[0]
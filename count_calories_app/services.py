@@ -1,29 +1,56 @@
+import asyncio
 import json
 import logging
+import threading
+from concurrent.futures import Future
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
 from google import genai
 from google.genai import errors
 from django.conf import settings
 
+from .models import NutritionLookup
+
 logger = logging.getLogger('count_calories_app')
 
+GEMINI_MODEL = 'gemini-2.5-flash'
+NUTRITION_FIELDS = ['calories', 'fat', 'carbohydrates', 'protein']
+
+
 class GeminiService:
-    @staticmethod
-    def get_nutrition_info(food_name):
-        """
-        Fetches nutritional information for a given food name from Gemini AI.
-        Returns a dictionary with success status and data or error.
-        """
-        if not food_name:
-            return {'success': False, 'error': 'Food name is required', 'status': 400}
+    """
+    Nutrition lookups through Gemini AI.
 
-        api_key = getattr(settings, 'GEMINI_API_KEY', None)
-        if not api_key:
-            logger.error("Gemini API key is not configured on the server")
-            return {'success': False, 'error': 'Gemini API key is not configured on the server', 'status': 500}
+    Successful answers are cached in NutritionLookup by normalised description,
+    concurrent lookups of the same description share one API call, and a single
+    genai.Client is reused across calls.
+    """
+
+    _client = None
+    _client_lock = threading.Lock()
+    _inflight = {}
+    _inflight_lock = threading.Lock()
+    _async_inflight = {}
+
+    @classmethod
+    def get_client(cls, api_key):
+        """
+        Return the shared genai.Client for ``api_key``.
 
-        client = genai.Client(api_key=api_key)
+        A new client is built only when the key or the genai.Client class
+        changes (for example when tests swap in a stub).
+        """
+        with cls._client_lock:
+            cached = cls._client
+            if cached is None or cached[0] != genai.Client or cached[1] != api_key:
+                cls._client = cached = (genai.Client, api_key, genai.Client(api_key=api_key))
+            return cached[2]
 
-        prompt = f"""
+    @staticmethod
+    def build_prompt(food_name):
+        """Prompt asking for the nutrition of ``food_name`` as a JSON object."""
+        return f"""
         You are a nutrition expert. Analyze this food description: "{food_name}"
 
         IMPORTANT: Calculate nutritional values for the EXACT quantity mentioned in the description, not per 100g.
@@ -59,26 +86,51 @@ class GeminiService:
         - Be accurate with Lithuanian food translations
         """
 
-        try:
-            response = client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt,
-            )
-        except errors.APIError as e:
-            error_message = str(e)
-            if e.code in (401, 403) or "API_KEY_INVALID" in error_message or "API key not valid" in error_message:
-                logger.error(f"Invalid Gemini API key: {e}")
-                return {
-                    'success': False,
-                    'error': 'Invalid Gemini API key. Please obtain a valid API key from https://aistudio.google.com/app/apikey and update it in your .env file.',
-                    'code': 'invalid_api_key',
-                    'status': 401
-                }
-            logger.error(f"Gemini API error: {e}")
-            return {'success': False, 'error': 'Gemini service error. Please try again later.', 'code': 'gemini_api_error', 'status': 502}
-
-        response_text = response.text.strip()
+    @staticmethod
+    def _precheck(food_name):
+        """Return an error result if the lookup cannot be made, else None."""
+        if not food_name:
+            return {'success': False, 'error': 'Food name is required', 'status': 400}
+        if not getattr(settings, 'GEMINI_API_KEY', None):
+            logger.error("Gemini API key is not configured on the server")
+            return {'success': False, 'error': 'Gemini API key is not configured on the server', 'status': 500}
+        return None
+
+    @staticmethod
+    def _cache_settings():
+        ttl = timedelta(days=getattr(settings, 'GEMINI_CACHE_TTL_DAYS', 30))
+        return ttl, getattr(settings, 'GEMINI_CACHE_MAX_ENTRIES', 2000)
+
+    @classmethod
+    def _cached_result(cls, food_name, normalized):
+        data = NutritionLookup.fetch(normalized, cls._cache_settings()[0])
+        if data is None:
+            return None
+        return {'success': True, 'data': {**data, 'product_name': food_name}, 'cached': True}
 
+    @classmethod
+    def _remember(cls, normalized, result):
+        if result['success']:
+            ttl, max_entries = cls._cache_settings()
+            NutritionLookup.store(normalized, result['data'], ttl, max_entries)
+
+    @staticmethod
+    def _api_error_result(e):
+        error_message = str(e)
+        if e.code in (401, 403) or "API_KEY_INVALID" in error_message or "API key not valid" in error_message:
+            logger.error(f"Invalid Gemini API key: {e}")
+            return {
+                'success': False,
+                'error': 'Invalid Gemini API key. Please obtain a valid API key from https://aistudio.google.com/app/apikey and update it in your .env file.',
+                'code': 'invalid_api_key',
+                'status': 401
+            }
+        logger.error(f"Gemini API error: {e}")
+        return {'success': False, 'error': 'Gemini service error. Please try again later.', 'code': 'gemini_api_error', 'status': 502}
+
+    @staticmethod
+    def _parse_response(response_text):
+        response_text = response_text.strip()
         try:
             if response_text.startswith('```json'):
                 response_text = response_text[7:]
@@ -87,12 +139,12 @@ class GeminiService:
 
             nutrition_data = json.loads(response_text.strip())
 
-            required_fields = ['product_name', 'calories', 'fat', 'carbohydrates', 'protein']
+            required_fields = ['product_name'] + NUTRITION_FIELDS
             for field in required_fields:
                 if field not in nutrition_data:
                     raise ValueError(f"Missing field: {field}")
 
-            for field in ['calories', 'fat', 'carbohydrates', 'protein']:
+            for field in NUTRITION_FIELDS:
                 nutrition_data[field] = float(nutrition_data[field])
 
             return {
@@ -103,3 +155,103 @@ class GeminiService:
         except (json.JSONDecodeError, ValueError) as e:
             logger.error(f"Error parsing Gemini response: {e}, Response: {response_text}")
             return {'success': False, 'error': 'Failed to parse nutritional information from AI response', 'status': 500}
+
+    @classmethod
+    def _ask_gemini(cls, food_name, normalized):
+        client = cls.get_client(settings.GEMINI_API_KEY)
+        try:
+            response = client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=cls.build_prompt(food_name),
+            )
+        except errors.APIError as e:
+            return cls._api_error_result(e)
+        result = cls._parse_response(response.text)
+        cls._remember(normalized, result)
+        return result
+
+    @classmethod
+    def get_nutrition_info(cls, food_name):
+        """
+        Fetches nutritional information for a given food name from Gemini AI.
+        Returns a dictionary with success status and data or error.
+
+        Answers are served from the lookup cache when possible, and concurrent
+        calls for the same description wait for a single API request.
+        """
+        error = cls._precheck(food_name)
+        if error:
+            return error
+
+        normalized = NutritionLookup.normalize(food_name)
+        cached = cls._cached_result(food_name, normalized)
+        if cached:
+            return cached
+
+        with cls._inflight_lock:
+            future = cls._inflight.get(normalized)
+            leader = future is None
+            if leader:
+                future = cls._inflight[normalized] = Future()
+
+        if not leader:
+            result = future.result()
+            if result['success']:
+                return {**result, 'data': {**result['data'], 'product_name': food_name}}
+            return result
+
+        try:
+            result = cls._ask_gemini(food_name, normalized)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with cls._inflight_lock:
+                cls._inflight.pop(normalized, None)
+
+    @classmethod
+    async def _aask_gemini(cls, food_name, normalized):
+        client = cls.get_client(settings.GEMINI_API_KEY)
+        try:
+            response = await client.aio.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=cls.build_prompt(food_name),
+            )
+        except errors.APIError as e:
+            return cls._api_error_result(e)
+        result = cls._parse_response(response.text)
+        await sync_to_async(cls._remember)(normalized, result)
+        return result
+
+    @classmethod
+    async def aget_nutrition_info(cls, food_name):
+        """
+        Async variant of get_nutrition_info() for ASGI deployments.
+
+        Uses the client's aio API so no thread is held during the request;
+        concurrent calls for the same description share one task.
+        """
+        error = cls._precheck(food_name)
+        if error:
+            return error
+
+        normalized = NutritionLookup.normalize(food_name)
+        cached = await sync_to_async(cls._cached_result)(food_name, normalized)
+        if cached:
+            return cached
+
+        task = cls._async_inflight.get(normalized)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(cls._aask_gemini(food_name, normalized))
+            cls._async_inflight[normalized] = task
+
+            def forget(done):
+                if cls._async_inflight.get(normalized) is done:
+                    del cls._async_inflight[normalized]
+            task.add_done_callback(forget)
+        result = await asyncio.shield(task)
+        if result['success']:
+            return {**result, 'data': {**result['data'], 'product_name': food_name}}
+        return result
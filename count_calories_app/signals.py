@@ -0,0 +1,100 @@
+"""
+Signal handlers that keep derived tables in step with the models they summarise.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import (
+    DailyNutrition, DataVersion, ExerciseProgress, FoodItem, FoodProduct, RunningSession, WorkoutExercise,
+    WorkoutSession,
+)
+from .response_cache import CACHED_MODELS
+
+
+@receiver(pre_save, sender=FoodItem)
+def remember_previous_food_day(sender, instance, raw=False, **kwargs):
+    """
+    Record the day and product an existing item had before the save, in case
+    consumed_at or product_name change, and link the item to its FoodProduct.
+    """
+    instance._previous_rollup_day = None
+    instance._previous_product_id = None
+    if raw:
+        return
+    previous_name = None
+    if instance.pk is not None:
+        previous = sender.objects.filter(pk=instance.pk).values_list(
+            'consumed_at', 'product_name', 'product_id'
+        ).first()
+        if previous is not None:
+            instance._previous_rollup_day = DailyNutrition.day_for(previous[0])
+            previous_name, instance._previous_product_id = previous[1], previous[2]
+    if instance.product_id is None or FoodProduct.key_for(instance.product_name) != FoodProduct.key_for(previous_name):
+        instance.product = FoodProduct.for_name(instance.product_name)
+
+
+@receiver(post_save, sender=FoodItem)
+def refresh_rollup_on_food_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    DailyNutrition.refresh_days({
+        DailyNutrition.day_for(instance.consumed_at),
+        getattr(instance, '_previous_rollup_day', None),
+    })
+    FoodProduct.refresh({instance.product_id, getattr(instance, '_previous_product_id', None)})
+
+
+@receiver(post_delete, sender=FoodItem)
+def refresh_rollup_on_food_delete(sender, instance, **kwargs):
+    DailyNutrition.refresh_days({DailyNutrition.day_for(instance.consumed_at)})
+    FoodProduct.refresh({instance.product_id})
+
+
+@receiver(pre_save, sender=RunningSession)
+def derive_running_metrics(sender, instance, **kwargs):
+    """Keep pace, speed, calories and distance bucket in step with distance and duration."""
+    instance.update_derived()
+
+
+@receiver(pre_save, sender=WorkoutExercise)
+def remember_previous_progress_session(sender, instance, raw=False, **kwargs):
+    """Record the exercise and workout an existing row had, in case either changes."""
+    instance._previous_progress_pair = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_progress_pair = sender.objects.filter(pk=instance.pk).values_list(
+        'exercise_id', 'workout_id'
+    ).first()
+
+
+@receiver(post_save, sender=WorkoutExercise)
+def refresh_progress_on_exercise_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    ExerciseProgress.refresh({
+        (instance.exercise_id, instance.workout_id),
+        getattr(instance, '_previous_progress_pair', None) or (None, None),
+    })
+
+
+@receiver(post_delete, sender=WorkoutExercise)
+def refresh_progress_on_exercise_delete(sender, instance, **kwargs):
+    ExerciseProgress.refresh({(instance.exercise_id, instance.workout_id)})
+
+
+@receiver(post_save, sender=WorkoutSession)
+def move_progress_with_workout(sender, instance, created=False, raw=False, **kwargs):
+    """A workout moved to another date takes its progress rows, and maybe its records, along."""
+    if not created and not raw:
+        ExerciseProgress.move_workout(instance)
+
+
+def bump_data_version(sender, **kwargs):
+    """Invalidate cached responses built from ``sender`` rows."""
+    DataVersion.bump(sender)
+
+
+for _model in CACHED_MODELS:
+    post_save.connect(bump_data_version, sender=_model, dispatch_uid=f'data_version_save_{_model.__name__}')
+    post_delete.connect(bump_data_version, sender=_model, dispatch_uid=f'data_version_delete_{_model.__name__}')
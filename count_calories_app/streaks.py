@@ -0,0 +1,65 @@
+"""
+Food logging streaks.
+
+All streak numbers shown on the dashboard and analytics pages come from here so
+they always agree. Logged days are read from the DailyNutrition rollup in a
+single query, so the cost does not grow with the length of the streak.
+"""
+
+from django.utils import timezone
+
+from .models import DailyNutrition
+
+
+def compute_streaks(logged_days, today, since=None):
+    """
+    Compute streak statistics from an ascending sequence of logged dates.
+
+    current_streak counts consecutive logged days ending today (0 if nothing is
+    logged today) and longest_streak is the longest run anywhere in the history.
+    total_days and consistency_rate only consider days on or after ``since``
+    when it is given, so analytics can report them for the selected period.
+    """
+    current_streak = 0
+    longest_streak = 0
+    run = 0
+    previous = None
+    period_days = []
+
+    for day in logged_days:
+        if day > today:
+            break
+        run = run + 1 if previous is not None and (day - previous).days == 1 else 1
+        longest_streak = max(longest_streak, run)
+        previous = day
+        if since is None or day >= since:
+            period_days.append(day)
+
+    if previous == today:
+        current_streak = run
+
+    consistency_rate = 0
+    if period_days:
+        days_since_start = (today - period_days[0]).days + 1
+        consistency_rate = round((len(period_days) / days_since_start) * 100, 1) if days_since_start > 0 else 0
+
+    return {
+        'current_streak': current_streak,
+        'longest_streak': longest_streak,
+        'total_days': len(period_days),
+        'consistency_rate': consistency_rate,
+    }
+
+
+def logging_streaks(since=None, today=None):
+    """
+    Streak statistics for the food log, read with one query.
+
+    ``since`` may be a date or datetime; a datetime counts from the local day it
+    falls on, matching DailyNutrition.objects.between().
+    """
+    today = today or timezone.localdate()
+    if since is not None:
+        since = DailyNutrition.day_for(since)
+    logged_days = DailyNutrition.objects.filter(date__lte=today).order_by('date').values_list('date', flat=True)
+    return compute_streaks(logged_days, today, since=since)
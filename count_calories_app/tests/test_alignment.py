@@ -0,0 +1,157 @@
+"""
+Tests for matching weigh-ins to body measurements by date.
+
+Tests cover:
+- align_by_date in same-day, nearest-within-N-days and latest-before modes,
+  with unsorted targets and several samples per day
+- Reading the match mode from the query string
+- Weigh-ins near local midnight matched to their local date
+- The tracker page, chart data, CSV export and api_body_measurements weights
+- Query count independent of the number of measurements (benchmark)
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.alignment import (
+    LATEST_BEFORE, NEAREST, SAME_DAY, align_by_date, matching_from_query, weights_for_dates,
+)
+from count_calories_app.models import BodyMeasurement, Weight
+
+
+def local_dt(day, hour=12, minute=0):
+    """Aware datetime at the given local time of a date."""
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+class AlignByDateTestCase(TestCase):
+    """The merge itself, without the database."""
+
+    def setUp(self):
+        d = date(2024, 3, 1)
+        self.days = [d + timedelta(days=n) for n in range(12)]
+        # Samples on days 0 (twice), 4 and 9
+        self.samples = [(self.days[0], 'a'), (self.days[0], 'b'), (self.days[4], 'c'), (self.days[9], 'd')]
+
+    def test_same_day_uses_latest_sample(self):
+        targets = [self.days[4], self.days[0], self.days[1]]
+        self.assertEqual(align_by_date(targets, self.samples), ['c', 'b', None])
+
+    def test_nearest_within(self):
+        targets = [self.days[n] for n in (11, 2, 6, 7, 3)]
+        matched = align_by_date(targets, self.samples, NEAREST, within_days=2)
+
+        # day 2 sits between days 0 and 4: the earlier one wins the tie
+        self.assertEqual(matched, ['d', 'b', 'c', 'd', 'c'])
+        self.assertEqual(align_by_date([self.days[7]], self.samples, NEAREST, within_days=1), [None])
+
+    def test_latest_before(self):
+        targets = [self.days[n] for n in (8, 0, 3, 11)]
+        self.assertEqual(align_by_date(targets, self.samples, LATEST_BEFORE), ['c', 'b', 'b', 'd'])
+        self.assertEqual(align_by_date(targets, self.samples, LATEST_BEFORE, within_days=2), [None, 'b', None, 'd'])
+        self.assertEqual(align_by_date([date(2024, 2, 1)], self.samples, LATEST_BEFORE), [None])
+
+    def test_empty_and_invalid(self):
+        self.assertEqual(align_by_date([], self.samples), [])
+        self.assertEqual(align_by_date([self.days[0]], []), [None])
+        with self.assertRaises(ValueError):
+            align_by_date([self.days[0]], self.samples, 'closest')
+
+    def test_matching_from_query(self):
+        self.assertEqual(matching_from_query(QueryDict('')), (SAME_DAY, None))
+        self.assertEqual(matching_from_query(QueryDict('weight_match=nearest&weight_within=5')), (NEAREST, 5))
+        self.assertEqual(matching_from_query(QueryDict('weight_match=bogus&weight_within=x')), (SAME_DAY, None))
+
+
+class WeightsForDatesTestCase(TestCase):
+    """Weigh-ins read from the database."""
+
+    def test_local_midnight_boundaries(self):
+        day = date(2024, 5, 10)
+        Weight.objects.create(weight=Decimal('80.0'), recorded_at=local_dt(day, 0, 10))
+        Weight.objects.create(weight=Decimal('79.0'), recorded_at=local_dt(day, 23, 50))
+        Weight.objects.create(weight=Decimal('78.0'), recorded_at=local_dt(day + timedelta(days=1), 0, 5))
+
+        self.assertEqual(weights_for_dates([day]), [Decimal('79.0')])
+        self.assertEqual(weights_for_dates([day - timedelta(days=1)]), [None])
+        self.assertEqual(weights_for_dates([day + timedelta(days=3)], NEAREST, 2), [Decimal('78.0')])
+        self.assertEqual(weights_for_dates([day + timedelta(days=30)], LATEST_BEFORE), [Decimal('78.0')])
+        self.assertEqual(weights_for_dates([]), [])
+
+
+class BodyMeasurementWeightViewsTestCase(TestCase):
+    """Every body-measurement view shows the matched weight."""
+
+    def setUp(self):
+        self.client = Client()
+        today = timezone.localdate()
+        self.days = [today - timedelta(days=n) for n in (20, 10, 1)]
+        for n, day in enumerate(self.days):
+            BodyMeasurement.objects.create(date=local_dt(day, 9), belly=Decimal(90 - n))
+        Weight.objects.create(weight=Decimal('85.0'), recorded_at=local_dt(self.days[0], 7))
+        Weight.objects.create(weight=Decimal('83.5'), recorded_at=local_dt(self.days[2] - timedelta(days=1), 7))
+
+    def test_chart_data(self):
+        url = reverse('body_measurements_data')
+        self.assertEqual(json.loads(self.client.get(url).content)['weight'], [85.0, None, None])
+
+        data = json.loads(self.client.get(url, {'weight_match': 'nearest', 'weight_within': '1'}).content)
+        self.assertEqual(data['weight'], [85.0, None, 83.5])
+
+    def test_tracker_arrows(self):
+        context = self.client.get(reverse('body_measurements_tracker'), {'weight_match': 'latest_before'}).context
+        rows = list(context['page_obj'])
+
+        self.assertEqual([row['weight'] for row in rows], [Decimal('83.5'), Decimal('85.0'), Decimal('85.0')])
+        self.assertEqual(rows[0]['arrows']['weight'], 'down')
+        self.assertEqual(rows[1]['arrows']['weight'], 'equal')
+
+    def test_csv_export(self):
+        response = self.client.get(reverse('export_body_measurements_csv'))
+        rows = list(csv.reader(io.StringIO(response.content.decode())))
+
+        self.assertEqual([row[1] for row in rows[1:]], ['', '', '85.0'])
+
+    def test_api_body_measurements(self):
+        items = json.loads(self.client.get(reverse('api_body_measurements'), {'weight_match': 'latest_before'}).content)['items']
+
+        self.assertEqual([item['weight'] for item in items], [83.5, 85.0, 85.0])
+        self.assertEqual(items[0]['changes']['weight'], -1.5)
+        self.assertNotIn('weight', items[2]['changes'])
+
+
+class BodyMeasurementWeightBenchmarkTestCase(TestCase):
+    """Matching weights costs the same for 5 measurements as for 200."""
+
+    def populate(self, first, last):
+        today = timezone.localdate()
+        BodyMeasurement.objects.bulk_create([
+            BodyMeasurement(date=local_dt(today - timedelta(days=n), 9), belly=Decimal('90')) for n in range(first, last)
+        ])
+        Weight.objects.bulk_create([
+            Weight(weight=Decimal('80'), recorded_at=local_dt(today - timedelta(days=n), 7)) for n in range(first, last, 2)
+        ])
+
+    def test_query_count_flat_as_measurements_grow(self):
+        self.populate(0, 5)
+        few = {}
+        for name in ('body_measurements_data', 'export_body_measurements_csv', 'api_body_measurements'):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(reverse(name))
+            few[name] = len(ctx.captured_queries)
+
+        self.populate(5, 200)
+        for name, count in few.items():
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(reverse(name))
+            self.assertEqual(len(ctx.captured_queries), count, name)
@@ -0,0 +1,169 @@
+"""
+Tests for the NumPy analytics engine behind analytics and api_analytics.
+
+Tests cover:
+- Weekday buckets, calorie bands and weekly/monthly reports from the daily series
+- Meal timing bucketed by local hour
+- The analytics page and api_analytics reporting the same numbers
+- Falling back to 90 days for an unknown period
+- A 5-year synthetic history: results matching a plain Python reference and
+  a query count that does not grow with history length (benchmark)
+"""
+
+import json
+import statistics
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.analytics_engine import AnalyticsEngine
+from count_calories_app.models import DailyNutrition, FoodItem, Weight
+
+
+def local_dt(day, hour=12):
+    """Aware datetime at the given local hour of a date."""
+    return timezone.make_aware(datetime.combine(day, time(hour, 0)))
+
+
+class AnalyticsEngineSectionsTestCase(TestCase):
+    """Sections computed from a fixed two-week series."""
+
+    def setUp(self):
+        # Monday 2024-01-01 .. Sunday 2024-01-14
+        self.first = date(2024, 1, 1)
+        self.calories = [1400, 1500, 1999, 2000, 2499, 2500, 2999, 3000, 3500, 1800, 2200, 2600, 0, 2100]
+        for offset, calories in enumerate(self.calories):
+            FoodItem.objects.create(
+                product_name='Meal', calories=Decimal(calories), protein=Decimal('100'),
+                carbohydrates=Decimal('200'), fat=Decimal('70'),
+                consumed_at=local_dt(self.first + timedelta(days=offset), hour=8 if offset % 2 else 19),
+            )
+        self.engine = AnalyticsEngine(local_dt(self.first, 0), local_dt(date(2024, 1, 14), 23))
+
+    def test_day_of_week_stats(self):
+        stats = self.engine.day_of_week_stats
+
+        self.assertEqual(stats['Monday'], {'avg_calories': 2200.0, 'count': 2, 'total_calories': 4400.0})
+        # The zero-calorie Saturday does not count as a logged Saturday
+        self.assertEqual(stats['Saturday']['count'], 1)
+        self.assertEqual(list(stats), ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+
+    def test_calorie_bands_use_lower_edges(self):
+        distribution = self.engine.calorie_distribution
+        counts = {key: band['count'] for key, band in distribution.items()}
+
+        self.assertEqual(counts, {'very_low': 1, 'low': 3, 'moderate': 4, 'high': 3, 'very_high': 2})
+        self.assertEqual(distribution['very_high']['label'], '3000+')
+
+    def test_weekly_reports_newest_first(self):
+        reports = self.engine.weekly_reports()
+
+        self.assertEqual([r['week_start'] for r in reports], [date(2024, 1, 8), date(2024, 1, 1)])
+        self.assertEqual(reports[1]['total_calories'], float(sum(self.calories[:7])))
+        self.assertEqual(reports[0]['days_logged'], 7)
+
+    def test_monthly_reports(self):
+        reports = self.engine.monthly_reports()
+
+        self.assertEqual(len(reports), 1)
+        self.assertEqual(reports[0]['month'], date(2024, 1, 1))
+        self.assertEqual(reports[0]['avg_protein'], 100.0)
+
+    def test_meal_timing_uses_local_hours(self):
+        timing = self.engine.meal_timing
+        hourly = json.loads(timing['hourly_json'])
+
+        self.assertEqual(hourly[8], float(sum(self.calories[1::2])))
+        self.assertEqual(hourly[19], float(sum(self.calories[0::2])))
+        self.assertAlmostEqual(timing['morning']['percent'] + timing['evening']['percent'], 100.0, delta=0.1)
+
+    def test_empty_period(self):
+        engine = AnalyticsEngine(local_dt(date(2020, 1, 1), 0), local_dt(date(2020, 1, 31), 23))
+
+        self.assertEqual(engine.overall_stats, {})
+        self.assertEqual(engine.day_of_week_stats, {})
+        self.assertEqual(engine.weekly_reports(), [])
+        self.assertEqual(engine.meal_timing, {})
+        self.assertEqual(engine.insights, [])
+
+
+class AnalyticsViewsShareEngineTestCase(TestCase):
+    """analytics and api_analytics report the same analysis."""
+
+    def setUp(self):
+        self.client = Client()
+        today = timezone.localdate()
+        for offset in range(1, 30):
+            FoodItem.objects.create(
+                product_name='Meal', calories=Decimal(1800 + 40 * offset), protein=Decimal('150'),
+                carbohydrates=Decimal('200'), fat=Decimal('60'), consumed_at=local_dt(today - timedelta(days=offset)),
+            )
+        for offset in range(1, 30, 3):
+            Weight.objects.create(weight=Decimal('90') - Decimal(offset) / 10, recorded_at=local_dt(today - timedelta(days=offset), 7))
+
+    def test_same_numbers(self):
+        context = self.client.get(reverse('analytics'), {'period': '30'}).context
+        data = json.loads(self.client.get(reverse('api_analytics'), {'period': '30'}).content)
+
+        for section in ('overall_stats', 'weight_pace', 'consistency_score', 'insights', 'achievements'):
+            self.assertEqual(data[section], json.loads(json.dumps(context[section])), section)
+        self.assertEqual(data['nutrition_score']['total'], context['nutrition_score']['total'])
+        self.assertEqual(data['nutrition_score']['breakdown'][0]['max'], 25)
+
+    def test_unknown_period_falls_back_to_90_days(self):
+        response = self.client.get(reverse('analytics'), {'period': 'fortnight'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['overall_stats']['total_days_logged'], 29)
+
+
+class AnalyticsEngineBenchmarkTestCase(TestCase):
+    """A 5-year synthetic history: correct results at a cost independent of its length."""
+
+    years = 5
+
+    def populate(self, first_offset, last_offset):
+        today = timezone.localdate()
+        FoodItem.objects.bulk_create([
+            FoodItem(
+                product_name=f'Food {offset % 7}', calories=Decimal(1500 + (offset * 37) % 1700),
+                protein=Decimal(60 + offset % 90), carbohydrates=Decimal(150 + offset % 120), fat=Decimal(40 + offset % 50),
+                consumed_at=local_dt(today - timedelta(days=offset), hour=6 + offset % 16),
+            )
+            for offset in range(first_offset, last_offset) if offset % 11
+        ])
+        Weight.objects.bulk_create([
+            Weight(weight=Decimal('95') - Decimal(offset % 300) / 50, recorded_at=local_dt(today - timedelta(days=offset), 7))
+            for offset in range(first_offset, last_offset, 4)
+        ])
+
+    def test_matches_python_reference(self):
+        self.populate(1, self.years * 365)
+        engine = AnalyticsEngine.for_period('all')
+        calories = [float(c) for c in DailyNutrition.objects.order_by('date').values_list('calories', flat=True)]
+
+        self.assertEqual(len(engine.series), len(calories))
+        self.assertEqual(engine.overall_stats['avg_daily_calories'], round(statistics.mean(calories)))
+        self.assertEqual(engine.overall_stats['calorie_std_dev'], round(statistics.stdev(calories)))
+        self.assertEqual(engine.consistency_score['cv'], round(statistics.stdev(calories) / statistics.mean(calories) * 100, 1))
+        self.assertEqual(sum(band['count'] for band in engine.calorie_distribution.values()), len(calories))
+        self.assertEqual(sum(day['count'] for day in engine.day_of_week_stats.values()), len(calories))
+        self.assertEqual(engine.calorie_budget()['days_under'], sum(1 for c in calories if c <= 2500))
+
+    def test_query_count_flat_as_history_grows(self):
+        url = reverse('api_analytics')
+        self.populate(1, 365)
+        with CaptureQueriesContext(connection) as one_year:
+            self.client.get(url, {'period': 'all'})
+
+        self.populate(365, self.years * 365)
+        with CaptureQueriesContext(connection) as five_years:
+            response = self.client.get(url, {'period': 'all'})
+
+        self.assertEqual(len(five_years.captured_queries), len(one_year.captured_queries))
+        self.assertGreater(len(json.loads(response.content)['daily_data']), 1500)
@@ -0,0 +1,104 @@
+"""
+Tests for the paginated body measurements tracker.
+
+Tests cover:
+- Arrows on the last row of a page computed against the first row of the next
+- Weight arrows and the latest-measurement summary on later pages
+- Chart data carrying ids and timestamps for the compare tab
+- Page render cost independent of the number of measurements (benchmark)
+"""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import BodyMeasurement, Weight
+
+
+def populate(first, last):
+    """Weekly measurements ``first``..``last - 1`` weeks ago, belly shrinking over time."""
+    now = timezone.now()
+    BodyMeasurement.objects.bulk_create([
+        BodyMeasurement(date=now - timedelta(weeks=n), belly=Decimal(80 + n % 3), neck=Decimal('40'))
+        for n in range(first, last)
+    ])
+
+
+class TrackerPageTestCase(TestCase):
+    """Rows, arrows and the summary card."""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('body_measurements_tracker')
+        populate(0, 25)
+
+    def test_page_rows_and_lookback_arrow(self):
+        page = self.client.get(self.url).context['page_obj']
+        rows = list(page)
+
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(page.paginator.num_pages, 3)
+        # Week 9 (belly 80) is compared with week 10 (belly 81) from the next page
+        self.assertEqual(rows[9]['measurement'].belly, Decimal('80'))
+        self.assertEqual(rows[9]['arrows']['belly'], 'down')
+        self.assertEqual(rows[0]['arrows']['neck'], 'equal')
+
+    def test_last_page_oldest_row_has_no_arrows(self):
+        context = self.client.get(self.url, {'page': 3}).context
+        rows = list(context['page_obj'])
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[-1]['arrows'], {})
+        self.assertEqual(context['latest_measurement']['measurement'], BodyMeasurement.objects.order_by('-date').first())
+        self.assertEqual(context['latest_measurement']['arrows']['belly'], 'down')
+
+    def test_weight_arrow(self):
+        newest, older = BodyMeasurement.objects.order_by('-date')[:2]
+        Weight.objects.create(weight=Decimal('82'), recorded_at=newest.date)
+        Weight.objects.create(weight=Decimal('83'), recorded_at=older.date)
+
+        rows = list(self.client.get(self.url).context['page_obj'])
+
+        self.assertEqual(rows[0]['weight'], Decimal('82'))
+        self.assertEqual(rows[0]['arrows']['weight'], 'down')
+        self.assertNotIn('weight', rows[1]['arrows'])
+
+    def test_empty_tracker(self):
+        BodyMeasurement.objects.all().delete()
+        context = self.client.get(self.url).context
+
+        self.assertIsNone(context['latest_measurement'])
+        self.assertEqual(list(context['page_obj']), [])
+
+    def test_chart_data_identifies_measurements(self):
+        data = json.loads(self.client.get(reverse('body_measurements_data')).content)
+        oldest = BodyMeasurement.objects.order_by('date').first()
+
+        self.assertEqual(len(data['ids']), 25)
+        self.assertEqual(data['ids'][0], oldest.id)
+        self.assertEqual(data['timestamps'][0], oldest.date.isoformat())
+        self.assertEqual(data['belly'][0], float(oldest.belly))
+
+
+class TrackerPageBenchmarkTestCase(TestCase):
+    """A page costs the same for 15 measurements as for years of weekly ones."""
+
+    def test_query_count_flat_as_history_grows(self):
+        client = Client()
+        url = reverse('body_measurements_tracker')
+        populate(0, 15)
+        with CaptureQueriesContext(connection) as few:
+            client.get(url, {'page': 2})
+
+        populate(15, 500)
+        with CaptureQueriesContext(connection) as many:
+            response = client.get(url, {'page': 2})
+
+        self.assertEqual(len(many.captured_queries), len(few.captured_queries))
+        self.assertEqual(len(list(response.context['page_obj'])), 10)
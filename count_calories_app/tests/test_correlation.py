@@ -0,0 +1,138 @@
+"""
+Tests for the prefix-sum weight/calorie correlation engine.
+
+Tests cover:
+- Interval sums and logged-day counts from DailyTotalsIndex
+- weight_intervals() matching a per-interval database aggregate
+- get_weight_calories_correlation pagination and constant query count
+"""
+
+import json
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.correlation import DailyTotalsIndex, weight_intervals
+from count_calories_app.models import FoodItem, Weight
+
+
+def local_dt(day, hour=12):
+    return timezone.make_aware(datetime.combine(day, time(hour, 0)))
+
+
+class DailyTotalsIndexTestCase(TestCase):
+    """Test cases for prefix-sum lookups."""
+
+    def setUp(self):
+        self.first = timezone.localdate() - timedelta(days=9)
+        for offset in (0, 1, 2, 5, 9):
+            FoodItem.objects.create(
+                product_name='Meal', calories=Decimal('100') * (offset + 1),
+                protein=Decimal('10'), consumed_at=local_dt(self.first + timedelta(days=offset))
+            )
+        self.index = DailyTotalsIndex(self.first, self.first + timedelta(days=9), fields=('calories', 'protein'))
+
+    def test_interval_sums_inclusive(self):
+        sums = self.index.interval_sums(
+            'calories',
+            [self.first, self.first + timedelta(days=2)],
+            [self.first + timedelta(days=1), self.first + timedelta(days=5)],
+        )
+        self.assertEqual(list(sums), [300.0, 900.0])
+
+    def test_logged_days(self):
+        logged = self.index.logged_days([self.first], [self.first + timedelta(days=9)])
+        self.assertEqual(list(logged), [5])
+
+    def test_ranges_outside_index_are_clipped(self):
+        sums = self.index.interval_sums(
+            'protein', [self.first - timedelta(days=30)], [self.first + timedelta(days=30)]
+        )
+        self.assertEqual(list(sums), [50.0])
+
+
+class WeightIntervalsTestCase(TestCase):
+    """weight_intervals() agrees with a direct aggregate per interval."""
+
+    def test_matches_per_interval_aggregate(self):
+        start = timezone.localdate() - timedelta(days=20)
+        for offset in range(21):
+            FoodItem.objects.create(
+                product_name='Meal', calories=Decimal(1800 + offset * 10),
+                consumed_at=local_dt(start + timedelta(days=offset))
+            )
+        weigh_ins = [(local_dt(start + timedelta(days=d), 7), Decimal('80') - Decimal(d) / 10) for d in (0, 3, 4, 10, 20)]
+
+        result = weight_intervals(weigh_ins)
+
+        for i in range(len(weigh_ins) - 1):
+            first_day = timezone.localtime(weigh_ins[i][0]).date()
+            last_day = timezone.localtime(weigh_ins[i + 1][0]).date()
+            expected = FoodItem.objects.filter(
+                consumed_at__gte=local_dt(first_day, 0),
+                consumed_at__lt=local_dt(last_day + timedelta(days=1), 0),
+            ).aggregate(total=Sum('calories'))['total']
+            self.assertAlmostEqual(result['calories'][i], float(expected))
+            self.assertEqual(result['logged_days'][i], (last_day - first_day).days + 1)
+        self.assertAlmostEqual(result['weight_change'][0], -0.3)
+
+    def test_fewer_than_two_weights(self):
+        result = weight_intervals([(timezone.now(), Decimal('80'))])
+        self.assertEqual(len(result['weight_change']), 0)
+
+
+class WeightCaloriesCorrelationPaginationTestCase(TestCase):
+    """The correlation endpoint only materialises the requested page."""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('weight_calories_correlation')
+
+    def create_history(self, days):
+        today = timezone.localdate()
+        for offset in range(days):
+            day = today - timedelta(days=offset)
+            Weight.objects.create(weight=Decimal('80') + Decimal(offset) / 10, recorded_at=local_dt(day, 7))
+            FoodItem.objects.create(product_name='Meal', calories=Decimal('2000'), consumed_at=local_dt(day))
+
+    def get(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params)
+        return json.loads(response.content), len(ctx.captured_queries)
+
+    def test_pages_newest_first(self):
+        self.create_history(25)
+        data, _ = self.get()
+        page = data['correlation_data']
+
+        self.assertEqual(len(page), 10)
+        self.assertEqual(data['pagination']['total_pages'], 3)
+        self.assertTrue(data['pagination']['has_next'])
+        self.assertGreater(page[0]['end_date'], page[-1]['end_date'])
+        self.assertEqual(page[0]['weight_change'], -0.1)
+        self.assertEqual(page[0]['total_calories'], 4000.0)
+        self.assertEqual(page[0]['days_between'], 1)
+
+        last, _ = self.get(page=3)
+        self.assertEqual(len(last['correlation_data']), 4)
+        self.assertFalse(last['pagination']['has_next'])
+
+    def test_out_of_range_page_is_empty(self):
+        self.create_history(5)
+        data, _ = self.get(page=9)
+        self.assertEqual(data['correlation_data'], [])
+
+    def test_query_count_independent_of_history_length(self):
+        self.create_history(12)
+        _, short_queries = self.get()
+
+        self.create_history(120)
+        _, long_queries = self.get()
+
+        self.assertEqual(short_queries, long_queries)
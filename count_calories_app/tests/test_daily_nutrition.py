@@ -0,0 +1,191 @@
+"""
+Tests for the DailyNutrition rollup table.
+
+Tests cover:
+- Rollup rows follow FoodItem create, update, delete and bulk_create
+- bulk_create spanning years of scattered days
+- Moving an entry to another day updates both days
+- The rebuild_rollups management command
+- Local-date range filtering used by the trend views, including a datetime
+  start inside a day and the trend windows late in the UTC evening
+"""
+
+import json
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import DailyNutrition, FoodItem
+
+
+def local_dt(day, hour=12):
+    """Aware datetime at the given local hour of a date."""
+    return timezone.make_aware(datetime.combine(day, time(hour, 0)))
+
+
+class DailyNutritionSyncTestCase(TestCase):
+    """Rollup rows are kept in step with FoodItem writes."""
+
+    def setUp(self):
+        self.day = timezone.localdate() - timedelta(days=3)
+
+    def test_create_adds_row(self):
+        FoodItem.objects.create(
+            product_name='Oats', calories=Decimal('350'), protein=Decimal('12'),
+            carbohydrates=Decimal('60'), fat=Decimal('6'), consumed_at=local_dt(self.day, 8)
+        )
+        FoodItem.objects.create(
+            product_name='Chicken', calories=Decimal('250'), protein=Decimal('40'),
+            consumed_at=local_dt(self.day, 13)
+        )
+
+        row = DailyNutrition.objects.get(date=self.day)
+        self.assertEqual(row.calories, Decimal('600'))
+        self.assertEqual(row.protein, Decimal('52'))
+        self.assertEqual(row.carbohydrates, Decimal('60'))
+        self.assertEqual(row.fat, Decimal('6'))
+        self.assertEqual(row.entry_count, 2)
+
+    def test_update_changes_totals(self):
+        item = FoodItem.objects.create(product_name='Rice', calories=Decimal('200'), consumed_at=local_dt(self.day))
+        item.calories = Decimal('320')
+        item.save()
+
+        self.assertEqual(DailyNutrition.objects.get(date=self.day).calories, Decimal('320'))
+
+    def test_moving_item_to_another_day_updates_both_days(self):
+        other_day = self.day - timedelta(days=1)
+        FoodItem.objects.create(product_name='Apple', calories=Decimal('80'), consumed_at=local_dt(self.day))
+        item = FoodItem.objects.create(product_name='Pasta', calories=Decimal('500'), consumed_at=local_dt(self.day))
+
+        item.consumed_at = local_dt(other_day)
+        item.save()
+
+        self.assertEqual(DailyNutrition.objects.get(date=self.day).calories, Decimal('80'))
+        self.assertEqual(DailyNutrition.objects.get(date=other_day).calories, Decimal('500'))
+
+    def test_delete_last_item_removes_row(self):
+        item = FoodItem.objects.create(product_name='Soup', calories=Decimal('150'), consumed_at=local_dt(self.day))
+        item.delete()
+
+        self.assertFalse(DailyNutrition.objects.filter(date=self.day).exists())
+
+    def test_queryset_delete_updates_rows(self):
+        FoodItem.objects.create(product_name='A', calories=Decimal('100'), consumed_at=local_dt(self.day))
+        FoodItem.objects.create(product_name='B', calories=Decimal('100'), consumed_at=local_dt(self.day))
+        FoodItem.objects.filter(product_name='A').delete()
+
+        row = DailyNutrition.objects.get(date=self.day)
+        self.assertEqual(row.calories, Decimal('100'))
+        self.assertEqual(row.entry_count, 1)
+
+    def test_bulk_create_updates_rows(self):
+        other_day = self.day + timedelta(days=1)
+        FoodItem.objects.bulk_create([
+            FoodItem(product_name='Egg', calories=Decimal('70'), consumed_at=local_dt(self.day, 7)),
+            FoodItem(product_name='Egg', calories=Decimal('70'), consumed_at=local_dt(self.day, 8)),
+            FoodItem(product_name='Toast', calories=Decimal('120'), consumed_at=local_dt(other_day)),
+        ])
+
+        self.assertEqual(DailyNutrition.objects.get(date=self.day).entry_count, 2)
+        self.assertEqual(DailyNutrition.objects.get(date=other_day).calories, Decimal('120'))
+
+    def test_bulk_create_spanning_years(self):
+        """Thousands of non-adjacent days are refreshed in batches."""
+        days = [self.day - timedelta(days=2 * n) for n in range(1500)]
+        FoodItem.objects.bulk_create([
+            FoodItem(product_name='Oats', calories=Decimal('300'), consumed_at=local_dt(day)) for day in days
+        ])
+
+        self.assertEqual(DailyNutrition.objects.count(), 1500)
+        self.assertEqual(DailyNutrition.objects.get(date=days[-1]).calories, Decimal('300'))
+
+    def test_days_use_local_date(self):
+        """An entry just after local midnight belongs to that local day."""
+        FoodItem.objects.create(product_name='Late snack', calories=Decimal('90'), consumed_at=local_dt(self.day, 0))
+
+        self.assertTrue(DailyNutrition.objects.filter(date=self.day).exists())
+
+
+class RebuildRollupsCommandTestCase(TestCase):
+    """The rebuild_rollups command recreates the table from FoodItem."""
+
+    def test_rebuild_restores_missing_and_stale_rows(self):
+        day = timezone.localdate() - timedelta(days=1)
+        FoodItem.objects.create(product_name='Bread', calories=Decimal('200'), consumed_at=local_dt(day))
+        FoodItem.objects.create(product_name='Milk', calories=Decimal('100'), consumed_at=local_dt(day - timedelta(days=1)))
+        DailyNutrition.objects.filter(date=day).update(calories=Decimal('1'))
+        DailyNutrition.objects.filter(date=day - timedelta(days=1)).delete()
+
+        out = StringIO()
+        call_command('rebuild_rollups', stdout=out)
+
+        self.assertIn('2 day(s)', out.getvalue())
+        self.assertEqual(DailyNutrition.objects.get(date=day).calories, Decimal('200'))
+        self.assertEqual(DailyNutrition.objects.get(date=day - timedelta(days=1)).calories, Decimal('100'))
+
+
+class DailyNutritionRangeTestCase(TestCase):
+    """Range helpers used by the trend and analytics views."""
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        for i in range(5):
+            FoodItem.objects.create(
+                product_name=f'Food {i}', calories=Decimal('1000'), protein=Decimal('50'),
+                consumed_at=local_dt(self.today - timedelta(days=i))
+            )
+
+    def test_between_dates_is_inclusive(self):
+        qs = DailyNutrition.objects.between(self.today - timedelta(days=2), self.today)
+        self.assertEqual(qs.count(), 3)
+
+    def test_between_keeps_day_of_datetime_start(self):
+        start = local_dt(self.today - timedelta(days=2), 15)
+        qs = DailyNutrition.objects.between(start, self.today)
+        self.assertEqual(qs.count(), 3)
+
+    def test_daily_totals_keys_and_order(self):
+        rows = list(DailyNutrition.objects.all().daily_totals())
+        self.assertEqual([r['day'] for r in rows], sorted(r['day'] for r in rows))
+        self.assertEqual(rows[0]['total_calories'], Decimal('1000'))
+        self.assertEqual(rows[0]['total_protein'], Decimal('50'))
+
+    def test_totals(self):
+        totals = DailyNutrition.objects.all().totals()
+        self.assertEqual(totals['calories'], Decimal('5000'))
+        self.assertEqual(totals['count'], 5)
+        self.assertEqual(totals['days'], 5)
+
+
+class TrendWindowTestCase(TestCase):
+    """Trend windows are local days, whatever the UTC time of the request."""
+
+    def trend(self, now, name, params):
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            return json.loads(self.client.get(reverse(name), params).content)
+
+    @timezone.override(ZoneInfo('Europe/Vilnius'))
+    def test_windows_follow_local_days(self):
+        # Meals at 01:20 Vilnius time (22:20 UTC the evening before) on May 30 - June 2
+        for offset in range(4):
+            FoodItem.objects.create(
+                product_name='Meal', calories=Decimal(30 + offset),
+                consumed_at=datetime(2024, 5, 29, 22, 20, tzinfo=dt_timezone.utc) + timedelta(days=offset),
+            )
+
+        # 13:00 and 01:30 Vilnius time on June 2
+        for now in (datetime(2024, 6, 2, 10, 0, tzinfo=dt_timezone.utc),
+                    datetime(2024, 6, 1, 22, 30, tzinfo=dt_timezone.utc)):
+            today = self.trend(now, 'calories_trend_data', {'range': 'today'})
+            self.assertEqual(today['labels'], ['2024-06-02'])
+            self.assertEqual(today['data'], [33.0])
+            three_days = self.trend(now, 'macros_trend_data', {'days': 3})
+            self.assertEqual(three_days['labels'], ['2024-05-31', '2024-06-01', '2024-06-02'])
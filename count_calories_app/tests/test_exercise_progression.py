@@ -0,0 +1,212 @@
+"""
+Tests for the per-exercise progression table and personal records.
+
+Tests cover:
+- Best set, estimated 1RM, sets, reps and volume per exercise per workout,
+  with several rows of the same exercise in one workout
+- Keeping ExerciseProgress and ExerciseRecord in step when exercises are
+  added, edited, moved, deleted and when a workout changes date or is deleted
+- Record detection: the first session, strict improvements only, missing values
+- get_exercise_progress_data and api_exercise_prs output and validation
+- ExerciseProgress.rebuild() and the rebuild_exercise_progress command
+- Query count independent of the number of sessions (benchmark)
+"""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import (
+    Exercise, ExerciseProgress, ExerciseRecord, WorkoutExercise, WorkoutSession, estimated_one_rep_max,
+)
+
+
+def records(exercise, kind):
+    return list(
+        ExerciseRecord.objects.filter(exercise=exercise, kind=kind).order_by('date').values_list('value', 'previous')
+    )
+
+
+class ProgressionTestCase(TestCase):
+    """A bench press logged over three sessions."""
+
+    def setUp(self):
+        now = timezone.now()
+        self.bench = Exercise.objects.create(name='Bench Press', muscle_group='Chest')
+        self.workouts = [WorkoutSession.objects.create(date=now - timedelta(days=n)) for n in (20, 10, 1)]
+
+    def log(self, workout, weight, sets=3, reps=5, exercise=None):
+        return WorkoutExercise.objects.create(
+            workout=self.workouts[workout], exercise=exercise or self.bench, sets=sets, reps=reps,
+            weight=None if weight is None else Decimal(weight),
+        )
+
+
+class ExerciseProgressTestCase(ProgressionTestCase):
+    """Rows maintained on every write."""
+
+    def test_session_row(self):
+        self.log(0, '60', sets=3, reps=10)
+        self.log(0, '70', sets=1, reps=3)
+        self.log(0, None, sets=2, reps=20)
+
+        row = ExerciseProgress.objects.get()
+        self.assertEqual(row.date, self.workouts[0].date)
+        self.assertEqual((row.sets, row.reps), (6, 73))
+        self.assertEqual((row.best_weight, row.best_reps), (Decimal('70'), 3))
+        self.assertEqual(row.volume, 60 * 30 + 70 * 3)
+        self.assertAlmostEqual(row.estimated_1rm, 80.0)
+
+    def test_epley(self):
+        self.assertEqual(estimated_one_rep_max(Decimal('100'), 1), 100)
+        self.assertEqual(estimated_one_rep_max(Decimal('90'), 10), 120)
+        self.assertIsNone(estimated_one_rep_max(None, 5))
+
+    def test_edit_move_and_delete(self):
+        squat = Exercise.objects.create(name='Squat')
+        entry = self.log(0, '60')
+        self.log(1, '70')
+
+        entry.weight = Decimal('75')
+        entry.save()
+        self.assertEqual(records(self.bench, ExerciseRecord.WEIGHT), [(75.0, None)])
+
+        entry.exercise = squat
+        entry.save()
+        self.assertEqual(list(self.bench.progress.values_list('workout', flat=True)), [self.workouts[1].id])
+        self.assertEqual(records(squat, ExerciseRecord.WEIGHT), [(75.0, None)])
+        self.assertEqual(records(self.bench, ExerciseRecord.WEIGHT), [(70.0, None)])
+
+        entry.delete()
+        self.assertFalse(squat.progress.exists())
+        self.assertFalse(squat.records.exists())
+
+    def test_workout_date_change_redetects_records(self):
+        self.log(0, '60')
+        self.log(2, '80')
+        self.assertEqual(records(self.bench, ExerciseRecord.WEIGHT), [(60.0, None), (80.0, 60.0)])
+
+        # The heavier session moves before the lighter one
+        self.workouts[2].date = self.workouts[0].date - timedelta(days=1)
+        self.workouts[2].save()
+
+        self.assertEqual(self.bench.progress.order_by('date').first().workout, self.workouts[2])
+        self.assertEqual(records(self.bench, ExerciseRecord.WEIGHT), [(80.0, None)])
+
+    def test_workout_delete(self):
+        self.log(0, '60')
+        self.log(1, '80')
+        self.workouts[1].delete()
+
+        self.assertEqual(self.bench.progress.count(), 1)
+        self.assertEqual(records(self.bench, ExerciseRecord.WEIGHT), [(60.0, None)])
+
+    def test_rebuild(self):
+        self.log(0, '60')
+        self.log(1, '65', reps=8)
+        expected = sorted(ExerciseRecord.objects.values_list('kind', 'value', 'previous'))
+        ExerciseProgress.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_exercise_progress', stdout=out)
+
+        self.assertIn('2 exercise session(s)', out.getvalue())
+        self.assertEqual(sorted(ExerciseRecord.objects.values_list('kind', 'value', 'previous')), expected)
+
+
+class RecordDetectionTestCase(TestCase):
+    """Which sessions count as records."""
+
+    def test_detect(self):
+        self.assertEqual(ExerciseRecord.detect([None, 50, 50, 40, 55, None, 60]), [(1, None), (4, 50.0), (6, 55.0)])
+        self.assertEqual(ExerciseRecord.detect([]), [])
+        self.assertEqual(ExerciseRecord.detect([None, None]), [])
+
+
+class ProgressEndpointsTestCase(ProgressionTestCase):
+    """The progress chart data and the PR list."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.log(0, '60', reps=10)
+        self.log(1, '70', reps=5)
+        self.log(1, '50', reps=12)
+        self.log(2, '65', reps=5)
+        self.squat = Exercise.objects.create(name='Squat', muscle_group='Legs')
+        self.log(2, '100', reps=5, exercise=self.squat)
+
+    def test_progress_data(self):
+        data = json.loads(self.client.get(reverse('exercise_progress_data_with_id', args=[self.bench.id])).content)
+
+        self.assertEqual(data['exercise_name'], 'Bench Press')
+        self.assertEqual(data['weight'], [60.0, 70.0, 65.0])
+        self.assertEqual(data['sets'], [3, 6, 3])
+        self.assertEqual(data['reps'], [10, 5, 5])
+        self.assertEqual(data['volume'], [1800.0, 1050.0 + 1800.0, 975.0])
+        self.assertEqual(data['e1rm'], [80.0, 81.7, 75.8])
+        kinds = [(record['kind'], record['value']) for record in data['records']]
+        self.assertIn(('weight', 70.0), kinds)
+        self.assertNotIn(('weight', 65.0), kinds)
+
+    def test_prs(self):
+        data = json.loads(self.client.get(reverse('api_exercise_prs'), {'days': 5}).content)
+
+        bench, squat = data['exercises']
+        self.assertEqual(bench['exercise_name'], 'Bench Press')
+        self.assertEqual(bench['records']['weight']['value'], 70.0)
+        self.assertEqual(bench['records']['weight']['previous'], 60.0)
+        self.assertEqual(bench['records']['volume']['value'], 2850.0)
+        self.assertEqual(squat['records']['e1rm']['value'], round(100 * (1 + 5 / 30), 1))
+        # Only the squat set records in the last 5 days
+        self.assertEqual({record['exercise_name'] for record in data['recent']}, {'Squat'})
+        self.assertEqual(data['recent'][0]['muscle_group'], 'Legs')
+
+    def test_prs_validation(self):
+        url = reverse('api_exercise_prs')
+        self.assertEqual(self.client.get(url, {'days': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'days': 0}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': 500}).status_code, 400)
+
+
+class ProgressionBenchmarkTestCase(TestCase):
+    """The same queries for 5 sessions as for 150."""
+
+    def populate(self, first, last):
+        now = timezone.now()
+        for exercise in self.exercises:
+            workouts = WorkoutSession.objects.bulk_create([
+                WorkoutSession(date=now - timedelta(days=n)) for n in range(first, last)
+            ])
+            for n, workout in enumerate(workouts):
+                WorkoutExercise.objects.create(
+                    workout=workout, exercise=exercise, sets=3, reps=5, weight=Decimal(40 + n % 30),
+                )
+
+    def test_query_count_flat_as_sessions_grow(self):
+        self.exercises = [Exercise.objects.create(name=f'Exercise {n}') for n in range(3)]
+        urls = [
+            reverse('exercise_progress_data_with_id', args=[self.exercises[0].id]),
+            reverse('api_exercise_prs'),
+        ]
+        self.populate(1, 6)
+        few = {}
+        for url in urls:
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(url)
+            few[url] = len(ctx.captured_queries)
+
+        self.populate(6, 150)
+        for url in urls:
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(url)
+            self.assertEqual(len(ctx.captured_queries), few[url], url)
+        self.assertEqual(self.exercises[0].progress.count(), 149)
@@ -0,0 +1,149 @@
+"""
+Tests for the streaming data exports.
+
+Tests cover:
+- export_data returning StreamingHttpResponse for CSV, JSON and NDJSON
+- CSV rows and JSON sections matching the stored data
+- type=all producing a valid JSON document with every section
+- Food tracker, top foods and weight CSV exports streaming their rows
+- Writer helpers (csv_lines, json_document, ndjson_lines)
+"""
+
+import csv
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.exports import csv_lines, json_document, ndjson_lines
+from count_calories_app.models import (
+    BodyMeasurement, Exercise, FoodItem, RunningSession, Weight, WorkoutExercise, WorkoutSession,
+)
+
+
+def read_body(response):
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+class WriterHelpersTestCase(TestCase):
+    """Test cases for the generator-based writers."""
+
+    def test_csv_lines_quotes_values(self):
+        text = ''.join(csv_lines(['Name', 'Notes'], [['Oats', 'a, b']]))
+        self.assertEqual(list(csv.reader(io.StringIO(text))), [['Name', 'Notes'], ['Oats', 'a, b']])
+
+    def test_json_document_with_empty_section(self):
+        text = ''.join(json_document([('a', iter([{'x': 1}, {'x': 2}])), ('b', iter([]))]))
+        self.assertEqual(json.loads(text), {'a': [{'x': 1}, {'x': 2}], 'b': []})
+
+    def test_ndjson_lines_tag_records_with_section(self):
+        lines = list(ndjson_lines([('weight', iter([{'weight': 80.0}]))]))
+        self.assertEqual([json.loads(line) for line in lines], [{'type': 'weight', 'weight': 80.0}])
+
+
+class ExportDataTestCase(TestCase):
+    """Test cases for the settings data export endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('export_data')
+        now = timezone.now()
+        FoodItem.objects.create(
+            product_name='Oats', calories=Decimal('300'), protein=Decimal('10'),
+            carbohydrates=Decimal('50'), fat=Decimal('5'), consumed_at=now - timedelta(hours=2)
+        )
+        FoodItem.objects.create(product_name='Milk, whole', calories=Decimal('120'), consumed_at=now)
+        Weight.objects.create(weight=Decimal('80.5'), recorded_at=now, notes='morning')
+        RunningSession.objects.create(date=now, distance=Decimal('5.0'), duration=timedelta(minutes=25))
+        BodyMeasurement.objects.create(date=now, neck=Decimal('40.0'), butt=Decimal('100.0'))
+        workout = WorkoutSession.objects.create(name='Push', date=now)
+        WorkoutExercise.objects.create(
+            workout=workout, exercise=Exercise.objects.create(name='Bench Press'),
+            sets=3, reps=8, weight=Decimal('60')
+        )
+
+    def test_food_csv_is_streamed(self):
+        response = self.client.get(self.url, {'type': 'food', 'format': 'csv'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('food_data.csv', response['Content-Disposition'])
+
+        rows = list(csv.reader(io.StringIO(read_body(response))))
+        self.assertEqual(rows[0], ['Date', 'Product Name', 'Calories', 'Protein (g)', 'Carbs (g)', 'Fat (g)'])
+        self.assertEqual([row[1] for row in rows[1:]], ['Milk, whole', 'Oats'])
+        self.assertEqual(rows[2][2:], ['300.0', '10.0', '50.0', '5.0'])
+
+    def test_workout_csv_one_row_per_exercise(self):
+        response = self.client.get(self.url, {'type': 'workout', 'format': 'csv'})
+        rows = list(csv.reader(io.StringIO(read_body(response))))
+        self.assertEqual(rows[1][1:], ['Push', 'Bench Press', '3', '8', '60.0', ''])
+
+    def test_body_csv_has_every_measurement_column(self):
+        response = self.client.get(self.url, {'type': 'body', 'format': 'csv'})
+        rows = list(csv.reader(io.StringIO(read_body(response))))
+        self.assertEqual(len(rows[1]), len(rows[0]))
+        self.assertEqual(rows[1][1], '40.0')
+        self.assertEqual(rows[1][14], '100.0')
+
+    def test_all_export_is_valid_json(self):
+        response = self.client.get(self.url, {'type': 'all', 'format': 'json'})
+        self.assertTrue(response.streaming)
+        self.assertIn('all_data.json', response['Content-Disposition'])
+
+        data = json.loads(read_body(response))
+        self.assertEqual(set(data), {'food_items', 'weight', 'workouts', 'running', 'body_measurements'})
+        self.assertEqual(len(data['food_items']), 2)
+        self.assertEqual(data['weight'][0]['weight'], 80.5)
+        self.assertEqual(data['workouts'][0]['exercises'][0]['exercise_name'], 'Bench Press')
+        self.assertEqual(data['body_measurements'][0]['butt'], 100.0)
+        self.assertEqual(data['running'][0]['duration'], '0:25:00')
+
+    def test_all_with_csv_format_keeps_json_download(self):
+        response = self.client.get(self.url, {'type': 'all', 'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('weight', json.loads(read_body(response)))
+
+    def test_ndjson_export(self):
+        response = self.client.get(self.url, {'type': 'food', 'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in read_body(response).splitlines()]
+        self.assertEqual([r['product_name'] for r in records], ['Milk, whole', 'Oats'])
+        self.assertTrue(all(r['type'] == 'food_items' for r in records))
+
+    def test_unknown_type_or_format_redirects(self):
+        self.assertEqual(self.client.get(self.url, {'type': 'nope'}).status_code, 302)
+        self.assertEqual(self.client.get(self.url, {'type': 'food', 'format': 'xml'}).status_code, 302)
+
+
+class PageExportsTestCase(TestCase):
+    """CSV exports on the tracker pages are streamed."""
+
+    def setUp(self):
+        self.client = Client()
+        now = timezone.now()
+        for hours, name in [(3, 'Oats'), (2, 'Oats'), (1, 'Apple')]:
+            FoodItem.objects.create(product_name=name, calories=Decimal('100'), consumed_at=now - timedelta(hours=hours))
+        Weight.objects.create(weight=Decimal('79.0'), recorded_at=now - timedelta(days=1))
+
+    def test_food_tracker_csv(self):
+        response = self.client.get(reverse('food_tracker'), {'days': '7', 'export': 'csv'})
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(read_body(response))))
+        self.assertEqual(rows[0][0], 'Consumed At')
+        self.assertEqual([row[1] for row in rows[1:]], ['Oats', 'Oats', 'Apple'])
+
+    def test_top_foods_csv(self):
+        response = self.client.get(reverse('top_foods'), {'days': '7', 'export': 'csv'})
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(read_body(response))))
+        self.assertEqual(rows[1][:2], ['Oats', '2'])
+
+    def test_weight_csv(self):
+        response = self.client.get(reverse('weight_tracker'), {'export': 'csv'})
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(read_body(response))))
+        self.assertEqual(rows[1][1], '79.0')
@@ -0,0 +1,189 @@
+"""
+Tests for the FoodProduct catalogue.
+
+Tests cover:
+- Entries linked to one product per normalised name
+- Product totals following FoodItem create, update, rename, delete and bulk_create
+- The latest visible entry used by quick add
+- The rebuild_food_products management command
+- All-time product lists costing the same number of queries for any history length
+- Date-windowed lists and the food tracker quick list grouping names by
+  product, like the all-time lists
+"""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import FoodItem, FoodProduct
+
+
+def log(name, calories='100', protein='0', days_ago=0, **kwargs):
+    return FoodItem.objects.create(
+        product_name=name, calories=Decimal(calories), protein=Decimal(protein),
+        consumed_at=timezone.now() - timedelta(days=days_ago), **kwargs
+    )
+
+
+class FoodProductSyncTestCase(TestCase):
+    """Product totals are kept in step with FoodItem writes."""
+
+    def test_entries_share_normalised_product(self):
+        first = log('Greek Yogurt', '120', '10', days_ago=2)
+        second = log('  greek   yogurt ', '140', '12')
+
+        self.assertEqual(first.product_id, second.product_id)
+        product = FoodProduct.objects.get()
+        self.assertEqual(product.key, 'greek yogurt')
+        self.assertEqual(product.name, '  greek   yogurt ')
+        self.assertEqual(product.entry_count, 2)
+        self.assertEqual(product.calories_total, Decimal('260'))
+        self.assertEqual(product.protein_total, Decimal('22'))
+        self.assertEqual(product.last_consumed_at, second.consumed_at)
+
+    def test_update_changes_totals(self):
+        item = log('Rice', '200')
+        item.calories = Decimal('320')
+        item.save()
+        self.assertEqual(FoodProduct.objects.get().calories_total, Decimal('320'))
+
+    def test_rename_moves_entry_between_products(self):
+        log('Oats', '300')
+        item = log('Oats', '350')
+        item.product_name = 'Porridge'
+        item.save()
+
+        totals = dict(FoodProduct.objects.values_list('key', 'calories_total'))
+        self.assertEqual(totals, {'oats': Decimal('300'), 'porridge': Decimal('350')})
+
+    def test_delete_last_entry_removes_product(self):
+        item = log('Kefir')
+        item.delete()
+        self.assertFalse(FoodProduct.objects.exists())
+
+    def test_bulk_create_links_and_totals(self):
+        now = timezone.now()
+        FoodItem.objects.bulk_create([
+            FoodItem(product_name=name, calories=Decimal('50'), consumed_at=now)
+            for name in ('Tea', 'tea', 'Coffee')
+        ])
+
+        self.assertEqual(FoodItem.objects.filter(product__isnull=True).count(), 0)
+        self.assertEqual(dict(FoodProduct.objects.values_list('key', 'entry_count')), {'tea': 2, 'coffee': 1})
+
+    def test_latest_item_skips_hidden_entries(self):
+        visible = log('Bread', '80', days_ago=1)
+        log('Bread', '999', hide_from_quick_list=True)
+
+        product = FoodProduct.objects.get()
+        self.assertEqual(product.latest_item, visible)
+        self.assertEqual(product.entry_count, 2)
+        self.assertEqual(product.quick_add_count, 1)
+
+    def test_rebuild_command(self):
+        log('Oats', '300')
+        log('Banana', '100')
+        FoodItem.objects.update(product=None)
+        FoodProduct.objects.update(entry_count=0)
+
+        out = StringIO()
+        call_command('rebuild_food_products', stdout=out)
+
+        self.assertIn('Rebuilt totals for 2 food product(s).', out.getvalue())
+        self.assertEqual(FoodItem.objects.filter(product__isnull=True).count(), 0)
+        self.assertEqual(dict(FoodProduct.objects.values_list('key', 'entry_count')), {'oats': 1, 'banana': 1})
+
+
+class FoodProductViewsTestCase(TestCase):
+    """All-time product views read the catalogue."""
+
+    def setUp(self):
+        self.client = Client()
+        for days_ago, calories in ((3, '90'), (2, '100'), (1, '110')):
+            log('Apple', calories, '1', days_ago=days_ago)
+        log('Apple Juice', '120')
+
+    def test_search_all_foods_without_query(self):
+        data = json.loads(self.client.get(reverse('api_search_all_foods')).content)
+        apple = data['results'][0]
+
+        self.assertEqual(apple['name'], 'Apple')
+        self.assertEqual(apple['count'], 3)
+        self.assertEqual(apple['calories'], 100)
+        self.assertEqual(apple['protein'], 1.0)
+
+    def test_api_top_foods_all_time(self):
+        data = json.loads(self.client.get(reverse('api_top_foods'), {'days': 'all'}).content)
+        self.assertEqual([f['name'] for f in data['by_frequency']], ['Apple', 'Apple Juice'])
+        self.assertEqual(data['items'][0]['total_calories'], 300.0)
+        self.assertEqual(data['items'][0]['avg_calories'], 100)
+
+    def test_top_foods_all_time_summary(self):
+        response = self.client.get(reverse('top_foods'), {'days': 'all'})
+        summary = response.context['summary']
+
+        self.assertEqual(summary['total_count'], 4)
+        self.assertEqual(summary['total_calories'], Decimal('420'))
+        self.assertEqual(summary['unique_foods'], 2)
+
+    def test_product_compare_reads_product_totals(self):
+        response = self.client.get(reverse('product_compare'), {'product1': 'apple', 'product2': 'Apple Juice'})
+        product1 = response.context['product1']
+
+        self.assertEqual(product1['calories'], 100.0)
+        self.assertEqual(product1['entries'], 3)
+        self.assertEqual(sum(product1['weekly_counts']), 3)
+
+    def test_all_time_query_count_independent_of_entries(self):
+        url = reverse('api_top_foods')
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url, {'days': 'all'})
+        FoodItem.objects.bulk_create([
+            FoodItem(product_name='Apple', calories=Decimal('100')) for _ in range(300)
+        ])
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url, {'days': 'all'})
+
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+        self.assertEqual(json.loads(response.content)['items'][0]['count'], 303)
+
+
+class WindowedProductListsTestCase(TestCase):
+    """Windowed lists merge case and spacing variants like the all-time ones."""
+
+    def setUp(self):
+        self.client = Client()
+        log('Apple', '90', days_ago=2)
+        log(' apple ', '110', days_ago=1)
+        log('Banana', '100')
+
+    def rows(self, days):
+        data = json.loads(self.client.get(reverse('api_top_foods'), {'days': days}).content)
+        return sorted((food['name'], food['count'], food['total_calories']) for food in data['items'])
+
+    def test_api_top_foods_window_matches_all_time(self):
+        self.assertEqual(self.rows(30), [(' apple ', 2, 200.0), ('Banana', 1, 100.0)])
+        self.assertEqual(self.rows(30), self.rows('all'))
+
+    def test_top_foods_window_matches_all_time(self):
+        pages = {days: self.client.get(reverse('top_foods'), {'days': days}).context for days in ('30', 'all')}
+
+        for context in pages.values():
+            self.assertEqual(context['summary']['unique_foods'], 2)
+            rows = sorted((row['product_name'], row['count']) for row in context['top_foods_page'])
+            self.assertEqual(rows, [(' apple ', 2), ('Banana', 1)])
+
+    def test_food_tracker_quick_list_matches_api(self):
+        page = self.client.get(reverse('food_tracker')).context['recent_items']
+        api = json.loads(self.client.get(reverse('api_quick_add_foods')).content)['foods']
+
+        self.assertEqual(sorted(item.product_name for item in page), sorted(food['name'] for food in api))
+        self.assertEqual({item.product_name: item.times_logged for item in page}, {' apple ': 2, 'Banana': 1})
@@ -0,0 +1,194 @@
+"""
+Tests for cached, coalesced and async Gemini nutrition lookups.
+
+All tests run against StubGenai, a local stand-in for the google.genai module.
+
+Tests cover:
+- Description normalisation
+- Answers cached in NutritionLookup and reused for equivalent descriptions
+- Cache entries expiring after the TTL and LRU eviction past the size limit
+- Failed lookups not being cached
+- One shared client across calls
+- Concurrent identical lookups sharing one API call (threads and asyncio)
+- The async gemini-nutrition endpoint
+"""
+
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import NutritionLookup
+from count_calories_app.services import GeminiService
+
+
+class StubGenai:
+    """Stand-in for the google.genai module recording every generate_content call."""
+
+    def __init__(self, reply=None, delay=0):
+        self.reply = reply or (lambda prompt: json.dumps({
+            'product_name': 'echo', 'calories': 95, 'fat': 0.3, 'carbohydrates': 25, 'protein': 0.5,
+        }))
+        self.delay = delay
+        self.calls = []
+        self.clients = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def Client(self, api_key):
+        self.clients += 1
+        stub = self
+
+        class Models:
+            def generate_content(self, model, contents):
+                stub.calls.append(contents)
+                stub.release.wait(5)
+                return SimpleNamespace(text=stub.reply(contents))
+
+        class AsyncModels:
+            async def generate_content(self, model, contents):
+                stub.calls.append(contents)
+                await asyncio.sleep(stub.delay)
+                return SimpleNamespace(text=stub.reply(contents))
+
+        return SimpleNamespace(models=Models(), aio=SimpleNamespace(models=AsyncModels()))
+
+
+class GeminiCacheTestCase(TestCase):
+    """Test cases for the NutritionLookup cache."""
+
+    def setUp(self):
+        self.stub = StubGenai()
+        patcher = patch('count_calories_app.services.genai', self.stub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def lookup(self, name):
+        with self.settings(GEMINI_API_KEY='stub-key'):
+            return GeminiService.get_nutrition_info(name)
+
+    def test_normalize(self):
+        self.assertEqual(NutritionLookup.normalize('  Šaltibarščiai   WITH  bread '), 'šaltibarščiai with bread')
+
+    def test_equivalent_description_served_from_cache(self):
+        first = self.lookup('Apple 150g')
+        second = self.lookup('apple   150G')
+
+        self.assertEqual(len(self.stub.calls), 1)
+        self.assertTrue(second['cached'])
+        self.assertEqual(second['data']['calories'], first['data']['calories'])
+        self.assertEqual(second['data']['product_name'], 'apple   150G')
+        self.assertEqual(NutritionLookup.objects.get().hits, 1)
+
+    def test_expired_entry_is_refetched(self):
+        self.lookup('Apple')
+        NutritionLookup.objects.update(created_at=timezone.now() - timedelta(days=31))
+        with self.settings(GEMINI_CACHE_TTL_DAYS=30):
+            self.lookup('Apple')
+        self.assertEqual(len(self.stub.calls), 2)
+
+    def test_least_recently_used_entries_evicted(self):
+        with self.settings(GEMINI_CACHE_MAX_ENTRIES=2):
+            self.lookup('Apple')
+            self.lookup('Pear')
+            self.lookup('Apple')  # refreshes Apple
+            self.lookup('Plum')
+        self.assertEqual(
+            sorted(NutritionLookup.objects.values_list('description', flat=True)), ['apple', 'plum']
+        )
+
+    def test_failures_are_not_cached(self):
+        self.stub.reply = lambda prompt: 'Not JSON'
+        self.assertFalse(self.lookup('Apple')['success'])
+        self.assertFalse(NutritionLookup.objects.exists())
+
+    def test_client_is_reused(self):
+        self.lookup('Apple')
+        self.lookup('Pear')
+        self.assertEqual(self.stub.clients, 1)
+
+
+class GeminiCoalescingTestCase(TestCase):
+    """Concurrent lookups for the same description share one API call."""
+
+    def setUp(self):
+        self.stub = StubGenai(delay=0.05)
+        for target, value in (
+            ('count_calories_app.services.genai', self.stub),
+            ('count_calories_app.services.GeminiService._cached_result', lambda name, normalized: None),
+            ('count_calories_app.services.GeminiService._remember', lambda normalized, result: None),
+        ):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_threads_share_one_call(self):
+        self.stub.release.clear()
+        results = []
+
+        def worker(name):
+            results.append(GeminiService.get_nutrition_info(name))
+
+        with self.settings(GEMINI_API_KEY='stub-key'):
+            threads = [threading.Thread(target=worker, args=(name,)) for name in ('Apple', 'apple', 'APPLE ')]
+            for thread in threads:
+                thread.start()
+            # Let the other threads reach the in-flight future before the leader's call returns
+            time.sleep(0.2)
+            self.stub.release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(len(self.stub.calls), 1)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(result['success'] for result in results))
+
+    def test_async_calls_share_one_task(self):
+        async def lookups():
+            return await asyncio.gather(*(GeminiService.aget_nutrition_info(name) for name in ('Kefir', 'kefir')))
+
+        with self.settings(GEMINI_API_KEY='stub-key'):
+            first, second = async_to_sync(lookups)()
+
+        self.assertEqual(len(self.stub.calls), 1)
+        self.assertEqual(first['data']['calories'], 95.0)
+        self.assertEqual(second['data']['product_name'], 'kefir')
+        self.assertEqual(GeminiService._async_inflight, {})
+
+
+class AsyncGeminiViewTestCase(TestCase):
+    """Test cases for the async gemini-nutrition endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('gemini_nutrition_async')
+        self.stub = StubGenai()
+        patcher = patch('count_calories_app.services.genai', self.stub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, payload):
+        with self.settings(GEMINI_API_KEY='stub-key'):
+            return self.client.post(self.url, json.dumps(payload), content_type='application/json')
+
+    def test_success_and_cache(self):
+        first = self.post({'food_name': 'Banana'})
+        second = self.post({'food_name': 'banana'})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(json.loads(second.content)['data']['product_name'], 'banana')
+        self.assertEqual(len(self.stub.calls), 1)
+
+    def test_missing_food_name(self):
+        self.assertEqual(self.post({'food_name': ''}).status_code, 400)
+
+    def test_get_not_allowed(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
@@ -0,0 +1,95 @@
+"""
+Tests that the hot time-range and product-name queries use their indexes.
+
+Tests cover:
+- Date-range filters on FoodItem, Weight, RunningSession, WorkoutSession and
+  BodyMeasurement searching their date index
+- Per-product history using the (product_name, consumed_at) index
+- Case-insensitive name lookups via FoodItemQuerySet.named() using the
+  lower(product_name) expression index
+- Quick-add product grouping using the partial index over visible items
+- Running leaderboards using the (distance_bucket, pace_seconds) and distance
+  indexes
+"""
+
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+from django.utils import timezone
+
+from count_calories_app.models import BodyMeasurement, FoodItem, RunningSession, Weight, WorkoutSession
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+class QueryPlanIndexTestCase(TestCase):
+    """EXPLAIN QUERY PLAN must show each hot query searching its index."""
+
+    def setUp(self):
+        self.end = timezone.now()
+        self.start = self.end - timedelta(days=7)
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(f'INDEX {index_name}', plan, f'Query plan does not use {index_name}:\n{plan}')
+
+    def test_food_date_range(self):
+        self.assertUsesIndex(
+            FoodItem.objects.filter(consumed_at__gte=self.start, consumed_at__lt=self.end),
+            'fooditem_consumed_at_idx',
+        )
+
+    def test_food_product_history(self):
+        self.assertUsesIndex(
+            FoodItem.objects.filter(product_name='Oats', consumed_at__gte=self.start),
+            'fooditem_name_consumed_idx',
+        )
+
+    def test_case_insensitive_name_lookup(self):
+        self.assertUsesIndex(FoodItem.objects.named('oats'), 'fooditem_name_lower_idx')
+
+    def test_quick_list(self):
+        self.assertUsesIndex(
+            FoodItem.objects.filter(hide_from_quick_list=False)
+            .values('product_name').annotate(times_logged=Count('id')).order_by(),
+            'fooditem_quick_list_idx',
+        )
+
+    def test_weight_date_range(self):
+        self.assertUsesIndex(Weight.objects.filter(recorded_at__gte=self.start), 'weight_recorded_at_idx')
+
+    def test_running_date_range(self):
+        self.assertUsesIndex(RunningSession.objects.filter(date__gte=self.start), 'runningsession_date_idx')
+
+    def test_running_fastest_per_bucket(self):
+        self.assertUsesIndex(RunningSession.objects.fastest('10k', 5), 'runningsession_bucket_pace_idx')
+
+    def test_running_longest(self):
+        self.assertUsesIndex(RunningSession.objects.longest(5), 'runningsession_distance_idx')
+
+    def test_workout_date_range(self):
+        self.assertUsesIndex(WorkoutSession.objects.filter(date__gte=self.start), 'workoutsession_date_idx')
+
+    def test_body_measurement_date_range(self):
+        self.assertUsesIndex(BodyMeasurement.objects.filter(date__gte=self.start), 'bodymeasurement_date_idx')
+
+
+class NamedLookupTestCase(TestCase):
+    """FoodItemQuerySet.named() matches product names ignoring case."""
+
+    def setUp(self):
+        for name in ('Oats', 'OATS', 'Oat milk', 'Banana'):
+            FoodItem.objects.create(product_name=name, calories=100)
+
+    def test_matches_exact_name_any_case(self):
+        self.assertEqual(
+            sorted(FoodItem.objects.named('oats').values_list('product_name', flat=True)), ['OATS', 'Oats']
+        )
+
+    def test_multiple_names(self):
+        self.assertEqual(FoodItem.objects.named('oats', 'BANANA').count(), 3)
+
+    def test_unknown_name(self):
+        self.assertEqual(FoodItem.objects.named('missing').count(), 0)
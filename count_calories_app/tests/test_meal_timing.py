@@ -0,0 +1,120 @@
+"""
+Tests for the grouped hour-of-day and meal-period histograms.
+
+Tests cover:
+- HourlyHistogram cells by local weekday and hour, and meal-period totals
+- api_hourly_eating_pattern hours, meal periods and the optional heatmap
+- api_analytics returning the heatmap on request
+- The food tracker's hourly chart data
+- Query count independent of the number of entries (benchmark)
+"""
+
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.analytics_engine import HourlyHistogram
+from count_calories_app.models import FoodItem
+
+
+def local_dt(day, hour=12):
+    """Aware datetime at the given local hour of a date."""
+    return timezone.make_aware(datetime.combine(day, time(hour, 0)))
+
+
+def log(calories, when):
+    return FoodItem.objects.create(product_name='Meal', calories=Decimal(calories), consumed_at=when)
+
+
+class HourlyHistogramTestCase(TestCase):
+    """Cells and meal periods of the grouped histogram."""
+
+    def test_cells_by_local_weekday_and_hour(self):
+        monday, sunday = date(2024, 1, 1), date(2024, 1, 7)
+        log('300', local_dt(monday, 8))
+        log('200', local_dt(monday, 8))
+        log('700', local_dt(sunday, 23))
+
+        histogram = HourlyHistogram(FoodItem.objects.all())
+
+        self.assertEqual(histogram.calories[0, 8], 500.0)
+        self.assertEqual(histogram.entries[0, 8], 2)
+        self.assertEqual(histogram.calories[6, 23], 700.0)
+        self.assertEqual(histogram.by_hour.sum(), 1200.0)
+        self.assertEqual(histogram.meal_periods()['morning'], 500.0)
+        self.assertEqual(histogram.meal_periods()['night'], 700.0)
+
+    def test_empty(self):
+        histogram = HourlyHistogram(FoodItem.objects.none())
+
+        self.assertFalse(histogram)
+        self.assertEqual(histogram.heatmap()['calories'], [[0.0] * 24] * 7)
+
+
+class HourlyPatternViewsTestCase(TestCase):
+    """Views reading the histogram."""
+
+    def setUp(self):
+        self.client = Client()
+        self.yesterday = timezone.localdate() - timedelta(days=1)
+        log('400', local_dt(self.yesterday, 7))
+        log('900', local_dt(self.yesterday, 19))
+
+    def test_hourly_pattern(self):
+        data = json.loads(self.client.get(reverse('api_hourly_pattern')).content)
+
+        self.assertEqual(data['calories'][7], 400.0)
+        self.assertEqual(data['calories'][19], 900.0)
+        self.assertEqual(data['meal_periods']['evening'], 900.0)
+        self.assertNotIn('heatmap', data)
+
+    def test_hourly_pattern_heatmap(self):
+        data = json.loads(self.client.get(reverse('api_hourly_pattern'), {'days': 'all', 'heatmap': '1'}).content)
+        row = data['heatmap']['calories'][self.yesterday.weekday()]
+
+        self.assertEqual(row[19], 900.0)
+        self.assertEqual(data['heatmap']['days'][0], 'Monday')
+
+    def test_analytics_heatmap_on_request(self):
+        url = reverse('api_analytics')
+        self.assertNotIn('eating_heatmap', json.loads(self.client.get(url).content))
+
+        data = json.loads(self.client.get(url, {'heatmap': 'true'}).content)
+        self.assertEqual(data['eating_heatmap']['entries'][self.yesterday.weekday()][7], 1)
+        self.assertEqual(data['meal_timing']['morning'] + data['meal_timing']['evening'], 100.0)
+
+    def test_food_tracker_hourly_chart(self):
+        response = self.client.get(reverse('food_tracker'), {'date': self.yesterday.isoformat()})
+        hourly = json.loads(response.context['hourly_calories_json'])
+
+        self.assertEqual(len(hourly), 24)
+        self.assertEqual(hourly[7], 400.0)
+
+
+class HourlyPatternBenchmarkTestCase(TestCase):
+    """Histogram cost must not grow with the number of entries."""
+
+    def test_query_count_flat_as_entries_grow(self):
+        client = Client()
+        url = reverse('api_hourly_pattern')
+        now = timezone.now()
+
+        log('100', now - timedelta(hours=1))
+        with CaptureQueriesContext(connection) as few:
+            client.get(url, {'days': 'all', 'heatmap': '1'})
+
+        FoodItem.objects.bulk_create([
+            FoodItem(product_name='Snack', calories=Decimal('50'), consumed_at=now - timedelta(hours=n))
+            for n in range(2, 500)
+        ])
+        with CaptureQueriesContext(connection) as many:
+            response = client.get(url, {'days': 'all', 'heatmap': '1'})
+
+        self.assertEqual(len(many.captured_queries), len(few.captured_queries))
+        self.assertEqual(sum(map(sum, json.loads(response.content)['heatmap']['entries'])), 499)
@@ -0,0 +1,250 @@
+"""
+Tests for the grouped monthly series behind the month trend and compare views.
+
+Tests cover:
+- Month sequences and the last-12-months window across a year boundary
+- Per-month totals, logged days, first/last/average weight and top food
+- Empty months filled with zeros and None
+- Weigh-ins near midnight counted in their local month
+- month_trends and api_yearly_trends reading the series
+- month_comparison for non-consecutive and repeated months with ranked food lists
+- api_month_compare with ?months= and its validation
+- Query count independent of the number of months (benchmark)
+"""
+
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import FoodItem, Weight
+from count_calories_app.monthly import MAX_COMPARE_MONTHS, last_months, month_comparison, month_sequence, monthly_series
+
+
+def local_dt(day, hour=12, minute=0):
+    """Aware datetime at the given local time of a date."""
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+def log(name, calories, when, protein='0'):
+    return FoodItem.objects.create(
+        product_name=name, calories=Decimal(calories), protein=Decimal(protein), consumed_at=when,
+    )
+
+
+class MonthSequenceTestCase(TestCase):
+    """Month windows are built without touching the database."""
+
+    def test_month_sequence_across_years(self):
+        self.assertEqual(month_sequence((2023, 11), (2024, 2)), [(2023, 11), (2023, 12), (2024, 1), (2024, 2)])
+        self.assertEqual(month_sequence((2024, 3), (2024, 3)), [(2024, 3)])
+        self.assertEqual(month_sequence((2024, 4), (2024, 3)), [])
+
+    def test_last_months(self):
+        months = last_months(date(2024, 3, 31), 12)
+
+        self.assertEqual(len(months), 12)
+        self.assertEqual(months[0], (2023, 4))
+        self.assertEqual(months[-1], (2024, 3))
+        self.assertEqual(len(set(months)), 12)
+
+
+class MonthlySeriesTestCase(TestCase):
+    """Totals, weights and top foods per month."""
+
+    def setUp(self):
+        log('Oats', '400', local_dt(date(2024, 1, 3), 8), protein='15')
+        log('Oats', '350', local_dt(date(2024, 1, 3), 9), protein='10')
+        log('Rice', '600', local_dt(date(2024, 1, 20)), protein='12')
+        log('Rice', '500', local_dt(date(2024, 3, 5)))
+        Weight.objects.create(weight=Decimal('82.0'), recorded_at=local_dt(date(2024, 1, 2), 7))
+        Weight.objects.create(weight=Decimal('81.0'), recorded_at=local_dt(date(2024, 1, 15), 7))
+        Weight.objects.create(weight=Decimal('80.5'), recorded_at=local_dt(date(2024, 1, 30), 7))
+        self.series = monthly_series([(2024, 1), (2024, 2), (2024, 3)])
+
+    def test_totals_and_logged_days(self):
+        january = self.series[0]
+
+        self.assertEqual((january['year'], january['month'], january['days_in_month']), (2024, 1, 31))
+        self.assertEqual(january['days_logged'], 2)
+        self.assertEqual(january['entries'], 3)
+        self.assertEqual(january['calories'], 1350.0)
+        self.assertEqual(january['protein'], 37.0)
+        self.assertEqual(january['top_food'], 'Oats')
+
+    def test_weights(self):
+        january = self.series[0]
+
+        self.assertEqual(january['weight_first'], 82.0)
+        self.assertEqual(january['weight_last'], 80.5)
+        self.assertAlmostEqual(january['weight_avg'], 81.1667, places=3)
+        self.assertEqual(january['weigh_ins'], 3)
+
+    def test_empty_month_filled(self):
+        february = self.series[1]
+
+        self.assertEqual(february['days_in_month'], 29)
+        self.assertEqual((february['days_logged'], february['calories']), (0, 0.0))
+        self.assertIsNone(february['weight_avg'])
+        self.assertIsNone(february['top_food'])
+        self.assertEqual(self.series[2]['weigh_ins'], 0)
+        self.assertEqual(self.series[2]['top_food'], 'Rice')
+
+    def test_weigh_in_near_midnight_uses_local_month(self):
+        Weight.objects.create(weight=Decimal('79.0'), recorded_at=local_dt(date(2024, 2, 29), 23, 45))
+        Weight.objects.create(weight=Decimal('78.0'), recorded_at=local_dt(date(2024, 3, 1), 0, 15))
+
+        february, march = monthly_series([(2024, 2), (2024, 3)])
+
+        self.assertEqual(february['weight_last'], 79.0)
+        self.assertEqual(march['weight_first'], 78.0)
+
+    def test_no_months(self):
+        self.assertEqual(monthly_series([]), [])
+
+
+class MonthlyViewsTestCase(TestCase):
+    """Both trend views report the series."""
+
+    def setUp(self):
+        self.client = Client()
+        self.yesterday = timezone.localdate() - timedelta(days=1)
+        log('Soup', '700', local_dt(self.yesterday), protein='30')
+        Weight.objects.create(weight=Decimal('80.0'), recorded_at=local_dt(self.yesterday, 7))
+
+    def test_month_trends(self):
+        monthly_data = self.client.get(reverse('month_trends')).context['monthly_data']
+        month = next(m for m in monthly_data if (m['year'], m['month']) == (self.yesterday.year, self.yesterday.month))
+
+        self.assertEqual(len(monthly_data), 12)
+        self.assertEqual(month['avg_cal'], 700.0)
+        self.assertEqual(month['weight_change'], 0.0)
+        self.assertEqual(month['top_food'], 'Soup')
+
+    def test_yearly_trends_last12_are_calendar_months(self):
+        months = json.loads(self.client.get(reverse('api_yearly_trends')).content)['months']
+        keys = [m['month'] for m in months]
+
+        self.assertEqual(len(set(keys)), 12)
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(keys[-1], timezone.localdate().strftime('%Y-%m'))
+
+        month = next(m for m in months if m['month'] == self.yesterday.strftime('%Y-%m'))
+        self.assertEqual(month['avg_calories'], 700)
+        self.assertEqual(month['avg_weight'], 80.0)
+        self.assertEqual(month['weight_delta'], 0)
+
+
+class MonthComparisonTestCase(TestCase):
+    """Any set of months, with per-month food lists."""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('api_month_compare')
+        for name in ('Oats', 'Oats', 'Oats', 'Rice', 'Rice', 'Apple'):
+            log(name, '100', local_dt(date(2024, 1, 10)))
+        log('Soup', '300', local_dt(date(2024, 6, 1)), protein='20')
+        Weight.objects.create(weight=Decimal('81.0'), recorded_at=local_dt(date(2024, 6, 2), 7))
+        Weight.objects.create(weight=Decimal('79.5'), recorded_at=local_dt(date(2024, 6, 20), 7))
+
+    def test_non_consecutive_and_repeated_months(self):
+        june, march, june_again = month_comparison([(2024, 6), (2024, 3), (2024, 6)])
+
+        self.assertEqual((june['month'], march['month']), (6, 3))
+        self.assertEqual(june['calories'], 300.0)
+        self.assertEqual((june['weight_min'], june['weight_max']), (79.5, 81.0))
+        self.assertEqual(march['days_logged'], 0)
+        self.assertEqual(march['top_foods'], [])
+        self.assertEqual(june_again['top_foods'], june['top_foods'])
+        self.assertIsNot(june_again['top_foods'][0], june['top_foods'][0])
+
+    def test_top_foods_ranked_and_limited(self):
+        (january,) = month_comparison([(2024, 1)], top_foods=2)
+
+        self.assertEqual([f['product_name'] for f in january['top_foods']], ['Oats', 'Rice'])
+        self.assertEqual(january['top_foods'][0]['count'], 3)
+        self.assertEqual(january['top_foods'][0]['calories'], 300.0)
+
+        (everything,) = month_comparison([(2024, 1)])
+        self.assertEqual([f['product_name'] for f in everything['top_foods']], ['Oats', 'Rice', 'Apple'])
+
+    def test_months_param(self):
+        response = self.client.get(self.url, {'months': '2024-06, 2024-01,2024-03'})
+        months = json.loads(response.content)['months']
+
+        self.assertEqual([m['month'] for m in months], ['2024-06', '2024-01', '2024-03'])
+        self.assertEqual(months[0]['weight']['change'], -1.5)
+        self.assertEqual(months[1]['top_foods'][0], {'product_name': 'Oats', 'count': 3, 'total_cal': 300.0})
+        self.assertEqual(months[1]['items_count'], 6)
+        self.assertIsNone(months[2]['weight'])
+
+    def test_two_month_shape_unchanged(self):
+        data = json.loads(self.client.get(self.url, {'month_a': '2024-06', 'month_b': '2024-01'}).content)
+
+        self.assertEqual(data['month_a']['avg_calories'], 300)
+        self.assertEqual(data['month_b']['days_logged'], 1)
+
+    def test_invalid_months_rejected(self):
+        too_many = ','.join(f'{y}-{m:02d}' for y, m in last_months(date(2024, 12, 1), MAX_COMPARE_MONTHS))
+        for params in ({'months': '2024-13'}, {'months': ''}, {'months': too_many + ',2025-01'},
+                       {'month_a': 'June', 'month_b': '2024-01'}, {'month_a': '2024-01'}):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400, params)
+        self.assertEqual(self.client.get(self.url, {'months': too_many}).status_code, 200)
+
+
+class MonthlySeriesBenchmarkTestCase(TestCase):
+    """The series costs the same number of queries for 12 months or 5 years."""
+
+    def test_query_count_flat_as_months_grow(self):
+        today = timezone.localdate()
+        FoodItem.objects.bulk_create([
+            FoodItem(product_name=f'Food {n % 5}', calories=Decimal('500'), consumed_at=local_dt(today - timedelta(days=n)))
+            for n in range(0, 4 * 365, 3)
+        ])
+        Weight.objects.bulk_create([
+            Weight(weight=Decimal('80'), recorded_at=local_dt(today - timedelta(days=n), 7))
+            for n in range(0, 4 * 365, 10)
+        ])
+
+        with CaptureQueriesContext(connection) as twelve:
+            monthly_series(last_months(today, 12))
+        with CaptureQueriesContext(connection) as sixty:
+            series = monthly_series(last_months(today, 60))
+        self.assertEqual(len(twelve.captured_queries), len(sixty.captured_queries))
+        self.assertEqual(sum(month['entries'] for month in series), FoodItem.objects.count())
+
+        url = reverse('api_yearly_trends')
+        with CaptureQueriesContext(connection) as last12:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as all_time:
+            response = self.client.get(url, {'year': 'all'})
+        self.assertEqual(len(all_time.captured_queries), len(last12.captured_queries) + 1)
+        self.assertGreaterEqual(len(json.loads(response.content)['months']), 48)
+
+    def test_compare_query_count_flat_as_months_grow(self):
+        url = reverse('api_month_compare')
+        today = timezone.localdate()
+        FoodItem.objects.bulk_create([
+            FoodItem(product_name=f'Food {n % 15}', calories=Decimal('400'), consumed_at=local_dt(today - timedelta(days=n)))
+            for n in range(0, 400)
+        ])
+        Weight.objects.bulk_create([
+            Weight(weight=Decimal('80'), recorded_at=local_dt(today - timedelta(days=n), 7)) for n in range(0, 400, 5)
+        ])
+        # Every other month, so the compared months are not one contiguous range
+        months = [f'{y}-{m:02d}' for y, m in last_months(today, 24)[::2]]
+
+        with CaptureQueriesContext(connection) as two:
+            self.client.get(url, {'months': ','.join(months[-2:])})
+        with CaptureQueriesContext(connection) as twelve:
+            response = self.client.get(url, {'months': ','.join(months)})
+
+        self.assertEqual(len(twelve.captured_queries), len(two.captured_queries))
+        data = json.loads(response.content)['months']
+        self.assertEqual(len(data), 12)
+        self.assertTrue(all(len(m['top_foods']) == 10 for m in data if m['days_logged'] >= 28))
@@ -0,0 +1,147 @@
+"""
+Tests for weekly training volume per muscle group.
+
+Tests cover:
+- Sets, total reps and volume summed per local Monday-to-Sunday week and
+  muscle group, with exercises without a group counted under 'Other'
+- Weeks without training filled with zeros, totals and the heatmap grid
+- api_workout_muscle_volume ranges (last N weeks, a year, custom dates
+  widened to whole weeks) and validation
+- One grouped query whatever the range or number of workouts (benchmark)
+"""
+
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import Exercise, WorkoutExercise, WorkoutSession
+from count_calories_app.training_volume import MuscleVolume, last_weeks, week_start
+
+# A Monday
+MONDAY = date(2024, 3, 4)
+
+
+def local(day, hour=12, minute=0):
+    return timezone.make_aware(datetime(day.year, day.month, day.day, hour, minute))
+
+
+class MuscleVolumeTestCase(TestCase):
+    """Three muscle groups over three weeks."""
+
+    def setUp(self):
+        self.client = Client()
+        self.bench = Exercise.objects.create(name='Bench Press', muscle_group='Chest')
+        self.squat = Exercise.objects.create(name='Squat', muscle_group='Legs')
+        self.plank = Exercise.objects.create(name='Plank', muscle_group='')
+        self.burpee = Exercise.objects.create(name='Burpee')
+
+    def log(self, when, exercise, sets, reps, weight=None):
+        workout = WorkoutSession.objects.create(date=when)
+        return WorkoutExercise.objects.create(
+            workout=workout, exercise=exercise, sets=sets, reps=reps,
+            weight=None if weight is None else Decimal(weight),
+        )
+
+    def test_weekly_groups(self):
+        self.log(local(MONDAY, 0, 30), self.bench, 3, 10, '60')
+        # Sunday night still belongs to the first week
+        self.log(local(MONDAY + timedelta(days=6), 23, 30), self.bench, 2, 5, '80')
+        self.log(local(MONDAY + timedelta(days=2)), self.squat, 5, 5, '100')
+        self.log(local(MONDAY + timedelta(days=3)), self.plank, 3, 1)
+        self.log(local(MONDAY + timedelta(days=15)), self.burpee, 2, 10)
+        self.log(local(MONDAY + timedelta(days=16)), self.squat, 3, 8, '90')
+        # Outside the range
+        self.log(local(MONDAY + timedelta(days=21)), self.squat, 3, 8, '90')
+
+        volume = MuscleVolume(MONDAY, MONDAY + timedelta(weeks=2))
+
+        self.assertEqual(volume.weeks, [MONDAY + timedelta(weeks=n) for n in range(3)])
+        self.assertEqual(volume.muscle_groups, ['Chest', 'Legs', 'Other'])
+        series = volume.series()
+        self.assertEqual(series['Chest'], {'sets': [5, 0, 0], 'reps': [40, 0, 0], 'volume': [2600.0, 0.0, 0.0]})
+        self.assertEqual(series['Legs']['volume'], [2500.0, 0.0, 2160.0])
+        self.assertEqual(series['Other'], {'sets': [3, 0, 2], 'reps': [3, 0, 20], 'volume': [0.0, 0.0, 0.0]})
+        self.assertEqual(volume.totals()['Legs'], {'sets': 8, 'reps': 49, 'volume': 4660.0})
+        self.assertEqual(volume.heatmap('sets'), {'metric': 'sets', 'rows': [[5, 0, 0], [5, 0, 3], [3, 0, 2]], 'max': 5})
+
+    def test_empty_range(self):
+        volume = MuscleVolume(MONDAY, MONDAY)
+        self.assertEqual(volume.muscle_groups, [])
+        self.assertEqual(volume.heatmap('volume'), {'metric': 'volume', 'rows': [], 'max': 0})
+
+    def test_week_helpers(self):
+        self.assertEqual(week_start(MONDAY + timedelta(days=6)), MONDAY)
+        self.assertEqual(last_weeks(MONDAY + timedelta(days=3), 4), (MONDAY - timedelta(weeks=3), MONDAY))
+
+    def test_endpoint_default_and_year(self):
+        today = timezone.localdate()
+        self.log(timezone.now(), self.bench, 3, 10, '50')
+        self.log(local(today - timedelta(weeks=20)), self.squat, 4, 6, '100')
+        url = reverse('api_workout_muscle_volume')
+
+        data = json.loads(self.client.get(url).content)
+        self.assertEqual(len(data['weeks']), 12)
+        self.assertEqual(data['weeks'][-1], week_start(today).isoformat())
+        self.assertEqual(data['muscle_groups'], ['Chest'])
+        self.assertEqual(data['series']['Chest']['volume'][-1], 1500.0)
+
+        data = json.loads(self.client.get(url, {'weeks': 52, 'metric': 'volume'}).content)
+        self.assertEqual(len(data['weeks']), 52)
+        self.assertEqual(data['muscle_groups'], ['Chest', 'Legs'])
+        self.assertEqual(data['heatmap']['metric'], 'volume')
+        self.assertEqual(data['heatmap']['max'], 2400.0)
+        self.assertEqual(len(data['heatmap']['rows'][1]), 52)
+
+    def test_endpoint_custom_range(self):
+        self.log(local(MONDAY + timedelta(days=1)), self.bench, 3, 10, '60')
+        response = self.client.get(reverse('api_workout_muscle_volume'), {
+            'start_date': (MONDAY + timedelta(days=3)).isoformat(),
+            'end_date': (MONDAY + timedelta(days=8)).isoformat(),
+            'metric': 'reps',
+        })
+        data = json.loads(response.content)
+
+        self.assertEqual(data['weeks'], [MONDAY.isoformat(), (MONDAY + timedelta(weeks=1)).isoformat()])
+        self.assertEqual(data['heatmap']['rows'], [[30, 0]])
+        self.assertEqual(data['totals']['Chest']['sets'], 3)
+
+    def test_endpoint_validation(self):
+        url = reverse('api_workout_muscle_volume')
+        self.assertEqual(self.client.get(url, {'metric': 'calories'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'weeks': 0}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'weeks': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'weeks': 1000}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start_date': '2024-13-01'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start_date': '2024-05-01', 'end_date': '2024-04-01'}).status_code, 400)
+
+
+class MuscleVolumeBenchmarkTestCase(TestCase):
+    """A year of daily workouts costs the same single grouped query as one."""
+
+    def test_one_grouped_query(self):
+        groups = [Exercise.objects.create(name=group, muscle_group=group) for group in ('Back', 'Chest', 'Legs')]
+        url = reverse('api_workout_muscle_volume')
+        now = timezone.now()
+
+        counts = []
+        for days in (range(1, 2), range(2, 365)):
+            workouts = WorkoutSession.objects.bulk_create([WorkoutSession(date=now - timedelta(days=n)) for n in days])
+            WorkoutExercise.objects.bulk_create([
+                WorkoutExercise(workout=workout, exercise=exercise, sets=3, reps=10, weight=Decimal('40'))
+                for workout in workouts for exercise in groups
+            ])
+            with CaptureQueriesContext(connection) as ctx:
+                data = json.loads(self.client.get(url, {'weeks': 53}).content)
+            counts.append(len(ctx.captured_queries))
+
+        self.assertEqual(counts[0], counts[1])
+        reads = [query['sql'] for query in ctx.captured_queries if 'FROM "count_calories_app_workoutexercise"' in query['sql']]
+        self.assertEqual(len(reads), 1)
+        self.assertIn('GROUP BY', reads[0])
+        self.assertEqual(data['totals']['Back']['sets'], 3 * 364)
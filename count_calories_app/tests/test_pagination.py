@@ -0,0 +1,158 @@
+"""
+Tests for keyset (cursor) pagination of the React list endpoints.
+
+Tests cover:
+- Walking api_food_items page by page without gaps or duplicates, including
+  entries sharing a timestamp
+- include_totals and the per_page cap
+- Rejecting tampered cursors and cursors issued for another list
+- Cursor pages for api_weight_items, api_running_items and api_workouts
+- Deep cursor pages costing the same number of queries as the first page
+"""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import Exercise, FoodItem, RunningSession, Weight, WorkoutExercise, WorkoutSession
+from count_calories_app.pagination import MAX_PER_PAGE
+
+
+class FoodItemsCursorTestCase(TestCase):
+    """Cursor pagination on api_food_items."""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('api_food_items')
+        now = timezone.now()
+        # Pairs of entries share a timestamp so the id tie-break matters
+        FoodItem.objects.bulk_create([
+            FoodItem(product_name=f'Meal {n}', calories=Decimal('100'), consumed_at=now - timedelta(minutes=n // 2))
+            for n in range(25)
+        ])
+
+    def get(self, **params):
+        response = self.client.get(self.url, {'days': 'all', **params})
+        return response, json.loads(response.content)
+
+    def test_walk_all_pages(self):
+        seen = []
+        cursor = ''
+        while True:
+            _, data = self.get(cursor=cursor, per_page=10, include_totals=0)
+            seen.extend(item['id'] for item in data['items'])
+            if not data['pagination']['has_more']:
+                break
+            cursor = data['pagination']['next_cursor']
+
+        expected = list(FoodItem.objects.order_by('-consumed_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+        self.assertIsNone(data['pagination']['next_cursor'])
+
+    def test_include_totals(self):
+        _, data = self.get(cursor='', per_page=5)
+        self.assertEqual(data['totals']['count'], 25)
+        self.assertEqual(data['totals']['calories'], 2500.0)
+
+        _, data = self.get(cursor='', per_page=5, include_totals=0)
+        self.assertNotIn('totals', data)
+
+    def test_without_totals_is_a_single_page_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.get(cursor='', per_page=5, include_totals=0)
+        self.assertEqual(len(ctx.captured_queries), 2)  # ETag validator lookup + the page
+
+    def test_per_page_is_capped(self):
+        _, data = self.get(per_page=100000)
+        self.assertEqual(data['pagination']['per_page'], MAX_PER_PAGE)
+        _, data = self.get(per_page='lots')
+        self.assertEqual(data['pagination']['per_page'], 50)
+
+    def test_page_numbers_still_supported(self):
+        _, data = self.get(page=3, per_page=10)
+        self.assertEqual(len(data['items']), 5)
+        self.assertEqual(data['pagination']['total_pages'], 3)
+        self.assertEqual(data['pagination']['total_items'], 25)
+
+    def test_tampered_cursor_rejected(self):
+        _, data = self.get(cursor='', per_page=10)
+        response, _ = self.get(cursor=data['pagination']['next_cursor'][:-2] + 'xx')
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_from_another_list_rejected(self):
+        Weight.objects.create(weight=Decimal('80'))
+        Weight.objects.create(weight=Decimal('81'))
+        weights = json.loads(self.client.get(reverse('api_weight_items'), {'cursor': '', 'per_page': 1}).content)
+        response, _ = self.get(cursor=weights['pagination']['next_cursor'])
+        self.assertEqual(response.status_code, 400)
+
+    def test_deep_page_query_count(self):
+        _, first = self.get(cursor='', per_page=2, include_totals=0)
+        cursor = first['pagination']['next_cursor']
+        for _ in range(8):
+            _, data = self.get(cursor=cursor, per_page=2, include_totals=0)
+            cursor = data['pagination']['next_cursor']
+        with CaptureQueriesContext(connection) as ctx:
+            _, data = self.get(cursor=cursor, per_page=2, include_totals=0)
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertEqual(len(data['items']), 2)
+
+
+class OtherListsCursorTestCase(TestCase):
+    """The same cursors page the weight, running and workout lists."""
+
+    def setUp(self):
+        self.client = Client()
+        now = timezone.now()
+        for n in range(5):
+            Weight.objects.create(weight=Decimal('80') - n, recorded_at=now - timedelta(days=n))
+            RunningSession.objects.create(
+                date=now - timedelta(days=n), distance=Decimal('5'), duration=timedelta(minutes=30)
+            )
+            session = WorkoutSession.objects.create(name=f'Session {n}', date=now - timedelta(days=n))
+            WorkoutExercise.objects.create(
+                workout=session, exercise=Exercise.objects.create(name=f'Lift {n}'),
+                sets=3, reps=10, weight=Decimal('50'),
+            )
+
+    def walk(self, url_name, **params):
+        pages = []
+        cursor = ''
+        while cursor is not None:
+            data = json.loads(self.client.get(reverse(url_name), {'cursor': cursor, 'per_page': 2, **params}).content)
+            pages.append(data)
+            cursor = data['pagination']['next_cursor']
+        return pages
+
+    def test_weight_pages_with_full_range_stats(self):
+        pages = self.walk('api_weight_items')
+        self.assertEqual([len(page['items']) for page in pages], [2, 2, 1])
+        self.assertEqual(pages[0]['stats']['min'], 76.0)
+        self.assertEqual(pages[0]['stats']['change'], 4.0)
+
+    def test_running_pages(self):
+        pages = self.walk('api_running_items', include_totals=0)
+        self.assertEqual(sum(len(page['items']) for page in pages), 5)
+        self.assertNotIn('stats', pages[0])
+
+    def test_running_stats_cover_full_range(self):
+        pages = self.walk('api_running_items')
+        self.assertEqual(pages[-1]['stats']['total_runs'], 5)
+        self.assertEqual(pages[-1]['stats']['total_distance'], 25.0)
+
+    def test_workout_pages(self):
+        pages = self.walk('api_workouts')
+        names = [item['name'] for page in pages for item in page['items']]
+        self.assertEqual(names, [f'Session {n}' for n in range(5)])
+        self.assertEqual(pages[0]['stats'], {'total_workouts': 5, 'total_exercises': 5, 'total_volume': 7500.0})
+
+    def test_lists_without_cursor_are_unchanged(self):
+        data = json.loads(self.client.get(reverse('api_workouts')).content)
+        self.assertEqual(len(data['items']), 5)
+        self.assertNotIn('pagination', data)
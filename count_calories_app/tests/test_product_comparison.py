@@ -0,0 +1,139 @@
+"""
+Tests for comparing food products side by side.
+
+Tests cover:
+- Averages, entry counts, last-logged and the 8-week frequency vector
+- Falling back to the best full-text match for names without a product
+- product_compare rendering two and three products
+- api_product_compare for many products, with unmatched names and validation
+- Query count independent of the number of products compared (benchmark)
+"""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import FoodItem, UserSettings
+from count_calories_app.product_comparison import FREQUENCY_WEEKS, MAX_COMPARE_PRODUCTS, compare_products
+
+
+def log(name, calories='100', protein='0', fat='0', carbs='0', days_ago=0):
+    return FoodItem.objects.create(
+        product_name=name, calories=Decimal(calories), protein=Decimal(protein), fat=Decimal(fat),
+        carbohydrates=Decimal(carbs), consumed_at=timezone.now() - timedelta(days=days_ago),
+    )
+
+
+class CompareProductsTestCase(TestCase):
+    """The comparison service."""
+
+    def setUp(self):
+        self.settings = UserSettings.get_settings()
+        log('Greek Yogurt', '120', protein='10', days_ago=1)
+        log('greek  yogurt', '140', protein='12', days_ago=8)
+        log('Greek Yogurt', '100', protein='8', days_ago=100)
+        log('Banana Bread', '300', fat='12', carbs='40', days_ago=2)
+
+    def test_averages_and_frequency(self):
+        (yogurt,) = compare_products(['Greek Yogurt'], self.settings)
+
+        self.assertEqual(yogurt['calories'], 120.0)
+        self.assertEqual(yogurt['protein'], 10.0)
+        self.assertEqual(yogurt['entries'], 3)
+        self.assertEqual(len(yogurt['weekly_counts']), FREQUENCY_WEEKS)
+        self.assertEqual(yogurt['weekly_counts'][-1], 1)
+        self.assertEqual(yogurt['weekly_counts'][-2], 1)
+        self.assertEqual(sum(yogurt['weekly_counts']), 2)
+        self.assertEqual(yogurt['weekly_max'], 1)
+        self.assertEqual(yogurt['protein_pct'], round(10.0 * 4 / 120.0 * 100, 1))
+        self.assertEqual(yogurt['last_logged'], FoodItem.objects.filter(calories=120).get().consumed_at)
+
+    def test_full_text_fallback_and_no_match(self):
+        bread, missing, yogurt = compare_products(['banana', 'Durian', 'GREEK YOGURT'], self.settings)
+
+        self.assertEqual(bread['name'], 'Banana Bread')
+        self.assertEqual(bread['fat_pct'], round(12.0 * 9 / 300.0 * 100, 1))
+        self.assertIsNone(missing)
+        self.assertEqual(yogurt['name'], 'GREEK YOGURT')
+
+    def test_products_without_entries_do_not_match(self):
+        FoodItem.objects.filter(product_name='Banana Bread').delete()
+        self.assertEqual(compare_products(['Banana Bread'], self.settings), [None])
+
+
+class ProductCompareViewsTestCase(TestCase):
+    """The HTML page and the JSON endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('api_product_compare')
+        for n in range(6):
+            log(f'Food {n}', calories=str(100 * (n + 1)), protein=str(5 * n), days_ago=n)
+
+    def test_page_two_products(self):
+        context = self.client.get(reverse('product_compare'), {'product1': 'Food 1', 'product2': 'Food 3'}).context
+
+        self.assertEqual(context['product1']['calories'], 200.0)
+        self.assertEqual(context['diff']['calories']['raw'], -200.0)
+        self.assertIsNone(context['product3'])
+        radar = json.loads(context['radar_data_json'])
+        self.assertEqual(radar[1]['cal_pct'], 100)
+        self.assertEqual(radar[0]['cal_pct'], 50)
+
+    def test_page_three_products(self):
+        context = self.client.get(
+            reverse('product_compare'), {'product1': 'Food 1', 'product2': 'Food 2', 'product3': 'Food 5'},
+        ).context
+
+        self.assertEqual(context['product3']['entries'], 1)
+        self.assertIsNone(context['diff'])
+        self.assertEqual(len(json.loads(context['radar_data_json'])), 3)
+
+    def test_api_many_products(self):
+        names = [f'Food {n}' for n in range(6)] + ['Nothing like it']
+        data = json.loads(self.client.get(self.url, {'product': names}).content)
+
+        self.assertEqual([p and p['name'] for p in data['products']], names[:6] + [None])
+        self.assertEqual(data['products'][4]['calories'], 500.0)
+        self.assertIsInstance(data['products'][0]['last_logged'], str)
+        self.assertEqual(len(data['radar']), 6)
+        self.assertEqual(data['radar'][5]['pro_pct'], 100)
+
+    def test_api_single_product_has_no_radar(self):
+        data = json.loads(self.client.get(self.url, {'product': ['Food 2', 'Food 2']}).content)
+
+        self.assertEqual(len(data['products']), 1)
+        self.assertIsNone(data['radar'])
+
+    def test_api_validation(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'product': ' '}).status_code, 400)
+        too_many = [f'Food {n}' for n in range(MAX_COMPARE_PRODUCTS + 1)]
+        self.assertEqual(self.client.get(self.url, {'product': too_many}).status_code, 400)
+
+
+class ProductCompareBenchmarkTestCase(TestCase):
+    """One grouped query whatever the number of products."""
+
+    def test_query_count_flat_as_products_grow(self):
+        settings = UserSettings.get_settings()
+        FoodItem.objects.bulk_create([
+            FoodItem(product_name=f'Food {n % 10}', calories=Decimal('100'),
+                     consumed_at=timezone.now() - timedelta(days=n % 70))
+            for n in range(500)
+        ])
+
+        with CaptureQueriesContext(connection) as two:
+            compare_products(['Food 0', 'Food 1'], settings)
+        with CaptureQueriesContext(connection) as ten:
+            stats = compare_products([f'Food {n}' for n in range(10)], settings)
+
+        self.assertEqual(len(two.captured_queries), 1)
+        self.assertEqual(len(ten.captured_queries), 1)
+        self.assertEqual(sum(p['entries'] for p in stats), 500)
@@ -0,0 +1,109 @@
+"""
+Tests for the quick-add food lists.
+
+Tests cover:
+- FoodItem.objects.latest_per_product() picking each product's latest entry
+- Hidden items being excluded from the quick-add lists
+- food_tracker and api_quick_add_foods costing the same number of queries
+  regardless of how many distinct products exist
+"""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import FoodItem
+
+
+class LatestPerProductTestCase(TestCase):
+    """Test cases for the latest_per_product queryset method."""
+
+    def setUp(self):
+        self.now = timezone.now()
+        FoodItem.objects.create(product_name='Oats', calories=Decimal('300'), consumed_at=self.now - timedelta(days=3))
+        FoodItem.objects.create(product_name='Oats', calories=Decimal('350'), consumed_at=self.now - timedelta(days=1))
+        FoodItem.objects.create(product_name='Banana', calories=Decimal('100'), consumed_at=self.now - timedelta(days=2))
+
+    def test_one_item_per_product_newest_first(self):
+        items = list(FoodItem.objects.latest_per_product())
+        self.assertEqual([i.product_name for i in items], ['Oats', 'Banana'])
+        self.assertEqual(items[0].calories, Decimal('350'))
+
+    def test_times_logged_annotation(self):
+        counts = {i.product_name: i.times_logged for i in FoodItem.objects.latest_per_product()}
+        self.assertEqual(counts, {'Oats': 2, 'Banana': 1})
+
+    def test_prior_filters_are_respected(self):
+        FoodItem.objects.create(
+            product_name='Oats', calories=Decimal('999'), consumed_at=self.now, hide_from_quick_list=True
+        )
+        items = list(FoodItem.objects.filter(hide_from_quick_list=False).latest_per_product())
+        oats = next(i for i in items if i.product_name == 'Oats')
+        self.assertEqual(oats.calories, Decimal('350'))
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            list(FoodItem.objects.latest_per_product())
+
+
+class QuickAddQueryCountTestCase(TestCase):
+    """Quick-add lists must not issue a query per distinct product."""
+
+    def create_products(self, start, count):
+        now = timezone.now()
+        FoodItem.objects.bulk_create([
+            FoodItem(product_name=f'Product {n}', calories=Decimal('100'), consumed_at=now - timedelta(minutes=n))
+            for n in range(start, start + count)
+        ])
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_food_tracker_query_count_is_constant(self):
+        url = reverse('food_tracker')
+        self.create_products(0, 3)
+        self.client.get(url)  # first render creates one-off rows (e.g. settings)
+        few, response = self.count_queries(url)
+        self.assertEqual(len(response.context['recent_items']), 3)
+
+        self.create_products(3, 60)
+        many, response = self.count_queries(url)
+        self.assertEqual(len(response.context['recent_items']), 63)
+        self.assertEqual(many, few)
+
+    def test_api_quick_add_single_query(self):
+        self.create_products(0, 40)
+        queries, _ = self.count_queries(reverse('api_quick_add_foods'))
+        self.assertEqual(queries, 2)  # ETag validator lookup + the quick-add query
+
+
+class QuickAddAPITestCase(TestCase):
+    """Test cases for the React quick-add endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        now = timezone.now()
+        for days_ago, calories in [(5, '200'), (4, '220'), (1, '250')]:
+            FoodItem.objects.create(
+                product_name='Yogurt', calories=Decimal(calories), protein=Decimal('10'),
+                consumed_at=now - timedelta(days=days_ago)
+            )
+        FoodItem.objects.create(product_name='Apple', calories=Decimal('80'), consumed_at=now)
+        FoodItem.objects.create(product_name='Secret', calories=Decimal('500'), consumed_at=now, hide_from_quick_list=True)
+
+    def test_ordered_by_frequency_with_latest_values(self):
+        response = self.client.get(reverse('api_quick_add_foods'))
+        foods = json.loads(response.content)['foods']
+
+        self.assertEqual([f['name'] for f in foods], ['Yogurt', 'Apple'])
+        self.assertEqual(foods[0]['calories'], 250)
+        self.assertEqual(foods[0]['protein'], 10.0)
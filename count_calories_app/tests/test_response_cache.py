@@ -0,0 +1,157 @@
+"""
+Tests for the analytics response cache.
+
+Tests cover:
+- DataVersion tokens changing on saves, deletes and FoodItem.bulk_create
+- Cached API responses being served without touching the data tables
+- Invalidation when a dependent model is written, but not an unrelated one
+- Query parameters being part of the key
+- Template views caching their context while still rendering the template
+- Conditional GETs answering 304 Not Modified until the data changes
+"""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import BodyMeasurement, DataVersion, FoodItem, Weight
+
+
+class DataVersionTestCase(TestCase):
+    """Test cases for DataVersion tokens."""
+
+    def token(self, model):
+        return DataVersion.tokens([model])[model._meta.label_lower]
+
+    def test_unwritten_model_has_empty_token(self):
+        self.assertEqual(self.token(Weight), '')
+
+    def test_save_and_delete_replace_token(self):
+        weight = Weight.objects.create(weight=Decimal('80'))
+        after_save = self.token(Weight)
+        self.assertNotEqual(after_save, '')
+
+        weight.delete()
+        self.assertNotEqual(self.token(Weight), after_save)
+
+    def test_bulk_create_replaces_token(self):
+        before = self.token(FoodItem)
+        FoodItem.objects.bulk_create([FoodItem(product_name='Oats', calories=Decimal('100'))])
+        self.assertNotEqual(self.token(FoodItem), before)
+
+
+class ResponseCacheTestCase(TestCase):
+    """Cached analytics endpoints and their invalidation."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        FoodItem.objects.create(
+            product_name='Oats', calories=Decimal('2000'), consumed_at=timezone.now() - timedelta(days=1)
+        )
+
+    def get(self, name, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse(name), params or {})
+        self.assertEqual(response.status_code, 200)
+        tables = ' '.join(q['sql'] for q in ctx.captured_queries)
+        return response, tables
+
+    def test_second_request_is_served_from_cache(self):
+        first, _ = self.get('api_yearly_trends')
+        second, tables = self.get('api_yearly_trends')
+
+        self.assertEqual(first.content, second.content)
+        self.assertNotIn('count_calories_app_dailynutrition', tables)
+        self.assertIn('count_calories_app_dataversion', tables)
+
+    def test_write_to_dependency_invalidates(self):
+        month = timezone.localdate().strftime('%Y-%m')
+        params = {'month_a': month, 'month_b': month}
+        before = json.loads(self.get('api_month_compare', params)[0].content)
+
+        FoodItem.objects.create(product_name='Rice', calories=Decimal('500'))
+        after, tables = self.get('api_month_compare', params)
+
+        self.assertIn('count_calories_app_dailynutrition', tables)
+        self.assertNotEqual(before, json.loads(after.content))
+
+    def test_unrelated_write_keeps_cache(self):
+        self.get('api_yearly_trends')
+        BodyMeasurement.objects.create(neck=Decimal('40'))
+        _, tables = self.get('api_yearly_trends')
+        self.assertNotIn('count_calories_app_dailynutrition', tables)
+
+    def test_query_params_are_part_of_key(self):
+        self.get('api_analytics', {'period': '30'})
+        _, tables = self.get('api_analytics', {'period': '90'})
+        self.assertIn('count_calories_app_dailynutrition', tables)
+
+    def test_template_view_renders_cached_context(self):
+        self.get('analytics')
+        response, tables = self.get('analytics')
+
+        self.assertNotIn('count_calories_app_dailynutrition', tables)
+        self.assertTemplateUsed(response, 'count_calories_app/analytics.html')
+        self.assertIn('overall_stats', response.context)
+
+    def test_disabled_by_zero_timeout(self):
+        with self.settings(RESPONSE_CACHE_TIMEOUT=0):
+            self.get('month_trends')
+            _, tables = self.get('month_trends')
+        self.assertIn('count_calories_app_dailynutrition', tables)
+
+
+class ConditionalGetTestCase(TestCase):
+    """ETag / Last-Modified handling on the React read endpoints."""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('api_dashboard')
+        FoodItem.objects.create(product_name='Oats', calories=Decimal('300'))
+
+    def test_response_carries_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_matching_etag_returns_304_with_one_query(self):
+        self.client.get(self.url)  # first request creates the settings row
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_write_changes_etag(self):
+        self.client.get(self.url)
+        etag = self.client.get(self.url)['ETag']
+        Weight.objects.create(weight=Decimal('80'))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unrelated_write_keeps_etag(self):
+        url = reverse('api_food_items')
+        etag = self.client.get(url)['ETag']
+        Weight.objects.create(weight=Decimal('80'))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_query_string_changes_etag(self):
+        url = reverse('api_food_items')
+        self.assertNotEqual(self.client.get(url)['ETag'], self.client.get(url, {'days': '30'})['ETag'])
+
+    def test_if_modified_since(self):
+        url = reverse('api_workouts')
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
@@ -0,0 +1,134 @@
+"""
+Tests for the running analytics engine.
+
+Tests cover:
+- Pace, speed and calorie series, with runs that have no distance or duration
+- Stats: totals, averages, longest run, fastest pace and pace improvement
+- Weekly and monthly distance grouped in the database
+- Fastest and slowest runs on the tracker page, and get_running_data filters
+- Query count independent of the number of sessions (benchmark)
+"""
+
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import RunningSession
+from count_calories_app.running_analytics import RunningSeries, min_distance_param, running_sessions
+
+
+def run(day, distance, minutes):
+    return RunningSession.objects.create(
+        date=timezone.make_aware(datetime(day.year, day.month, day.day, 12)),
+        distance=Decimal(distance), duration=timedelta(minutes=minutes),
+    )
+
+
+class RunningSeriesTestCase(TestCase):
+    """The engine on a handful of runs."""
+
+    def setUp(self):
+        # Two runs in the week of Monday 2024-04-01, two in the week of Monday 2024-05-06
+        run(datetime(2024, 4, 1), '5', 30)
+        run(datetime(2024, 4, 3), '10', 50)
+        run(datetime(2024, 5, 6), '4', 0)
+        run(datetime(2024, 5, 7), '0', 20)
+
+    def test_series(self):
+        series = RunningSeries(RunningSession.objects.all())
+
+        self.assertEqual(series.distance.tolist(), [5, 10, 4, 0])
+        self.assertEqual(series.pace.tolist(), [6, 5, 0, 0])
+        self.assertEqual(series.speed.tolist(), [10, 12, 0, 0])
+        self.assertEqual(series.calories.tolist(), [300, 600, 240, 0])
+        self.assertEqual(series.speed_extremes(), (1, 3))
+
+    def test_stats(self):
+        stats = RunningSeries(RunningSession.objects.all()).stats()
+
+        self.assertEqual(stats['total_sessions'], 4)
+        self.assertEqual(stats['total_distance'], 19)
+        self.assertEqual(stats['avg_duration'], 25)
+        self.assertAlmostEqual(stats['avg_speed'], 19 / (100 / 60))
+        self.assertEqual(stats['longest_run'], 10)
+        self.assertEqual(stats['fastest_pace'], 0)
+        self.assertEqual(stats['weekly_distance'], 9.5)
+        self.assertEqual(stats['monthly_distance'], 9.5)
+        # First and last paced runs: 6 -> 0 min/km is a 100% improvement
+        self.assertEqual(stats['pace_improvement'], 100)
+
+    def test_weekly_and_monthly_distance(self):
+        series = RunningSeries(running_sessions(min_distance=1))
+
+        self.assertEqual(series.weekly_distance.tolist(), [15, 4])
+        self.assertEqual(sorted(series.monthly_distance.tolist()), [4, 15])
+
+    def test_empty(self):
+        series = RunningSeries(RunningSession.objects.none())
+
+        self.assertEqual(series.stats()['total_sessions'], 0)
+        self.assertEqual(series.speed_extremes(), (None, None))
+        self.assertEqual(series.chart_data()['labels'], [])
+
+    def test_min_distance_param(self):
+        self.assertEqual(min_distance_param({'min_distance': '5.5'}), 5.5)
+        self.assertEqual(min_distance_param({'min_distance': 'far'}), 3)
+        self.assertEqual(min_distance_param({}), 3)
+
+
+class RunningViewsTestCase(TestCase):
+    """The tracker page and the chart endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        today = timezone.localdate()
+        self.slow = run(today - timedelta(days=3), '5', 40)
+        self.fast = run(today - timedelta(days=2), '6', 30)
+        self.short = run(today - timedelta(days=1), '2', 8)
+        run(today - timedelta(days=200), '8', 48)
+
+    def test_tracker_extremes(self):
+        context = self.client.get(reverse('running_tracker')).context
+
+        self.assertEqual(context['highest_speed_session']['session'], self.fast)
+        self.assertEqual(context['highest_speed_session']['speed'], 12.0)
+        self.assertEqual(context['lowest_speed_session']['session'], self.slow)
+        self.assertEqual([data['speed'] for data in context['running_sessions']], [12.0, 7.5, 10.0])
+
+    def test_running_data(self):
+        data = json.loads(self.client.get(reverse('running_data')).content)
+        self.assertEqual(data['distances'], [5.0, 6.0])
+        self.assertEqual(data['paces'], [8.0, 5.0])
+
+        data = json.loads(self.client.get(reverse('running_data'), {'days': 'all', 'min_distance': '1'}).content)
+        self.assertEqual(data['stats']['total_sessions'], 4)
+        self.assertEqual(data['stats']['longest_run'], 8.0)
+
+
+class RunningAnalyticsBenchmarkTestCase(TestCase):
+    """The same queries for 5 sessions as for 300."""
+
+    def populate(self, first, last):
+        now = timezone.now()
+        RunningSession.objects.bulk_create([
+            RunningSession(date=now - timedelta(days=n), distance=Decimal('5'), duration=timedelta(minutes=25 + n % 10))
+            for n in range(first, last)
+        ])
+
+    def test_query_count_flat_as_sessions_grow(self):
+        self.populate(1, 6)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(reverse('running_data'), {'days': 'all'})
+
+        self.populate(6, 300)
+        with CaptureQueriesContext(connection) as many:
+            data = json.loads(self.client.get(reverse('running_data'), {'days': 'all'}).content)
+
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+        self.assertEqual(data['stats']['total_sessions'], 299)
@@ -0,0 +1,158 @@
+"""
+Tests for the stored running metrics and the personal-best leaderboard.
+
+Tests cover:
+- Pace, speed, calorie estimate and distance bucket set on create, update,
+  bulk_create and through api_add_running
+- Distance bucket boundaries
+- Fastest runs per bucket and longest runs, with ties and the bucket filter
+- api_running_personal_bests output and validation
+- api_running_items reading the stored speed, pace and bucket
+- Query count independent of the number of sessions (benchmark)
+"""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import RunningSession
+from count_calories_app.running_analytics import MAX_LEADERBOARD_SIZE, personal_bests
+
+
+def run(distance, minutes, days_ago=0):
+    return RunningSession.objects.create(
+        date=timezone.now() - timedelta(days=days_ago),
+        distance=Decimal(distance), duration=timedelta(minutes=minutes),
+    )
+
+
+class DerivedMetricsTestCase(TestCase):
+    """The columns kept in step with distance and duration."""
+
+    def test_create_and_update(self):
+        session = run('10', 50)
+        session.refresh_from_db()
+        self.assertEqual(session.pace_seconds, 300)
+        self.assertEqual(session.speed_kmh, 12)
+        self.assertEqual(session.calories_estimate, 600)
+        self.assertEqual(session.distance_bucket, '10k')
+
+        session.distance = Decimal('4')
+        session.duration = timedelta(0)
+        session.save()
+        session.refresh_from_db()
+        self.assertEqual(session.pace_seconds, 0)
+        self.assertEqual(session.speed_kmh, 0)
+        self.assertEqual(session.distance_bucket, '')
+
+    def test_zero_distance_has_no_pace(self):
+        self.assertIsNone(run('0', 20).pace_seconds)
+
+    def test_bulk_create(self):
+        RunningSession.objects.bulk_create([
+            RunningSession(distance=Decimal('21.1'), duration=timedelta(hours=2)),
+            RunningSession(distance=Decimal('5'), duration=timedelta(minutes=25)),
+        ])
+        self.assertEqual(
+            list(RunningSession.objects.order_by('distance').values_list('distance_bucket', 'speed_kmh')),
+            [('5k', 12.0), ('half', 10.55)],
+        )
+
+    def test_api_add_running(self):
+        response = self.client.post(
+            reverse('api_add_running'), json.dumps({'date': timezone.now().isoformat(), 'distance': '6', 'duration': '00:30:00'}),
+            content_type='application/json',
+        )
+        session = RunningSession.objects.get(pk=json.loads(response.content)['id'])
+        self.assertEqual(session.pace_seconds, 300)
+        self.assertEqual(session.distance_bucket, '5k')
+
+    def test_bucket_boundaries(self):
+        cases = {4.99: '', 5: '5k', 9.99: '5k', 10: '10k', 21.0975: 'half', 42.2: 'marathon'}
+        for distance, bucket in cases.items():
+            self.assertEqual(RunningSession.bucket_for(distance), bucket, distance)
+
+
+class PersonalBestsTestCase(TestCase):
+    """The leaderboards and their endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('api_running_personal_bests')
+        self.slow_5k = run('5', 30, days_ago=3)
+        self.fast_5k = run('5.5', 25, days_ago=2)
+        self.tied_5k = run('5', 30, days_ago=1)
+        self.ten_k = run('10', 55, days_ago=4)
+        self.short = run('3', 12, days_ago=5)
+
+    def test_fastest_per_bucket(self):
+        bests = personal_bests(limit=2)
+        by_bucket = {board['bucket']: board['runs'] for board in bests['buckets']}
+
+        self.assertEqual([board['bucket'] for board in bests['buckets']], ['marathon', 'half', '10k', '5k'])
+        # Equal pace: the earlier run ranks first
+        self.assertEqual(by_bucket['5k'], [self.fast_5k, self.slow_5k])
+        self.assertEqual(by_bucket['10k'], [self.ten_k])
+        self.assertEqual(by_bucket['half'], [])
+        self.assertEqual(bests['longest'], [self.ten_k, self.fast_5k])
+
+    def test_bucket_filter(self):
+        bests = personal_bests(limit=5, buckets=['5k'])
+        self.assertEqual([board['bucket'] for board in bests['buckets']], ['5k'])
+        self.assertEqual(len(bests['buckets'][0]['runs']), 3)
+
+    def test_api(self):
+        data = json.loads(self.client.get(self.url, {'limit': 1, 'bucket': ['5k', '10k']}).content)
+
+        self.assertEqual([board['label'] for board in data['buckets']], ['10K', '5K'])
+        fastest = data['buckets'][1]['runs'][0]
+        self.assertEqual(fastest['id'], self.fast_5k.id)
+        self.assertEqual(fastest['pace'], '4:32')
+        self.assertEqual(fastest['distance_bucket'], '5k')
+        self.assertEqual([item['id'] for item in data['longest']], [self.ten_k.id])
+
+    def test_api_validation(self):
+        self.assertEqual(self.client.get(self.url, {'limit': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'limit': 0}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'limit': MAX_LEADERBOARD_SIZE + 1}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'bucket': 'ultra'}).status_code, 400)
+
+    def test_running_items_use_stored_metrics(self):
+        RunningSession.objects.filter(pk=self.ten_k.pk).update(speed_kmh=99)
+        items = json.loads(self.client.get(reverse('api_running_items')).content)['items']
+
+        ten_k = next(item for item in items if item['id'] == self.ten_k.id)
+        self.assertEqual(ten_k['speed'], 99)
+        self.assertEqual(ten_k['pace'], '5:30')
+        self.assertEqual(ten_k['distance_bucket'], '10k')
+
+
+class PersonalBestsBenchmarkTestCase(TestCase):
+    """The same queries for 10 sessions as for 400."""
+
+    def populate(self, first, last):
+        now = timezone.now()
+        RunningSession.objects.bulk_create([
+            RunningSession(date=now - timedelta(days=n), distance=Decimal(3 + n % 40),
+                           duration=timedelta(minutes=20 + n % 200))
+            for n in range(first, last)
+        ])
+
+    def test_query_count_flat_as_sessions_grow(self):
+        url = reverse('api_running_personal_bests')
+        self.populate(0, 10)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+
+        self.populate(10, 400)
+        with CaptureQueriesContext(connection) as many:
+            data = json.loads(self.client.get(url, {'limit': 10}).content)
+
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+        self.assertEqual(len(data['longest']), 10)
@@ -0,0 +1,261 @@
+"""
+Tests for importing GPX and TCX tracks into running sessions.
+
+Tests cover:
+- Streaming GPX and TCX points, with namespaces and incomplete points skipped
+- Distance, moving time, elevation gain and per-km splits
+- Packing the points into a float32 blob and reading them back
+- Rejecting malformed, empty and backwards tracks, and skipping points with
+  non-finite or out-of-range coordinates or elevation
+- The upload endpoint and the tracker page import, with splits exposed by
+  api_running_items
+- Query count independent of the number of track points (benchmark)
+"""
+
+import io
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from count_calories_app.models import RunningSession, RunningTrack
+from count_calories_app.tracks import (
+    TrackError, import_track, km_splits, pack_points, parse_track, summarise_track, unpack_points,
+)
+
+START = datetime(2024, 6, 1, 6, 0, tzinfo=dt_timezone.utc)
+# Metres per 0.001 degree of latitude along a meridian
+STEP_M = np.radians(0.001) * 6371008.8
+
+
+def gpx(points, name='Morning run'):
+    """GPX 1.1 document with one segment of (lat, lon, elevation, seconds) points."""
+    rows = ''.join(
+        f'<trkpt lat="{lat:.6f}" lon="{lon:.6f}">'
+        + (f'<ele>{ele}</ele>' if ele is not None else '')
+        + f'<time>{(START + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%SZ")}</time></trkpt>'
+        for lat, lon, ele, seconds in points
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1">'
+        f'<trk><name>{name}</name><trkseg>{rows}</trkseg></trk></gpx>'
+    ).encode()
+
+
+def northward(count, seconds_per_point=30, elevation=None, step=0.001):
+    """``count`` points ``step`` degrees of latitude apart, one every ``seconds_per_point``."""
+    return [
+        (54.0 + n * step, 25.0, elevation(n) if elevation else None, n * seconds_per_point)
+        for n in range(count)
+    ]
+
+
+class ParseTrackTestCase(TestCase):
+    """Streaming the points out of the XML."""
+
+    def test_gpx(self):
+        points = northward(4, elevation=lambda n: 100 + n)
+        source_format, lat, lon, elevation, timestamps = parse_track(io.BytesIO(gpx(points)))
+
+        self.assertEqual(source_format, RunningTrack.GPX)
+        self.assertEqual(lat.tolist(), [54.0, 54.001, 54.002, 54.003])
+        self.assertEqual(elevation.tolist(), [100, 101, 102, 103])
+        self.assertEqual((timestamps - timestamps[0]).tolist(), [0, 30, 60, 90])
+
+    def test_tcx_skips_points_without_position(self):
+        trackpoint = (
+            '<Trackpoint><Time>2024-06-01T06:00:{s:02d}Z</Time>{position}'
+            '<AltitudeMeters>50.5</AltitudeMeters></Trackpoint>'
+        )
+        position = '<Position><LatitudeDegrees>{lat}</LatitudeDegrees><LongitudeDegrees>25</LongitudeDegrees></Position>'
+        points = [
+            trackpoint.format(s=0, position=position.format(lat=54.0)),
+            trackpoint.format(s=5, position=''),
+            trackpoint.format(s=10, position=position.format(lat=54.001)),
+        ]
+        document = (
+            '<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">'
+            '<Activities><Activity Sport="Running"><Id>2024-06-01T06:00:00Z</Id><Lap StartTime="2024-06-01T06:00:00Z">'
+            f'<Track>{"".join(points)}</Track></Lap></Activity></Activities></TrainingCenterDatabase>'
+        ).encode()
+
+        source_format, lat, lon, elevation, timestamps = parse_track(io.BytesIO(document))
+
+        self.assertEqual(source_format, RunningTrack.TCX)
+        self.assertEqual(lat.tolist(), [54.0, 54.001])
+        self.assertEqual(lon.tolist(), [25.0, 25.0])
+        self.assertEqual(elevation.tolist(), [50.5, 50.5])
+        self.assertEqual(timestamps[1] - timestamps[0], 10)
+
+    def test_invalid_files(self):
+        with self.assertRaises(TrackError):
+            parse_track(io.BytesIO(b'<gpx><trk>'))
+        with self.assertRaises(TrackError):
+            parse_track(io.BytesIO(b'<kml></kml>'))
+        with self.assertRaises(TrackError):
+            parse_track(io.BytesIO(gpx(northward(1))))
+
+
+class TrackSummaryTestCase(TestCase):
+    """Figures computed from the point arrays."""
+
+    def arrays(self, points):
+        return parse_track(io.BytesIO(gpx(points)))[1:]
+
+    def test_distance_moving_time_and_splits(self):
+        # 20 steps of ~111 m every 30 s, then a 5 minute pause, then 10 more steps
+        points = northward(21)
+        points += [(lat, lon, None, seconds + 300) for lat, lon, _, seconds in northward(31)[21:]]
+        points.insert(21, (points[20][0], 25.0, None, points[20][3] + 300))
+        summary = summarise_track(*self.arrays(points))
+
+        self.assertAlmostEqual(summary['distance_km'], 30 * STEP_M / 1000, places=3)
+        self.assertEqual(summary['elapsed_seconds'], 30 * 30 + 300)
+        self.assertEqual(summary['moving_seconds'], 30 * 30)
+        self.assertIsNone(summary['elevation_gain'])
+
+        splits = summary['splits']
+        self.assertEqual([split['km'] for split in splits], [1, 2, 3, 4])
+        self.assertEqual([split['distance'] for split in splits[:3]], [1.0, 1.0, 1.0])
+        # 1000 m at 30 s per STEP_M metres
+        self.assertAlmostEqual(splits[0]['seconds'], 1000 / STEP_M * 30, places=0)
+        # The pause falls in the third kilometre
+        self.assertAlmostEqual(splits[2]['seconds'], 1000 / STEP_M * 30 + 300, places=0)
+        self.assertAlmostEqual(sum(split['seconds'] for split in splits), 1200, places=0)
+
+    def test_elevation_gain_is_smoothed(self):
+        # A steady 1 m climb per point with +-3 m of alternating noise
+        points = northward(41, elevation=lambda n: 100 + n + (3 if n % 2 else -3))
+        gain = summarise_track(*self.arrays(points))['elevation_gain']
+
+        # The raw profile climbs 7 m on every other point: 140 m in all
+        self.assertGreater(gain, 35)
+        self.assertLess(gain, 45)
+
+    def test_splits_for_short_track(self):
+        splits = km_splits(np.array([0.0, 400.0, 400.0, 700.0]), np.array([0.0, 100.0, 160.0, 220.0]))
+        self.assertEqual(splits, [{'km': 1, 'distance': 0.7, 'seconds': 220.0, 'pace_seconds': 314.3}])
+
+    def test_pack_round_trip(self):
+        lat, lon, elevation, timestamps = self.arrays(northward(5, elevation=lambda n: 10.5 * n))
+        blob = pack_points(lat, lon, elevation, timestamps)
+        self.assertEqual(len(blob), 5 * 4 * 4)
+
+        lat2, lon2, elevation2, elapsed = unpack_points(blob)
+        np.testing.assert_allclose(lat2, lat, atol=1e-5)
+        np.testing.assert_allclose(elevation2, elevation)
+        self.assertEqual(elapsed.tolist(), [0, 30, 60, 90, 120])
+
+
+class ImportTrackTestCase(TestCase):
+    """Sessions created from uploaded tracks."""
+
+    def setUp(self):
+        self.client = Client()
+
+    def upload(self, content, name='run.gpx'):
+        return SimpleUploadedFile(name, content, content_type='application/gpx+xml')
+
+    def test_import_track(self):
+        session = import_track(io.BytesIO(gpx(northward(46, elevation=lambda n: 100 + n))), notes='Park')
+
+        session.refresh_from_db()
+        self.assertEqual(session.date, START)
+        self.assertEqual(float(session.distance), round(45 * STEP_M / 1000, 2))
+        self.assertEqual(session.duration, timedelta(seconds=45 * 30))
+        self.assertEqual(session.moving_duration, session.duration)
+        # 5003.8 m: the last 3.8 m get no split of their own
+        self.assertEqual(len(session.splits), 5)
+        self.assertEqual(session.distance_bucket, '5k')
+        self.assertEqual(session.notes, 'Park')
+        self.assertEqual(session.track.point_count, 46)
+        self.assertEqual(session.track.point_arrays()[3][-1], 45 * 30)
+
+    def test_rejects_backwards_time_and_overlong_tracks(self):
+        points = northward(3)
+        points[2] = (*points[2][:3], 10)
+        with self.assertRaises(TrackError):
+            import_track(io.BytesIO(gpx(points)))
+        with self.assertRaises(TrackError):
+            import_track(io.BytesIO(gpx(northward(2, step=10))))
+        self.assertFalse(RunningSession.objects.exists())
+
+    def test_api_import(self):
+        response = self.client.post(
+            reverse('api_import_running_track'), {'file': self.upload(gpx(northward(10))), 'notes': 'Short'},
+        )
+        data = json.loads(response.content)
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['item']['notes'], 'Short')
+        self.assertEqual(len(data['item']['splits']), 1)
+
+        items = json.loads(self.client.get(reverse('api_running_items'), {'days': 'all'}).content)['items']
+        self.assertEqual(items[0]['splits'], data['item']['splits'])
+        self.assertEqual(items[0]['moving_minutes'], 4.5)
+
+    def test_api_import_errors(self):
+        url = reverse('api_import_running_track')
+        self.assertEqual(self.client.post(url).status_code, 400)
+        response = self.client.post(url, {'file': self.upload(b'not xml')})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Not a valid', json.loads(response.content)['error'])
+
+    def test_api_import_bad_values(self):
+        def strict_json(response):
+            # NaN and Infinity are not JSON; the React client cannot parse them
+            return json.loads(response.content, parse_constant=lambda constant: self.fail(constant))
+
+        url = reverse('api_import_running_track')
+        bad_points = [
+            (float('nan'), 25.0, None, 45),
+            (54.0, float('inf'), None, 45),
+            (95.0, 25.0, None, 45),
+            (54.0, -181.0, None, 45),
+        ]
+        for bad in bad_points:
+            points = northward(4)
+            points.insert(2, bad)
+            response = self.client.post(url, {'file': self.upload(gpx(points))})
+            self.assertEqual(response.status_code, 200, bad)
+            self.assertAlmostEqual(strict_json(response)['item']['distance'], 3 * STEP_M / 1000, places=2)
+
+        only_bad = [(float('nan'), 25.0, None, 0), (95.0, 25.0, None, 30)]
+        response = self.client.post(url, {'file': self.upload(gpx(only_bad))})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(url, {'file': self.upload(gpx(northward(4, elevation=lambda n: '1e999')))})
+        self.assertIsNone(strict_json(response)['item']['elevation_gain'])
+        strict_json(self.client.get(reverse('api_running_items'), {'days': 'all'}))
+        self.assertEqual(RunningSession.objects.count(), len(bad_points) + 1)
+
+    def test_tracker_page_import(self):
+        response = self.client.post(reverse('import_running_track'), {'file': self.upload(gpx(northward(10)))})
+
+        self.assertRedirects(response, reverse('running_tracker'))
+        self.assertEqual(RunningTrack.objects.count(), 1)
+        page = self.client.get(reverse('running_tracker'), {'min_distance': 0})
+        self.assertContains(page, 'moving 0:04:30')
+
+
+class TrackImportBenchmarkTestCase(TestCase):
+    """Importing and listing cost the same queries for 50 points as for 20,000."""
+
+    def test_query_count_flat_as_points_grow(self):
+        import_track(io.BytesIO(gpx(northward(2))))
+        counts = []
+        for size in (50, 20000):
+            with CaptureQueriesContext(connection) as ctx:
+                import_track(io.BytesIO(gpx(northward(size, seconds_per_point=1, step=0.00002))))
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('api_running_items'), {'days': 'all'})
+        self.assertFalse(any('"points"' in query['sql'] for query in ctx.captured_queries))
@@ -0,0 +1,142 @@
+"""
+Tests for the full-text food name search.
+
+Tests cover:
+- The name table and FTS index following FoodItem inserts, renames, deletes
+  and bulk creates through the database triggers
+- Prefix and multi-word matching, ignoring case and Lithuanian diacritics
+- Ranking by how often a product was logged
+- FoodItemQuerySet.search() and the views built on it
+- Search query count not depending on the number of FoodItem rows
+"""
+
+import json
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app import search
+from count_calories_app.models import FoodItem
+
+
+def log(name, times=1, calories='100'):
+    for _ in range(times):
+        FoodItem.objects.create(product_name=name, calories=Decimal(calories), consumed_at=timezone.now())
+
+
+def indexed_names():
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT product_name, times_logged FROM {search.NAMES_TABLE} ORDER BY product_name')
+        return dict(cursor.fetchall())
+
+
+@skipUnless(search.is_available(), 'The FTS5 index is SQLite only')
+class SearchIndexSyncTestCase(TestCase):
+    """The triggers keep the name table in step with FoodItem."""
+
+    def test_insert_counts_names(self):
+        log('Oats', 2)
+        log('Banana')
+        self.assertEqual(indexed_names(), {'Banana': 1, 'Oats': 2})
+
+    def test_rename_moves_count(self):
+        log('Oats', 2)
+        item = FoodItem.objects.first()
+        item.product_name = 'Porridge'
+        item.save()
+        self.assertEqual(indexed_names(), {'Oats': 1, 'Porridge': 1})
+        self.assertEqual(search.search_product_names('porr'), ['Porridge'])
+
+    def test_delete_removes_unused_names(self):
+        log('Oats')
+        FoodItem.objects.all().delete()
+        self.assertEqual(indexed_names(), {})
+        self.assertEqual(search.search_product_names('oats'), [])
+
+    def test_bulk_create(self):
+        FoodItem.objects.bulk_create([FoodItem(product_name='Kefir', calories=Decimal('60')) for _ in range(3)])
+        self.assertEqual(indexed_names(), {'Kefir': 3})
+
+    def test_rebuild_command(self):
+        log('Oats')
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.NAMES_TABLE}')
+        out = StringIO()
+        call_command('rebuild_food_search', stdout=out)
+        self.assertIn('Indexed 1 distinct food name(s).', out.getvalue())
+        self.assertEqual(search.search_product_names('oat'), ['Oats'])
+
+
+@skipUnless(search.is_available(), 'The FTS5 index is SQLite only')
+class SearchMatchingTestCase(TestCase):
+    """Matching and ranking rules."""
+
+    def setUp(self):
+        log('Itališkas vištienos maltinukas', 2)
+        log('Šaltibarščiai')
+        log('Apple Juice', 1)
+        log('Apple', 5)
+        log('Pineapple')
+
+    def test_prefix_and_case(self):
+        self.assertEqual(search.search_product_names('APP'), ['Apple', 'Apple Juice'])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(search.search_product_names('app jui'), ['Apple Juice'])
+
+    def test_diacritics_ignored_both_ways(self):
+        self.assertEqual(search.search_product_names('italiskas vistienos'), ['Itališkas vištienos maltinukas'])
+        self.assertEqual(search.search_product_names('šaltibar'), ['Šaltibarščiai'])
+        self.assertEqual(search.search_product_names('saltibarsciai'), ['Šaltibarščiai'])
+
+    def test_punctuation_only_query(self):
+        self.assertEqual(search.search_product_names('" * ('), [])
+        self.assertFalse(FoodItem.objects.search('"').exists())
+
+    def test_quotes_in_query_are_safe(self):
+        self.assertEqual(search.search_product_names('"apple" OR'), [])
+
+    def test_queryset_search(self):
+        self.assertEqual(FoodItem.objects.search('maltinukas').count(), 2)
+
+
+@skipUnless(search.is_available(), 'The FTS5 index is SQLite only')
+class SearchViewsTestCase(TestCase):
+    """Views using the full-text index."""
+
+    def setUp(self):
+        self.client = Client()
+        log('Apple', 3, calories='95')
+        log('Apple Juice', 1, calories='120')
+        log('Banana')
+
+    def test_autocomplete_ranked(self):
+        data = json.loads(self.client.get(reverse('food_autocomplete'), {'q': 'app'}).content)
+        self.assertEqual(data['suggestions'], ['Apple', 'Apple Juice'])
+
+    def test_search_all_foods_aggregates_matches(self):
+        data = json.loads(self.client.get(reverse('api_search_all_foods'), {'q': 'apple'}).content)
+        self.assertEqual([r['name'] for r in data['results']], ['Apple', 'Apple Juice'])
+        self.assertEqual(data['results'][0]['count'], 3)
+        self.assertEqual(data['results'][0]['calories'], 95)
+
+    def test_top_foods_search(self):
+        response = self.client.get(reverse('top_foods'), {'q': 'juice', 'days': 'all'})
+        names = [row['product_name'] for row in response.context['top_foods_page']]
+        self.assertEqual(names, ['Apple Juice'])
+
+    def test_query_count_independent_of_rows(self):
+        url = reverse('api_search_all_foods')
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url, {'q': 'app'})
+        FoodItem.objects.bulk_create([FoodItem(product_name=f'Other {n}', calories=Decimal('10')) for n in range(300)])
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(url, {'q': 'app'})
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
@@ -0,0 +1,137 @@
+"""
+Tests for the shared logging-streak engine.
+
+Tests cover:
+- Current/longest streak and consistency calculations
+- Dashboard and analytics views reporting identical streaks
+- Query count staying flat as the streak grows (benchmark)
+"""
+
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import FoodItem
+from count_calories_app.streaks import compute_streaks, logging_streaks
+
+
+def log_days(day_offsets):
+    """Log one food item at local noon for each day offset back from today."""
+    today = timezone.localdate()
+    FoodItem.objects.bulk_create([
+        FoodItem(
+            product_name=f'Food {offset}',
+            calories=Decimal('1500'),
+            consumed_at=timezone.make_aware(datetime.combine(today - timedelta(days=offset), time(12, 0))),
+        )
+        for offset in day_offsets
+    ])
+
+
+class ComputeStreaksTestCase(TestCase):
+    """Pure streak calculations."""
+
+    def setUp(self):
+        self.today = date(2026, 3, 15)
+
+    def days(self, *offsets):
+        return sorted(self.today - timedelta(days=o) for o in offsets)
+
+    def test_empty_history(self):
+        stats = compute_streaks([], self.today)
+        self.assertEqual(stats['current_streak'], 0)
+        self.assertEqual(stats['longest_streak'], 0)
+        self.assertEqual(stats['total_days'], 0)
+        self.assertEqual(stats['consistency_rate'], 0)
+
+    def test_current_streak_ends_today(self):
+        stats = compute_streaks(self.days(0, 1, 2, 4), self.today)
+        self.assertEqual(stats['current_streak'], 3)
+
+    def test_current_streak_zero_when_today_not_logged(self):
+        stats = compute_streaks(self.days(1, 2, 3), self.today)
+        self.assertEqual(stats['current_streak'], 0)
+        self.assertEqual(stats['longest_streak'], 3)
+
+    def test_longest_streak(self):
+        stats = compute_streaks(self.days(0, 1, 2, 10, 11, 12, 13, 14, 15), self.today)
+        self.assertEqual(stats['longest_streak'], 6)
+
+    def test_future_days_ignored(self):
+        stats = compute_streaks([self.today, self.today + timedelta(days=1)], self.today)
+        self.assertEqual(stats['current_streak'], 1)
+        self.assertEqual(stats['total_days'], 1)
+
+    def test_since_limits_period_stats_only(self):
+        stats = compute_streaks(self.days(*range(10)), self.today, since=self.today - timedelta(days=4))
+        self.assertEqual(stats['current_streak'], 10)
+        self.assertEqual(stats['total_days'], 5)
+        self.assertEqual(stats['consistency_rate'], 100.0)
+
+    def test_consistency_rate(self):
+        stats = compute_streaks(self.days(*range(0, 20, 2)), self.today)
+        self.assertEqual(stats['total_days'], 10)
+        self.assertEqual(stats['consistency_rate'], round(10 / 19 * 100, 1))
+
+
+class StreakConsistencyAcrossViewsTestCase(TestCase):
+    """home, api_dashboard, analytics and api_analytics agree on streaks."""
+
+    def setUp(self):
+        self.client = Client()
+        log_days([0, 1, 2, 3, 5, 6])
+
+    def test_all_views_report_same_current_streak(self):
+        home = self.client.get(reverse('home')).context['streak']
+        dashboard = json.loads(self.client.get(reverse('api_dashboard')).content)['streak']
+        analytics = self.client.get(reverse('analytics')).context['streaks']
+        api = json.loads(self.client.get(reverse('api_analytics')).content)['streaks']
+
+        self.assertEqual(home, 4)
+        self.assertEqual(dashboard, 4)
+        self.assertEqual(analytics['current_streak'], 4)
+        self.assertEqual(api['current_streak'], 4)
+        self.assertEqual(analytics['longest_streak'], api['longest_streak'])
+
+
+class StreakBenchmarkTestCase(TestCase):
+    """Streak cost must not grow with streak length."""
+
+    def measure(self):
+        with CaptureQueriesContext(connection) as ctx:
+            stats = logging_streaks()
+        return stats, len(ctx.captured_queries)
+
+    def test_query_count_flat_as_streak_grows(self):
+        log_days(range(5))
+        short_stats, short_queries = self.measure()
+
+        log_days(range(5, 400))
+        long_stats, long_queries = self.measure()
+
+        self.assertEqual(short_stats['current_streak'], 5)
+        self.assertEqual(long_stats['current_streak'], 400)
+        self.assertEqual(short_queries, 1)
+        self.assertEqual(long_queries, short_queries)
+
+    def test_dashboard_query_count_flat_as_streak_grows(self):
+        client = Client()
+        url = reverse('api_dashboard')
+
+        log_days(range(5))
+        client.get(url)  # create UserSettings so both requests run the same queries
+        with CaptureQueriesContext(connection) as short_ctx:
+            client.get(url)
+
+        log_days(range(5, 400))
+        with CaptureQueriesContext(connection) as long_ctx:
+            response = client.get(url)
+
+        self.assertEqual(json.loads(response.content)['streak'], 400)
+        self.assertEqual(len(long_ctx.captured_queries), len(short_ctx.captured_queries))
@@ -0,0 +1,91 @@
+"""
+Query-count regression tests for workout listing and export.
+
+Tests cover:
+- api_workouts using a constant number of queries for 1 and 1,000 sessions
+- Workout CSV and JSON exports using a constant number of queries
+- Session volume computed in the database
+"""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from count_calories_app.models import Exercise, WorkoutExercise, WorkoutSession
+
+
+class WorkoutQueryCountTestCase(TestCase):
+    """Workout list and export cost must not grow with the number of sessions."""
+
+    def setUp(self):
+        self.client = Client()
+        self.bench = Exercise.objects.create(name='Bench Press', muscle_group='Chest')
+        self.squat = Exercise.objects.create(name='Squat', muscle_group='Legs')
+
+    def create_sessions(self, count):
+        now = timezone.now()
+        sessions = WorkoutSession.objects.bulk_create([
+            WorkoutSession(name=f'Session {n}', date=now - timedelta(hours=n))
+            for n in range(count)
+        ])
+        WorkoutExercise.objects.bulk_create([
+            WorkoutExercise(workout=session, exercise=exercise, sets=3, reps=10, weight=weight)
+            for session in sessions
+            for exercise, weight in ((self.bench, Decimal('60')), (self.squat, None))
+        ])
+
+    def count_queries(self, url, params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+            # Streaming exports query the database while the body is consumed
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), body
+
+    def assert_constant(self, url, params):
+        self.create_sessions(1)
+        one, _ = self.count_queries(url, params)
+        self.create_sessions(999)
+        thousand, body = self.count_queries(url, params)
+        self.assertEqual(one, thousand)
+        return body
+
+    def test_api_workouts_constant_queries(self):
+        data = json.loads(self.assert_constant(reverse('api_workouts'), {'days': 'all'}))
+        self.assertEqual(data['stats']['total_workouts'], 1000)
+        self.assertEqual(data['stats']['total_exercises'], 2000)
+
+    def test_workout_csv_export_constant_queries(self):
+        self.assert_constant(reverse('export_data'), {'type': 'workout', 'format': 'csv'})
+
+    def test_full_json_export_constant_queries(self):
+        body = self.assert_constant(reverse('export_data'), {'type': 'all', 'format': 'json'})
+        self.assertEqual(len(json.loads(body)['workouts']), 1000)
+
+
+class WorkoutVolumeTestCase(TestCase):
+    """Session and exercise volume as returned by api_workouts."""
+
+    def test_volume_computed_per_exercise_and_session(self):
+        bench = Exercise.objects.create(name='Bench Press')
+        plank = Exercise.objects.create(name='Plank')
+        session = WorkoutSession.objects.create(name='Push', date=timezone.now())
+        WorkoutExercise.objects.create(workout=session, exercise=bench, sets=4, reps=8, weight=Decimal('62.5'))
+        WorkoutExercise.objects.create(workout=session, exercise=plank, sets=3, reps=1, weight=None)
+
+        response = Client().get(reverse('api_workouts'))
+        item = json.loads(response.content)['items'][0]
+
+        self.assertEqual(item['total_volume'], 2000.0)
+        self.assertEqual([e['volume'] for e in item['exercises']], [2000.0, 0])
+        self.assertEqual([e['exercise'] for e in item['exercises']], ['Bench Press', 'Plank'])
+
+    def test_session_without_exercises_has_zero_volume(self):
+        WorkoutSession.objects.create(name='Rest', date=timezone.now())
+        self.assertEqual(WorkoutSession.objects.with_total_volume().get().total_volume, 0.0)
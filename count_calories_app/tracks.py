@@ -0,0 +1,258 @@
+"""
+GPX and TCX track import for running sessions.
+
+Track files are read with ElementTree.iterparse: every track point is turned
+into numbers and dropped from the tree as soon as it is complete, so a 50 MB
+file never sits in memory as a document. The points are collected in compact
+typed arrays and stored on RunningTrack as one packed float32 blob instead of
+a row per point.
+
+Distance, per-km splits, elevation gain and moving time are computed with
+NumPy once, at import time, and cached on the RunningSession. The running
+endpoints read those cached values and never re-parse a track.
+
+The standard library parser does not fetch external entities, and expat
+limits entity expansion, so uploaded XML cannot reach the file system or the
+network.
+"""
+
+import math
+import xml.etree.ElementTree as ET
+from array import array
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+
+from .models import RunningSession, RunningTrack
+
+# Largest track file accepted, in bytes
+MAX_TRACK_BYTES = 64 * 1024 * 1024
+
+# RunningSession.distance holds up to 999.99 km
+MAX_DISTANCE_KM = 1000
+
+# Slower than this (m/s) between two points counts as standing still
+MOVING_SPEED = 0.5
+
+# Points averaged to smooth GPS elevation noise before summing the climbs
+ELEVATION_SMOOTHING = 5
+
+# A remainder after the last full kilometre shorter than this (m) gets no split
+MIN_SPLIT_M = 10
+
+EARTH_RADIUS_M = 6371008.8
+
+# Track point element and the child elements read from it, per format
+POINT_TAGS = {'trkpt': RunningTrack.GPX, 'Trackpoint': RunningTrack.TCX}
+LATITUDE_TAGS = {'LatitudeDegrees'}
+LONGITUDE_TAGS = {'LongitudeDegrees'}
+ELEVATION_TAGS = {'ele', 'AltitudeMeters'}
+TIME_TAGS = {'time', 'Time'}
+
+
+class TrackError(ValueError):
+    """The uploaded file is not a usable GPX or TCX track."""
+
+
+def _local(tag):
+    """Element name without its XML namespace."""
+    return tag.rpartition('}')[2]
+
+
+def _timestamp(text):
+    """Seconds since the epoch of an ISO 8601 time; times without a zone are UTC."""
+    moment = datetime.fromisoformat(text.strip())
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    return moment.timestamp()
+
+
+def _read_point(element):
+    """
+    (lat, lon, elevation or NaN, timestamp) of a track point, or None when it
+    is incomplete or its position is not a finite latitude and longitude.
+    A non-finite elevation counts as missing.
+    """
+    lat, lon = element.get('lat'), element.get('lon')
+    elevation = moment = None
+    for child in element.iter():
+        name = _local(child.tag)
+        if name in LATITUDE_TAGS:
+            lat = child.text
+        elif name in LONGITUDE_TAGS:
+            lon = child.text
+        elif name in ELEVATION_TAGS:
+            elevation = child.text
+        elif name in TIME_TAGS:
+            moment = child.text
+    if lat is None or lon is None or not moment:
+        return None
+    try:
+        lat, lon, moment = float(lat), float(lon), _timestamp(moment)
+        elevation = float(elevation) if elevation else math.nan
+    except ValueError:
+        return None
+    # Also false for NaN and infinity
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon, elevation if math.isfinite(elevation) else math.nan, moment
+
+
+def parse_track(source):
+    """
+    Stream the track points out of a GPX or TCX file (path or binary file object).
+
+    Returns (format, lat, lon, elevation, timestamps) with one float64 NumPy
+    array per column, in file order. Points without a position or a time
+    (for example TCX points recorded while paused) are skipped. Raises
+    TrackError when the file is not XML or holds fewer than two points.
+    """
+    source_format = None
+    columns = (array('d'), array('d'), array('d'), array('d'))
+    open_elements = []
+    try:
+        for event, element in ET.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                open_elements.append(element)
+                continue
+            open_elements.pop()
+            name = _local(element.tag)
+            if name not in POINT_TAGS:
+                continue
+            source_format = source_format or POINT_TAGS[name]
+            point = _read_point(element)
+            if point is not None:
+                for column, value in zip(columns, point):
+                    column.append(value)
+            # Drop the finished point so the tree never grows with the file
+            element.clear()
+            if open_elements:
+                open_elements[-1].remove(element)
+    except ET.ParseError as e:
+        raise TrackError(f'Not a valid GPX or TCX file: {e}') from e
+
+    if source_format is None:
+        raise TrackError('No GPX or TCX track points found')
+    if len(columns[0]) < 2:
+        raise TrackError('A track needs at least two points with a position and a time')
+    return (source_format, *(np.frombuffer(column, dtype=np.float64) for column in columns))
+
+
+def segment_distances(lat, lon):
+    """Great-circle distance in metres between consecutive points."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    a = (np.sin(np.diff(lat) / 2) ** 2
+         + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def elevation_gain(elevation):
+    """Metres climbed, summed over the smoothed elevation profile; None without elevation."""
+    elevation = elevation[~np.isnan(elevation)]
+    if len(elevation) < 2:
+        return None
+    window = min(ELEVATION_SMOOTHING, len(elevation))
+    smoothed = np.convolve(elevation, np.ones(window) / window, mode='valid')
+    return float(np.clip(np.diff(smoothed), 0, None).sum())
+
+
+def km_splits(distance, elapsed):
+    """
+    Time of every full kilometre, plus the remaining part of the last one
+    when it is at least MIN_SPLIT_M long.
+
+    ``distance`` and ``elapsed`` are cumulative metres and seconds per point.
+    Each split is a dict of km (1-based), distance (km), seconds and
+    pace_seconds (seconds per km); the kilometre marks are interpolated
+    between the points around them.
+    """
+    total = distance[-1]
+    marks = np.arange(1000, total + 1e-9, 1000)
+    if not len(marks) or marks[-1] <= total - MIN_SPLIT_M:
+        marks = np.append(marks, total)
+    # Cumulative distance only ever grows, but may stand still: use the last
+    # point at each distance so a pause is counted in the split it ends
+    reached, last = np.unique(distance[::-1], return_index=True)
+    times = np.interp(marks, reached, elapsed[::-1][last])
+    seconds = np.diff(times, prepend=0.0)
+    lengths = np.diff(marks, prepend=0.0) / 1000
+    return [
+        {
+            'km': index + 1,
+            'distance': round(float(length), 3),
+            'seconds': round(float(split), 1),
+            'pace_seconds': round(float(split / length), 1) if length > 0 else None,
+        }
+        for index, (length, split) in enumerate(zip(lengths, seconds))
+    ]
+
+
+def summarise_track(lat, lon, elevation, timestamps):
+    """
+    Distance (km), elapsed and moving seconds, elevation gain and splits of a track.
+
+    Moving time adds up the gaps between points covered at MOVING_SPEED or
+    faster, so pauses count towards the elapsed time only.
+    """
+    steps = segment_distances(lat, lon)
+    gaps = np.diff(timestamps)
+    moving = (gaps > 0) & (steps >= MOVING_SPEED * gaps)
+    distance = np.concatenate(([0.0], np.cumsum(steps)))
+    elapsed = timestamps - timestamps[0]
+    return {
+        'distance_km': float(distance[-1] / 1000),
+        'elapsed_seconds': float(elapsed[-1]),
+        'moving_seconds': float(gaps[moving].sum()),
+        'elevation_gain': elevation_gain(elevation),
+        'splits': km_splits(distance, elapsed) if distance[-1] > 0 else [],
+    }
+
+
+def pack_points(lat, lon, elevation, timestamps):
+    """Little-endian float32 rows of (lat, lon, elevation, seconds since the previous point)."""
+    deltas = np.diff(timestamps, prepend=timestamps[0])
+    return np.column_stack((lat, lon, elevation, deltas)).astype('<f4').tobytes()
+
+
+def unpack_points(blob):
+    """(lat, lon, elevation, seconds since start) float64 arrays from pack_points() output."""
+    rows = np.frombuffer(bytes(blob), dtype='<f4').reshape(-1, 4).astype(np.float64)
+    return rows[:, 0], rows[:, 1], rows[:, 2], np.cumsum(rows[:, 3])
+
+
+@transaction.atomic
+def import_track(source, notes=''):
+    """
+    Create a RunningSession and its RunningTrack from a GPX or TCX file.
+
+    The session's date is the first point's time, its distance the track
+    length and its duration the elapsed time. Raises TrackError for files
+    that cannot be imported.
+    """
+    source_format, lat, lon, elevation, timestamps = parse_track(source)
+    if np.any(np.diff(timestamps) < 0):
+        raise TrackError('Track point times must not go backwards')
+    summary = summarise_track(lat, lon, elevation, timestamps)
+    if summary['elapsed_seconds'] <= 0:
+        raise TrackError('The track has no duration')
+    if summary['distance_km'] >= MAX_DISTANCE_KM:
+        raise TrackError(f'Tracks must be shorter than {MAX_DISTANCE_KM} km')
+
+    session = RunningSession.objects.create(
+        date=datetime.fromtimestamp(timestamps[0], tz=dt_timezone.utc),
+        distance=Decimal(str(round(summary['distance_km'], 2))),
+        duration=timedelta(seconds=round(summary['elapsed_seconds'])),
+        moving_duration=timedelta(seconds=round(summary['moving_seconds'])),
+        elevation_gain=None if summary['elevation_gain'] is None else round(summary['elevation_gain'], 1),
+        splits=summary['splits'],
+        notes=notes,
+    )
+    RunningTrack.objects.create(
+        session=session,
+        source_format=source_format,
+        point_count=len(lat),
+        points=pack_points(lat, lon, elevation, timestamps),
+    )
+    return session
@@ -0,0 +1,129 @@
+"""
+Weekly training volume per muscle group.
+
+The workout pages only count sessions. weekly_rows() sums sets, reps and
+volume (sets * reps * weight) of every WorkoutExercise, grouped by the local
+week of its workout and by the exercise's muscle group, in one aggregate
+query joined over WorkoutExercise -> WorkoutSession -> Exercise. Only the
+grouped rows reach Python, never model instances, so a year-long heatmap
+costs the same single query as a single week.
+
+Weeks start on Monday in the current time zone. Weeks without training are
+filled with zeros here so every series lines up with the week labels.
+"""
+
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.db.models import F, FloatField, IntegerField, Sum, Value
+from django.db.models.functions import Coalesce, NullIf, TruncWeek
+from django.utils import timezone
+
+from .models import WorkoutExercise
+
+# Exercises without a muscle group are counted under this name
+UNGROUPED = 'Other'
+
+# Weekly figures, in the order of the last axis of MuscleVolume.values
+METRICS = ('sets', 'reps', 'volume')
+
+# Weeks shown by default, and the most one request may ask for
+DEFAULT_WEEKS = 12
+MAX_WEEKS = 260
+
+
+def week_start(day):
+    """Monday of the week containing ``day``."""
+    return day - timedelta(days=day.weekday())
+
+
+def last_weeks(today, count=DEFAULT_WEEKS):
+    """(first Monday, last Monday) of the ``count`` weeks ending with the week of ``today``."""
+    last = week_start(today)
+    return last - timedelta(weeks=count - 1), last
+
+
+def weekly_rows(first, last):
+    """
+    Values queryset of week, muscle_group, total_sets, total_reps and
+    total_volume for the weeks starting on the Mondays ``first`` through ``last``.
+
+    reps counts every repetition (sets * reps); volume leaves out exercises
+    logged without a weight.
+    """
+    start = timezone.make_aware(datetime.combine(first, time.min))
+    end = timezone.make_aware(datetime.combine(last + timedelta(weeks=1), time.min))
+    return (
+        WorkoutExercise.objects
+        .filter(workout__date__gte=start, workout__date__lt=end)
+        .annotate(
+            week=TruncWeek('workout__date'),
+            muscle_group=Coalesce(NullIf('exercise__muscle_group', Value('')), Value(UNGROUPED)),
+        )
+        .values('week', 'muscle_group')
+        .annotate(
+            total_sets=Sum('sets'),
+            total_reps=Sum(F('sets') * F('reps'), output_field=IntegerField()),
+            total_volume=Coalesce(
+                Sum(F('sets') * F('reps') * F('weight'), output_field=FloatField()),
+                Value(0.0),
+                output_field=FloatField(),
+            ),
+        )
+        # The default Meta ordering would split the groups
+        .order_by('week', 'muscle_group')
+    )
+
+
+class MuscleVolume:
+    """
+    Weekly sets, reps and volume per muscle group as one NumPy array.
+
+    ``values[g, w, m]`` is metric ``METRICS[m]`` of ``muscle_groups[g]`` in
+    the week starting on ``weeks[w]``.
+    """
+
+    def __init__(self, first, last):
+        self.weeks = [first + timedelta(weeks=n) for n in range((last - first).days // 7 + 1)]
+        rows = list(weekly_rows(first, last).values_list(
+            'week', 'muscle_group', 'total_sets', 'total_reps', 'total_volume',
+        ))
+        self.muscle_groups = sorted({row[1] for row in rows})
+        group_index = {group: index for index, group in enumerate(self.muscle_groups)}
+        week_index = {week: index for index, week in enumerate(self.weeks)}
+
+        self.values = np.zeros((len(self.muscle_groups), len(self.weeks), len(METRICS)))
+        for week, group, *figures in rows:
+            self.values[group_index[group], week_index[timezone.localtime(week).date()]] = figures
+
+    def series(self):
+        """{muscle group: {metric: one value per week}}."""
+        return {
+            group: {
+                metric: [_number(metric, value) for value in self.values[g, :, m]]
+                for m, metric in enumerate(METRICS)
+            }
+            for g, group in enumerate(self.muscle_groups)
+        }
+
+    def totals(self):
+        """{muscle group: {metric: total over all weeks}}."""
+        sums = self.values.sum(axis=1)
+        return {
+            group: {metric: _number(metric, sums[g, m]) for m, metric in enumerate(METRICS)}
+            for g, group in enumerate(self.muscle_groups)
+        }
+
+    def heatmap(self, metric):
+        """One row per muscle group and one column per week of ``metric``, with the largest cell."""
+        grid = self.values[:, :, METRICS.index(metric)]
+        return {
+            'metric': metric,
+            'rows': [[_number(metric, value) for value in row] for row in grid],
+            'max': _number(metric, grid.max()) if grid.size else 0,
+        }
+
+
+def _number(metric, value):
+    """Whole sets and reps, volume to one decimal."""
+    return round(float(value), 1) if metric == 'volume' else int(value)
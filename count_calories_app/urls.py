@@ -8,6 +8,7 @@ urlpatterns = [
     path('api/food-autocomplete/', views.food_autocomplete, name='food_autocomplete'),
     path('api/nutrition-data/', views.get_nutrition_data, name='nutrition_data'),
     path('api/gemini-nutrition/', views.get_gemini_nutrition, name='gemini_nutrition'),
+    path('api/gemini-nutrition/async/', views.aget_gemini_nutrition, name='gemini_nutrition_async'),
     path('api/calories-trend/', views.get_calories_trend_data, name='calories_trend_data'),
     path('api/macros-trend/', views.get_macros_trend_data, name='macros_trend_data'),
 
@@ -30,6 +31,7 @@ urlpatterns = [
     path('api/exercise-progress/<int:exercise_id>/', views.get_exercise_progress_data, name='exercise_progress_data_with_id'),
 
     path('running/', views.running_tracker, name='running_tracker'),
+    path('running/import/', views.import_running_track, name='import_running_track'),
     path('running/<int:running_session_id>/edit/', views.edit_running_session, name='edit_running_session'),
     path('running/<int:running_session_id>/delete/', views.delete_running_session, name='delete_running_session'),
     path('api/running-data/', views.get_running_data, name='running_data'),
@@ -73,10 +75,13 @@ urlpatterns = [
     path('api/react/weight-items/<int:weight_id>/update/', views.api_update_weight, name='api_update_weight'),
     path('api/react/running-items/', views.api_running_items, name='api_running_items'),
     path('api/react/running-items/add/', views.api_add_running, name='api_add_running'),
+    path('api/react/running-items/import/', views.api_import_running_track, name='api_import_running_track'),
     path('api/react/running-items/<int:session_id>/update/', views.api_update_running, name='api_update_running'),
     path('api/react/running-items/<int:session_id>/delete/', views.api_delete_running, name='api_delete_running'),
+    path('api/react/running-items/personal-bests/', views.api_running_personal_bests, name='api_running_personal_bests'),
     path('api/react/workouts/', views.api_workouts, name='api_workouts'),
     path('api/react/workouts/add/', views.api_add_workout, name='api_add_workout'),
+    path('api/react/workouts/muscle-volume/', views.api_workout_muscle_volume, name='api_workout_muscle_volume'),
     path('api/react/workouts/<int:workout_id>/update/', views.api_update_workout, name='api_update_workout'),
     path('api/react/workouts/<int:workout_id>/delete/', views.api_delete_workout, name='api_delete_workout'),
     path('api/react/workouts/<int:workout_id>/exercises/add/', views.api_add_workout_exercise, name='api_add_workout_exercise'),
@@ -84,6 +89,7 @@ urlpatterns = [
     path('api/react/workouts/<int:workout_id>/exercises/<int:exercise_id>/delete/', views.api_delete_workout_exercise, name='api_delete_workout_exercise'),
     path('api/react/exercises/', views.api_exercises, name='api_exercises'),
     path('api/react/exercises/add/', views.api_add_exercise, name='api_add_exercise'),
+    path('api/react/exercises/prs/', views.api_exercise_prs, name='api_exercise_prs'),
     path('api/react/exercises/<int:exercise_id>/delete/', views.api_delete_exercise, name='api_delete_exercise'),
     path('api/react/body-measurements/', views.api_body_measurements, name='api_body_measurements'),
     path('api/react/body-measurements/add/', views.api_add_body_measurement, name='api_add_body_measurement'),
@@ -91,6 +97,7 @@ urlpatterns = [
     path('api/react/body-measurements/<int:measurement_id>/delete/', views.api_delete_body_measurement, name='api_delete_body_measurement'),
     path('api/react/analytics/', views.api_analytics, name='api_analytics'),
     path('api/react/analytics/month-compare/', views.api_month_compare, name='api_month_compare'),
+    path('api/react/analytics/product-compare/', views.api_product_compare, name='api_product_compare'),
     path('api/react/analytics/yearly-trends/', views.api_yearly_trends, name='api_yearly_trends'),
     path('api/react/top-foods/', views.api_top_foods, name='api_top_foods'),
     path('api/react/settings/', views.api_settings, name='api_settings'),
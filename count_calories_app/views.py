@@ -9,9 +9,26 @@ from django.contrib import messages
 from django.core.paginator import Paginator
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import ensure_csrf_cookie
-from .models import FoodItem, Weight, Exercise, WorkoutSession, WorkoutExercise, RunningSession, WorkoutTable, BodyMeasurement, UserSettings, MealTemplate, MealTemplateItem
+from .models import FoodItem, Weight, Exercise, WorkoutSession, WorkoutExercise, RunningSession, WorkoutTable, BodyMeasurement, UserSettings, MealTemplate, MealTemplateItem, DailyNutrition, FoodProduct, ExerciseRecord
 from .forms import FoodItemForm, WeightForm, ExerciseForm, WorkoutSessionForm, WorkoutExerciseForm, RunningSessionForm, BodyMeasurementForm
 from .services import GeminiService
+from .streaks import logging_streaks
+from .correlation import weight_intervals
+from .analytics_engine import DEFAULT_GOALS, AnalyticsEngine, HourlyHistogram
+from .monthly import (
+    MAX_COMPARE_MONTHS, first_logged_day, last_months, month_comparison, month_sequence, monthly_series, parse_month,
+)
+from .alignment import local_day, matching_from_query, weights_for_dates
+from .running_analytics import (
+    DEFAULT_LEADERBOARD_SIZE, MAX_LEADERBOARD_SIZE, RunningSeries, min_distance_param, personal_bests,
+    running_sessions,
+)
+from .tracks import MAX_TRACK_BYTES, TrackError, import_track
+from .training_volume import DEFAULT_WEEKS, MAX_WEEKS, METRICS, MuscleVolume, last_weeks, week_start
+from .product_comparison import MAX_COMPARE_PRODUCTS, compare_products, radar_chart
+from .response_cache import cached_context, cached_response, conditional_response
+from .search import search_product_names
+from .pagination import InvalidCursor, include_totals_param, paginate_request, per_page_param
 import logging
 import json
 import os
@@ -22,7 +39,6 @@ logger = logging.getLogger('count_calories_app')
 
 @ensure_csrf_cookie
 def home(request):
-    from django.db.models.functions import TruncDate
     now = timezone.now()
     today_date = now.date()
     today_end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
@@ -34,27 +50,10 @@ def home(request):
     # Month start
     month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
-    # Today's food stats - use TruncDate for consistent filtering with food_tracker view
-    today_food = FoodItem.objects.annotate(
-        consumed_date=TruncDate('consumed_at')
-    ).filter(consumed_date=today_date)
-    today_stats = today_food.aggregate(
-        calories=Sum('calories'),
-        protein=Sum('protein'),
-        carbs=Sum('carbohydrates'),
-        fat=Sum('fat'),
-        count=Count('id')
-    )
-
-    # This week's food stats
-    week_food = FoodItem.objects.filter(consumed_at__gte=week_start, consumed_at__lte=today_end)
-    week_stats = week_food.aggregate(
-        calories=Sum('calories'),
-        protein=Sum('protein'),
-        carbs=Sum('carbohydrates'),
-        fat=Sum('fat'),
-        count=Count('id')
-    )
+    # Today's and this week's food stats, read from the daily rollup (local dates)
+    today_stats = DailyNutrition.objects.between(today_date, today_date).totals()
+    week_days = DailyNutrition.objects.between(week_start.date(), today_end)
+    week_stats = week_days.totals()
 
     # Latest weight
     latest_weight = Weight.objects.order_by('-recorded_at').first()
@@ -81,16 +80,7 @@ def home(request):
     recent_foods = FoodItem.objects.order_by('-consumed_at')[:5]
 
     # Streak calculation (consecutive days with food logged)
-    streak = 0
-    check_date = now.date()
-    while True:
-        day_start = timezone.make_aware(timezone.datetime.combine(check_date, timezone.datetime.min.time()))
-        day_end = timezone.make_aware(timezone.datetime.combine(check_date, timezone.datetime.max.time()))
-        if FoodItem.objects.filter(consumed_at__gte=day_start, consumed_at__lte=day_end).exists():
-            streak += 1
-            check_date -= timedelta(days=1)
-        else:
-            break
+    streak = logging_streaks()['current_streak']
 
     # Get user settings for targets (sync weight from latest entry)
     settings = UserSettings.get_settings()
@@ -129,13 +119,7 @@ def home(request):
     tdee = settings.calculate_bmr()
     weight_prediction = None
     if tdee and latest_weight:
-        from django.db.models.functions import TruncDate as _TruncDate
-        week_days_logged = (
-            FoodItem.objects
-            .filter(consumed_at__gte=week_start, consumed_at__lte=today_end)
-            .annotate(_day=_TruncDate('consumed_at'))
-            .values('_day').distinct().count()
-        )
+        week_days_logged = week_days.count()
         week_total_cal = float(week_stats['calories'] or 0)
         avg_daily_cal = round(week_total_cal / week_days_logged) if week_days_logged else 0
         current_weight_kg = float(latest_weight.weight)
@@ -295,14 +279,7 @@ def get_gemini_nutrition(request):
         food_name = data.get('food_name', '').strip()
 
         result = GeminiService.get_nutrition_info(food_name)
-
-        if result['success']:
-            return JsonResponse(result)
-        else:
-            response_data = {'error': result.get('error')}
-            if 'code' in result:
-                response_data['code'] = result['code']
-            return JsonResponse(response_data, status=result.get('status', 500))
+        return _gemini_json_response(result)
 
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
@@ -316,6 +293,39 @@ def get_gemini_nutrition(request):
             'error': 'Failed to get nutritional information'
         }, status=500)
 
+
+async def aget_gemini_nutrition(request):
+    """
+    Async variant of get_gemini_nutrition for ASGI deployments.
+
+    Same request and response format; the worker is not blocked while Gemini answers.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST method allowed'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        food_name = data.get('food_name', '').strip()
+
+        result = await GeminiService.aget_nutrition_info(food_name)
+        return _gemini_json_response(result)
+
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    except Exception as e:
+        logger.error(f"Unexpected error in aget_gemini_nutrition: {e}")
+        return JsonResponse({'error': 'An unexpected error occurred'}, status=500)
+
+
+def _gemini_json_response(result):
+    """Turn a GeminiService result dict into the JSON response the frontend expects."""
+    if result['success']:
+        return JsonResponse(result)
+    response_data = {'error': result.get('error')}
+    if 'code' in result:
+        response_data['code'] = result['code']
+    return JsonResponse(response_data, status=result.get('status', 500))
+
 def food_tracker(request):
     time_range = request.GET.get('range')
     selected_date_str = request.GET.get('date')
@@ -441,38 +451,24 @@ def food_tracker(request):
                 return time_range
             except Exception:
                 return time_range
+        from .exports import CHUNK_SIZE, csv_lines, streaming_response
         filename = f"food_items_{_date_label()}.csv"
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        writer = csv.writer(response)
-        writer.writerow(['Consumed At', 'Product Name', 'Calories', 'Fat (g)', 'Carbs (g)', 'Protein (g)'])
-        for fi in food_items.order_by('consumed_at').iterator():
-            writer.writerow([
-                fi.consumed_at.strftime('%Y-%m-%d %H:%M:%S') if fi.consumed_at else '',
-                fi.product_name,
-                float(fi.calories or 0),
-                float(fi.fat or 0),
-                float(fi.carbohydrates or 0),
-                float(fi.protein or 0),
-            ])
-        return response
-
-    from django.db.models import Max
-    product_names = FoodItem.objects.filter(
-        hide_from_quick_list=False
-    ).values('product_name').annotate(
-        latest=Max('consumed_at')
-    ).order_by('-latest')
-
-    quick_add_items = []
-    for item in product_names:
-        food = FoodItem.objects.filter(
-            product_name=item['product_name'],
-            consumed_at=item['latest'],
-            hide_from_quick_list=False
-        ).first()
-        if food:
-            quick_add_items.append(food)
+        rows = food_items.order_by('consumed_at').values_list(
+            'consumed_at', 'product_name', 'calories', 'fat', 'carbohydrates', 'protein'
+        ).iterator(chunk_size=CHUNK_SIZE)
+        return streaming_response(csv_lines(
+            ['Consumed At', 'Product Name', 'Calories', 'Fat (g)', 'Carbs (g)', 'Protein (g)'],
+            ([
+                consumed_at.strftime('%Y-%m-%d %H:%M:%S') if consumed_at else '',
+                product_name,
+                float(calories or 0),
+                float(fat or 0),
+                float(carbs or 0),
+                float(protein or 0),
+            ] for consumed_at, product_name, calories, fat, carbs, protein in rows),
+        ), 'text/csv', filename)
+
+    quick_add_items = list(FoodItem.objects.filter(hide_from_quick_list=False).latest_per_product())
 
     totals = food_items.aggregate(
         total_calories=Sum('calories'),
@@ -630,15 +626,7 @@ def food_tracker(request):
     else:
         top_foods_queryset = FoodItem.objects.filter(consumed_at__gte=start_date)
 
-    top_foods_data = top_foods_queryset.values('product_name').annotate(
-        count=Count('id'),
-        total_calories=Sum('calories'),
-        avg_calories=Avg('calories'),
-        total_fat=Sum('fat'),
-        total_carbs=Sum('carbohydrates'),
-        total_protein=Sum('protein'),
-        latest_consumed=Max('consumed_at')
-    )
+    top_foods_data = top_foods_queryset.food_totals()
 
     if sort_by == 'count':
         if sort_order == 'desc':
@@ -851,23 +839,17 @@ def top_foods(request):
     # Apply search filter if provided
     if selected_foods:
         # Multi-food exact match (case-insensitive)
-        from django.db.models import Q
-        food_filter = Q()
-        for food_name in selected_foods:
-            food_filter |= Q(product_name__iexact=food_name)
-        top_foods_queryset = top_foods_queryset.filter(food_filter)
+        top_foods_queryset = top_foods_queryset.named(*selected_foods)
     elif search_query:
-        top_foods_queryset = top_foods_queryset.filter(product_name__icontains=search_query)
+        top_foods_queryset = top_foods_queryset.search(search_query)
 
-    top_foods_data = top_foods_queryset.values('product_name').annotate(
-        count=Count('id'),
-        total_calories=Sum('calories'),
-        avg_calories=Avg('calories'),
-        total_fat=Sum('fat'),
-        total_carbs=Sum('carbohydrates'),
-        total_protein=Sum('protein'),
-        latest_consumed=Max('consumed_at')
-    )
+    # All-time lists without a name filter read the per-product totals
+    all_products = start_date is None and not selected_foods and not search_query
+    if all_products:
+        top_foods_data = FoodProduct.objects.food_totals()
+    else:
+        # Grouped by FoodProduct, like the all-time list
+        top_foods_data = top_foods_queryset.food_totals()
 
     if sort_by == 'count':
         if sort_order == 'desc':
@@ -919,13 +901,11 @@ def top_foods(request):
                 return time_range
             except Exception:
                 return time_range
+        from .exports import CHUNK_SIZE, csv_lines, streaming_response
         filename = f"top_foods_{_date_label()}.csv"
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        writer = csv.writer(response)
-        writer.writerow(['Product Name', 'Times Eaten', 'Total Calories', 'Average Calories', 'Total Fat (g)', 'Total Carbs (g)', 'Total Protein (g)', 'Latest Consumed'])
-        for item in top_foods_data.iterator():
-            writer.writerow([
+        return streaming_response(csv_lines(
+            ['Product Name', 'Times Eaten', 'Total Calories', 'Average Calories', 'Total Fat (g)', 'Total Carbs (g)', 'Total Protein (g)', 'Latest Consumed'],
+            ([
                 item['product_name'],
                 item['count'],
                 float(item['total_calories'] or 0),
@@ -934,8 +914,8 @@ def top_foods(request):
                 float(item['total_carbs'] or 0),
                 float(item['total_protein'] or 0),
                 item['latest_consumed'].strftime('%Y-%m-%d %H:%M:%S') if item['latest_consumed'] else ''
-            ])
-        return response
+            ] for item in top_foods_data.iterator(chunk_size=CHUNK_SIZE)),
+        ), 'text/csv', filename)
 
     paginator = Paginator(top_foods_data, 10)  # Show 10 items per page
     try:
@@ -944,16 +924,20 @@ def top_foods(request):
         top_foods_page = paginator.page(1)
 
     # Calculate summary statistics from the base queryset (not the aggregated one)
-    summary_data = top_foods_queryset.aggregate(
-        total_count=Count('id'),
-        total_calories=Sum('calories'),
-        total_fat=Sum('fat'),
-        total_carbs=Sum('carbohydrates'),
-        total_protein=Sum('protein')
-    )
+    if all_products:
+        summary_data = FoodProduct.objects.totals()
+        unique_foods_count = summary_data['unique_foods']
+    else:
+        summary_data = top_foods_queryset.aggregate(
+            total_count=Count('id'),
+            total_calories=Sum('calories'),
+            total_fat=Sum('fat'),
+            total_carbs=Sum('carbohydrates'),
+            total_protein=Sum('protein')
+        )
 
-    # Count unique foods
-    unique_foods_count = top_foods_queryset.values('product_name').distinct().count()
+        # Count unique foods
+        unique_foods_count = top_foods_queryset.values('product_id').distinct().count()
 
     summary = {
         'total_count': summary_data['total_count'] or 0,
@@ -999,71 +983,60 @@ def food_autocomplete(request):
     if len(query) < 1:
         return JsonResponse({'suggestions': []})
 
-    # Get distinct food names matching the query, ordered by how often they appear
-    food_names = FoodItem.objects.filter(
-        product_name__icontains=query
-    ).values('product_name').annotate(
-        count=Count('id')
-    ).order_by('-count')[:15]
-
-    suggestions = [item['product_name'] for item in food_names]
+    # Distinct food names from the full-text index, best matches and most logged first
+    suggestions = search_product_names(query, limit=15)
 
     return JsonResponse({'suggestions': suggestions})
 
 
-def get_calories_trend_data(request):
+def _trend_window(request):
+    """
+    (start, end) local dates of the calories and macros trend charts, both inclusive.
+
+    ``days`` (a number or 'all') wins over ``date``, which wins over
+    ``start_date``/``end_date``, which win over ``range`` (today, week or
+    month). N days end with today; the default is the last 30 days.
+    """
+    from datetime import datetime
+
     days_param = request.GET.get('days')
     start_date_str = request.GET.get('start_date')
     end_date_str = request.GET.get('end_date')
     selected_date_str = request.GET.get('date')
     time_range = request.GET.get('range', 'today')
 
-    end_date = timezone.now().replace(hour=23, minute=59, second=59, microsecond=999999)
-    start_date = end_date - timedelta(days=30)  # Default 30 days
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(days=29)  # Default 30 days
 
-    # Handle days parameter
     if days_param:
-        from datetime import datetime
         if days_param == 'all':
             start_date = None
         else:
             try:
-                days = int(days_param)
-                start_date = end_date - timedelta(days=days)
+                start_date = end_date - timedelta(days=int(days_param) - 1)
             except ValueError:
                 pass
     elif selected_date_str:
         # Single date - show last 30 days for context
-        start_date = end_date - timedelta(days=30)
+        pass
     elif start_date_str and end_date_str:
         try:
-            from datetime import datetime
-            start_date = timezone.make_aware(datetime.strptime(start_date_str, '%Y-%m-%d'))
-            end_date = timezone.make_aware(datetime.strptime(end_date_str, '%Y-%m-%d').replace(hour=23, minute=59, second=59))
+            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
         except ValueError:
             pass
     elif time_range == 'today':
-        start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        start_date = end_date
     elif time_range == 'week':
-        start_date = end_date - timedelta(days=7)
-    elif time_range == 'month':
-        start_date = end_date - timedelta(days=30)
+        start_date = end_date - timedelta(days=6)
+    return start_date, end_date
 
-    # Build query
-    if start_date is None:
-        food_items = FoodItem.objects.filter(consumed_at__lte=end_date).order_by('consumed_at')
-    else:
-        food_items = FoodItem.objects.filter(
-            consumed_at__gte=start_date,
-            consumed_at__lte=end_date
-        ).order_by('consumed_at')
 
-    from django.db.models.functions import TruncDate
-    daily_calories = food_items.annotate(
-        day=TruncDate('consumed_at')
-    ).values('day').annotate(
-        total_calories=Sum('calories')
-    ).order_by('day')
+def get_calories_trend_data(request):
+    start_date, end_date = _trend_window(request)
+
+    # Daily totals come from the rollup table, one row per logged day
+    daily_calories = DailyNutrition.objects.between(start_date, end_date).daily_totals()
 
     # Build response with both formats for compatibility
     daily_list = list(daily_calories)
@@ -1085,60 +1058,10 @@ def get_calories_trend_data(request):
     return JsonResponse(calories_data)
 
 def get_macros_trend_data(request):
-    days_param = request.GET.get('days')
-    start_date_str = request.GET.get('start_date')
-    end_date_str = request.GET.get('end_date')
-    selected_date_str = request.GET.get('date')
-    time_range = request.GET.get('range', 'today')
-
-    end_date = timezone.now().replace(hour=23, minute=59, second=59, microsecond=999999)
-    start_date = end_date - timedelta(days=30)  # Default 30 days
-
-    # Handle days parameter
-    if days_param:
-        from datetime import datetime
-        if days_param == 'all':
-            start_date = None
-        else:
-            try:
-                days = int(days_param)
-                start_date = end_date - timedelta(days=days)
-            except ValueError:
-                pass
-    elif selected_date_str:
-        # Single date - show last 30 days for context
-        start_date = end_date - timedelta(days=30)
-    elif start_date_str and end_date_str:
-        try:
-            from datetime import datetime
-            start_date = timezone.make_aware(datetime.strptime(start_date_str, '%Y-%m-%d'))
-            end_date = timezone.make_aware(datetime.strptime(end_date_str, '%Y-%m-%d').replace(hour=23, minute=59, second=59))
-        except ValueError:
-            pass
-    elif time_range == 'today':
-        start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
-    elif time_range == 'week':
-        start_date = end_date - timedelta(days=7)
-    elif time_range == 'month':
-        start_date = end_date - timedelta(days=30)
-
-    # Build query
-    if start_date is None:
-        food_items = FoodItem.objects.filter(consumed_at__lte=end_date).order_by('consumed_at')
-    else:
-        food_items = FoodItem.objects.filter(
-            consumed_at__gte=start_date,
-            consumed_at__lte=end_date
-        ).order_by('consumed_at')
+    start_date, end_date = _trend_window(request)
 
-    from django.db.models.functions import TruncDate
-    daily_macros = food_items.annotate(
-        day=TruncDate('consumed_at')
-    ).values('day').annotate(
-        total_protein=Sum('protein'),
-        total_carbs=Sum('carbohydrates'),
-        total_fat=Sum('fat')
-    ).order_by('day')
+    # Daily totals come from the rollup table, one row per logged day
+    daily_macros = list(DailyNutrition.objects.between(start_date, end_date).daily_totals())
 
     macros_data = {
         'labels': [item['day'].strftime('%Y-%m-%d') for item in daily_macros],
@@ -1280,51 +1203,44 @@ def get_weight_data(request):
     return JsonResponse(weight_data)
 
 def get_weight_calories_correlation(request):
-    weights = Weight.objects.all().order_by('recorded_at')
-
-    correlation_data = []
-    if len(weights) >= 2:
-        for i in range(1, len(weights)):
-            current_weight = weights[i]
-            previous_weight = weights[i-1]
-            weight_change = float(current_weight.weight) - float(previous_weight.weight)
-            from datetime import datetime, time
-            prev_date = previous_weight.recorded_at.date()
-            prev_datetime = timezone.make_aware(datetime.combine(prev_date, time.min))
-            curr_date = current_weight.recorded_at.date()
-            curr_datetime = timezone.make_aware(datetime.combine(curr_date, time.max))
-            food_items = FoodItem.objects.filter(
-                consumed_at__gte=prev_datetime,
-                consumed_at__lte=curr_datetime
-            )
-            total_calories_result = food_items.aggregate(Sum('calories'))['calories__sum'] or 0
-            total_calories = float(total_calories_result)
-            days_between = (current_weight.recorded_at - previous_weight.recorded_at).days
-            if days_between == 0:
-                days_between = 1
-            daily_avg_calories = float(total_calories) / days_between
-            correlation_data.append({
-                'start_date': previous_weight.recorded_at.strftime('%Y-%m-%d'),
-                'end_date': current_weight.recorded_at.strftime('%Y-%m-%d'),
-                'start_weight': float(previous_weight.weight),
-                'end_weight': float(current_weight.weight),
-                'weight_change': round(weight_change, 2),
-                'days_between': days_between,
-                'total_calories': float(total_calories),
-                'daily_avg_calories': round(daily_avg_calories, 1),
-            })
-
-    correlation_data.reverse()
     page = request.GET.get('page', 1)
     try:
         page = int(page)
     except ValueError:
         page = 1
     items_per_page = 10
+
+    weights = Weight.objects.order_by('recorded_at', 'id')
+    interval_count = max(weights.count() - 1, 0)
+    total_pages = (interval_count + items_per_page - 1) // items_per_page
+
+    # Intervals are listed newest first; only the weigh-ins on this page are loaded
     start_idx = (page - 1) * items_per_page
-    end_idx = start_idx + items_per_page
-    page_data = correlation_data[start_idx:end_idx]
-    total_pages = (len(correlation_data) + items_per_page - 1) // items_per_page
+    end_idx = min(start_idx + items_per_page, interval_count)
+    page_data = []
+    if 0 <= start_idx < end_idx:
+        first_weight = interval_count - end_idx
+        last_weight = interval_count - start_idx
+        page_weights = list(weights.values_list('recorded_at', 'weight')[first_weight:last_weight + 1])
+        intervals = weight_intervals(page_weights)
+
+        for i in reversed(range(len(page_weights) - 1)):
+            previous_at, previous_weight = page_weights[i]
+            current_at, current_weight = page_weights[i + 1]
+            days_between = (current_at - previous_at).days
+            if days_between == 0:
+                days_between = 1
+            total_calories = float(intervals['calories'][i])
+            page_data.append({
+                'start_date': previous_at.strftime('%Y-%m-%d'),
+                'end_date': current_at.strftime('%Y-%m-%d'),
+                'start_weight': float(previous_weight),
+                'end_weight': float(current_weight),
+                'weight_change': round(float(intervals['weight_change'][i]), 2),
+                'days_between': days_between,
+                'total_calories': total_calories,
+                'daily_avg_calories': round(total_calories / days_between, 1),
+            })
 
     return JsonResponse({
         'correlation_data': page_data,
@@ -1397,18 +1313,17 @@ def weight_tracker(request):
             export_query = weights_query.order_by('recorded_at')
             filename_label = 'last_90_days'
 
+        from .exports import CHUNK_SIZE, csv_lines, streaming_response
         filename = f"weights_{filename_label}.csv"
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        writer = csv.writer(response)
-        writer.writerow(['Recorded At', 'Weight (kg)', 'Notes'])
-        for recorded_at, weight, notes in export_query.values_list('recorded_at', 'weight', 'notes').iterator():
-            writer.writerow([
+        rows = export_query.values_list('recorded_at', 'weight', 'notes').iterator(chunk_size=CHUNK_SIZE)
+        return streaming_response(csv_lines(
+            ['Recorded At', 'Weight (kg)', 'Notes'],
+            ([
                 recorded_at.strftime('%Y-%m-%d %H:%M:%S') if recorded_at else '',
                 float(weight) if weight is not None else '',
                 notes or ''
-            ])
-        return response
+            ] for recorded_at, weight, notes in rows),
+        ), 'text/csv', filename)
 
     # Pagination for the main page view (last 90 days)
     paginator = Paginator(weights_query, 10)
@@ -1510,21 +1425,82 @@ def get_exercise_progress_data(request, exercise_id=None):
 
     exercise = get_object_or_404(Exercise, id=exercise_id)
 
-    workout_exercises = WorkoutExercise.objects.filter(
-        exercise_id=exercise_id
-    ).order_by('workout__date')
+    # One precomputed row per session, see ExerciseProgress
+    sessions = list(exercise.progress.order_by('date', 'id').values_list(
+        'date', 'best_weight', 'sets', 'best_reps', 'volume', 'estimated_1rm',
+    ))
 
     progress_data = {
         'exercise_name': exercise.name,
-        'labels': [we.workout.date.strftime('%Y-%m-%d') for we in workout_exercises],
-        'weight': [float(we.weight) if we.weight else 0 for we in workout_exercises],
-        'sets': [we.sets for we in workout_exercises],
-        'reps': [we.reps for we in workout_exercises],
-        'volume': [float(we.weight) * we.sets * we.reps if we.weight else 0 for we in workout_exercises]
+        'labels': [date.strftime('%Y-%m-%d') for date, *_ in sessions],
+        'weight': [float(weight) if weight else 0 for _, weight, *_ in sessions],
+        'sets': [row[2] for row in sessions],
+        'reps': [row[3] for row in sessions],
+        'volume': [row[4] for row in sessions],
+        'e1rm': [round(row[5], 1) if row[5] else 0 for row in sessions],
+        'records': [_exercise_record(record) for record in exercise.records.order_by('date', 'id')],
     }
 
     return JsonResponse(progress_data)
 
+
+def _exercise_record(record, with_exercise=False):
+    """JSON dict for one ExerciseRecord."""
+    item = {
+        'kind': record.kind,
+        'label': record.get_kind_display(),
+        'value': round(record.value, 1),
+        'previous': round(record.previous, 1) if record.previous is not None else None,
+        'date': record.date.isoformat(),
+        'workout_id': record.workout_id,
+    }
+    if with_exercise:
+        item.update({
+            'exercise_id': record.exercise_id,
+            'exercise_name': record.exercise.name,
+            'muscle_group': record.exercise.muscle_group,
+        })
+    return item
+
+
+@require_http_methods(["GET"])
+@conditional_response(Exercise, WorkoutSession, WorkoutExercise)
+def api_exercise_prs(request):
+    """
+    Personal records across all exercises.
+
+    ``exercises`` lists each exercise's standing records by kind (heaviest
+    weight, estimated 1RM, session volume); ``recent`` lists the records set
+    in the last ``days`` days (default 30), newest first, at most ``limit``
+    (default 20). Both read the precomputed ExerciseRecord table in one query each.
+    """
+    try:
+        days = int(request.GET.get('days', 30))
+        limit = int(request.GET.get('limit', 20))
+    except ValueError:
+        return JsonResponse({'error': 'days and limit must be whole numbers'}, status=400)
+    if days < 1 or not 1 <= limit <= 100:
+        return JsonResponse({'error': 'days must be positive and limit between 1 and 100'}, status=400)
+
+    exercises = {}
+    for record in ExerciseRecord.objects.current().select_related('exercise').order_by('exercise__name', 'exercise_id'):
+        entry = exercises.setdefault(record.exercise_id, {
+            'exercise_id': record.exercise_id,
+            'exercise_name': record.exercise.name,
+            'muscle_group': record.exercise.muscle_group,
+            'records': {},
+        })
+        entry['records'][record.kind] = _exercise_record(record)
+
+    recent = ExerciseRecord.objects.filter(
+        date__gte=timezone.now() - timedelta(days=days),
+    ).select_related('exercise').order_by('-date', '-id')[:limit]
+
+    return JsonResponse({
+        'exercises': list(exercises.values()),
+        'recent': [_exercise_record(record, with_exercise=True) for record in recent],
+    })
+
 def edit_food_item(request, food_item_id):
     """
     View for editing a food item.
@@ -1724,6 +1700,7 @@ def delete_workout_table(request, table_id):
 
 
 @require_http_methods(["GET"])
+@conditional_response(WorkoutTable)
 def api_workout_tables(request):
     """List saved workout tables (React API)"""
     tables = WorkoutTable.objects.all().order_by('-created_at')
@@ -1792,40 +1769,23 @@ def running_tracker(request):
     Handles displaying the form, list of running sessions, and charts,
     as well as processing form submissions.
     """
-    min_distance = request.GET.get('min_distance', 3)
-    try:
-        min_distance = float(min_distance)
-    except ValueError:
-        min_distance = 3
-
-    running_sessions = RunningSession.objects.filter(distance__gte=min_distance).order_by('-date')
-
-    running_sessions_with_speed = []
-    highest_speed_session = None
-    lowest_speed_session = None
-    highest_speed = 0
-    lowest_speed = float('inf')
-
-    for session in running_sessions:
-        session_data = {
-            'session': session,
-            'speed': 0  # Default value
-        }
-
-        duration_seconds = session.duration.total_seconds()
-        if duration_seconds > 0:  # Avoid division by zero
-            hours = duration_seconds / 3600  # Convert seconds to hours
-            speed = float(session.distance) / hours
-            session_data['speed'] = round(speed, 1)  # Round to 1 decimal place
-
-            if speed > highest_speed:
-                highest_speed = speed
-                highest_speed_session = session_data
-            if speed < lowest_speed:
-                lowest_speed = speed
-                lowest_speed_session = session_data
+    min_distance = min_distance_param(request.GET)
+
+    sessions = running_sessions(min_distance)
+    series = RunningSeries(sessions)
+    speeds = {session_id: round(float(speed), 1) for session_id, speed in zip(series.ids, series.speed)}
+    running_sessions_with_speed = [
+        {'session': session, 'speed': speeds.get(session.id, 0)}
+        for session in sessions.order_by('-date', '-id')
+    ]
 
-        running_sessions_with_speed.append(session_data)
+    # Fastest and slowest runs by average speed, from the engine's arrays
+    highest_speed_session = lowest_speed_session = None
+    fastest, slowest = series.speed_extremes()
+    if fastest is not None:
+        by_id = {data['session'].id: data for data in running_sessions_with_speed}
+        highest_speed_session = by_id[series.ids[fastest]]
+        lowest_speed_session = by_id[series.ids[slowest]]
 
     if request.method == 'POST':
         logger.info(f"Processing running session form submission: {request.POST}")
@@ -1854,6 +1814,32 @@ def running_tracker(request):
     }
     return render(request, 'count_calories_app/running_tracker.html', context)
 
+def _import_track_upload(request):
+    """
+    Import the GPX/TCX file uploaded as ``file``; returns (session, error message).
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return None, 'Choose a GPX or TCX file to import.'
+    if upload.size > MAX_TRACK_BYTES:
+        return None, f'Track files can be at most {MAX_TRACK_BYTES // (1024 * 1024)} MB.'
+    try:
+        return import_track(upload, notes=request.POST.get('notes', '')), None
+    except TrackError as e:
+        return None, str(e)
+
+
+@require_http_methods(["POST"])
+def import_running_track(request):
+    """Create a running session from an uploaded GPX or TCX track."""
+    session, error = _import_track_upload(request)
+    if error:
+        messages.error(request, error)
+    else:
+        logger.info(f"Imported running track: {session.id} - {session.distance} km")
+        messages.success(request, f"Imported a {session.distance} km run with {len(session.splits)} splits.")
+    return redirect('running_tracker')
+
 def edit_running_session(request, running_session_id):
     """
     View for editing a running session.
@@ -1927,141 +1913,61 @@ def get_running_data(request):
         except ValueError:
             start_date = end_date - timedelta(days=90)
 
-    min_distance = request.GET.get('min_distance', 3)
-    try:
-        min_distance = float(min_distance)
-    except ValueError:
-        min_distance = 3
-
-    qs = RunningSession.objects.filter(
-        date__lte=end_date,
-        distance__gte=min_distance
-    )
-    if start_date is not None:
-        qs = qs.filter(date__gte=start_date)
-    running_sessions = qs.order_by('date')
-
-    stats = {
-        'total_distance': 0,
-        'total_sessions': 0,
-        'avg_distance': 0,
-        'avg_duration': 0,
-        'avg_speed': 0,  # Average speed in km/h
-        'avg_pace': 0,   # Average pace in min/km
-        'total_calories': 0,  # Estimated total calories burned
-        'weekly_distance': 0,  # Average weekly distance
-        'monthly_distance': 0,  # Average monthly distance
-        'pace_improvement': 0,  # Pace improvement over time (%)
-        'longest_run': 0,  # Longest run distance
-        'fastest_pace': 0,  # Fastest pace (min/km)
-    }
-
-    labels = []
-    distances = []
-    durations = []
-    paces = []  # Pace in min/km
-    speeds = []  # Speed in km/h
-    calories = []  # Estimated calories burned
-
-    weekly_distances = {}
-    monthly_distances = {}
-
-    first_pace = None
-    last_pace = None
-
-    fastest_pace_value = float('inf')
-    longest_run_distance = 0
+    sessions = running_sessions(min_distance_param(request.GET), start_date, end_date)
+    return JsonResponse(RunningSeries(sessions).chart_data())
 
-    for session in running_sessions:
-        labels.append(session.date.strftime('%Y-%m-%d'))
-        distances.append(float(session.distance))
+# Circumference fields compared between consecutive measurements
+BODY_MEASUREMENT_FIELDS = (
+    'neck', 'chest', 'belly', 'left_biceps', 'right_biceps', 'left_triceps', 'right_triceps',
+    'left_forearm', 'right_forearm', 'left_thigh', 'right_thigh', 'left_lower_leg', 'right_lower_leg', 'butt',
+)
 
-        duration_minutes = session.duration.total_seconds() / 60
-        durations.append(duration_minutes)
 
-        if float(session.distance) > 0:
-            pace = duration_minutes / float(session.distance)
-            paces.append(pace)
+def _arrow(current, previous):
+    if current is None or previous is None:
+        return None
+    if current > previous:
+        return 'up'
+    if current < previous:
+        return 'down'
+    return 'equal'
 
-            if first_pace is None:
-                first_pace = pace
-            last_pace = pace
 
-            if pace < fastest_pace_value:
-                fastest_pace_value = pace
-        else:
-            paces.append(0)
-
-        if duration_minutes > 0:
-            speed = float(session.distance) / (duration_minutes / 60)
-            speeds.append(speed)
-        else:
-            speeds.append(0)
-
-        calorie_estimate = float(session.distance) * 60
-        calories.append(calorie_estimate)
-
-        if float(session.distance) > longest_run_distance:
-            longest_run_distance = float(session.distance)
-
-        week_key = session.date.strftime('%Y-%W')
-        if week_key not in weekly_distances:
-            weekly_distances[week_key] = 0
-        weekly_distances[week_key] += float(session.distance)
-
-        month_key = session.date.strftime('%Y-%m')
-        if month_key not in monthly_distances:
-            monthly_distances[month_key] = 0
-        monthly_distances[month_key] += float(session.distance)
-
-    if running_sessions:
-        stats['total_distance'] = sum(distances)
-        stats['total_sessions'] = len(running_sessions)
-        stats['avg_distance'] = stats['total_distance'] / stats['total_sessions']
-        total_duration_minutes = sum(durations)
-        stats['avg_duration'] = total_duration_minutes / stats['total_sessions']
-
-        total_duration_hours = total_duration_minutes / 60
-        if total_duration_hours > 0:  # Avoid division by zero
-            stats['avg_speed'] = stats['total_distance'] / total_duration_hours
-
-        if stats['total_distance'] > 0:
-            stats['avg_pace'] = total_duration_minutes / stats['total_distance']
-
-        stats['total_calories'] = sum(calories)
-
-        if weekly_distances:
-            stats['weekly_distance'] = sum(weekly_distances.values()) / len(weekly_distances)
-
-        if monthly_distances:
-            stats['monthly_distance'] = sum(monthly_distances.values()) / len(monthly_distances)
-
-        if first_pace is not None and last_pace is not None and first_pace > 0:
-            improvement_percentage = ((last_pace - first_pace) / first_pace) * 100
-            stats['pace_improvement'] = -improvement_percentage  # Invert so positive means improvement
-
-        stats['longest_run'] = longest_run_distance
-        stats['fastest_pace'] = fastest_pace_value if fastest_pace_value != float('inf') else 0
+def _measurement_rows(measurements, count, match, within_days):
+    """
+    Tracker rows for the first ``count`` of ``measurements`` (newest first).
 
-    running_data = {
-        'labels': labels,
-        'distances': distances,
-        'durations': durations,
-        'paces': paces,
-        'speeds': speeds,
-        'calories': calories,
-        'stats': stats
-    }
+    Each row holds the measurement, its matched weight and up/down/equal arrows
+    against the next older measurement. ``measurements`` carries one extra
+    row past ``count`` when an older measurement exists, so the last visible
+    row still gets its arrows.
+    """
+    weights = weights_for_dates([local_day(m.date) for m in measurements], match, within_days)
+    rows = []
+    for i, measurement in enumerate(measurements[:count]):
+        arrows = {}
+        if i + 1 < len(measurements):
+            previous = measurements[i + 1]
+            for field in BODY_MEASUREMENT_FIELDS:
+                arrow = _arrow(getattr(measurement, field), getattr(previous, field))
+                if arrow:
+                    arrows[field] = arrow
+            arrow = _arrow(weights[i], weights[i + 1])
+            if arrow:
+                arrows['weight'] = arrow
+        rows.append({'measurement': measurement, 'arrows': arrows, 'weight': weights[i]})
+    return rows
 
-    return JsonResponse(running_data)
 
 def body_measurements_tracker(request):
     """
     View for the body measurements tracker page.
+
+    Only the visible page (plus one older row for its arrows) and the latest
+    measurement are read, so the page costs the same for any history length.
+    Chart and compare-tab series are fetched from get_body_measurements_data.
     """
     try:
-        measurements = BodyMeasurement.objects.all().order_by('-date')
-
         if request.method == 'POST':
             form = BodyMeasurementForm(request.POST)
             if form.is_valid():
@@ -2071,88 +1977,31 @@ def body_measurements_tracker(request):
         else:
             form = BodyMeasurementForm(initial={'date': timezone.now()})
 
-        weights = Weight.objects.all()
+        measurements = BodyMeasurement.objects.order_by('-date', '-id')
+        match, within_days = matching_from_query(request.GET)
 
-        measurements_with_arrows = []
-        for i, measurement in enumerate(measurements):
-            measurement_data = {
-                'measurement': measurement,
-                'arrows': {},
-                'weight': None
-            }
+        paginator = Paginator(measurements, 10)  # Show 10 measurements per page
+        page_obj = paginator.get_page(request.GET.get('page'))
+        offset = page_obj.start_index() - 1 if paginator.count else 0
+        visible = page_obj.end_index() - offset if paginator.count else 0
+        page_obj.object_list = _measurement_rows(
+            list(measurements[offset:offset + visible + 1]), visible, match, within_days,
+        )
 
-            measurement_date = measurement.date.date() if hasattr(measurement.date, 'date') else measurement.date
-            matching_weight = weights.filter(recorded_at__date=measurement_date).first()
-            if matching_weight:
-                measurement_data['weight'] = matching_weight.weight
-
-            if i < len(measurements) - 1:
-                next_measurement = measurements[i + 1]
-
-                for field in ['neck', 'chest', 'belly', 'left_biceps', 'right_biceps',
-                              'left_triceps', 'right_triceps', 'left_forearm', 'right_forearm',
-                              'left_thigh', 'right_thigh', 'left_lower_leg', 'right_lower_leg', 'butt']:
-                    current_value = getattr(measurement, field)
-                    next_value = getattr(next_measurement, field)
-
-                    if current_value is not None and next_value is not None:
-                        if current_value > next_value:
-                            measurement_data['arrows'][field] = 'up'
-                        elif current_value < next_value:
-                            measurement_data['arrows'][field] = 'down'
-                        else:
-                            measurement_data['arrows'][field] = 'equal'
-
-            if i < len(measurements) - 1 and measurement_data['weight'] is not None:
-                next_measurement_date = measurements[i + 1].date.date() if hasattr(measurements[i + 1].date, 'date') else measurements[i + 1].date
-                next_matching_weight = weights.filter(recorded_at__date=next_measurement_date).first()
-                if next_matching_weight:
-                    if measurement_data['weight'] > next_matching_weight.weight:
-                        measurement_data['arrows']['weight'] = 'up'
-                    elif measurement_data['weight'] < next_matching_weight.weight:
-                        measurement_data['arrows']['weight'] = 'down'
-                    else:
-                        measurement_data['arrows']['weight'] = 'equal'
-
-            measurements_with_arrows.append(measurement_data)
-
-        from django.core.paginator import Paginator
-        paginator = Paginator(measurements_with_arrows, 10)  # Show 10 measurements per page
-
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        # The summary card always shows the newest measurement
+        if page_obj.number == 1:
+            latest_measurement = page_obj.object_list[0] if page_obj.object_list else None
+        else:
+            latest_measurement = _measurement_rows(list(measurements[:2]), 1, match, within_days)[0]
 
         table_view = request.GET.get('table_view', 'false')
 
-        measurements_json = json.dumps([
-            {
-                'id': m.id,
-                'date': m.date.isoformat() if m.date else None,
-                'neck': float(m.neck) if m.neck else None,
-                'chest': float(m.chest) if m.chest else None,
-                'belly': float(m.belly) if m.belly else None,
-                'butt': float(m.butt) if m.butt else None,
-                'left_biceps': float(m.left_biceps) if m.left_biceps else None,
-                'right_biceps': float(m.right_biceps) if m.right_biceps else None,
-                'left_triceps': float(m.left_triceps) if m.left_triceps else None,
-                'right_triceps': float(m.right_triceps) if m.right_triceps else None,
-                'left_forearm': float(m.left_forearm) if m.left_forearm else None,
-                'right_forearm': float(m.right_forearm) if m.right_forearm else None,
-                'left_thigh': float(m.left_thigh) if m.left_thigh else None,
-                'right_thigh': float(m.right_thigh) if m.right_thigh else None,
-                'left_lower_leg': float(m.left_lower_leg) if m.left_lower_leg else None,
-                'right_lower_leg': float(m.right_lower_leg) if m.right_lower_leg else None,
-            }
-            for m in measurements
-        ])
-
         return render(request, 'count_calories_app/body_measurements_tracker.html', {
             'form': form,
-            'measurements_with_arrows': measurements_with_arrows,  # Keep the full list for charts
-            'page_obj': page_obj,  # Add paginated measurements
+            'latest_measurement': latest_measurement,
+            'page_obj': page_obj,
             'page_title': 'Body Measurements Tracker',
             'table_view': table_view,  # Pass table view state to template
-            'measurements_json': measurements_json,
         })
     except Exception as e:
         logger.error(f"Error in body_measurements_tracker: {str(e)}")
@@ -2209,12 +2058,17 @@ def delete_body_measurement(request, measurement_id):
 def get_body_measurements_data(request):
     """
     API endpoint to get body measurements data for charts.
+
+    Series are oldest first; ``ids`` and ``timestamps`` identify each
+    measurement for the tracker's compare tab.
     """
     try:
-        measurements = BodyMeasurement.objects.all().order_by('date')
+        measurements = list(BodyMeasurement.objects.all().order_by('date', 'id'))
 
-        if not measurements.exists():
+        if not measurements:
             return JsonResponse({
+                'ids': [],
+                'timestamps': [],
                 'dates': [],
                 'weight': [],
                 'neck': [],
@@ -2233,8 +2087,6 @@ def get_body_measurements_data(request):
                 'butt': [],
             })
 
-        weights = Weight.objects.all()
-
         dates = [m.date.strftime('%Y-%m-%d') for m in measurements]
         neck_data = [float(m.neck) if m.neck else None for m in measurements]
         chest_data = [float(m.chest) if m.chest else None for m in measurements]
@@ -2251,16 +2103,15 @@ def get_body_measurements_data(request):
         right_lower_leg_data = [float(m.right_lower_leg) if m.right_lower_leg else None for m in measurements]
         butt_data = [float(m.butt) if m.butt else None for m in measurements]
 
-        weight_data = []
-        for m in measurements:
-            measurement_date = m.date.date() if hasattr(m.date, 'date') else m.date
-            matching_weight = weights.filter(recorded_at__date=measurement_date).first()
-            if matching_weight:
-                weight_data.append(float(matching_weight.weight))
-            else:
-                weight_data.append(None)
+        match, within_days = matching_from_query(request.GET)
+        weight_data = [
+            float(weight) if weight is not None else None
+            for weight in weights_for_dates([local_day(m.date) for m in measurements], match, within_days)
+        ]
 
         return JsonResponse({
+            'ids': [m.id for m in measurements],
+            'timestamps': [m.date.isoformat() for m in measurements],
             'dates': dates,
             'weight': weight_data,
             'neck': neck_data,
@@ -2289,8 +2140,9 @@ def export_body_measurements_csv(request):
     Export all body measurements as CSV with a matched weight column by date.
     """
     try:
-        measurements = BodyMeasurement.objects.all().order_by('-date')
-        weights = Weight.objects.all()
+        measurements = list(BodyMeasurement.objects.all().order_by('-date'))
+        match, within_days = matching_from_query(request.GET)
+        matched_weights = weights_for_dates([local_day(m.date) for m in measurements], match, within_days)
 
         response = HttpResponse(content_type='text/csv')
         filename = timezone.now().strftime('body_measurements_%Y-%m-%d.csv')
@@ -2305,10 +2157,8 @@ def export_body_measurements_csv(request):
         ]
         writer.writerow(header)
 
-        for m in measurements:
-            measurement_date = m.date.date() if hasattr(m.date, 'date') else m.date
-            matching_weight = weights.filter(recorded_at__date=measurement_date).first()
-            weight_value = float(matching_weight.weight) if (matching_weight and matching_weight.weight is not None) else ''
+        for m, matching_weight in zip(measurements, matched_weights):
+            weight_value = float(matching_weight) if matching_weight is not None else ''
 
             row = [
                 m.date.strftime('%Y-%m-%d'),
@@ -2342,1052 +2192,98 @@ def analytics(request):
     """
     Analytics page with weekly/monthly reports and correlation insights.
     """
-    from datetime import datetime, timedelta
-    from django.db.models.functions import TruncDate, TruncWeek, TruncMonth
-    from django.db.models import F
-    import statistics
+    context = cached_context(
+        'analytics', request, (FoodItem, Weight, WorkoutSession, RunningSession), _analytics_context
+    )
+    return render(request, 'count_calories_app/analytics.html', context)
 
-    now = timezone.now()
 
-    # Get period from request (default: last 90 days)
+def _analytics_context(request):
+    """Build the analytics page context."""
     period = request.GET.get('period', '90')
+    engine = AnalyticsEngine.for_period(period)
 
-    if period == 'all':
-        start_date = None
-    else:
-        try:
-            days = int(period)
-            start_date = now - timedelta(days=days)
-        except ValueError:
-            start_date = now - timedelta(days=90)
-
-    # Fetch data
-    if start_date:
-        food_items = FoodItem.objects.filter(consumed_at__gte=start_date, consumed_at__lte=now)
-        weights = Weight.objects.filter(recorded_at__gte=start_date, recorded_at__lte=now).order_by('recorded_at')
-    else:
-        food_items = FoodItem.objects.filter(consumed_at__lte=now)
-        weights = Weight.objects.filter(recorded_at__lte=now).order_by('recorded_at')
+    return {
+        'period': period,
+        'weekly_summary': engine.weekly_summary,  # This week dashboard
+        'goal_progress': engine.goal_progress(DEFAULT_GOALS),  # Goal tracking with progress bars
+        'goals': DEFAULT_GOALS,  # Goal targets
+        'weekly_reports': engine.weekly_reports(limit=12),
+        'monthly_reports': engine.monthly_reports(limit=12),
+        'best_worst_days': engine.best_worst_days,
+        'weight_analysis': engine.weight_analysis,
+        'insights': engine.insights,
+        'overall_stats': engine.overall_stats,
+        'day_of_week_stats': engine.day_of_week_stats,
+        'weekday_insights': engine.weekday_insights,
+        'streaks': engine.streaks,
+        'macro_analysis': engine.macro_analysis,
+        'weight_pace': engine.weight_pace,
+        'projections': engine.projections,
+        'consistency_score': engine.consistency_score,
+        'meal_timing': engine.meal_timing,
+        'top_foods': engine.top_foods,
+        'calorie_budget': engine.calorie_budget(),
+        'weight_volatility': engine.weight_volatility,
+        'nutrition_score': engine.nutrition_score,
+        'period_comparison': engine.period_comparison,
+        'achievements': engine.achievements,
+        'calorie_distribution': engine.calorie_distribution,
+    }
 
-    # === DAILY STATS ===
-    daily_stats = food_items.annotate(
-        day=TruncDate('consumed_at')
-    ).values('day').annotate(
-        total_calories=Sum('calories'),
-        total_protein=Sum('protein'),
-        total_carbs=Sum('carbohydrates'),
-        total_fat=Sum('fat')
-    ).order_by('day')
 
-    daily_stats_list = list(daily_stats)
+# ============================================
+# REACT FRONTEND JSON API ENDPOINTS
+# ============================================
 
-    # === THIS WEEK SUMMARY (for dashboard) ===
-    this_week_start = now - timedelta(days=now.weekday())  # Monday of this week
-    this_week_start = this_week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-    last_week_start = this_week_start - timedelta(days=7)
-    last_week_end = this_week_start
+@require_http_methods(["GET"])
+@conditional_response(FoodItem, Weight, WorkoutSession, RunningSession, UserSettings)
+def api_dashboard(request):
+    """Dashboard data for React frontend"""
+    now = timezone.now()
+    today_date = now.date()
+    week_start = now - timedelta(days=now.weekday())
+    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    today_end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
 
-    # This week's data
-    this_week_food = FoodItem.objects.filter(consumed_at__gte=this_week_start, consumed_at__lte=now)
-    this_week_weights = Weight.objects.filter(recorded_at__gte=this_week_start, recorded_at__lte=now).order_by('recorded_at')
-    this_week_workouts = WorkoutSession.objects.filter(date__gte=this_week_start, date__lte=now)
-    this_week_runs = RunningSession.objects.filter(date__gte=this_week_start, date__lte=now)
+    # Today's and this week's food stats, read from the daily rollup (local dates)
+    today_stats = DailyNutrition.objects.between(today_date, today_date).totals()
+    week_days = DailyNutrition.objects.between(week_start.date(), today_end)
+    week_stats = week_days.totals()
 
-    # Last week's data (for comparison)
-    last_week_food = FoodItem.objects.filter(consumed_at__gte=last_week_start, consumed_at__lt=last_week_end)
-    last_week_weights = Weight.objects.filter(recorded_at__gte=last_week_start, recorded_at__lt=last_week_end).order_by('recorded_at')
-    last_week_workouts = WorkoutSession.objects.filter(date__gte=last_week_start, date__lt=last_week_end)
+    # Latest weight
+    latest_weight = Weight.objects.order_by('-recorded_at').first()
+    weight_week_ago = Weight.objects.filter(recorded_at__lte=now - timedelta(days=7)).order_by('-recorded_at').first()
+    weight_change = None
+    if latest_weight and weight_week_ago:
+        weight_change = float(latest_weight.weight) - float(weight_week_ago.weight)
 
-    # Calculate this week stats
-    this_week_daily = this_week_food.annotate(day=TruncDate('consumed_at')).values('day').annotate(
-        total_cal=Sum('calories'), total_prot=Sum('protein')
-    )
-    this_week_days_logged = this_week_daily.count()
-    this_week_total_cal = sum([d['total_cal'] or 0 for d in this_week_daily])
-    this_week_total_prot = sum([d['total_prot'] or 0 for d in this_week_daily])
-    this_week_avg_cal = round(this_week_total_cal / this_week_days_logged, 0) if this_week_days_logged else 0
-    this_week_avg_prot = round(this_week_total_prot / this_week_days_logged, 1) if this_week_days_logged else 0
-
-    # Calculate last week stats
-    last_week_daily = last_week_food.annotate(day=TruncDate('consumed_at')).values('day').annotate(
-        total_cal=Sum('calories'), total_prot=Sum('protein')
-    )
-    last_week_days_logged = last_week_daily.count()
-    last_week_total_cal = sum([d['total_cal'] or 0 for d in last_week_daily])
-    last_week_total_prot = sum([d['total_prot'] or 0 for d in last_week_daily])
-    last_week_avg_cal = round(last_week_total_cal / last_week_days_logged, 0) if last_week_days_logged else 0
-    last_week_avg_prot = round(last_week_total_prot / last_week_days_logged, 1) if last_week_days_logged else 0
-
-    # Weight change this week
-    this_week_weight_change = None
-    if this_week_weights.exists() and this_week_weights.count() >= 2:
-        first_w = float(this_week_weights.first().weight)
-        last_w = float(this_week_weights.last().weight)
-        this_week_weight_change = round(last_w - first_w, 1)
-
-    # Build weekly summary
-    weekly_summary = {
-        'this_week': {
-            'days_logged': this_week_days_logged,
-            'total_calories': this_week_total_cal,
-            'avg_calories': this_week_avg_cal,
-            'total_protein': round(this_week_total_prot, 0),
-            'avg_protein': this_week_avg_prot,
-            'workouts': this_week_workouts.count(),
-            'runs': this_week_runs.count(),
-            'run_distance': round(sum([float(r.distance) for r in this_week_runs]), 1),
-            'weight_change': this_week_weight_change,
-            'current_weight': float(this_week_weights.last().weight) if this_week_weights.exists() else None,
-        },
-        'last_week': {
-            'days_logged': last_week_days_logged,
-            'avg_calories': last_week_avg_cal,
-            'avg_protein': last_week_avg_prot,
-            'workouts': last_week_workouts.count(),
-        },
-        'comparison': {
-            'calories_diff': round(this_week_avg_cal - last_week_avg_cal, 0) if last_week_avg_cal else None,
-            'protein_diff': round(this_week_avg_prot - last_week_avg_prot, 1) if last_week_avg_prot else None,
-            'workouts_diff': this_week_workouts.count() - last_week_workouts.count(),
-            'logging_diff': this_week_days_logged - last_week_days_logged,
-        }
-    }
-
-    # === GOAL TRACKING ===
-    # Default goals (could be user-configurable in future)
-    goals = {
-        'daily_calories': 2500,
-        'daily_protein': 150,
-        'weekly_workouts': 4,
-        'weekly_runs': 2,
-        'target_weight': 80,  # kg
-    }
-
-    # Calculate goal progress
-    goal_progress = {}
-
-    # Calories goal (based on this week average)
-    if this_week_avg_cal > 0:
-        cal_progress = min(100, round((this_week_avg_cal / goals['daily_calories']) * 100, 0))
-        cal_status = 'on_track' if 90 <= cal_progress <= 110 else 'under' if cal_progress < 90 else 'over'
-        goal_progress['calories'] = {
-            'current': this_week_avg_cal,
-            'target': goals['daily_calories'],
-            'progress': cal_progress,
-            'status': cal_status,
-        }
-
-    # Protein goal
-    if this_week_avg_prot > 0:
-        prot_progress = min(100, round((this_week_avg_prot / goals['daily_protein']) * 100, 0))
-        goal_progress['protein'] = {
-            'current': this_week_avg_prot,
-            'target': goals['daily_protein'],
-            'progress': prot_progress,
-            'status': 'achieved' if prot_progress >= 100 else 'in_progress',
-        }
-
-    # Workouts goal
-    workout_progress = min(100, round((this_week_workouts.count() / goals['weekly_workouts']) * 100, 0))
-    goal_progress['workouts'] = {
-        'current': this_week_workouts.count(),
-        'target': goals['weekly_workouts'],
-        'progress': workout_progress,
-        'status': 'achieved' if workout_progress >= 100 else 'in_progress',
-    }
-
-    # Running goal
-    run_progress = min(100, round((this_week_runs.count() / goals['weekly_runs']) * 100, 0))
-    goal_progress['runs'] = {
-        'current': this_week_runs.count(),
-        'target': goals['weekly_runs'],
-        'progress': run_progress,
-        'status': 'achieved' if run_progress >= 100 else 'in_progress',
-    }
-
-    # === WEEKLY REPORTS ===
-    weekly_stats = food_items.annotate(
-        week=TruncWeek('consumed_at')
-    ).values('week').annotate(
-        total_calories=Sum('calories'),
-        total_protein=Sum('protein'),
-        total_carbs=Sum('carbohydrates'),
-        total_fat=Sum('fat'),
-        days_logged=Count('consumed_at__date', distinct=True)
-    ).order_by('-week')
-
-    weekly_reports = []
-    for week in weekly_stats:
-        days = week['days_logged'] or 1
-        weekly_reports.append({
-            'week_start': week['week'],
-            'total_calories': week['total_calories'] or 0,
-            'avg_calories': round((week['total_calories'] or 0) / days, 0),
-            'total_protein': week['total_protein'] or 0,
-            'avg_protein': round((week['total_protein'] or 0) / days, 1),
-            'total_carbs': week['total_carbs'] or 0,
-            'avg_carbs': round((week['total_carbs'] or 0) / days, 1),
-            'total_fat': week['total_fat'] or 0,
-            'avg_fat': round((week['total_fat'] or 0) / days, 1),
-            'days_logged': days
-        })
-
-    # === MONTHLY REPORTS ===
-    monthly_stats = food_items.annotate(
-        month=TruncMonth('consumed_at')
-    ).values('month').annotate(
-        total_calories=Sum('calories'),
-        total_protein=Sum('protein'),
-        total_carbs=Sum('carbohydrates'),
-        total_fat=Sum('fat'),
-        days_logged=Count('consumed_at__date', distinct=True)
-    ).order_by('-month')
-
-    monthly_reports = []
-    for month in monthly_stats:
-        days = month['days_logged'] or 1
-        monthly_reports.append({
-            'month': month['month'],
-            'total_calories': month['total_calories'] or 0,
-            'avg_calories': round((month['total_calories'] or 0) / days, 0),
-            'total_protein': month['total_protein'] or 0,
-            'avg_protein': round((month['total_protein'] or 0) / days, 1),
-            'total_carbs': month['total_carbs'] or 0,
-            'avg_carbs': round((month['total_carbs'] or 0) / days, 1),
-            'total_fat': month['total_fat'] or 0,
-            'avg_fat': round((month['total_fat'] or 0) / days, 1),
-            'days_logged': days
-        })
-
-    # === BEST/WORST DAYS ===
-    best_worst_days = {}
-    if daily_stats_list:
-        # Best day (lowest calories with reasonable amount - at least 500)
-        valid_days = [d for d in daily_stats_list if d['total_calories'] and d['total_calories'] >= 500]
-        if valid_days:
-            best_worst_days['lowest_calorie_day'] = min(valid_days, key=lambda x: x['total_calories'])
-            best_worst_days['highest_calorie_day'] = max(valid_days, key=lambda x: x['total_calories'])
-            best_worst_days['highest_protein_day'] = max(valid_days, key=lambda x: x['total_protein'] or 0)
-            best_worst_days['lowest_protein_day'] = min(valid_days, key=lambda x: x['total_protein'] or 0)
-
-    # === WEIGHT ANALYSIS ===
-    weight_analysis = {}
-    weights_list = list(weights)
-    if len(weights_list) >= 2:
-        first_weight = float(weights_list[0].weight)
-        last_weight = float(weights_list[-1].weight)
-        weight_analysis['start_weight'] = first_weight
-        weight_analysis['end_weight'] = last_weight
-        weight_analysis['total_change'] = round(last_weight - first_weight, 1)
-
-        # Calculate weekly weight changes
-        weight_values = [float(w.weight) for w in weights_list]
-        weight_analysis['min_weight'] = min(weight_values)
-        weight_analysis['max_weight'] = max(weight_values)
-        weight_analysis['avg_weight'] = round(statistics.mean(weight_values), 1)
-
-        if len(weight_values) >= 3:
-            weight_analysis['std_dev'] = round(statistics.stdev(weight_values), 2)
-
-    # === CORRELATION INSIGHTS ===
-    insights = []
-
-    if len(weights_list) >= 3 and len(daily_stats_list) >= 7:
-        # Create a dict of daily food stats by date
-        daily_food_by_date = {d['day']: d for d in daily_stats_list}
-
-        # Analyze weight changes vs nutrition
-        weight_changes_with_nutrition = []
-
-        for i in range(1, len(weights_list)):
-            current_weight = weights_list[i]
-            prev_weight = weights_list[i-1]
-
-            weight_change = float(current_weight.weight) - float(prev_weight.weight)
-
-            # Get food data between these weight measurements
-            start_dt = prev_weight.recorded_at
-            end_dt = current_weight.recorded_at
-
-            period_food = [d for d in daily_stats_list
-                          if d['day'] and start_dt.date() <= d['day'] <= end_dt.date()]
-
-            if period_food:
-                avg_calories = float(statistics.mean([float(d['total_calories']) for d in period_food if d['total_calories']]))
-                avg_protein = float(statistics.mean([float(d['total_protein'] or 0) for d in period_food]))
-                avg_carbs = float(statistics.mean([float(d['total_carbs'] or 0) for d in period_food]))
-                avg_fat = float(statistics.mean([float(d['total_fat'] or 0) for d in period_food]))
-
-                weight_changes_with_nutrition.append({
-                    'weight_change': weight_change,
-                    'avg_calories': avg_calories,
-                    'avg_protein': avg_protein,
-                    'avg_carbs': avg_carbs,
-                    'avg_fat': avg_fat
-                })
-
-        if len(weight_changes_with_nutrition) >= 3:
-            # Analyze patterns
-            weight_loss_periods = [p for p in weight_changes_with_nutrition if p['weight_change'] < -0.1]
-            weight_gain_periods = [p for p in weight_changes_with_nutrition if p['weight_change'] > 0.1]
-
-            # Calorie insights
-            if weight_loss_periods and weight_gain_periods:
-                avg_cal_loss = statistics.mean([p['avg_calories'] for p in weight_loss_periods])
-                avg_cal_gain = statistics.mean([p['avg_calories'] for p in weight_gain_periods])
-
-                if avg_cal_loss < avg_cal_gain:
-                    insights.append({
-                        'type': 'calories',
-                        'icon': '🔥',
-                        'title': 'Calorie Impact',
-                        'description': f'You tend to lose weight when averaging {avg_cal_loss:.0f} kcal/day and gain when averaging {avg_cal_gain:.0f} kcal/day.',
-                        'recommendation': f'Try to stay around {avg_cal_loss:.0f} kcal/day for weight loss.'
-                    })
-
-            # Protein insights
-            if weight_loss_periods:
-                avg_protein_loss = statistics.mean([p['avg_protein'] for p in weight_loss_periods])
-                all_avg_protein = statistics.mean([p['avg_protein'] for p in weight_changes_with_nutrition])
-
-                if avg_protein_loss > all_avg_protein * 1.1:  # 10% higher
-                    insights.append({
-                        'type': 'protein',
-                        'icon': '💪',
-                        'title': 'Protein Correlation',
-                        'description': f'Weight loss periods correlate with higher protein intake (~{avg_protein_loss:.0f}g/day vs average {all_avg_protein:.0f}g/day).',
-                        'recommendation': f'Aim for at least {avg_protein_loss:.0f}g protein daily.'
-                    })
-
-            # Carb insights
-            if weight_loss_periods and weight_gain_periods:
-                avg_carbs_loss = statistics.mean([p['avg_carbs'] for p in weight_loss_periods])
-                avg_carbs_gain = statistics.mean([p['avg_carbs'] for p in weight_gain_periods])
-
-                if avg_carbs_loss < avg_carbs_gain * 0.9:  # 10% lower
-                    insights.append({
-                        'type': 'carbs',
-                        'icon': '🍞',
-                        'title': 'Carbohydrate Pattern',
-                        'description': f'Lower carb intake (~{avg_carbs_loss:.0f}g/day) correlates with weight loss vs (~{avg_carbs_gain:.0f}g/day) with weight gain.',
-                        'recommendation': f'Consider keeping carbs around {avg_carbs_loss:.0f}g/day.'
-                    })
-
-            # Fat insights
-            if weight_loss_periods and weight_gain_periods:
-                avg_fat_loss = statistics.mean([p['avg_fat'] for p in weight_loss_periods])
-                avg_fat_gain = statistics.mean([p['avg_fat'] for p in weight_gain_periods])
-
-                if abs(avg_fat_loss - avg_fat_gain) > 10:
-                    insights.append({
-                        'type': 'fat',
-                        'icon': '🥑',
-                        'title': 'Fat Intake Pattern',
-                        'description': f'During weight loss: ~{avg_fat_loss:.0f}g fat/day. During weight gain: ~{avg_fat_gain:.0f}g fat/day.',
-                        'recommendation': f'Optimal fat intake appears to be around {avg_fat_loss:.0f}g/day.'
-                    })
-
-    # Overall stats
-    overall_stats = {}
-    calories_list = []
-    if daily_stats_list:
-        calories_list = [float(d['total_calories']) for d in daily_stats_list if d['total_calories']]
-        if calories_list:
-            overall_stats['avg_daily_calories'] = round(statistics.mean(calories_list), 0)
-            overall_stats['total_days_logged'] = len(daily_stats_list)
-            overall_stats['total_calories'] = round(sum(calories_list), 0)
-
-            protein_list = [float(d['total_protein']) for d in daily_stats_list if d['total_protein']]
-            carbs_list = [float(d['total_carbs']) for d in daily_stats_list if d['total_carbs']]
-            fat_list = [float(d['total_fat']) for d in daily_stats_list if d['total_fat']]
-
-            if protein_list:
-                overall_stats['avg_daily_protein'] = round(statistics.mean(protein_list), 1)
-                overall_stats['total_protein'] = round(sum(protein_list), 0)
-            if carbs_list:
-                overall_stats['avg_daily_carbs'] = round(statistics.mean(carbs_list), 1)
-                overall_stats['total_carbs'] = round(sum(carbs_list), 0)
-            if fat_list:
-                overall_stats['avg_daily_fat'] = round(statistics.mean(fat_list), 1)
-                overall_stats['total_fat'] = round(sum(fat_list), 0)
-
-            # Calorie variability
-            if len(calories_list) >= 3:
-                overall_stats['calorie_std_dev'] = round(statistics.stdev(calories_list), 0)
-                overall_stats['calorie_min'] = round(min(calories_list), 0)
-                overall_stats['calorie_max'] = round(max(calories_list), 0)
-
-    # === DAY OF WEEK ANALYSIS ===
-    day_of_week_stats = {}
-    day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-
-    if daily_stats_list:
-        for day_num in range(7):
-            day_data = [d for d in daily_stats_list if d['day'] and d['day'].weekday() == day_num]
-            if day_data:
-                day_calories = [float(d['total_calories']) for d in day_data if d['total_calories']]
-                if day_calories:
-                    day_of_week_stats[day_names[day_num]] = {
-                        'avg_calories': round(statistics.mean(day_calories), 0),
-                        'count': len(day_calories),
-                        'total_calories': round(sum(day_calories), 0)
-                    }
-
-    # Find best and worst days of week
-    weekday_insights = {}
-    if day_of_week_stats:
-        sorted_days = sorted(day_of_week_stats.items(), key=lambda x: x[1]['avg_calories'])
-        if sorted_days:
-            weekday_insights['lowest_day'] = {'name': sorted_days[0][0], 'calories': sorted_days[0][1]['avg_calories']}
-            weekday_insights['highest_day'] = {'name': sorted_days[-1][0], 'calories': sorted_days[-1][1]['avg_calories']}
-
-            # Weekend vs Weekday comparison
-            weekday_cals = [v['avg_calories'] for k, v in day_of_week_stats.items() if k in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']]
-            weekend_cals = [v['avg_calories'] for k, v in day_of_week_stats.items() if k in ['Saturday', 'Sunday']]
-
-            if weekday_cals and weekend_cals:
-                weekday_insights['weekday_avg'] = round(statistics.mean(weekday_cals), 0)
-                weekday_insights['weekend_avg'] = round(statistics.mean(weekend_cals), 0)
-                weekday_insights['weekend_difference'] = round(weekday_insights['weekend_avg'] - weekday_insights['weekday_avg'], 0)
-
-    # === LOGGING STREAKS ===
-    streaks = {}
-    if daily_stats_list:
-        # Sort by date
-        sorted_days = sorted([d['day'] for d in daily_stats_list if d['day']])
-
-        if sorted_days:
-            # Current streak
-            current_streak = 0
-            check_date = now.date()
-            for i in range(len(sorted_days)):
-                if check_date in sorted_days or (check_date - timedelta(days=1)) in sorted_days:
-                    # Allow for today or yesterday
-                    pass
-
-            # Calculate current streak (consecutive days ending at most recent log)
-            current_streak = 1
-            for i in range(len(sorted_days) - 1, 0, -1):
-                if (sorted_days[i] - sorted_days[i-1]).days == 1:
-                    current_streak += 1
-                else:
-                    break
-
-            # Calculate longest streak
-            longest_streak = 1
-            temp_streak = 1
-            for i in range(1, len(sorted_days)):
-                if (sorted_days[i] - sorted_days[i-1]).days == 1:
-                    temp_streak += 1
-                    longest_streak = max(longest_streak, temp_streak)
-                else:
-                    temp_streak = 1
-
-            streaks['current_streak'] = current_streak
-            streaks['longest_streak'] = longest_streak
-            streaks['total_days'] = len(sorted_days)
-
-            # Days since first log
-            if sorted_days:
-                days_since_start = (now.date() - sorted_days[0]).days + 1
-                streaks['consistency_rate'] = round((len(sorted_days) / days_since_start) * 100, 1) if days_since_start > 0 else 0
-
-    # === MACRO RATIO ANALYSIS ===
-    macro_analysis = {}
-    if overall_stats.get('avg_daily_protein') and overall_stats.get('avg_daily_carbs') and overall_stats.get('avg_daily_fat'):
-        protein_g = overall_stats['avg_daily_protein']
-        carbs_g = overall_stats['avg_daily_carbs']
-        fat_g = overall_stats['avg_daily_fat']
-
-        # Calculate calories from each macro
-        protein_cal = protein_g * 4
-        carbs_cal = carbs_g * 4
-        fat_cal = fat_g * 9
-
-        total_macro_cal = protein_cal + carbs_cal + fat_cal
-
-        if total_macro_cal > 0:
-            macro_analysis['protein_percent'] = round((protein_cal / total_macro_cal) * 100, 1)
-            macro_analysis['carbs_percent'] = round((carbs_cal / total_macro_cal) * 100, 1)
-            macro_analysis['fat_percent'] = round((fat_cal / total_macro_cal) * 100, 1)
-
-            # Protein per kg body weight (if we have weight data)
-            if weights_list:
-                latest_weight = float(weights_list[-1].weight)
-                macro_analysis['protein_per_kg'] = round(protein_g / latest_weight, 2)
-
-            # Macro balance assessment
-            # Recommended ranges: Protein 10-35%, Carbs 45-65%, Fat 20-35%
-            macro_analysis['balance_notes'] = []
-            if macro_analysis['protein_percent'] < 15:
-                macro_analysis['balance_notes'].append('Protein intake is low (below 15%)')
-            elif macro_analysis['protein_percent'] > 35:
-                macro_analysis['balance_notes'].append('Protein intake is high (above 35%)')
-
-            if macro_analysis['carbs_percent'] < 40:
-                macro_analysis['balance_notes'].append('Carb intake is low (below 40%)')
-            elif macro_analysis['carbs_percent'] > 65:
-                macro_analysis['balance_notes'].append('Carb intake is high (above 65%)')
-
-            if macro_analysis['fat_percent'] < 20:
-                macro_analysis['balance_notes'].append('Fat intake is low (below 20%)')
-            elif macro_analysis['fat_percent'] > 40:
-                macro_analysis['balance_notes'].append('Fat intake is high (above 40%)')
-
-    # === WEIGHT PACE ANALYSIS ===
-    weight_pace = {}
-    if len(weights_list) >= 2:
-        first_weight = float(weights_list[0].weight)
-        last_weight = float(weights_list[-1].weight)
-        first_date = weights_list[0].recorded_at
-        last_date = weights_list[-1].recorded_at
-
-        days_diff = (last_date - first_date).days
-        if days_diff > 0:
-            total_change = last_weight - first_weight
-            weight_pace['total_change'] = round(total_change, 1)
-            weight_pace['days'] = days_diff
-            weight_pace['weekly_rate'] = round((total_change / days_diff) * 7, 2)
-            weight_pace['monthly_rate'] = round((total_change / days_diff) * 30, 1)
-
-            # Healthy weight loss/gain is typically 0.5-1 kg per week
-            if total_change < 0:
-                weight_pace['status'] = 'losing'
-                if abs(weight_pace['weekly_rate']) > 1:
-                    weight_pace['pace_assessment'] = 'Rapid weight loss (>1 kg/week) - may be too fast'
-                elif abs(weight_pace['weekly_rate']) >= 0.5:
-                    weight_pace['pace_assessment'] = 'Healthy weight loss pace (0.5-1 kg/week)'
-                else:
-                    weight_pace['pace_assessment'] = 'Slow but steady weight loss (<0.5 kg/week)'
-            elif total_change > 0:
-                weight_pace['status'] = 'gaining'
-                if weight_pace['weekly_rate'] > 0.5:
-                    weight_pace['pace_assessment'] = 'Rapid weight gain (>0.5 kg/week)'
-                else:
-                    weight_pace['pace_assessment'] = 'Gradual weight gain (<0.5 kg/week)'
-            else:
-                weight_pace['status'] = 'maintaining'
-                weight_pace['pace_assessment'] = 'Weight is stable'
-
-            # Estimated calorie deficit/surplus
-            # 1 kg of body weight ≈ 7700 calories
-            if days_diff >= 7:
-                daily_cal_change = (total_change * 7700) / days_diff
-                weight_pace['estimated_daily_deficit'] = round(daily_cal_change, 0)
-
-    # === GOAL PROJECTIONS ===
-    projections = {}
-    if weight_pace.get('weekly_rate') and weights_list:
-        current_weight = float(weights_list[-1].weight)
-        weekly_rate = weight_pace['weekly_rate']
-
-        # Project weight in 4 weeks, 8 weeks, 12 weeks
-        if weekly_rate != 0:
-            projections['4_weeks'] = round(current_weight + (weekly_rate * 4), 1)
-            projections['8_weeks'] = round(current_weight + (weekly_rate * 8), 1)
-            projections['12_weeks'] = round(current_weight + (weekly_rate * 12), 1)
-
-            # Time to reach common goals (if losing weight)
-            if weekly_rate < 0:
-                goal_weights = [70, 75, 80, 85, 90, 95]
-                projections['goals'] = []
-                for goal in goal_weights:
-                    if goal < current_weight:
-                        weeks_to_goal = (current_weight - goal) / abs(weekly_rate)
-                        if weeks_to_goal <= 52:  # Only show if achievable within a year
-                            target_date = now + timedelta(weeks=weeks_to_goal)
-                            projections['goals'].append({
-                                'weight': goal,
-                                'weeks': round(weeks_to_goal, 0),
-                                'date': target_date.strftime('%B %d, %Y')
-                            })
-
-    # === CALORIE CONSISTENCY SCORE ===
-    consistency_score = {}
-    if calories_list and len(calories_list) >= 7:
-        avg_cal = statistics.mean(calories_list)
-        std_dev = statistics.stdev(calories_list) if len(calories_list) > 1 else 0
-
-        # Coefficient of variation (lower is more consistent)
-        cv = (std_dev / avg_cal) * 100 if avg_cal > 0 else 0
-
-        if cv < 10:
-            consistency_score['rating'] = 'Excellent'
-            consistency_score['description'] = 'Very consistent calorie intake'
-            consistency_score['score'] = 95
-        elif cv < 15:
-            consistency_score['rating'] = 'Good'
-            consistency_score['description'] = 'Fairly consistent calorie intake'
-            consistency_score['score'] = 80
-        elif cv < 25:
-            consistency_score['rating'] = 'Moderate'
-            consistency_score['description'] = 'Some variation in daily calories'
-            consistency_score['score'] = 60
-        else:
-            consistency_score['rating'] = 'Variable'
-            consistency_score['description'] = 'High variation in daily calories'
-            consistency_score['score'] = 40
-
-        consistency_score['cv'] = round(cv, 1)
-
-    # === ADDITIONAL INSIGHTS ===
-    # Add more insights based on data patterns
-
-    # Weekend overeating insight
-    if weekday_insights.get('weekend_difference') and weekday_insights['weekend_difference'] > 200:
-        insights.append({
-            'type': 'weekend',
-            'icon': '📅',
-            'title': 'Weekend Pattern',
-            'description': f'You eat ~{weekday_insights["weekend_difference"]:.0f} more calories on weekends ({weekday_insights["weekend_avg"]:.0f}) vs weekdays ({weekday_insights["weekday_avg"]:.0f}).',
-            'recommendation': 'Plan weekend meals in advance to stay on track.'
-        })
-
-    # Consistency insight
-    if consistency_score.get('rating') == 'Variable':
-        insights.append({
-            'type': 'consistency',
-            'icon': '📊',
-            'title': 'Calorie Variability',
-            'description': f'Your daily calories vary significantly (CV: {consistency_score["cv"]:.1f}%). Range: {overall_stats.get("calorie_min", 0):.0f} - {overall_stats.get("calorie_max", 0):.0f} kcal.',
-            'recommendation': 'Try meal prepping to maintain more consistent intake.'
-        })
-
-    # Protein adequacy insight
-    if macro_analysis.get('protein_per_kg'):
-        if macro_analysis['protein_per_kg'] < 1.2:
-            insights.append({
-                'type': 'protein',
-                'icon': '🥩',
-                'title': 'Protein Intake',
-                'description': f'You\'re getting {macro_analysis["protein_per_kg"]:.2f}g protein per kg body weight. For muscle maintenance, aim for 1.2-1.6g/kg.',
-                'recommendation': f'Consider increasing protein to {round(float(weights_list[-1].weight) * 1.4, 0):.0f}g daily.'
-            })
-        elif macro_analysis['protein_per_kg'] >= 1.6:
-            insights.append({
-                'type': 'protein',
-                'icon': '💪',
-                'title': 'Strong Protein Intake',
-                'description': f'Excellent! You\'re getting {macro_analysis["protein_per_kg"]:.2f}g protein per kg body weight.',
-                'recommendation': 'Keep up the good protein intake for muscle health.'
-            })
-
-    # Streak insight
-    if streaks.get('current_streak', 0) >= 7:
-        insights.append({
-            'type': 'streak',
-            'icon': '🔥',
-            'title': 'Logging Streak',
-            'description': f'Great job! You\'ve logged {streaks["current_streak"]} days in a row. Your longest streak is {streaks["longest_streak"]} days.',
-            'recommendation': 'Keep the momentum going!'
-        })
-
-    # Weight milestone insight
-    if weight_pace.get('total_change') and weight_pace['total_change'] < -5:
-        insights.append({
-            'type': 'milestone',
-            'icon': '🏆',
-            'title': 'Weight Loss Milestone',
-            'description': f'Amazing! You\'ve lost {abs(weight_pace["total_change"]):.1f} kg in {weight_pace["days"]} days.',
-            'recommendation': 'Celebrate your progress and keep going!'
-        })
-
-    # === MEAL TIMING ANALYSIS ===
-    meal_timing = {}
-    if food_items.exists():
-        # Group by hour of day
-        hour_data = {}
-        for item in food_items:
-            hour = item.consumed_at.hour
-            if hour not in hour_data:
-                hour_data[hour] = {'calories': 0, 'count': 0}
-            hour_data[hour]['calories'] += float(item.calories or 0)
-            hour_data[hour]['count'] += 1
-
-        if hour_data:
-            # Define meal periods
-            morning = sum(hour_data.get(h, {}).get('calories', 0) for h in range(5, 11))  # 5-10
-            midday = sum(hour_data.get(h, {}).get('calories', 0) for h in range(11, 15))  # 11-14
-            afternoon = sum(hour_data.get(h, {}).get('calories', 0) for h in range(15, 18))  # 15-17
-            evening = sum(hour_data.get(h, {}).get('calories', 0) for h in range(18, 22))  # 18-21
-            night = sum(hour_data.get(h, {}).get('calories', 0) for h in list(range(22, 24)) + list(range(0, 5)))
-
-            total_cal = morning + midday + afternoon + evening + night
-            if total_cal > 0:
-                meal_timing['morning'] = {'calories': round(morning, 0), 'percent': round((morning/total_cal)*100, 1)}
-                meal_timing['midday'] = {'calories': round(midday, 0), 'percent': round((midday/total_cal)*100, 1)}
-                meal_timing['afternoon'] = {'calories': round(afternoon, 0), 'percent': round((afternoon/total_cal)*100, 1)}
-                meal_timing['evening'] = {'calories': round(evening, 0), 'percent': round((evening/total_cal)*100, 1)}
-                meal_timing['night'] = {'calories': round(night, 0), 'percent': round((night/total_cal)*100, 1)}
-
-                # Find peak eating time
-                periods = [('Morning (5-10)', morning), ('Midday (11-14)', midday),
-                          ('Afternoon (15-17)', afternoon), ('Evening (18-21)', evening), ('Night (22-4)', night)]
-                peak_period = max(periods, key=lambda x: x[1])
-                meal_timing['peak_period'] = peak_period[0]
-                # 24-hour breakdown for chart
-                meal_timing['hourly_json'] = json.dumps(
-                    [round(hour_data.get(h, {}).get('calories', 0), 1) for h in range(24)]
-                )
-
-    # === TOP FOODS ANALYSIS ===
-    top_foods = {}
-    if food_items.exists():
-        from django.db.models import Count as DjangoCount
-
-        # Most frequent foods
-        frequent_foods = food_items.values('product_name').annotate(
-            count=DjangoCount('id'),
-            total_calories=Sum('calories'),
-            total_protein=Sum('protein')
-        ).order_by('-count')
-
-        top_foods['most_frequent'] = list(frequent_foods)
-
-        # Highest calorie foods (single items)
-        high_cal_foods = food_items.order_by('-calories')[:5]
-        top_foods['highest_calorie'] = [
-            {'name': f.product_name, 'calories': float(f.calories), 'date': f.consumed_at}
-            for f in high_cal_foods
-        ]
-
-        # Highest protein foods
-        high_protein_foods = food_items.filter(protein__isnull=False).order_by('-protein')[:5]
-        top_foods['highest_protein'] = [
-            {'name': f.product_name, 'protein': float(f.protein), 'date': f.consumed_at}
-            for f in high_protein_foods
-        ]
-
-    # === CALORIE BUDGET ANALYSIS ===
-    calorie_budget = {}
-    target_calories = 2500  # Default target, could be user-configurable
-
-    if calories_list:
-        days_under = sum(1 for c in calories_list if c <= target_calories)
-        days_over = len(calories_list) - days_under
-
-        calorie_budget['target'] = target_calories
-        calorie_budget['days_under'] = days_under
-        calorie_budget['days_over'] = days_over
-        calorie_budget['under_percent'] = round((days_under / len(calories_list)) * 100, 1)
-        calorie_budget['avg_over_amount'] = round(
-            statistics.mean([c - target_calories for c in calories_list if c > target_calories]), 0
-        ) if days_over > 0 else 0
-        calorie_budget['avg_under_amount'] = round(
-            statistics.mean([target_calories - c for c in calories_list if c <= target_calories]), 0
-        ) if days_under > 0 else 0
-
-    # === WEIGHT VOLATILITY ANALYSIS ===
-    weight_volatility = {}
-    if len(weights_list) >= 5:
-        weight_values = [float(w.weight) for w in weights_list]
-
-        # Calculate daily fluctuations
-        fluctuations = [abs(weight_values[i] - weight_values[i-1]) for i in range(1, len(weight_values))]
-
-        weight_volatility['avg_fluctuation'] = round(statistics.mean(fluctuations), 2)
-        weight_volatility['max_fluctuation'] = round(max(fluctuations), 2)
-
-        # Count significant fluctuations (>0.5 kg)
-        significant_fluct = sum(1 for f in fluctuations if f > 0.5)
-        weight_volatility['significant_fluctuations'] = significant_fluct
-        weight_volatility['stability_score'] = round(100 - (significant_fluct / len(fluctuations) * 100), 0) if fluctuations else 100
-
-        # Trend analysis - compare first half to second half
-        mid = len(weight_values) // 2
-        first_half_avg = statistics.mean(weight_values[:mid])
-        second_half_avg = statistics.mean(weight_values[mid:])
-        weight_volatility['trend_direction'] = 'decreasing' if second_half_avg < first_half_avg else 'increasing' if second_half_avg > first_half_avg else 'stable'
-        weight_volatility['trend_change'] = round(second_half_avg - first_half_avg, 2)
-
-    # === NUTRITION SCORE ===
-    nutrition_score = {}
-    if macro_analysis and overall_stats.get('avg_daily_calories'):
-        score = 0
-        max_score = 100
-        breakdown = []
-
-        # Protein score (max 25 points)
-        protein_per_kg = macro_analysis.get('protein_per_kg', 0)
-        if protein_per_kg >= 1.6:
-            protein_score = 25
-            breakdown.append({'name': 'Protein', 'score': 25, 'status': 'Excellent'})
-        elif protein_per_kg >= 1.2:
-            protein_score = 20
-            breakdown.append({'name': 'Protein', 'score': 20, 'status': 'Good'})
-        elif protein_per_kg >= 0.8:
-            protein_score = 15
-            breakdown.append({'name': 'Protein', 'score': 15, 'status': 'Adequate'})
-        else:
-            protein_score = 5
-            breakdown.append({'name': 'Protein', 'score': 5, 'status': 'Low'})
-        score += protein_score
-
-        # Macro balance score (max 25 points)
-        protein_pct = macro_analysis.get('protein_percent', 0)
-        carbs_pct = macro_analysis.get('carbs_percent', 0)
-        fat_pct = macro_analysis.get('fat_percent', 0)
-
-        balance_score = 25
-        if protein_pct < 15 or protein_pct > 35:
-            balance_score -= 8
-        if carbs_pct < 40 or carbs_pct > 65:
-            balance_score -= 8
-        if fat_pct < 20 or fat_pct > 40:
-            balance_score -= 8
-        balance_score = max(0, balance_score)
-        breakdown.append({'name': 'Macro Balance', 'score': balance_score, 'status': 'Good' if balance_score >= 20 else 'Needs Work'})
-        score += balance_score
-
-        # Consistency score (max 25 points)
-        if consistency_score.get('score'):
-            cons_points = round(consistency_score['score'] * 0.25)
-            breakdown.append({'name': 'Consistency', 'score': cons_points, 'status': consistency_score.get('rating', 'N/A')})
-            score += cons_points
-
-        # Logging dedication (max 25 points)
-        if streaks.get('consistency_rate'):
-            log_score = min(25, round(streaks['consistency_rate'] * 0.25))
-            breakdown.append({'name': 'Logging', 'score': log_score, 'status': 'Dedicated' if log_score >= 20 else 'Regular' if log_score >= 10 else 'Sporadic'})
-            score += log_score
-
-        nutrition_score['total'] = min(100, score)
-        nutrition_score['breakdown'] = breakdown
-        nutrition_score['grade'] = 'A' if score >= 85 else 'B' if score >= 70 else 'C' if score >= 55 else 'D' if score >= 40 else 'F'
-
-    # === PERIOD COMPARISON ===
-    period_comparison = {}
-    if start_date and daily_stats_list:
-        # Calculate previous period of same length
-        period_days = int(period) if period != 'all' else 90
-        prev_start = start_date - timedelta(days=period_days)
-        prev_end = start_date
-
-        prev_food_items = FoodItem.objects.filter(consumed_at__gte=prev_start, consumed_at__lt=prev_end)
-        prev_weights = Weight.objects.filter(recorded_at__gte=prev_start, recorded_at__lt=prev_end).order_by('recorded_at')
-
-        if prev_food_items.exists():
-            # Previous period stats
-            prev_daily = prev_food_items.annotate(day=TruncDate('consumed_at')).values('day').annotate(
-                total_calories=Sum('calories'),
-                total_protein=Sum('protein')
-            )
-            prev_daily_list = list(prev_daily)
-
-            if prev_daily_list:
-                prev_cal_list = [float(d['total_calories']) for d in prev_daily_list if d['total_calories']]
-                if prev_cal_list and calories_list:
-                    prev_avg_cal = statistics.mean(prev_cal_list)
-                    curr_avg_cal = statistics.mean(calories_list)
-
-                    period_comparison['prev_avg_calories'] = round(prev_avg_cal, 0)
-                    period_comparison['curr_avg_calories'] = round(curr_avg_cal, 0)
-                    period_comparison['calorie_change'] = round(curr_avg_cal - prev_avg_cal, 0)
-                    period_comparison['calorie_change_percent'] = round(((curr_avg_cal - prev_avg_cal) / prev_avg_cal) * 100, 1) if prev_avg_cal > 0 else 0
-
-                    prev_protein_list = [float(d['total_protein']) for d in prev_daily_list if d['total_protein']]
-                    if prev_protein_list:
-                        curr_protein_list = [float(d['total_protein']) for d in daily_stats_list if d['total_protein']]
-                        if curr_protein_list:
-                            prev_avg_protein = statistics.mean(prev_protein_list)
-                            curr_avg_protein = statistics.mean(curr_protein_list)
-                            period_comparison['prev_avg_protein'] = round(prev_avg_protein, 1)
-                            period_comparison['curr_avg_protein'] = round(curr_avg_protein, 1)
-                            period_comparison['protein_change'] = round(curr_avg_protein - prev_avg_protein, 1)
-
-        # Weight comparison
-        if prev_weights.exists() and weights_list:
-            prev_weight_list = list(prev_weights)
-            if prev_weight_list:
-                prev_avg_weight = statistics.mean([float(w.weight) for w in prev_weight_list])
-                curr_avg_weight = statistics.mean([float(w.weight) for w in weights_list])
-                period_comparison['prev_avg_weight'] = round(prev_avg_weight, 1)
-                period_comparison['curr_avg_weight'] = round(curr_avg_weight, 1)
-                period_comparison['weight_change'] = round(curr_avg_weight - prev_avg_weight, 1)
-
-    # === ACHIEVEMENTS ===
-    achievements = []
-
-    # Streak achievements
-    if streaks.get('current_streak', 0) >= 30:
-        achievements.append({'icon': '🔥', 'title': 'Monthly Warrior', 'desc': '30+ day logging streak'})
-    elif streaks.get('current_streak', 0) >= 14:
-        achievements.append({'icon': '🔥', 'title': 'Two Week Champion', 'desc': '14+ day logging streak'})
-    elif streaks.get('current_streak', 0) >= 7:
-        achievements.append({'icon': '🔥', 'title': 'Week Warrior', 'desc': '7+ day logging streak'})
-
-    # Weight achievements
-    if weight_pace.get('total_change', 0) <= -10:
-        achievements.append({'icon': '🏆', 'title': 'Major Milestone', 'desc': 'Lost 10+ kg'})
-    elif weight_pace.get('total_change', 0) <= -5:
-        achievements.append({'icon': '🥇', 'title': 'Great Progress', 'desc': 'Lost 5+ kg'})
-    elif weight_pace.get('total_change', 0) <= -2:
-        achievements.append({'icon': '🥈', 'title': 'Good Start', 'desc': 'Lost 2+ kg'})
-
-    # Consistency achievements
-    if consistency_score.get('score', 0) >= 90:
-        achievements.append({'icon': '🎯', 'title': 'Precision Eater', 'desc': 'Excellent calorie consistency'})
-
-    # Protein achievements
-    if macro_analysis.get('protein_per_kg', 0) >= 2.0:
-        achievements.append({'icon': '💪', 'title': 'Protein Champion', 'desc': '2+ g protein per kg body weight'})
-    elif macro_analysis.get('protein_per_kg', 0) >= 1.6:
-        achievements.append({'icon': '🥩', 'title': 'Protein Pro', 'desc': '1.6+ g protein per kg body weight'})
-
-    # Logging achievements
-    if streaks.get('total_days', 0) >= 100:
-        achievements.append({'icon': '📊', 'title': 'Century Logger', 'desc': '100+ days logged'})
-    elif streaks.get('total_days', 0) >= 50:
-        achievements.append({'icon': '📈', 'title': 'Dedicated Tracker', 'desc': '50+ days logged'})
-
-    # Consistency rate achievements
-    if streaks.get('consistency_rate', 0) >= 90:
-        achievements.append({'icon': '⭐', 'title': 'Super Consistent', 'desc': '90%+ logging consistency'})
-
-    # Balance achievement
-    if nutrition_score.get('total', 0) >= 80:
-        achievements.append({'icon': '🌟', 'title': 'Nutrition Master', 'desc': 'Excellent overall nutrition score'})
-
-    # === CALORIE DISTRIBUTION ANALYSIS ===
-    calorie_distribution = {}
-    if calories_list and len(calories_list) >= 10:
-        # Categorize days
-        very_low = sum(1 for c in calories_list if c < 1500)
-        low = sum(1 for c in calories_list if 1500 <= c < 2000)
-        moderate = sum(1 for c in calories_list if 2000 <= c < 2500)
-        high = sum(1 for c in calories_list if 2500 <= c < 3000)
-        very_high = sum(1 for c in calories_list if c >= 3000)
-
-        total = len(calories_list)
-        calorie_distribution['very_low'] = {'count': very_low, 'percent': round((very_low/total)*100, 1), 'label': '<1500'}
-        calorie_distribution['low'] = {'count': low, 'percent': round((low/total)*100, 1), 'label': '1500-2000'}
-        calorie_distribution['moderate'] = {'count': moderate, 'percent': round((moderate/total)*100, 1), 'label': '2000-2500'}
-        calorie_distribution['high'] = {'count': high, 'percent': round((high/total)*100, 1), 'label': '2500-3000'}
-        calorie_distribution['very_high'] = {'count': very_high, 'percent': round((very_high/total)*100, 1), 'label': '3000+'}
-
-    # Add insight for late night eating
-    if meal_timing.get('night', {}).get('percent', 0) > 15:
-        insights.append({
-            'type': 'timing',
-            'icon': '🌙',
-            'title': 'Late Night Eating',
-            'description': f'{meal_timing["night"]["percent"]:.0f}% of your calories are consumed late at night (after 10 PM).',
-            'recommendation': 'Try to finish eating earlier for better digestion and sleep quality.'
-        })
-
-    # Add insight for calorie distribution
-    if calorie_distribution.get('very_high', {}).get('percent', 0) > 20:
-        insights.append({
-            'type': 'distribution',
-            'icon': '📊',
-            'title': 'High Calorie Days',
-            'description': f'{calorie_distribution["very_high"]["percent"]:.0f}% of your days exceed 3000 calories.',
-            'recommendation': 'Identify triggers for high-calorie days and plan alternatives.'
-        })
-
-    context = {
-        'period': period,
-        'weekly_summary': weekly_summary,  # This week dashboard
-        'goal_progress': goal_progress,  # Goal tracking with progress bars
-        'goals': goals,  # Goal targets
-        'weekly_reports': weekly_reports[:12],  # Last 12 weeks
-        'monthly_reports': monthly_reports[:12],  # Last 12 months
-        'best_worst_days': best_worst_days,
-        'weight_analysis': weight_analysis,
-        'insights': insights,
-        'overall_stats': overall_stats,
-        'day_of_week_stats': day_of_week_stats,
-        'weekday_insights': weekday_insights,
-        'streaks': streaks,
-        'macro_analysis': macro_analysis,
-        'weight_pace': weight_pace,
-        'projections': projections,
-        'consistency_score': consistency_score,
-        'meal_timing': meal_timing,
-        'top_foods': top_foods,
-        'calorie_budget': calorie_budget,
-        'weight_volatility': weight_volatility,
-        'nutrition_score': nutrition_score,
-        'period_comparison': period_comparison,
-        'achievements': achievements,
-        'calorie_distribution': calorie_distribution,
-    }
-
-    return render(request, 'count_calories_app/analytics.html', context)
-
-
-# ============================================
-# REACT FRONTEND JSON API ENDPOINTS
-# ============================================
-
-@require_http_methods(["GET"])
-def api_dashboard(request):
-    """Dashboard data for React frontend"""
-    from django.db.models.functions import TruncDate
-    now = timezone.now()
-    today_date = now.date()
-    week_start = now - timedelta(days=now.weekday())
-    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-    today_end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-    # Today's food stats - use TruncDate for consistent filtering
-    today_food = FoodItem.objects.annotate(
-        consumed_date=TruncDate('consumed_at')
-    ).filter(consumed_date=today_date)
-    today_stats = today_food.aggregate(
-        calories=Sum('calories'),
-        protein=Sum('protein'),
-        carbs=Sum('carbohydrates'),
-        fat=Sum('fat'),
-        count=Count('id')
-    )
-
-    # This week's food stats
-    week_food = FoodItem.objects.filter(consumed_at__gte=week_start, consumed_at__lte=today_end)
-    week_stats = week_food.aggregate(
-        calories=Sum('calories'),
-        protein=Sum('protein'),
-        carbs=Sum('carbohydrates'),
-        fat=Sum('fat'),
-        count=Count('id')
-    )
-
-    # Latest weight
-    latest_weight = Weight.objects.order_by('-recorded_at').first()
-    weight_week_ago = Weight.objects.filter(recorded_at__lte=now - timedelta(days=7)).order_by('-recorded_at').first()
-    weight_change = None
-    if latest_weight and weight_week_ago:
-        weight_change = float(latest_weight.weight) - float(weight_week_ago.weight)
-
-    # This week's workouts and runs
-    week_workouts = WorkoutSession.objects.filter(date__gte=week_start.date()).count()
-    week_runs = RunningSession.objects.filter(date__gte=week_start.date())
-    week_run_stats = week_runs.aggregate(
-        total_distance=Sum('distance'),
-        count=Count('id')
+    # This week's workouts and runs
+    week_workouts = WorkoutSession.objects.filter(date__gte=week_start.date()).count()
+    week_runs = RunningSession.objects.filter(date__gte=week_start.date())
+    week_run_stats = week_runs.aggregate(
+        total_distance=Sum('distance'),
+        count=Count('id')
     )
 
     # Last week data for comparison
     last_week_start = week_start - timedelta(days=7)
     last_week_end = week_start
-    last_week_food = FoodItem.objects.filter(consumed_at__gte=last_week_start, consumed_at__lt=last_week_end)
-    last_week_daily = last_week_food.annotate(day=TruncDate('consumed_at')).values('day').annotate(
-        total_cal=Sum('calories'), total_prot=Sum('protein')
-    )
-    last_week_days = last_week_daily.count()
-    last_week_total_cal = sum([d['total_cal'] or 0 for d in last_week_daily])
-    last_week_total_prot = sum([float(d['total_prot'] or 0) for d in last_week_daily])
+    last_week_daily = list(DailyNutrition.objects.between(
+        last_week_start.date(), last_week_end.date() - timedelta(days=1)
+    ).daily_totals())
+    last_week_days = len(last_week_daily)
+    last_week_total_cal = sum([d['total_calories'] or 0 for d in last_week_daily])
+    last_week_total_prot = sum([float(d['total_protein'] or 0) for d in last_week_daily])
     last_week_avg_cal = round(last_week_total_cal / last_week_days, 0) if last_week_days else 0
     last_week_avg_prot = round(last_week_total_prot / last_week_days, 1) if last_week_days else 0
     last_week_workouts = WorkoutSession.objects.filter(date__gte=last_week_start.date(), date__lt=last_week_end.date()).count()
 
     # This week averages
-    this_week_daily = week_food.annotate(day=TruncDate('consumed_at')).values('day').annotate(
-        total_cal=Sum('calories'), total_prot=Sum('protein')
-    )
-    this_week_days = this_week_daily.count()
-    this_week_total_cal = sum([d['total_cal'] or 0 for d in this_week_daily])
-    this_week_total_prot = sum([float(d['total_prot'] or 0) for d in this_week_daily])
+    this_week_daily = list(week_days.daily_totals())
+    this_week_days = len(this_week_daily)
+    this_week_total_cal = sum([d['total_calories'] or 0 for d in this_week_daily])
+    this_week_total_prot = sum([float(d['total_protein'] or 0) for d in this_week_daily])
     this_week_avg_cal = round(this_week_total_cal / this_week_days, 0) if this_week_days else 0
     this_week_avg_prot = round(this_week_total_prot / this_week_days, 1) if this_week_days else 0
 
@@ -3399,16 +2295,7 @@ def api_dashboard(request):
         food['consumed_at'] = food['consumed_at'].isoformat() if food['consumed_at'] else None
 
     # Streak calculation
-    streak = 0
-    check_date = now.date()
-    while True:
-        day_start = timezone.make_aware(timezone.datetime.combine(check_date, timezone.datetime.min.time()))
-        day_end = timezone.make_aware(timezone.datetime.combine(check_date, timezone.datetime.max.time()))
-        if FoodItem.objects.filter(consumed_at__gte=day_start, consumed_at__lte=day_end).exists():
-            streak += 1
-            check_date -= timedelta(days=1)
-        else:
-            break
+    streak = logging_streaks()['current_streak']
 
     # Get user settings for targets (sync weight from latest entry)
     settings = UserSettings.get_settings()
@@ -3517,6 +2404,7 @@ def api_dashboard(request):
 
 
 @require_http_methods(["GET"])
+@conditional_response(FoodItem)
 def api_food_items(request):
     """Get food items with filtering for React frontend"""
     days = request.GET.get('days', '90')
@@ -3556,15 +2444,47 @@ def api_food_items(request):
             food_items = FoodItem.objects.filter(consumed_at__gte=now - timedelta(days=90))
 
     food_items = food_items.order_by('-consumed_at')
+    per_page = per_page_param(request)
+    include_totals = include_totals_param(request)
+
+    # Totals over the whole range (include_totals=0 skips them, e.g. for infinite scroll)
+    totals = None
+    if include_totals:
+        totals = food_items.aggregate(
+            calories=Sum('calories'),
+            protein=Sum('protein'),
+            carbs=Sum('carbohydrates'),
+            fat=Sum('fat'),
+            count=Count('id')
+        )
+
+    # Pagination: keyset when a cursor is given, page numbers otherwise
+    try:
+        cursor_page = paginate_request(request, food_items, 'consumed_at')
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
-    # Pagination
-    page = int(request.GET.get('page', 1))
-    per_page = int(request.GET.get('per_page', 50))
-    paginator = Paginator(food_items, per_page)
-    page_obj = paginator.get_page(page)
+    if cursor_page is not None:
+        page_items = cursor_page.items
+        pagination = cursor_page.as_dict(per_page)
+    else:
+        try:
+            page = int(request.GET.get('page', 1))
+        except (TypeError, ValueError):
+            page = 1
+        paginator = Paginator(food_items, per_page)
+        if totals is not None:
+            paginator.count = totals['count']  # already counted with the totals
+        page_items = paginator.get_page(page)
+        pagination = {
+            'page': page,
+            'per_page': per_page,
+            'total_pages': paginator.num_pages,
+            'total_items': paginator.count,
+        }
 
     items = []
-    for item in page_obj:
+    for item in page_items:
         items.append({
             'id': item.id,
             'name': item.product_name,
@@ -3576,31 +2496,16 @@ def api_food_items(request):
             'hidden': item.hide_from_quick_list,
         })
 
-    # Totals
-    totals = food_items.aggregate(
-        calories=Sum('calories'),
-        protein=Sum('protein'),
-        carbs=Sum('carbohydrates'),
-        fat=Sum('fat'),
-        count=Count('id')
-    )
-
-    return JsonResponse({
-        'items': items,
-        'totals': {
+    response = {'items': items, 'pagination': pagination}
+    if totals is not None:
+        response['totals'] = {
             'calories': float(totals['calories']) if totals['calories'] else 0,
             'protein': round(float(totals['protein']) if totals['protein'] else 0, 1),
             'carbs': round(float(totals['carbs']) if totals['carbs'] else 0, 1),
             'fat': round(float(totals['fat']) if totals['fat'] else 0, 1),
             'count': totals['count'] or 0,
-        },
-        'pagination': {
-            'page': page,
-            'per_page': per_page,
-            'total_pages': paginator.num_pages,
-            'total_items': paginator.count,
         }
-    })
+    return JsonResponse(response)
 
 
 def _validate_food_data(data):
@@ -3712,28 +2617,22 @@ def api_delete_food(request, food_id):
 
 
 @require_http_methods(["GET"])
+@conditional_response(FoodItem)
 def api_quick_add_foods(request):
-    """Get recent foods for quick-add feature"""
-    recent_foods = FoodItem.objects.filter(
-        hide_from_quick_list=False
-    ).values('product_name').annotate(
-        count=Count('id'),
-        avg_calories=Avg('calories'),
-        avg_protein=Avg('protein'),
-        avg_carbs=Avg('carbohydrates'),
-        avg_fat=Avg('fat'),
-    ).order_by('-count')[:15]
+    """Get the most frequently logged foods for quick-add, using each food's latest entry"""
+    products = FoodProduct.objects.for_quick_add()[:15]
 
     # Transform to frontend-expected format
     foods = []
-    for i, food in enumerate(recent_foods):
+    for i, product in enumerate(products):
+        food = product.latest_item
         foods.append({
             'id': i + 1,  # Generate an ID for display purposes
-            'name': food['product_name'],
-            'calories': round(food['avg_calories'] or 0),
-            'protein': round(food['avg_protein'] or 0, 1),
-            'carbs': round(food['avg_carbs'] or 0, 1),
-            'fat': round(food['avg_fat'] or 0, 1),
+            'name': food.product_name,
+            'calories': round(float(food.calories or 0)),
+            'protein': round(float(food.protein or 0), 1),
+            'carbs': round(float(food.carbohydrates or 0), 1),
+            'fat': round(float(food.fat or 0), 1),
         })
 
     return JsonResponse({
@@ -3752,26 +2651,12 @@ def api_search_all_foods(request):
 
     if not query:
         # Return most frequently logged foods if no query
-        foods = FoodItem.objects.values('product_name').annotate(
-            count=Count('id'),
-            avg_calories=Avg('calories'),
-            avg_protein=Avg('protein'),
-            avg_carbs=Avg('carbohydrates'),
-            avg_fat=Avg('fat'),
-            last_used=Max('consumed_at'),
-        ).order_by('-count')[:limit]
+        foods = FoodProduct.objects.food_totals().order_by('-count', '-latest_consumed')[:limit]
     else:
-        # Search by name (case-insensitive)
-        foods = FoodItem.objects.filter(
-            product_name__icontains=query
-        ).values('product_name').annotate(
-            count=Count('id'),
-            avg_calories=Avg('calories'),
-            avg_protein=Avg('protein'),
-            avg_carbs=Avg('carbohydrates'),
-            avg_fat=Avg('fat'),
-            last_used=Max('consumed_at'),
-        ).order_by('-count')[:limit]
+        # Rank names through the full-text index, then read those products' totals
+        keys = list(dict.fromkeys(FoodProduct.key_for(name) for name in search_product_names(query, limit=limit)))
+        by_key = {food['key']: food for food in FoodProduct.objects.filter(key__in=keys).food_totals()}
+        foods = [by_key[key] for key in keys if key in by_key]
 
     # Transform to frontend-expected format
     results = []
@@ -3783,7 +2668,7 @@ def api_search_all_foods(request):
             'carbs': round(food['avg_carbs'] or 0, 1),
             'fat': round(food['avg_fat'] or 0, 1),
             'count': food['count'],
-            'last_used': food['last_used'].isoformat() if food['last_used'] else None,
+            'last_used': food['latest_consumed'].isoformat() if food['latest_consumed'] else None,
         })
 
     return JsonResponse({
@@ -3793,35 +2678,9 @@ def api_search_all_foods(request):
     })
 
 
-@require_http_methods(["GET"])
-def api_weight_items(request):
-    """Get weight entries for React frontend"""
-    days = request.GET.get('days', '365')
-    now = timezone.now()
-
-    if days == 'all':
-        weights = Weight.objects.all()
-    else:
-        try:
-            days_int = int(days)
-            start_date = now - timedelta(days=days_int)
-            weights = Weight.objects.filter(recorded_at__gte=start_date)
-        except ValueError:
-            weights = Weight.objects.filter(recorded_at__gte=now - timedelta(days=365))
-
-    weights = weights.order_by('-recorded_at')
-
-    items = []
-    for w in weights:
-        items.append({
-            'id': w.id,
-            'weight': float(w.weight),
-            'recorded_at': w.recorded_at.isoformat(),
-            'notes': w.notes,
-        })
-
-    # Stats
-    weight_values = [float(w.weight) for w in weights]
+def _weight_stats(history):
+    """Summary stats for weight entries given as (weight, recorded_at) pairs, newest first."""
+    weight_values = [float(weight) for weight, _ in history]
     stats = {}
     if weight_values:
         current_weight = weight_values[0]
@@ -3829,8 +2688,8 @@ def api_weight_items(request):
 
         # Change rate (kg/week)
         change_rate = 0
-        if len(weights) >= 2:
-            days_span = (weights[0].recorded_at - weights[len(weights)-1].recorded_at).days
+        if len(history) >= 2:
+            days_span = (history[0][1] - history[-1][1]).days
             if days_span > 0:
                 change_rate = round(change / (days_span / 7), 2)
 
@@ -3855,7 +2714,7 @@ def api_weight_items(request):
         if target_weight and current_weight > target_weight and change_rate < 0:
             weeks_to_goal = round((current_weight - target_weight) / abs(change_rate), 1)
             import datetime as dt
-            goal_date_val = weights[0].recorded_at + dt.timedelta(weeks=weeks_to_goal)
+            goal_date_val = history[0][1] + dt.timedelta(weeks=weeks_to_goal)
             goal_date = goal_date_val.strftime('%Y-%m-%d')
 
         stats = {
@@ -3872,11 +2731,53 @@ def api_weight_items(request):
             'goal_date': goal_date,
             'weight_goal': target_weight,
         }
+    return stats
 
-    return JsonResponse({
-        'items': items,
-        'stats': stats,
-    })
+
+@require_http_methods(["GET"])
+@conditional_response(Weight, UserSettings)
+def api_weight_items(request):
+    """Get weight entries for React frontend"""
+    days = request.GET.get('days', '365')
+    now = timezone.now()
+
+    if days == 'all':
+        weights = Weight.objects.all()
+    else:
+        try:
+            days_int = int(days)
+            start_date = now - timedelta(days=days_int)
+            weights = Weight.objects.filter(recorded_at__gte=start_date)
+        except ValueError:
+            weights = Weight.objects.filter(recorded_at__gte=now - timedelta(days=365))
+
+    weights = weights.order_by('-recorded_at')
+
+    # Keyset pagination when a cursor is given, the whole range otherwise
+    try:
+        cursor_page = paginate_request(request, weights, 'recorded_at')
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    page_items = list(weights) if cursor_page is None else cursor_page.items
+
+    items = []
+    for w in page_items:
+        items.append({
+            'id': w.id,
+            'weight': float(w.weight),
+            'recorded_at': w.recorded_at.isoformat(),
+            'notes': w.notes,
+        })
+
+    response = {'items': items}
+    if cursor_page is None:
+        response['stats'] = _weight_stats([(w.weight, w.recorded_at) for w in page_items])
+    else:
+        if include_totals_param(request):
+            response['stats'] = _weight_stats(list(weights.values_list('weight', 'recorded_at')))
+        response['pagination'] = cursor_page.as_dict(per_page_param(request))
+    return JsonResponse(response)
 
 
 @require_http_methods(["POST"])
@@ -3922,7 +2823,45 @@ def api_update_weight(request, weight_id):
     return JsonResponse({'success': True, 'message': 'Weight entry updated'})
 
 
+def _running_item(r):
+    """JSON dict for one running session, with the speed, pace and bucket stored on it."""
+    duration_seconds = r.duration.total_seconds() if r.duration else 0
+    distance = float(r.distance) if r.distance else 0
+    speed = r.speed_kmh
+    pace_seconds = r.pace_seconds or 0
+
+    return {
+        'id': r.id,
+        'date': r.date.isoformat() if r.date else None,
+        'distance': distance,
+        'duration': str(r.duration) if r.duration else None,
+        'duration_minutes': round(duration_seconds / 60, 1),
+        'speed': round(speed, 2),
+        'pace': f"{int(pace_seconds // 60)}:{int(pace_seconds % 60):02d}" if pace_seconds else None,
+        'distance_bucket': r.distance_bucket,
+        'moving_minutes': round(r.moving_duration.total_seconds() / 60, 1) if r.moving_duration else None,
+        'elevation_gain': r.elevation_gain,
+        'splits': r.splits or [],
+        'notes': r.notes,
+    }
+
+
+def _running_stats(items):
+    """Totals and averages over running items built by _running_item()."""
+    total_distance = sum(item['distance'] for item in items)
+    total_duration = sum(item['duration_minutes'] for item in items)
+    return {
+        'total_runs': len(items),
+        'total_distance': round(total_distance, 1),
+        'total_duration': round(total_duration, 1),
+        'avg_distance': round(total_distance / len(items), 1) if items else 0,
+        'avg_duration': round(total_duration / len(items), 1) if items else 0,
+        'avg_speed': round(sum(item['speed'] for item in items) / len(items), 2) if items else 0,
+    }
+
+
 @require_http_methods(["GET"])
+@conditional_response(RunningSession)
 def api_running_items(request):
     """Get running sessions for React frontend"""
     days = request.GET.get('days', '365')
@@ -3940,40 +2879,25 @@ def api_running_items(request):
 
     runs = runs.order_by('-date')
 
-    items = []
-    for r in runs:
-        duration_seconds = r.duration.total_seconds() if r.duration else 0
-        distance = float(r.distance) if r.distance else 0
-        speed = (distance / (duration_seconds / 3600)) if duration_seconds > 0 else 0
-        pace_seconds = (duration_seconds / distance) if distance > 0 else 0
-
-        items.append({
-            'id': r.id,
-            'date': r.date.isoformat() if r.date else None,
-            'distance': distance,
-            'duration': str(r.duration) if r.duration else None,
-            'duration_minutes': round(duration_seconds / 60, 1),
-            'speed': round(speed, 2),
-            'pace': f"{int(pace_seconds // 60)}:{int(pace_seconds % 60):02d}" if pace_seconds else None,
-            'notes': r.notes,
-        })
+    # Keyset pagination when a cursor is given, the whole range otherwise
+    try:
+        cursor_page = paginate_request(request, runs, 'date')
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
-    # Stats
-    total_distance = sum(item['distance'] for item in items)
-    total_duration = sum(item['duration_minutes'] for item in items)
-    stats = {
-        'total_runs': len(items),
-        'total_distance': round(total_distance, 1),
-        'total_duration': round(total_duration, 1),
-        'avg_distance': round(total_distance / len(items), 1) if items else 0,
-        'avg_duration': round(total_duration / len(items), 1) if items else 0,
-        'avg_speed': round(sum(item['speed'] for item in items) / len(items), 2) if items else 0,
-    }
+    items = [_running_item(r) for r in (runs if cursor_page is None else cursor_page.items)]
 
-    return JsonResponse({
-        'items': items,
-        'stats': stats,
-    })
+    response = {'items': items}
+    if cursor_page is None:
+        response['stats'] = _running_stats(items)
+    else:
+        if include_totals_param(request):
+            response['stats'] = _running_stats([
+                _running_item(RunningSession(distance=distance, duration=duration, speed_kmh=speed))
+                for distance, duration, speed in runs.values_list('distance', 'duration', 'speed_kmh')
+            ])
+        response['pagination'] = cursor_page.as_dict(per_page_param(request))
+    return JsonResponse(response)
 
 
 @require_http_methods(["POST"])
@@ -4005,6 +2929,15 @@ def api_add_running(request):
         return JsonResponse({'success': False, 'error': 'Failed to add running session. Please try again.'}, status=400)
 
 
+@require_http_methods(["POST"])
+def api_import_running_track(request):
+    """Create a running session from a GPX or TCX file uploaded as multipart ``file``."""
+    session, error = _import_track_upload(request)
+    if error:
+        return JsonResponse({'success': False, 'error': error}, status=400)
+    return JsonResponse({'success': True, 'id': session.id, 'item': _running_item(session)})
+
+
 @require_http_methods(["PUT", "PATCH"])
 def api_update_running(request, session_id):
     """Update a running session via React API"""
@@ -4036,6 +2969,52 @@ def api_delete_running(request, session_id):
 
 
 @require_http_methods(["GET"])
+@conditional_response(RunningSession)
+def api_running_personal_bests(request):
+    """
+    Fastest runs per distance bucket and the longest runs (?limit=N&bucket=5k...).
+
+    Each leaderboard is one indexed query, so the cost does not grow with the
+    number of sessions logged.
+    """
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LEADERBOARD_SIZE))
+    except ValueError:
+        return JsonResponse({'error': 'limit must be a whole number'}, status=400)
+    if not 1 <= limit <= MAX_LEADERBOARD_SIZE:
+        return JsonResponse({'error': f'limit must be between 1 and {MAX_LEADERBOARD_SIZE}'}, status=400)
+
+    buckets = request.GET.getlist('bucket') or None
+    known = {bucket for bucket, _, _ in RunningSession.DISTANCE_BUCKETS}
+    if buckets and not known.issuperset(buckets):
+        return JsonResponse({'error': f'bucket must be one of {", ".join(sorted(known))}'}, status=400)
+
+    bests = personal_bests(limit, buckets)
+    return JsonResponse({
+        'buckets': [
+            {**board, 'runs': [_running_item(r) for r in board['runs']]}
+            for board in bests['buckets']
+        ],
+        'longest': [_running_item(r) for r in bests['longest']],
+    })
+
+
+def _workout_stats(workouts):
+    """Session count, exercise count and total volume over a WorkoutSession queryset, in two queries."""
+    from django.db.models import F, FloatField
+    exercises = WorkoutExercise.objects.filter(workout__in=workouts).aggregate(
+        count=Count('id'),
+        volume=Sum(F('sets') * F('reps') * F('weight'), output_field=FloatField()),
+    )
+    return {
+        'total_workouts': workouts.count(),
+        'total_exercises': exercises['count'],
+        'total_volume': round(exercises['volume'] or 0, 1),
+    }
+
+
+@require_http_methods(["GET"])
+@conditional_response(WorkoutSession, WorkoutExercise, Exercise)
 def api_workouts(request):
     """Get workout sessions for React frontend"""
     days = request.GET.get('days', '90')
@@ -4051,17 +3030,22 @@ def api_workouts(request):
         except ValueError:
             workouts = WorkoutSession.objects.filter(date__gte=(now - timedelta(days=90)).date())
 
-    workouts = workouts.order_by('-date')
+    # Keyset pagination when a cursor is given, the whole range otherwise
+    try:
+        cursor_page = paginate_request(request, workouts.with_exercises().with_total_volume(), 'date')
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    if cursor_page is None:
+        page_workouts = workouts.with_exercises().with_total_volume().order_by('-date')
+    else:
+        page_workouts = cursor_page.items
 
     items = []
-    for w in workouts:
-        exercises = WorkoutExercise.objects.filter(workout=w)
+    for w in page_workouts:
         exercise_list = []
-        total_volume = 0
 
-        for ex in exercises:
-            volume = (ex.sets or 0) * (ex.reps or 0) * (float(ex.weight) if ex.weight else 0)
-            total_volume += volume
+        for ex in w.exercises.all():
+            volume = ex.volume or 0
             exercise_list.append({
                 'id': ex.id,
                 'exercise': ex.exercise.name if ex.exercise else 'Unknown',
@@ -4078,19 +3062,68 @@ def api_workouts(request):
             'notes': w.notes,
             'exercises': exercise_list,
             'exercise_count': len(exercise_list),
-            'total_volume': round(total_volume, 1),
+            'total_volume': round(w.total_volume, 1),
         })
 
-    # Stats
-    stats = {
-        'total_workouts': len(items),
-        'total_exercises': sum(item['exercise_count'] for item in items),
-        'total_volume': round(sum(item['total_volume'] for item in items), 1),
-    }
+    response = {'items': items}
+    if cursor_page is None:
+        response['stats'] = {
+            'total_workouts': len(items),
+            'total_exercises': sum(item['exercise_count'] for item in items),
+            'total_volume': round(sum(item['total_volume'] for item in items), 1),
+        }
+    else:
+        if include_totals_param(request):
+            response['stats'] = _workout_stats(workouts)
+        response['pagination'] = cursor_page.as_dict(per_page_param(request))
+    return JsonResponse(response)
+
 
+@require_http_methods(["GET"])
+@conditional_response(WorkoutSession, WorkoutExercise, Exercise)
+def api_workout_muscle_volume(request):
+    """
+    Weekly sets, reps and volume per muscle group.
+
+    The range is the last ``weeks`` weeks (default 12, ``weeks=52`` for a
+    year), or ``start_date`` through ``end_date`` (YYYY-MM-DD) widened to
+    whole Monday-to-Sunday weeks. ``heatmap`` holds ``metric`` (sets, reps or
+    volume; default sets) as one row per muscle group and one column per week.
+    All figures come from one grouped query, see training_volume.
+    """
+    from datetime import datetime
+
+    metric = request.GET.get('metric', 'sets')
+    if metric not in METRICS:
+        return JsonResponse({'error': f"metric must be one of {', '.join(METRICS)}"}, status=400)
+
+    start_date_param = request.GET.get('start_date')
+    end_date_param = request.GET.get('end_date')
+    try:
+        if start_date_param or end_date_param:
+            today = timezone.localdate()
+            start = datetime.strptime(start_date_param, '%Y-%m-%d').date() if start_date_param else today
+            end = datetime.strptime(end_date_param, '%Y-%m-%d').date() if end_date_param else today
+            first, last = week_start(start), week_start(end)
+        else:
+            weeks = int(request.GET.get('weeks', DEFAULT_WEEKS))
+            if weeks < 1:
+                raise ValueError
+            first, last = last_weeks(timezone.localdate(), weeks)
+    except ValueError:
+        return JsonResponse({'error': 'Use YYYY-MM-DD dates or a positive whole number of weeks'}, status=400)
+    if last < first:
+        return JsonResponse({'error': 'start_date must not be after end_date'}, status=400)
+    if (last - first).days // 7 >= MAX_WEEKS:
+        return JsonResponse({'error': f'At most {MAX_WEEKS} weeks can be requested'}, status=400)
+
+    volume = MuscleVolume(first, last)
     return JsonResponse({
-        'items': items,
-        'stats': stats,
+        'weeks': [week.isoformat() for week in volume.weeks],
+        'muscle_groups': volume.muscle_groups,
+        'series': volume.series(),
+        'totals': volume.totals(),
+        'heatmap': volume.heatmap(metric),
     })
 
 
@@ -4185,6 +3218,7 @@ def api_delete_workout_exercise(request, workout_id, exercise_id):
 
 
 @require_http_methods(["GET"])
+@conditional_response(Exercise)
 def api_exercises(request):
     """Get exercise library"""
     exercises = Exercise.objects.all().order_by('name')
@@ -4224,17 +3258,22 @@ def api_delete_exercise(request, exercise_id):
 
 
 @require_http_methods(["GET"])
+@conditional_response(BodyMeasurement, FoodItem, Weight, WorkoutSession, RunningSession, UserSettings)
 def api_body_measurements(request):
     """Get body measurements for React frontend"""
-    measurements = BodyMeasurement.objects.all().order_by('-date')[:50]
+    measurements = list(reversed(BodyMeasurement.objects.all().order_by('-date')[:50]))
+    match, within_days = matching_from_query(request.GET)
+    matched_weights = weights_for_dates([local_day(m.date) for m in measurements], match, within_days)
 
     items = []
     prev_measurement = None
+    prev_weight = None
 
-    for m in reversed(list(measurements)):
+    for m, weight in zip(measurements, matched_weights):
         item = {
             'id': m.id,
             'date': m.date.isoformat() if m.date else None,
+            'weight': float(weight) if weight is not None else None,
             'neck': float(m.neck) if m.neck else None,
             'chest': float(m.chest) if m.chest else None,
             'belly': float(m.belly) if m.belly else None,
@@ -4260,9 +3299,12 @@ def api_body_measurements(request):
                 previous = getattr(prev_measurement, field)
                 if current and previous:
                     item['changes'][field] = round(float(current) - float(previous), 1)
+            if weight is not None and prev_weight is not None:
+                item['changes']['weight'] = round(float(weight) - float(prev_weight), 1)
 
         items.append(item)
         prev_measurement = m
+        prev_weight = weight
 
     items.reverse()  # Most recent first
 
@@ -4270,562 +3312,70 @@ def api_body_measurements(request):
 
 
 @require_http_methods(["GET"])
+@conditional_response(FoodItem, Weight, WorkoutSession, RunningSession, UserSettings)
+@cached_response(FoodItem, Weight, WorkoutSession, RunningSession, UserSettings)
 def api_analytics(request):
     """Get comprehensive analytics data for React frontend - mirrors Django analytics view"""
-    import statistics
-    from django.db.models.functions import TruncDate, TruncWeek, TruncMonth
-
     period = request.GET.get('period', '90')
-    now = timezone.now()
-
-    if period == 'all':
-        start_date = None
-    else:
-        try:
-            days = int(period)
-            start_date = now - timedelta(days=days)
-        except ValueError:
-            start_date = now - timedelta(days=90)
-
-    # Get food items and weights
-    if start_date:
-        food_items = FoodItem.objects.filter(consumed_at__gte=start_date, consumed_at__lte=now)
-        weights = Weight.objects.filter(recorded_at__gte=start_date, recorded_at__lte=now).order_by('recorded_at')
-    else:
-        food_items = FoodItem.objects.filter(consumed_at__lte=now)
-        weights = Weight.objects.filter(recorded_at__lte=now).order_by('recorded_at')
+    engine = AnalyticsEngine.for_period(period)
 
-    # === DAILY STATS ===
-    daily_stats = food_items.annotate(
-        day=TruncDate('consumed_at')
-    ).values('day').annotate(
-        total_calories=Sum('calories'),
-        total_protein=Sum('protein'),
-        total_carbs=Sum('carbohydrates'),
-        total_fat=Sum('fat')
-    ).order_by('day')
-
-    daily_stats_list = list(daily_stats)
-    daily_data = []
-    for stat in daily_stats_list:
-        if stat['day']:
-            daily_data.append({
-                'date': stat['day'].isoformat(),
-                'calories': float(stat['total_calories'] or 0),
-                'protein': round(float(stat['total_protein'] or 0), 1),
-                'carbs': round(float(stat['total_carbs'] or 0), 1),
-                'fat': round(float(stat['total_fat'] or 0), 1),
-            })
-
-    # === THIS WEEK SUMMARY ===
-    this_week_start = now - timedelta(days=now.weekday())
-    this_week_start = this_week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-    last_week_start = this_week_start - timedelta(days=7)
-    last_week_end = this_week_start
-
-    this_week_food = FoodItem.objects.filter(consumed_at__gte=this_week_start, consumed_at__lte=now)
-    last_week_food = FoodItem.objects.filter(consumed_at__gte=last_week_start, consumed_at__lt=last_week_end)
-
-    this_week_daily = this_week_food.annotate(day=TruncDate('consumed_at')).values('day').annotate(
-        total_cal=Sum('calories'), total_prot=Sum('protein')
-    )
-    this_week_days_logged = this_week_daily.count()
-    this_week_total_cal = sum([d['total_cal'] or 0 for d in this_week_daily])
-    this_week_total_prot = sum([d['total_prot'] or 0 for d in this_week_daily])
-    this_week_avg_cal = round(this_week_total_cal / this_week_days_logged, 0) if this_week_days_logged else 0
-    this_week_avg_prot = round(float(this_week_total_prot) / this_week_days_logged, 1) if this_week_days_logged else 0
-
-    last_week_daily = last_week_food.annotate(day=TruncDate('consumed_at')).values('day').annotate(
-        total_cal=Sum('calories'), total_prot=Sum('protein')
-    )
-    last_week_days_logged = last_week_daily.count()
-    last_week_total_cal = sum([d['total_cal'] or 0 for d in last_week_daily])
-    last_week_total_prot = sum([d['total_prot'] or 0 for d in last_week_daily])
-    last_week_avg_cal = round(last_week_total_cal / last_week_days_logged, 0) if last_week_days_logged else 0
-    last_week_avg_prot = round(float(last_week_total_prot) / last_week_days_logged, 1) if last_week_days_logged else 0
-
-    this_week_workouts = WorkoutSession.objects.filter(date__gte=this_week_start.date()).count()
-    last_week_workouts = WorkoutSession.objects.filter(date__gte=last_week_start.date(), date__lt=this_week_start.date()).count()
-    this_week_runs = RunningSession.objects.filter(date__gte=this_week_start.date()).count()
-
-    weekly_summary = {
-        'this_week': {
-            'days_logged': this_week_days_logged,
-            'total_calories': float(this_week_total_cal),
-            'avg_calories': float(this_week_avg_cal),
-            'total_protein': round(float(this_week_total_prot), 0),
-            'avg_protein': float(this_week_avg_prot),
-            'workouts': this_week_workouts,
-            'runs': this_week_runs,
-        },
-        'last_week': {
-            'days_logged': last_week_days_logged,
-            'avg_calories': float(last_week_avg_cal),
-            'avg_protein': float(last_week_avg_prot),
-            'workouts': last_week_workouts,
-        },
-        'comparison': {
-            'calories_diff': round(this_week_avg_cal - last_week_avg_cal, 0) if last_week_avg_cal else None,
-            'protein_diff': round(this_week_avg_prot - last_week_avg_prot, 1) if last_week_avg_prot else None,
-            'workouts_diff': this_week_workouts - last_week_workouts,
+    def report(row, key):
+        days = row['days_logged']
+        return {
+            key: row[key].isoformat(),
+            'avg_calories': row['avg_calories'],
+            'avg_protein': round(row['total_protein'] / days, 0),
+            'avg_carbs': round(row['total_carbs'] / days, 0),
+            'avg_fat': round(row['total_fat'] / days, 0),
+            'days_logged': days,
         }
-    }
-
-    # === OVERALL STATS ===
-    overall_stats = {}
-    calories_list = []
-    if daily_stats_list:
-        calories_list = [float(d['total_calories']) for d in daily_stats_list if d['total_calories']]
-        if calories_list:
-            overall_stats['avg_daily_calories'] = round(statistics.mean(calories_list), 0)
-            overall_stats['total_days_logged'] = len(daily_stats_list)
-            overall_stats['calorie_min'] = round(min(calories_list), 0)
-            overall_stats['calorie_max'] = round(max(calories_list), 0)
-
-            protein_list = [float(d['total_protein']) for d in daily_stats_list if d['total_protein']]
-            carbs_list = [float(d['total_carbs']) for d in daily_stats_list if d['total_carbs']]
-            fat_list = [float(d['total_fat']) for d in daily_stats_list if d['total_fat']]
-
-            if protein_list:
-                overall_stats['avg_daily_protein'] = round(statistics.mean(protein_list), 1)
-                overall_stats['total_protein'] = round(sum(protein_list), 0)
-            if carbs_list:
-                overall_stats['avg_daily_carbs'] = round(statistics.mean(carbs_list), 1)
-                overall_stats['total_carbs'] = round(sum(carbs_list), 0)
-            if fat_list:
-                overall_stats['avg_daily_fat'] = round(statistics.mean(fat_list), 1)
-                overall_stats['total_fat'] = round(sum(fat_list), 0)
-
-    # === STREAKS ===
-    streaks = {}
-    if daily_stats_list:
-        sorted_days = sorted([d['day'] for d in daily_stats_list if d['day']])
-        if sorted_days:
-            current_streak = 1
-            for i in range(len(sorted_days) - 1, 0, -1):
-                if (sorted_days[i] - sorted_days[i-1]).days == 1:
-                    current_streak += 1
-                else:
-                    break
-
-            longest_streak = 1
-            temp_streak = 1
-            for i in range(1, len(sorted_days)):
-                if (sorted_days[i] - sorted_days[i-1]).days == 1:
-                    temp_streak += 1
-                    longest_streak = max(longest_streak, temp_streak)
-                else:
-                    temp_streak = 1
-
-            streaks['current_streak'] = current_streak
-            streaks['longest_streak'] = longest_streak
-            streaks['total_days'] = len(sorted_days)
-
-            if sorted_days:
-                days_since_start = (now.date() - sorted_days[0]).days + 1
-                streaks['consistency_rate'] = round((len(sorted_days) / days_since_start) * 100, 1) if days_since_start > 0 else 0
-
-    # === WEIGHT ANALYSIS ===
-    weight_analysis = {}
-    weights_list = list(weights)
-    if len(weights_list) >= 2:
-        first_weight = float(weights_list[0].weight)
-        last_weight = float(weights_list[-1].weight)
-        weight_analysis['start_weight'] = first_weight
-        weight_analysis['current_weight'] = last_weight
-        weight_analysis['total_change'] = round(last_weight - first_weight, 1)
-
-        weight_values = [float(w.weight) for w in weights_list]
-        weight_analysis['min_weight'] = min(weight_values)
-        weight_analysis['max_weight'] = max(weight_values)
-        weight_analysis['avg_weight'] = round(statistics.mean(weight_values), 1)
-        weight_analysis['days_tracked'] = len(weights_list)
-
-    # === WEIGHT PACE ===
-    weight_pace = {}
-    if len(weights_list) >= 2:
-        first_date = weights_list[0].recorded_at
-        last_date = weights_list[-1].recorded_at
-        days_diff = (last_date - first_date).days
-        if days_diff > 0:
-            total_change = float(weights_list[-1].weight) - float(weights_list[0].weight)
-            weight_pace['weekly_rate'] = round((total_change / days_diff) * 7, 2)
-            weight_pace['monthly_rate'] = round((total_change / days_diff) * 30, 1)
-            weight_pace['days'] = days_diff
-
-            if total_change < 0:
-                weight_pace['status'] = 'losing'
-                if abs(weight_pace['weekly_rate']) >= 0.5:
-                    weight_pace['pace_assessment'] = 'Healthy weight loss pace (0.5-1 kg/week)'
-                else:
-                    weight_pace['pace_assessment'] = 'Slow but steady weight loss (<0.5 kg/week)'
-            elif total_change > 0:
-                weight_pace['status'] = 'gaining'
-            else:
-                weight_pace['status'] = 'maintaining'
-
-            if days_diff >= 7:
-                weight_pace['estimated_daily_deficit'] = round((total_change * 7700) / days_diff, 0)
-
-    # === PROJECTIONS ===
-    projections = {}
-    if weight_pace.get('weekly_rate') and weights_list:
-        current_weight = float(weights_list[-1].weight)
-        weekly_rate = weight_pace['weekly_rate']
-        if weekly_rate != 0:
-            projections['4_weeks'] = round(current_weight + (weekly_rate * 4), 1)
-            projections['8_weeks'] = round(current_weight + (weekly_rate * 8), 1)
-            projections['12_weeks'] = round(current_weight + (weekly_rate * 12), 1)
-
-            if weekly_rate < 0:
-                goal_weights = [70, 75, 80, 85, 90, 95]
-                projections['goals'] = []
-                for goal in goal_weights:
-                    if goal < current_weight:
-                        weeks_to_goal = (current_weight - goal) / abs(weekly_rate)
-                        if weeks_to_goal <= 52:
-                            target_date = now + timedelta(weeks=weeks_to_goal)
-                            projections['goals'].append({
-                                'weight': goal,
-                                'weeks': round(weeks_to_goal, 0),
-                                'date': target_date.strftime('%B %d, %Y')
-                            })
-
-    # === MACRO ANALYSIS ===
-    macro_analysis = {}
-    if overall_stats.get('avg_daily_protein') and overall_stats.get('avg_daily_carbs') and overall_stats.get('avg_daily_fat'):
-        protein_g = overall_stats['avg_daily_protein']
-        carbs_g = overall_stats['avg_daily_carbs']
-        fat_g = overall_stats['avg_daily_fat']
-
-        protein_cal = protein_g * 4
-        carbs_cal = carbs_g * 4
-        fat_cal = fat_g * 9
-        total_macro_cal = protein_cal + carbs_cal + fat_cal
-
-        if total_macro_cal > 0:
-            macro_analysis['protein_percent'] = round((protein_cal / total_macro_cal) * 100, 1)
-            macro_analysis['carbs_percent'] = round((carbs_cal / total_macro_cal) * 100, 1)
-            macro_analysis['fat_percent'] = round((fat_cal / total_macro_cal) * 100, 1)
-
-            if weights_list:
-                latest_weight = float(weights_list[-1].weight)
-                macro_analysis['protein_per_kg'] = round(protein_g / latest_weight, 2)
-
-    # === DAY OF WEEK ANALYSIS ===
-    day_of_week_stats = {}
-    day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    if daily_stats_list:
-        for day_num in range(7):
-            day_data = [d for d in daily_stats_list if d['day'] and d['day'].weekday() == day_num]
-            if day_data:
-                day_calories = [float(d['total_calories']) for d in day_data if d['total_calories']]
-                if day_calories:
-                    day_of_week_stats[day_names[day_num]] = {
-                        'avg_calories': round(statistics.mean(day_calories), 0),
-                        'count': len(day_calories),
-                    }
-
-    weekday_insights = {}
-    if day_of_week_stats:
-        sorted_days = sorted(day_of_week_stats.items(), key=lambda x: x[1]['avg_calories'])
-        if sorted_days:
-            weekday_insights['lowest_day'] = {'name': sorted_days[0][0], 'calories': sorted_days[0][1]['avg_calories']}
-            weekday_insights['highest_day'] = {'name': sorted_days[-1][0], 'calories': sorted_days[-1][1]['avg_calories']}
-
-            weekday_cals = [v['avg_calories'] for k, v in day_of_week_stats.items() if k in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']]
-            weekend_cals = [v['avg_calories'] for k, v in day_of_week_stats.items() if k in ['Saturday', 'Sunday']]
-
-            if weekday_cals and weekend_cals:
-                weekday_insights['weekday_avg'] = round(statistics.mean(weekday_cals), 0)
-                weekday_insights['weekend_avg'] = round(statistics.mean(weekend_cals), 0)
-                weekday_insights['weekend_difference'] = round(weekday_insights['weekend_avg'] - weekday_insights['weekday_avg'], 0)
-
-    # === CALORIE CONSISTENCY SCORE ===
-    consistency_score = {}
-    if calories_list and len(calories_list) >= 7:
-        avg_cal = statistics.mean(calories_list)
-        std_dev = statistics.stdev(calories_list) if len(calories_list) > 1 else 0
-        cv = (std_dev / avg_cal) * 100 if avg_cal > 0 else 0
-
-        if cv < 10:
-            consistency_score = {'rating': 'Excellent', 'score': 95, 'cv': round(cv, 1)}
-        elif cv < 15:
-            consistency_score = {'rating': 'Good', 'score': 80, 'cv': round(cv, 1)}
-        elif cv < 25:
-            consistency_score = {'rating': 'Moderate', 'score': 60, 'cv': round(cv, 1)}
-        else:
-            consistency_score = {'rating': 'Variable', 'score': 40, 'cv': round(cv, 1)}
-
-    # === INSIGHTS ===
-    insights = []
 
-    if macro_analysis.get('protein_per_kg'):
-        if macro_analysis['protein_per_kg'] >= 1.6:
-            insights.append({
-                'type': 'protein', 'icon': '💪', 'title': 'Strong Protein Intake',
-                'description': f'Excellent! You\'re getting {macro_analysis["protein_per_kg"]:.2f}g protein per kg body weight.',
-                'recommendation': 'Keep up the good protein intake for muscle health.'
-            })
-
-    if streaks.get('current_streak', 0) >= 7:
-        insights.append({
-            'type': 'streak', 'icon': '🔥', 'title': 'Logging Streak',
-            'description': f'Great job! You\'ve logged {streaks["current_streak"]} days in a row. Your longest streak is {streaks["longest_streak"]} days.',
-            'recommendation': 'Keep the momentum going!'
-        })
-
-    # Weight-nutrition correlation insights (same logic as Django template view)
-    if len(weights_list) >= 3:
-        import statistics as _stats
-        weight_changes_with_nutrition = []
-        for i in range(len(weights_list) - 1):
-            older_w = weights_list[i]
-            newer_w = weights_list[i + 1]
-            w_change = float(newer_w.weight) - float(older_w.weight)
-            period_start = older_w.recorded_at
-            period_end = newer_w.recorded_at
-            period_food = FoodItem.objects.filter(consumed_at__gte=period_start, consumed_at__lte=period_end)
-            if period_food.exists():
-                from django.db.models.functions import TruncDate as _TD
-                days_count = period_food.annotate(day=_TD('consumed_at')).values('day').distinct().count()
-                if days_count > 0:
-                    p_totals = period_food.aggregate(cal=Sum('calories'), prot=Sum('protein'), carb=Sum('carbohydrates'), fat_=Sum('fat'))
-                    weight_changes_with_nutrition.append({
-                        'weight_change': w_change,
-                        'avg_calories': float(p_totals['cal'] or 0) / days_count,
-                        'avg_protein': float(p_totals['prot'] or 0) / days_count,
-                        'avg_carbs': float(p_totals['carb'] or 0) / days_count,
-                        'avg_fat': float(p_totals['fat_'] or 0) / days_count,
-                    })
-
-        if len(weight_changes_with_nutrition) >= 3:
-            weight_loss_periods = [p for p in weight_changes_with_nutrition if p['weight_change'] < -0.1]
-            weight_gain_periods = [p for p in weight_changes_with_nutrition if p['weight_change'] > 0.1]
-
-            if weight_loss_periods and weight_gain_periods:
-                avg_cal_loss = _stats.mean([p['avg_calories'] for p in weight_loss_periods])
-                avg_cal_gain = _stats.mean([p['avg_calories'] for p in weight_gain_periods])
-                if avg_cal_loss < avg_cal_gain:
-                    insights.append({
-                        'type': 'calories', 'icon': '🔥', 'title': 'Calorie Impact',
-                        'description': f'You tend to lose weight when averaging {avg_cal_loss:.0f} kcal/day and gain when averaging {avg_cal_gain:.0f} kcal/day.',
-                        'recommendation': f'Try to stay around {avg_cal_loss:.0f} kcal/day for weight loss.'
-                    })
-
-                avg_carbs_loss = _stats.mean([p['avg_carbs'] for p in weight_loss_periods])
-                avg_carbs_gain = _stats.mean([p['avg_carbs'] for p in weight_gain_periods])
-                if avg_carbs_loss < avg_carbs_gain * 0.9:
-                    insights.append({
-                        'type': 'carbs', 'icon': '🍞', 'title': 'Carbohydrate Pattern',
-                        'description': f'Lower carb intake (~{avg_carbs_loss:.0f}g/day) correlates with weight loss vs (~{avg_carbs_gain:.0f}g/day) with weight gain.',
-                        'recommendation': f'Consider keeping carbs around {avg_carbs_loss:.0f}g/day.'
-                    })
-
-    # Weekend Pattern insight
-    if weekday_insights.get('weekend_difference') and weekday_insights['weekend_difference'] > 200:
-        insights.append({
-            'type': 'weekend', 'icon': '📅', 'title': 'Weekend Pattern',
-            'description': f'You consume about {weekday_insights["weekend_difference"]:.0f} more calories on weekends compared to weekdays.',
-            'recommendation': 'Try to maintain more consistent eating patterns throughout the week.'
-        })
-
-    # === ACHIEVEMENTS ===
-    achievements = []
-    if streaks.get('current_streak', 0) >= 30:
-        achievements.append({'icon': '🔥', 'title': 'Monthly Warrior', 'desc': '30+ day logging streak'})
-    if weight_pace.get('weekly_rate') and weight_analysis.get('total_change', 0) <= -2:
-        achievements.append({'icon': '🥈', 'title': 'Good Start', 'desc': 'Lost 2+ kg'})
-    if macro_analysis.get('protein_per_kg', 0) >= 2.0:
-        achievements.append({'icon': '💪', 'title': 'Protein Champion', 'desc': '2+ g protein per kg body weight'})
-    if streaks.get('total_days', 0) >= 50:
-        achievements.append({'icon': '📈', 'title': 'Dedicated Tracker', 'desc': '50+ days logged'})
-    if streaks.get('consistency_rate', 0) >= 90:
-        achievements.append({'icon': '⭐', 'title': 'Super Consistent', 'desc': '90%+ logging consistency'})
-
-    # === NUTRITION SCORE ===
-    nutrition_score = {}
-    if macro_analysis and overall_stats.get('avg_daily_calories'):
-        score = 0
-        breakdown = []
-
-        protein_per_kg = macro_analysis.get('protein_per_kg', 0)
-        if protein_per_kg >= 1.6:
-            score += 25
-            breakdown.append({'name': 'Protein', 'score': 25, 'max': 25})
-        elif protein_per_kg >= 1.2:
-            score += 20
-            breakdown.append({'name': 'Protein', 'score': 20, 'max': 25})
-        else:
-            score += 10
-            breakdown.append({'name': 'Protein', 'score': 10, 'max': 25})
-
-        balance_score = 25
-        if macro_analysis.get('carbs_percent', 0) < 40 or macro_analysis.get('carbs_percent', 0) > 65:
-            balance_score -= 8
-        breakdown.append({'name': 'Macro Balance', 'score': max(0, balance_score), 'max': 25})
-        score += max(0, balance_score)
-
-        if consistency_score.get('score'):
-            cons_points = round(consistency_score['score'] * 0.25)
-            breakdown.append({'name': 'Consistency', 'score': cons_points, 'max': 25})
-            score += cons_points
-
-        if streaks.get('consistency_rate'):
-            log_score = min(25, round(streaks['consistency_rate'] * 0.25))
-            breakdown.append({'name': 'Logging', 'score': log_score, 'max': 25})
-            score += log_score
-
-        nutrition_score['total'] = min(100, score)
-        nutrition_score['breakdown'] = breakdown
-        nutrition_score['grade'] = 'A' if score >= 85 else 'B' if score >= 70 else 'C' if score >= 55 else 'D'
-
-    # === WEEKLY REPORTS ===
-    weekly_stats = food_items.annotate(week=TruncWeek('consumed_at')).values('week').annotate(
-        total_calories=Sum('calories'), total_protein=Sum('protein'),
-        total_carbs=Sum('carbohydrates'), total_fat=Sum('fat'),
-        days_logged=Count('consumed_at__date', distinct=True)
-    ).order_by('-week')
-
-    weekly_reports = []
-    for week in weekly_stats[:12]:
-        days = week['days_logged'] or 1
-        weekly_reports.append({
-            'week_start': week['week'].isoformat() if week['week'] else None,
-            'avg_calories': round((week['total_calories'] or 0) / days, 0),
-            'avg_protein': round(float(week['total_protein'] or 0) / days, 0),
-            'avg_carbs': round(float(week['total_carbs'] or 0) / days, 0),
-            'avg_fat': round(float(week['total_fat'] or 0) / days, 0),
-            'days_logged': days
-        })
-
-    # === MONTHLY REPORTS ===
-    monthly_stats = food_items.annotate(month=TruncMonth('consumed_at')).values('month').annotate(
-        total_calories=Sum('calories'), total_protein=Sum('protein'),
-        total_carbs=Sum('carbohydrates'), total_fat=Sum('fat'),
-        days_logged=Count('consumed_at__date', distinct=True)
-    ).order_by('-month')
-
-    monthly_reports = []
-    for month in monthly_stats[:12]:
-        days = month['days_logged'] or 1
-        monthly_reports.append({
-            'month': month['month'].isoformat() if month['month'] else None,
-            'avg_calories': round((month['total_calories'] or 0) / days, 0),
-            'avg_protein': round(float(month['total_protein'] or 0) / days, 0),
-            'avg_carbs': round(float(month['total_carbs'] or 0) / days, 0),
-            'avg_fat': round(float(month['total_fat'] or 0) / days, 0),
-            'days_logged': days
-        })
-
-    # === TOP FOODS ===
-    top_foods = []
-    if food_items.exists():
-        frequent_foods = food_items.values('product_name').annotate(
-            count=Count('id'), total_calories=Sum('calories')
-        ).order_by('-count')
-        top_foods = [{'name': f['product_name'], 'count': f['count'], 'total_calories': float(f['total_calories'] or 0)} for f in frequent_foods]
-
-    # === BEST/WORST DAYS ===
     best_worst_days = {}
-    if daily_stats_list:
-        valid_days = [d for d in daily_stats_list if d['total_calories'] and d['total_calories'] >= 500]
-        if valid_days:
-            lowest = min(valid_days, key=lambda x: x['total_calories'])
-            highest = max(valid_days, key=lambda x: x['total_calories'])
-            best_worst_days['lowest_calorie_day'] = {'date': lowest['day'].isoformat(), 'calories': float(lowest['total_calories'])}
-            best_worst_days['highest_calorie_day'] = {'date': highest['day'].isoformat(), 'calories': float(highest['total_calories'])}
-
-            highest_protein = max(valid_days, key=lambda x: x['total_protein'] or 0)
-            best_worst_days['highest_protein_day'] = {'date': highest_protein['day'].isoformat(), 'protein': float(highest_protein['total_protein'] or 0)}
-
-    # === CALORIE DISTRIBUTION ===
-    calorie_distribution = []
-    if calories_list and len(calories_list) >= 10:
-        total = len(calories_list)
-        calorie_distribution = [
-            {'label': '<1500 kcal', 'count': sum(1 for c in calories_list if c < 1500), 'percent': round(sum(1 for c in calories_list if c < 1500)/total*100, 1)},
-            {'label': '1500-2000 kcal', 'count': sum(1 for c in calories_list if 1500 <= c < 2000), 'percent': round(sum(1 for c in calories_list if 1500 <= c < 2000)/total*100, 1)},
-            {'label': '2000-2500 kcal', 'count': sum(1 for c in calories_list if 2000 <= c < 2500), 'percent': round(sum(1 for c in calories_list if 2000 <= c < 2500)/total*100, 1)},
-            {'label': '2500-3000 kcal', 'count': sum(1 for c in calories_list if 2500 <= c < 3000), 'percent': round(sum(1 for c in calories_list if 2500 <= c < 3000)/total*100, 1)},
-            {'label': '3000+ kcal', 'count': sum(1 for c in calories_list if c >= 3000), 'percent': round(sum(1 for c in calories_list if c >= 3000)/total*100, 1)},
-        ]
-
-    # === MEAL TIMING ===
-    meal_timing = {}
-    if food_items.exists():
-        hour_data = {}
-        for item in food_items:
-            hour = item.consumed_at.hour
-            if hour not in hour_data:
-                hour_data[hour] = 0
-            hour_data[hour] += float(item.calories or 0)
-
-        if hour_data:
-            morning = sum(hour_data.get(h, 0) for h in range(5, 11))
-            midday = sum(hour_data.get(h, 0) for h in range(11, 15))
-            afternoon = sum(hour_data.get(h, 0) for h in range(15, 18))
-            evening = sum(hour_data.get(h, 0) for h in range(18, 22))
-            night = sum(hour_data.get(h, 0) for h in list(range(22, 24)) + list(range(0, 5)))
-
-            total_cal = morning + midday + afternoon + evening + night
-            if total_cal > 0:
-                meal_timing = {
-                    'morning': round((morning/total_cal)*100, 1),
-                    'midday': round((midday/total_cal)*100, 1),
-                    'afternoon': round((afternoon/total_cal)*100, 1),
-                    'evening': round((evening/total_cal)*100, 1),
-                    'night': round((night/total_cal)*100, 1),
-                }
-
-    # Late Night Eating insight (added after meal_timing is computed)
-    if meal_timing.get('night', 0) > 15:
-        insights.append({
-            'type': 'timing', 'icon': '🌙', 'title': 'Late Night Eating',
-            'description': f'{meal_timing["night"]:.0f}% of your calories are consumed late at night (after 10 PM).',
-            'recommendation': 'Try to finish eating earlier for better digestion and sleep quality.'
-        })
-
-    # High Calorie Days insight (added after calorie_distribution is computed)
-    if calorie_distribution:
-        high_cal_entry = next((d for d in calorie_distribution if '3000+' in d.get('label', '')), None)
-        if high_cal_entry and high_cal_entry.get('percent', 0) > 20:
-            insights.append({
-                'type': 'distribution', 'icon': '📊', 'title': 'High Calorie Days',
-                'description': f'{high_cal_entry["percent"]:.0f}% of your days exceed 3000 calories.',
-                'recommendation': 'Identify triggers for high-calorie days and plan alternatives.'
-            })
-
-    # Nutrition Master achievement
-    if nutrition_score.get('total', 0) >= 80:
-        achievements.append({'icon': '🌟', 'title': 'Nutrition Master', 'desc': 'Excellent overall nutrition score'})
-
-    return JsonResponse({
+    for key, field, label in (('lowest_calorie_day', 'total_calories', 'calories'),
+                              ('highest_calorie_day', 'total_calories', 'calories'),
+                              ('highest_protein_day', 'total_protein', 'protein')):
+        day = engine.best_worst_days.get(key)
+        if day:
+            best_worst_days[key] = {'date': day['day'].isoformat(), label: day[field]}
+
+    data = {
         'period': period,
-        'daily_data': daily_data,
-        'weekly_summary': weekly_summary,
-        'overall_stats': overall_stats,
-        'streaks': streaks,
-        'weight_analysis': weight_analysis,
-        'weight_pace': weight_pace,
-        'projections': projections,
-        'macro_analysis': macro_analysis,
-        'day_of_week_stats': day_of_week_stats,
-        'weekday_insights': weekday_insights,
-        'consistency_score': consistency_score,
-        'insights': insights,
-        'achievements': achievements,
-        'nutrition_score': nutrition_score,
-        'weekly_reports': weekly_reports,
-        'monthly_reports': monthly_reports,
-        'top_foods': top_foods,
+        'daily_data': engine.daily_data,
+        'weekly_summary': engine.weekly_summary,
+        'overall_stats': engine.overall_stats,
+        'streaks': engine.streaks,
+        'weight_analysis': engine.weight_analysis,
+        'weight_pace': engine.weight_pace,
+        'projections': engine.projections,
+        'macro_analysis': engine.macro_analysis,
+        'day_of_week_stats': engine.day_of_week_stats,
+        'weekday_insights': engine.weekday_insights,
+        'consistency_score': engine.consistency_score,
+        'insights': engine.insights,
+        'achievements': engine.achievements,
+        'nutrition_score': engine.nutrition_score,
+        'weekly_reports': [report(row, 'week_start') for row in engine.weekly_reports(limit=12)],
+        'monthly_reports': [report(row, 'month') for row in engine.monthly_reports(limit=12)],
+        'top_foods': [
+            {'name': f['product_name'], 'count': f['count'], 'total_calories': float(f['total_calories'] or 0)}
+            for f in engine.frequent_foods
+        ],
         'best_worst_days': best_worst_days,
-        'calorie_distribution': calorie_distribution,
-        'meal_timing': meal_timing,
-    })
+        'calorie_distribution': [
+            {'label': f"{band['label']} kcal", 'count': band['count'], 'percent': band['percent']}
+            for band in engine.calorie_distribution.values()
+        ],
+        'meal_timing': {
+            key: value['percent'] for key, value in engine.meal_timing.items() if isinstance(value, dict)
+        },
+    }
+    if _heatmap_requested(request):
+        data['eating_heatmap'] = engine.eating_heatmap
+    return JsonResponse(data)
 
 
 @require_http_methods(["GET"])
+@conditional_response(FoodItem)
 def api_top_foods(request):
     """Get top foods for React frontend"""
     days = request.GET.get('days', '90')
@@ -4833,7 +3383,8 @@ def api_top_foods(request):
     now = timezone.now()
 
     if days == 'all':
-        food_items = FoodItem.objects.all()
+        # All-time totals are kept per product, no need to group the entries
+        top_foods = FoodProduct.objects.food_totals()
     else:
         try:
             days_int = int(days)
@@ -4842,16 +3393,8 @@ def api_top_foods(request):
         except ValueError:
             food_items = FoodItem.objects.filter(consumed_at__gte=now - timedelta(days=90))
 
-    # Aggregate by product name
-    top_foods = food_items.values('product_name').annotate(
-        count=Count('id'),
-        total_calories=Sum('calories'),
-        avg_calories=Avg('calories'),
-        total_protein=Sum('protein'),
-        total_carbs=Sum('carbohydrates'),
-        total_fat=Sum('fat'),
-        latest=Max('consumed_at'),
-    )
+        # Aggregate by product, like the all-time totals
+        top_foods = food_items.food_totals()
 
     if sort_by == 'calories':
         top_foods = top_foods.order_by('-total_calories')
@@ -4870,7 +3413,7 @@ def api_top_foods(request):
             'total_protein': round(float(food['total_protein'] or 0), 1),
             'total_carbs': round(float(food['total_carbs'] or 0), 1),
             'total_fat': round(float(food['total_fat'] or 0), 1),
-            'latest': food['latest'].isoformat() if food['latest'] else None,
+            'latest': food['latest_consumed'].isoformat() if food['latest_consumed'] else None,
         })
 
     # Build separate sorted lists for React frontend
@@ -4963,91 +3506,30 @@ def settings_view(request):
 
 
 def export_data(request):
-    """Handle data export requests"""
+    """
+    Handle data export requests.
+
+    Exports are streamed: rows are read in chunks and written as they are
+    produced, so memory use does not grow with the size of the history.
+    ``format`` may be csv (JSON for type=all), json or ndjson.
+    """
+    from .exports import CSV_EXPORTS, RECORD_SECTIONS, csv_lines, json_document, ndjson_lines, record_sections, streaming_response
+
     export_type = request.GET.get('type', 'all')
     export_format = request.GET.get('format', 'csv')
 
-    if export_format == 'csv':
-        response = HttpResponse(content_type='text/csv')
+    if export_type != 'all' and export_type not in RECORD_SECTIONS:
+        return redirect('/settings/?section=data')
 
-        if export_type == 'food':
-            response['Content-Disposition'] = 'attachment; filename="food_data.csv"'
-            writer = csv.writer(response)
-            writer.writerow(['Date', 'Product Name', 'Calories', 'Protein (g)', 'Carbs (g)', 'Fat (g)'])
-            for item in FoodItem.objects.all().order_by('-consumed_at'):
-                writer.writerow([item.consumed_at.strftime('%Y-%m-%d %H:%M'), item.product_name,
-                    float(item.calories), float(item.protein), float(item.carbohydrates), float(item.fat)])
-
-        elif export_type == 'weight':
-            response['Content-Disposition'] = 'attachment; filename="weight_data.csv"'
-            writer = csv.writer(response)
-            writer.writerow(['Date', 'Weight (kg)', 'Notes'])
-            for item in Weight.objects.all().order_by('-recorded_at'):
-                writer.writerow([item.recorded_at.strftime('%Y-%m-%d %H:%M'), float(item.weight), item.notes or ''])
-
-        elif export_type == 'workout':
-            response['Content-Disposition'] = 'attachment; filename="workout_data.csv"'
-            writer = csv.writer(response)
-            writer.writerow(['Date', 'Workout Name', 'Exercise', 'Sets', 'Reps', 'Weight (kg)', 'Notes'])
-            for workout in WorkoutSession.objects.all().order_by('-date'):
-                for exercise in workout.exercises.all():
-                    writer.writerow([workout.date.strftime('%Y-%m-%d'), workout.name or 'Unnamed',
-                        exercise.exercise.name, exercise.sets, exercise.reps,
-                        float(exercise.weight) if exercise.weight else '', exercise.notes or ''])
-
-        elif export_type == 'running':
-            response['Content-Disposition'] = 'attachment; filename="running_data.csv"'
-            writer = csv.writer(response)
-            writer.writerow(['Date', 'Distance (km)', 'Duration', 'Notes'])
-            for item in RunningSession.objects.all().order_by('-date'):
-                writer.writerow([item.date.strftime('%Y-%m-%d'), float(item.distance), str(item.duration), item.notes or ''])
-
-        elif export_type == 'body':
-            response['Content-Disposition'] = 'attachment; filename="body_measurements.csv"'
-            writer = csv.writer(response)
-            writer.writerow(['Date', 'Neck', 'Chest', 'Belly', 'Left Biceps', 'Right Biceps',
-                'Left Triceps', 'Right Triceps', 'Left Forearm', 'Right Forearm',
-                'Left Thigh', 'Right Thigh', 'Left Lower Leg', 'Right Lower Leg', 'Butt', 'Notes'])
-            for item in BodyMeasurement.objects.all().order_by('-date'):
-                writer.writerow([item.date.strftime('%Y-%m-%d'),
-                    float(item.neck) if item.neck else '', float(item.chest) if item.chest else '',
-                    float(item.belly) if item.belly else '', float(item.left_biceps) if item.left_biceps else '',
-                    float(item.right_biceps) if item.right_biceps else '', float(item.left_triceps) if item.left_triceps else '',
-                    float(item.right_triceps) if item.right_triceps else '', float(item.left_forearm) if item.left_forearm else '',
-                    float(item.right_forearm) if item.right_forearm else '', float(item.left_thigh) if item.left_thigh else '',
-                    float(item.right_thigh) if item.right_thigh else '', float(item.left_lower_leg) if item.left_lower_leg else '',
-                    float(item.right_lower_leg) if item.right_lower_leg else '', float(item.butt) if item.butt else '',
-                    item.notes or ''])
-
-        elif export_type == 'all':
-            import json as json_module
-            response = HttpResponse(content_type='application/json')
-            response['Content-Disposition'] = 'attachment; filename="all_data.json"'
-            data = {'food_items': [], 'weight': [], 'workouts': [], 'running': [], 'body_measurements': []}
-            for item in FoodItem.objects.all():
-                data['food_items'].append({
-                    'consumed_at': item.consumed_at.isoformat(), 'product_name': item.product_name,
-                    'calories': float(item.calories), 'protein': float(item.protein),
-                    'carbohydrates': float(item.carbohydrates), 'fat': float(item.fat)
-                })
-            for item in Weight.objects.all():
-                data['weight'].append({'recorded_at': item.recorded_at.isoformat(), 'weight': float(item.weight), 'notes': item.notes})
-            for item in RunningSession.objects.all():
-                data['running'].append({'date': item.date.isoformat(), 'distance': float(item.distance), 'duration': str(item.duration), 'notes': item.notes})
-            for item in BodyMeasurement.objects.all():
-                data['body_measurements'].append({
-                    'date': item.date.isoformat(), 'neck': float(item.neck) if item.neck else None,
-                    'chest': float(item.chest) if item.chest else None, 'belly': float(item.belly) if item.belly else None, 'notes': item.notes
-                })
-            for workout in WorkoutSession.objects.all():
-                workout_data = {'date': workout.date.isoformat(), 'name': workout.name, 'notes': workout.notes, 'exercises': []}
-                for ex in workout.exercises.all():
-                    workout_data['exercises'].append({'exercise_name': ex.exercise.name, 'sets': ex.sets, 'reps': ex.reps,
-                        'weight': float(ex.weight) if ex.weight else None, 'notes': ex.notes})
-                data['workouts'].append(workout_data)
-            response.write(json_module.dumps(data, indent=2))
+    if export_format == 'csv' and export_type != 'all':
+        filename, rows, header = CSV_EXPORTS[export_type]
+        return streaming_response(csv_lines(header, rows()), 'text/csv', filename)
 
-        return response
+    basename = 'all_data' if export_type == 'all' else RECORD_SECTIONS[export_type][0]
+    if export_format in ('csv', 'json'):
+        return streaming_response(json_document(record_sections(export_type)), 'application/json', f'{basename}.json')
+    if export_format == 'ndjson':
+        return streaming_response(ndjson_lines(record_sections(export_type)), 'application/x-ndjson', f'{basename}.ndjson')
     return redirect('/settings/?section=data')
 
 
@@ -5192,41 +3674,22 @@ def month_compare(request):
     month1_str = request.GET.get('month1', default_cur_month)
     month2_str = request.GET.get('month2', default_prev_month)
 
-    def parse_month(s):
+    def parse_month_or_current(s):
         try:
-            dt = datetime.strptime(s, '%Y-%m')
-            return dt.year, dt.month
-        except (ValueError, TypeError):
+            return parse_month(s)
+        except (ValueError, TypeError, AttributeError):
             return now.year, now.month
 
-    year1, mon1 = parse_month(month1_str)
-    year2, mon2 = parse_month(month2_str)
-
-    def get_month_data(year, month):
-        start = timezone.make_aware(datetime(year, month, 1, 0, 0, 0))
-        # Use half-open range [start, next_month_start) to avoid missing entries at
-        # midnight and to correctly handle months with any number of days.
-        if month == 12:
-            end = timezone.make_aware(datetime(year + 1, 1, 1, 0, 0, 0))
-        else:
-            end = timezone.make_aware(datetime(year, month + 1, 1, 0, 0, 0))
-
-        qs = FoodItem.objects.filter(consumed_at__gte=start, consumed_at__lt=end)
+    year1, mon1 = parse_month_or_current(month1_str)
+    year2, mon2 = parse_month_or_current(month2_str)
 
-        days_logged = qs.annotate(day=TruncDate('consumed_at')).values('day').distinct().count()
+    def get_month_data(month):
+        days_logged = month['days_logged']
 
-        totals = qs.aggregate(
-            total_calories=Sum('calories'),
-            total_protein=Sum('protein'),
-            total_fat=Sum('fat'),
-            total_carbs=Sum('carbohydrates'),
-            total_entries=Count('id'),
-        )
-
-        tc = totals['total_calories'] or 0
-        tp = totals['total_protein'] or 0
-        tf = totals['total_fat'] or 0
-        tcarbs = totals['total_carbs'] or 0
+        tc = month['calories']
+        tp = month['protein']
+        tf = month['fat']
+        tcarbs = month['carbs']
 
         # Macro calorie breakdown for bar chart
         p_cal = tp * 4
@@ -5244,29 +3707,26 @@ def month_compare(request):
         else:
             macro_pct = {'protein': 0, 'fat': 0, 'carbs': 0}
 
-        top_foods = list(
-            qs.values('product_name').annotate(
-                count=Count('id'),
-                total_calories=Sum('calories'),
-                total_protein=Sum('protein'),
-                total_fat=Sum('fat'),
-                total_carbs=Sum('carbohydrates'),
-            ).order_by('-count')
-        )
+        top_foods = [{
+            'product_name': food['product_name'],
+            'count': food['count'],
+            'total_calories': food['calories'],
+            'total_protein': food['protein'],
+            'total_fat': food['fat'],
+            'total_carbs': food['carbs'],
+        } for food in month['top_foods']]
 
         # Weight stats for this month
-        weight_qs = Weight.objects.filter(recorded_at__gte=start, recorded_at__lt=end).order_by('recorded_at')
         weight_stats = None
-        if weight_qs.exists():
-            w_agg = weight_qs.aggregate(avg=Avg('weight'), wmin=Min('weight'), wmax=Max('weight'))
+        if month['weigh_ins']:
             weight_stats = {
-                'start': round(weight_qs.first().weight, 1),
-                'end': round(weight_qs.last().weight, 1),
-                'avg': round(w_agg['avg'], 1),
-                'min': round(w_agg['wmin'], 1),
-                'max': round(w_agg['wmax'], 1),
-                'change': round(weight_qs.last().weight - weight_qs.first().weight, 1),
-                'count': weight_qs.count(),
+                'start': round(month['weight_first'], 1),
+                'end': round(month['weight_last'], 1),
+                'avg': round(month['weight_avg'], 1),
+                'min': round(month['weight_min'], 1),
+                'max': round(month['weight_max'], 1),
+                'change': round(month['weight_last'] - month['weight_first'], 1),
+                'count': month['weigh_ins'],
             }
 
         return {
@@ -5280,13 +3740,13 @@ def month_compare(request):
             'avg_daily_fat': round(tf / days_logged, 1) if days_logged else 0,
             'total_carbs': tcarbs,
             'avg_daily_carbs': round(tcarbs / days_logged, 1) if days_logged else 0,
-            'total_entries': totals['total_entries'] or 0,
+            'total_entries': month['entries'],
             'macro_pct': macro_pct,
             'weight': weight_stats,
         }
 
-    data1 = get_month_data(year1, mon1)
-    data2 = get_month_data(year2, mon2)
+    # Totals, weights and full food lists for both months in one batch of queries
+    data1, data2 = (get_month_data(month) for month in month_comparison([(year1, mon1), (year2, mon2)]))
 
     # Overview diffs (A minus B)
     overview_diffs = {
@@ -5360,14 +3820,11 @@ def month_compare(request):
             end_dt = timezone.make_aware(datetime(year, month + 1, 1, 0, 0, 0))
 
         # Daily calorie totals
-        daily_cals = {
-            row['day']: row['total']
-            for row in FoodItem.objects
-                .filter(consumed_at__gte=start_dt, consumed_at__lt=end_dt)
-                .annotate(day=TruncDate('consumed_at'))
-                .values('day')
-                .annotate(total=Sum('calories'))
-        }
+        daily_cals = dict(
+            DailyNutrition.objects
+                .filter(date__year=year, date__month=month)
+                .values_list('date', 'calories')
+        )
 
         # Daily weight readings (average if multiple on same day)
         daily_weights = {
@@ -5439,89 +3896,62 @@ def month_compare(request):
 
 def month_trends(request):
     """12-month trend view: calories, macros and weight across months."""
+    context = cached_context('month_trends', request, (FoodItem, Weight), _month_trends_context)
+    return render(request, 'count_calories_app/month_trends.html', context)
+
+
+def _month_trends_context(request):
+    """Build the month trends page context."""
     from datetime import datetime
-    import calendar
-    from django.db.models.functions import TruncDate
 
-    now = timezone.now()
+    today = timezone.localdate()
 
     # ── Mode: 'last12' (rolling) or a specific calendar year ──────────────
     mode = request.GET.get('mode', 'last12')
     try:
-        selected_year = int(request.GET.get('year', now.year))
+        selected_year = int(request.GET.get('year', today.year))
     except (ValueError, TypeError):
-        selected_year = now.year
+        selected_year = today.year
 
-    # Available years (from first FoodItem to current year)
-    first_entry = FoodItem.objects.order_by('consumed_at').values_list('consumed_at', flat=True).first()
-    first_year = first_entry.year if first_entry else now.year
-    available_years = list(range(now.year, first_year - 1, -1))
+    # Available years (from first logged day to current year)
+    first_day = first_logged_day()
+    first_year = first_day.year if first_day else today.year
+    available_years = list(range(today.year, first_year - 1, -1))
 
     # Build the list of (year, month) pairs to analyse
     if mode == 'year':
         months_to_analyze = [(selected_year, m) for m in range(1, 13)]
     elif mode == 'all':
-        # Every month from the user's first FoodItem entry through the current month
-        if first_entry:
-            months_to_analyze = []
-            y, m = first_entry.year, first_entry.month
-            while (y, m) <= (now.year, now.month):
-                months_to_analyze.append((y, m))
-                m += 1
-                if m == 13:
-                    m = 1
-                    y += 1
-        else:
-            # No entries yet — show just the current month
-            months_to_analyze = [(now.year, now.month)]
+        # Every month from the first logged day through the current month
+        # (just the current month when nothing is logged yet)
+        first_day = first_day or today
+        months_to_analyze = month_sequence((first_day.year, first_day.month), (today.year, today.month))
     else:  # last12 — rolling window ending this month
-        months_to_analyze = []
-        y, m = now.year, now.month
-        for _ in range(12):
-            months_to_analyze.insert(0, (y, m))
-            m -= 1
-            if m == 0:
-                m = 12
-                y -= 1
-
-    # ── Per-month aggregation ──────────────────────────────────────────────
+        months_to_analyze = last_months(today, 12)
+
+    # ── Per-month aggregation (a fixed number of grouped queries) ─────────
     monthly_data = []
-    for (y, m) in months_to_analyze:
-        last_day = calendar.monthrange(y, m)[1]
-        start = timezone.make_aware(datetime(y, m, 1, 0, 0, 0))
-        end   = timezone.make_aware(datetime(y, m, last_day, 23, 59, 59))
+    for month in monthly_series(months_to_analyze):
+        y, m = month['year'], month['month']
+        last_day = month['days_in_month']
+        days_logged = month['days_logged']
 
-        qs = FoodItem.objects.filter(consumed_at__gte=start, consumed_at__lte=end)
-        days_logged = qs.annotate(day=TruncDate('consumed_at')).values('day').distinct().count()
+        tc     = month['calories']
+        tp     = month['protein']
 
-        totals = qs.aggregate(
-            total_calories=Sum('calories'),
-            total_protein=Sum('protein'),
-            total_fat=Sum('fat'),
-            total_carbs=Sum('carbohydrates'),
-        )
-        tc     = float(totals['total_calories'] or 0)
-        tp     = float(totals['total_protein']  or 0)
-        tf     = float(totals['total_fat']      or 0)
-        tcarbs = float(totals['total_carbs']    or 0)
-
-        avg_cal    = round(tc     / days_logged, 1) if days_logged else 0
-        avg_prot   = round(tp     / days_logged, 1) if days_logged else 0
-        avg_fat    = round(tf     / days_logged, 1) if days_logged else 0
-        avg_carbs  = round(tcarbs / days_logged, 1) if days_logged else 0
+        avg_cal    = round(tc               / days_logged, 1) if days_logged else 0
+        avg_prot   = round(tp               / days_logged, 1) if days_logged else 0
+        avg_fat    = round(month['fat']     / days_logged, 1) if days_logged else 0
+        avg_carbs  = round(month['carbs']   / days_logged, 1) if days_logged else 0
 
-        # Top food by count
-        top_food_qs = qs.values('product_name').annotate(cnt=Count('id')).order_by('-cnt').first()
-        top_food = top_food_qs['product_name'] if top_food_qs else None
+        top_food = month['top_food']
 
         # Weight
-        w_qs = Weight.objects.filter(recorded_at__gte=start, recorded_at__lte=end).order_by('recorded_at')
         weight_avg    = None
         weight_change = None
-        if w_qs.exists():
-            w_agg = w_qs.aggregate(avg=Avg('weight'))
-            weight_avg    = round(float(w_agg['avg']), 1)
-            weight_change = round(float(w_qs.last().weight) - float(w_qs.first().weight), 1)
+        if month['weigh_ins']:
+            weight_avg    = round(month['weight_avg'], 1)
+            weight_change = round(month['weight_last'] - month['weight_first'], 1)
 
         monthly_data.append({
             'year': y,
@@ -5595,14 +4025,14 @@ def month_trends(request):
         'consistency': m['consistency_pct'] if m['has_data'] else None,
     } for m in monthly_data])
 
-    return render(request, 'count_calories_app/month_trends.html', {
+    return {
         'monthly_data':   monthly_data,
         'summary':        summary,
         'mode':           mode,
         'selected_year':  selected_year,
         'available_years': available_years,
         'chart_data_json': chart_data,
-    })
+    }
 
 
 def product_compare(request):
@@ -5610,99 +4040,18 @@ def product_compare(request):
     Compare two or three food products side-by-side using averaged nutritional
     data from all logged entries for each product.
     """
-    from datetime import timedelta
-    from django.utils import timezone as tz_util
-
     product1_name = request.GET.get('product1', '').strip()
     product2_name = request.GET.get('product2', '').strip()
     product3_name = request.GET.get('product3', '').strip()
 
     settings = UserSettings.get_settings()
 
-    def get_product_stats(name):
-        if not name:
-            return None
-        qs = FoodItem.objects.filter(product_name__iexact=name)
-        agg = qs.aggregate(
-            avg_calories=Avg('calories'),
-            avg_protein=Avg('protein'),
-            avg_fat=Avg('fat'),
-            avg_carbs=Avg('carbohydrates'),
-            total_entries=Count('id'),
-            last_logged=Max('consumed_at'),
-        )
-        matched_name = name
-        if agg['avg_calories'] is None:
-            qs = FoodItem.objects.filter(product_name__icontains=name)
-            agg = qs.aggregate(
-                avg_calories=Avg('calories'),
-                avg_protein=Avg('protein'),
-                avg_fat=Avg('fat'),
-                avg_carbs=Avg('carbohydrates'),
-                total_entries=Count('id'),
-                last_logged=Max('consumed_at'),
-            )
-            first = qs.values('product_name').first()
-            matched_name = first['product_name'] if first else name
-        if agg['avg_calories'] is None:
-            return None
-
-        calories = round(float(agg['avg_calories']), 1)
-        protein  = round(float(agg['avg_protein']  or 0), 1)
-        fat      = round(float(agg['avg_fat']      or 0), 1)
-        carbs    = round(float(agg['avg_carbs']    or 0), 1)
-
-        # Weekly frequency: counts per week for the last 8 weeks
-        now = tz_util.now()
-        weekly_counts = []
-        for w in range(7, -1, -1):
-            w_start = now - timedelta(weeks=w + 1)
-            w_end   = now - timedelta(weeks=w)
-            cnt = FoodItem.objects.filter(
-                product_name__iexact=matched_name,
-                consumed_at__gte=w_start,
-                consumed_at__lt=w_end,
-            ).count()
-            weekly_counts.append(cnt)
-
-        protein_pct         = round(protein * 4 / calories * 100, 1) if calories else 0
-        fat_pct             = round(fat     * 9 / calories * 100, 1) if calories else 0
-        carbs_pct           = round(carbs   * 4 / calories * 100, 1) if calories else 0
-        protein_per_100kcal = round(protein / calories * 100,      1) if calories else 0
-
-        # Goal alignment (% of daily targets)
-        cal_target     = settings.daily_calorie_target or 1
-        protein_target = settings.protein_target or 1
-        fat_target     = settings.fat_target     or 1
-        carbs_target   = settings.carbs_target   or 1
-        cal_goal_pct     = round(calories / cal_target     * 100, 1)
-        protein_goal_pct = round(protein  / protein_target * 100, 1)
-        fat_goal_pct     = round(fat      / fat_target     * 100, 1)
-        carbs_goal_pct   = round(carbs    / carbs_target   * 100, 1)
-
-        return {
-            'name':               matched_name,
-            'calories':           calories,
-            'protein':            protein,
-            'fat':                fat,
-            'carbs':              carbs,
-            'entries':            agg['total_entries'],
-            'last_logged':        agg['last_logged'],
-            'weekly_counts':      weekly_counts,
-            'weekly_max':         max(weekly_counts) or 1,
-            'protein_pct':        protein_pct,
-            'fat_pct':            fat_pct,
-            'carbs_pct':          carbs_pct,
-            'protein_per_100kcal': protein_per_100kcal,
-            'cal_goal_pct':       cal_goal_pct,
-            'protein_goal_pct':   protein_goal_pct,
-            'fat_goal_pct':       fat_goal_pct,
-            'carbs_goal_pct':     carbs_goal_pct,
-        }
-
-    product1 = get_product_stats(product1_name) if product1_name else None
-    product2 = get_product_stats(product2_name) if product2_name else None
-    product3 = get_product_stats(product3_name) if product3_name else None
+    # Every named product in one grouped query (see product_comparison.py)
+    names = [name for name in (product1_name, product2_name, product3_name) if name]
+    stats = dict(zip(names, compare_products(names, settings)))
+    product1 = stats.get(product1_name) if product1_name else None
+    product2 = stats.get(product2_name) if product2_name else None
+    product3 = stats.get(product3_name) if product3_name else None
 
     # Pairwise diff (only when exactly 2 products)
     def _diff(a, b):
@@ -5722,19 +4071,7 @@ def product_compare(request):
     active_products = [p for p in [product1, product2, product3] if p]
     radar_data_json = 'null'
     if len(active_products) >= 2:
-        mx_cal = max(p['calories']           for p in active_products) or 1
-        mx_pro = max(p['protein']            for p in active_products) or 1
-        mx_fat = max(p['fat']                for p in active_products) or 1
-        mx_car = max(p['carbs']              for p in active_products) or 1
-        mx_eff = max(p['protein_per_100kcal'] for p in active_products) or 1
-        radar_data_json = json.dumps([{
-            'name':    p['name'],
-            'cal_pct': round(p['calories']            / mx_cal * 100),
-            'pro_pct': round(p['protein']             / mx_pro * 100),
-            'fat_pct': round(p['fat']                 / mx_fat * 100),
-            'car_pct': round(p['carbs']               / mx_car * 100),
-            'eff_pct': round(p['protein_per_100kcal'] / mx_eff * 100),
-        } for p in active_products])
+        radar_data_json = json.dumps(radar_chart(active_products))
 
     return render(request, 'count_calories_app/product_compare.html', {
         'product1':        product1,
@@ -5752,18 +4089,12 @@ def product_compare(request):
 # ── Shared helper ─────────────────────────────────────────────────
 def _hourly_calories_json(food_qs):
     """Return JSON array [0..23] of total calories per hour for a food queryset."""
-    from django.db.models.functions import ExtractHour
-    rows = (
-        food_qs
-        .annotate(hr=ExtractHour('consumed_at'))
-        .values('hr')
-        .annotate(cal=Sum('calories'))
-    )
-    buckets = [0.0] * 24
-    for row in rows:
-        if row['hr'] is not None:
-            buckets[row['hr']] = round(float(row['cal'] or 0), 1)
-    return json.dumps(buckets)
+    return json.dumps([round(float(cal), 1) for cal in HourlyHistogram(food_qs).by_hour])
+
+
+def _heatmap_requested(request):
+    """Whether the client asked for the weekday x hour heatmap (?heatmap=1)."""
+    return request.GET.get('heatmap', '').lower() in ('1', 'true', 'yes', 'on')
 
 
 # ══════════════════════════════════════════════════════════════════
@@ -6000,6 +4331,7 @@ def api_delete_body_measurement(request, measurement_id):
 
 
 @require_http_methods(["GET"])
+@conditional_response(MealTemplate, MealTemplateItem)
 def api_meal_templates(request):
     """List all meal templates"""
     from count_calories_app.models import MealTemplate, MealTemplateItem
@@ -6086,8 +4418,9 @@ def api_delete_meal_template(request, template_id):
 
 
 @require_http_methods(["GET"])
+@conditional_response(FoodItem, Weight)
 def api_hourly_eating_pattern(request):
-    """Get calorie distribution by hour of day"""
+    """Get calorie distribution by local hour of day; ?heatmap=1 adds a weekday x hour grid"""
     days_param = request.GET.get('days', '30')
     date_param = request.GET.get('date')
     now = timezone.now()
@@ -6105,55 +4438,55 @@ def api_hourly_eating_pattern(request):
         start = now - timedelta(days=days)
         food_items = FoodItem.objects.filter(consumed_at__gte=start)
 
-    hourly = {}
-    for hour in range(24):
-        hourly[hour] = 0
-
-    for item in food_items:
-        if item.consumed_at:
-            hour = item.consumed_at.hour
-            hourly[hour] += float(item.calories or 0)
-
-    return JsonResponse({
+    histogram = HourlyHistogram(food_items)
+    data = {
         'hours': list(range(24)),
-        'calories': [round(hourly[h], 1) for h in range(24)],
-    })
+        'calories': [round(float(cal), 1) for cal in histogram.by_hour],
+        'meal_periods': {key: round(cal, 1) for key, cal in histogram.meal_periods().items()},
+    }
+    if _heatmap_requested(request):
+        data['heatmap'] = histogram.heatmap()
+    return JsonResponse(data)
 
 
 @require_http_methods(["GET"])
+@conditional_response(FoodItem, Weight)
+@cached_response(FoodItem, Weight)
 def api_month_compare(request):
-    """Compare two months of nutrition data"""
+    """
+    Compare months of nutrition data.
+
+    Either ``month_a`` and ``month_b`` (answered as month_a / month_b) or
+    ``months=2026-01,2026-02,...`` for up to MAX_COMPARE_MONTHS months
+    (answered as a ``months`` list in the requested order).
+    """
+    months_param = request.GET.get('months')
     month_a = request.GET.get('month_a')  # Format: "2026-01"
     month_b = request.GET.get('month_b')  # Format: "2026-02"
 
-    if not month_a or not month_b:
+    if months_param is not None:
+        month_strs = [m.strip() for m in months_param.split(',') if m.strip()]
+        if not month_strs:
+            return JsonResponse({'error': 'months must list at least one month'}, status=400)
+        if len(month_strs) > MAX_COMPARE_MONTHS:
+            return JsonResponse({'error': f'At most {MAX_COMPARE_MONTHS} months can be compared'}, status=400)
+    elif not month_a or not month_b:
         return JsonResponse({'error': 'Both month_a and month_b are required'}, status=400)
+    else:
+        month_strs = [month_a, month_b]
 
-    from datetime import datetime
-    import calendar
-
-    def get_month_data(month_str):
-        year, month = map(int, month_str.split('-'))
-        _, last_day = calendar.monthrange(year, month)
-        start = timezone.make_aware(datetime(year, month, 1))
-        end = timezone.make_aware(datetime(year, month, last_day, 23, 59, 59))
-
-        food_items = FoodItem.objects.filter(consumed_at__gte=start, consumed_at__lte=end)
-        from django.db.models.functions import TruncDate
-        days_logged = food_items.annotate(day=TruncDate('consumed_at')).values('day').distinct().count()
+    try:
+        months = [parse_month(m) for m in month_strs]
+    except ValueError:
+        return JsonResponse({'error': 'Months must be formatted as YYYY-MM'}, status=400)
 
-        totals = food_items.aggregate(
-            total_calories=Sum('calories'),
-            total_protein=Sum('protein'),
-            total_carbs=Sum('carbohydrates'),
-            total_fat=Sum('fat'),
-            count=Count('id'),
-        )
+    def get_month_data(row):
+        days_logged = row['days_logged']
 
-        total_cal = float(totals['total_calories'] or 0)
-        total_prot = float(totals['total_protein'] or 0)
-        total_carbs = float(totals['total_carbs'] or 0)
-        total_fat = float(totals['total_fat'] or 0)
+        total_cal = row['calories']
+        total_prot = row['protein']
+        total_carbs = row['carbs']
+        total_fat = row['fat']
 
         avg_cal = round(total_cal / days_logged) if days_logged else 0
         avg_prot = round(total_prot / days_logged, 1) if days_logged else 0
@@ -6161,26 +4494,25 @@ def api_month_compare(request):
         avg_fat = round(total_fat / days_logged, 1) if days_logged else 0
 
         # Weight data for this month
-        weights = Weight.objects.filter(recorded_at__gte=start, recorded_at__lte=end).order_by('recorded_at')
         weight_data = None
-        if weights.exists():
-            weight_values = [float(w.weight) for w in weights]
+        if row['weigh_ins']:
             weight_data = {
-                'avg': round(sum(weight_values) / len(weight_values), 1),
-                'start': weight_values[0],
-                'end': weight_values[-1],
-                'change': round(weight_values[-1] - weight_values[0], 2),
-                'min': round(min(weight_values), 1),
-                'max': round(max(weight_values), 1),
+                'avg': round(row['weight_avg'], 1),
+                'start': row['weight_first'],
+                'end': row['weight_last'],
+                'change': round(row['weight_last'] - row['weight_first'], 2),
+                'min': round(row['weight_min'], 1),
+                'max': round(row['weight_max'], 1),
             }
 
         # Top foods
-        top_foods = (food_items.values('product_name')
-            .annotate(count=Count('id'), total_cal=Sum('calories'))
-            .order_by('-count')[:10])
+        top_foods = [
+            {'product_name': food['product_name'], 'count': food['count'], 'total_cal': food['calories']}
+            for food in row['top_foods']
+        ]
 
         return {
-            'month': month_str,
+            'month': f"{row['year']}-{row['month']:02d}",
             'days_logged': days_logged,
             'total_calories': total_cal,
             'total_protein': total_prot,
@@ -6190,84 +4522,88 @@ def api_month_compare(request):
             'avg_protein': avg_prot,
             'avg_carbs': avg_carbs,
             'avg_fat': avg_fat,
-            'items_count': totals['count'] or 0,
+            'items_count': row['entries'],
             'weight': weight_data,
-            'top_foods': list(top_foods),
+            'top_foods': top_foods,
         }
 
-    data_a = get_month_data(month_a)
-    data_b = get_month_data(month_b)
+    # Every requested month in the same fixed number of grouped queries
+    data = [get_month_data(row) for row in month_comparison(months, top_foods=10)]
+
+    if months_param is not None:
+        return JsonResponse({'months': data})
+    return JsonResponse({'month_a': data[0], 'month_b': data[1]})
+
 
-    return JsonResponse({'month_a': data_a, 'month_b': data_b})
+@require_http_methods(["GET"])
+@conditional_response(FoodItem, UserSettings)
+@cached_response(FoodItem, UserSettings)
+def api_product_compare(request):
+    """
+    Compare up to MAX_COMPARE_PRODUCTS products (?product=Oats&product=Rice...).
+
+    ``products`` lists the stats in the requested order, None for names that
+    match nothing; ``radar`` normalises the matched products' axes.
+    """
+    names = []
+    for name in (name.strip() for name in request.GET.getlist('product')):
+        if name and name not in names:
+            names.append(name)
+    if not names:
+        return JsonResponse({'error': 'At least one product is required'}, status=400)
+    if len(names) > MAX_COMPARE_PRODUCTS:
+        return JsonResponse({'error': f'At most {MAX_COMPARE_PRODUCTS} products can be compared'}, status=400)
+
+    products = compare_products(names, UserSettings.get_settings())
+    for product in products:
+        if product and product['last_logged']:
+            product['last_logged'] = product['last_logged'].isoformat()
+    matched = [product for product in products if product]
+
+    return JsonResponse({
+        'products': products,
+        'radar': radar_chart(matched) if len(matched) >= 2 else None,
+    })
 
 
 @require_http_methods(["GET"])
+@conditional_response(FoodItem, Weight)
+@cached_response(FoodItem, Weight)
 def api_yearly_trends(request):
     """Get monthly trends data for the React trends view (last12 / specific year / all time)."""
     import calendar
     year_param = request.GET.get('year', 'last12')
-    now = timezone.now()
+    today = timezone.localdate()
 
     if year_param == 'last12':
-        # Last 12 months
-        months = []
-        for i in range(11, -1, -1):
-            dt = now - timedelta(days=i*30)
-            months.append((dt.year, dt.month))
+        # Last 12 calendar months, ending with the current one
+        months = last_months(today, 12)
     elif year_param == 'all':
-        # Every month from the user's first FoodItem entry through the current month
-        first_entry = FoodItem.objects.order_by('consumed_at').values_list('consumed_at', flat=True).first()
-        if first_entry:
-            months = []
-            y, m = first_entry.year, first_entry.month
-            while (y, m) <= (now.year, now.month):
-                months.append((y, m))
-                m += 1
-                if m == 13:
-                    m = 1
-                    y += 1
-        else:
-            months = [(now.year, now.month)]
+        # Every month from the first logged day through the current month
+        first_day = first_logged_day() or today
+        months = month_sequence((first_day.year, first_day.month), (today.year, today.month))
     else:
         year = int(year_param)
         months = [(year, m) for m in range(1, 13)]
 
-    from datetime import datetime
     monthly_data = []
 
-    for year, month in months:
-        _, last_day = calendar.monthrange(year, month)
-        start = timezone.make_aware(datetime(year, month, 1))
-        end = timezone.make_aware(datetime(year, month, last_day, 23, 59, 59))
+    for row in monthly_series(months):
+        year, month = row['year'], row['month']
+        last_day = row['days_in_month']
+        days_logged = row['days_logged']
 
-        food_items = FoodItem.objects.filter(consumed_at__gte=start, consumed_at__lte=end)
-        from django.db.models.functions import TruncDate
-        days_logged = food_items.annotate(day=TruncDate('consumed_at')).values('day').distinct().count()
-
-        totals = food_items.aggregate(
-            total_calories=Sum('calories'),
-            total_protein=Sum('protein'),
-            total_carbs=Sum('carbohydrates'),
-            total_fat=Sum('fat'),
-        )
-
-        total_cal = float(totals['total_calories'] or 0)
-        total_prot = float(totals['total_protein'] or 0)
-        total_carbs = float(totals['total_carbs'] or 0)
-        total_fat = float(totals['total_fat'] or 0)
+        total_cal = row['calories']
+        total_prot = row['protein']
+        total_carbs = row['carbs']
+        total_fat = row['fat']
 
         # Weight for this month
-        weights = Weight.objects.filter(recorded_at__gte=start, recorded_at__lte=end).order_by('recorded_at')
         avg_weight = None
         weight_delta = None
-        if weights.exists():
-            weight_values = [float(w.weight) for w in weights]
-            avg_weight = round(sum(weight_values) / len(weight_values), 1)
-            weight_delta = round(weight_values[-1] - weight_values[0], 2) if len(weight_values) > 1 else 0
-
-        # Top food
-        top_food = (food_items.values('product_name')
-            .annotate(count=Count('id')).order_by('-count').first())
+        if row['weigh_ins']:
+            avg_weight = round(row['weight_avg'], 1)
+            weight_delta = round(row['weight_last'] - row['weight_first'], 2)
 
         consistency = round((days_logged / last_day) * 100, 1) if last_day > 0 else 0
 
@@ -6285,7 +4621,7 @@ def api_yearly_trends(request):
             'avg_fat': round(total_fat / days_logged, 1) if days_logged else 0,
             'avg_weight': avg_weight,
             'weight_delta': weight_delta,
-            'top_food': top_food['product_name'] if top_food else None,
+            'top_food': row['top_food'],
         })
 
     return JsonResponse({'months': monthly_data})
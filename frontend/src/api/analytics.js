@@ -14,6 +14,22 @@ export const analyticsApi = {
     return response.data;
   },
 
+  // Compare any number of 'YYYY-MM' months; answered as { months: [...] } in the same order
+  compareMonths: async (months) => {
+    const response = await apiClient.get('/api/react/analytics/month-compare/', {
+      params: { months: months.join(',') }
+    });
+    return response.data;
+  },
+
+  // Compare up to 10 products by name; answered as { products: [...], radar }
+  compareProducts: async (names) => {
+    const response = await apiClient.get('/api/react/analytics/product-compare/', {
+      params: new URLSearchParams(names.map((name) => ['product', name]))
+    });
+    return response.data;
+  },
+
   getYearlyTrends: async (year = 'last12') => {
     const response = await apiClient.get('/api/react/analytics/yearly-trends/', { params: { year } });
     return response.data;
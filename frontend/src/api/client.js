@@ -16,12 +16,34 @@ function getCsrfToken() {
   return null;
 }
 
+// Conditional GETs: the last ETag and body per URL, so unchanged data comes back
+// as an empty 304 and is served from here. Oldest entries are dropped first.
+const MAX_ETAG_ENTRIES = 100;
+const etagCache = new Map();
+
+function isGet(config) {
+  return (config.method || 'get').toLowerCase() === 'get';
+}
+
+function etagCacheKey(config) {
+  return apiClient.getUri(config);
+}
+
+function rememberResponse(key, etag, data) {
+  etagCache.delete(key);
+  etagCache.set(key, { etag, data });
+  if (etagCache.size > MAX_ETAG_ENTRIES) {
+    etagCache.delete(etagCache.keys().next().value);
+  }
+}
+
 const apiClient = axios.create({
   baseURL: API_BASE_URL,
   headers: {
     'Content-Type': 'application/json',
   },
   withCredentials: true,
+  validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
 });
 
 // Request interceptor for adding CSRF token to mutating requests
@@ -34,6 +56,13 @@ apiClient.interceptors.request.use(
         config.headers['X-CSRFToken'] = csrfToken;
       }
     }
+    // Revalidate GETs we already hold a copy of
+    if (isGet(config)) {
+      const cached = etagCache.get(etagCacheKey(config));
+      if (cached) {
+        config.headers['If-None-Match'] = cached.etag;
+      }
+    }
     return config;
   },
   (error) => {
@@ -41,9 +70,38 @@ apiClient.interceptors.request.use(
   }
 );
 
-// Response interceptor for error handling
+// Response interceptor for conditional GETs and error handling
 apiClient.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    if (!isGet(response.config)) {
+      return response;
+    }
+    const key = etagCacheKey(response.config);
+    if (response.status === 304) {
+      const cached = etagCache.get(key);
+      if (cached) {
+        rememberResponse(key, cached.etag, cached.data);
+        return { ...response, status: 200, data: cached.data };
+      }
+      // The server matched an ETag we no longer hold; fetch the full response once.
+      // The retry sends no If-None-Match, since nothing is cached for this URL.
+      if (!response.config.etagRetry) {
+        return apiClient.get(response.config.url, {
+          params: response.config.params,
+          etagRetry: true,
+        });
+      }
+      // Never hand an empty 304 body to the caller
+      const error = new Error(`Unexpected 304 Not Modified for ${key}`);
+      error.response = response;
+      return Promise.reject(error);
+    }
+    const etag = response.headers?.etag;
+    if (etag) {
+      rememberResponse(key, etag, response.data);
+    }
+    return response;
+  },
   (error) => {
     console.error('API Error:', error.response?.data || error.message);
     return Promise.reject(error);
@@ -13,6 +13,17 @@ export const runningApi = {
     return response.data;
   },
 
+  // Import a running session from a GPX or TCX file
+  importTrack: async (file, notes = '') => {
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('notes', notes);
+    const response = await apiClient.post('/api/react/running-items/import/', formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+    return response.data;
+  },
+
   // Update a running session
   update: async (id, data) => {
     const response = await apiClient.put(`/api/react/running-items/${id}/update/`, data);
@@ -25,6 +36,14 @@ export const runningApi = {
     return response.data;
   },
 
+  // Fastest runs per distance bucket (5k, 10k, half, marathon) and longest runs
+  getPersonalBests: async (limit = 5, buckets = []) => {
+    const params = new URLSearchParams(buckets.map((bucket) => ['bucket', bucket]));
+    params.append('limit', limit);
+    const response = await apiClient.get('/api/react/running-items/personal-bests/', { params });
+    return response.data;
+  },
+
   // Get running data for charts (legacy endpoint)
   getRunningData: async (days = 365) => {
     const response = await apiClient.get('/api/running-data/', {
@@ -30,6 +30,18 @@ export const workoutApi = {
     return response.data;
   },
 
+  // Standing personal records per exercise and the records set recently
+  getPersonalRecords: async (params = {}) => {
+    const response = await apiClient.get('/api/react/exercises/prs/', { params });
+    return response.data;
+  },
+
+  // Weekly sets, reps and volume per muscle group, with a heatmap of one metric
+  getMuscleVolume: async (params = {}) => {
+    const response = await apiClient.get('/api/react/workouts/muscle-volume/', { params });
+    return response.data;
+  },
+
   // Get workout tables
   getWorkoutTables: async () => {
     const response = await apiClient.get('/api/react/workout-tables/');